@@ -21,9 +21,28 @@ on this site at least once.
 
 USAGE
   python3 scripts/audit_pages.py --serve            audit every top-level page
+  python3 scripts/audit_pages.py --all              ...and the generated daily/hail/rent pages
+  python3 scripts/audit_pages.py --incremental      re-parse only pages whose bytes changed
   python3 scripts/audit_pages.py --page cot.html    just one
   python3 scripts/audit_pages.py --selftest         offline checks of the checks
 
+ONE PARSE PER PAGE, ONE WALK OF THE REPO
+Each page's copy is parsed once into a Snapshot (reader text, head) that every
+static check shares; the first version stripped tags three times per page and
+stat()ed up to three paths per href. Links, data refs, titles and descriptions
+come from the site graph (site_graph.py), which also answers the duplicate
+and orphan questions across the whole site. Existence checks are set lookups
+against a FileIndex built by one walk of the repo. Pages are parsed across a
+process pool (--jobs).
+
+With --incremental, each page's static findings are kept in .audit-cache.json
+keyed by a hash of its bytes, and the graph is kept in .site-graph.json; an
+unchanged page is not parsed again. Link and data-ref findings are always
+re-derived from the graph against this run's FileIndex, so a page that links
+to a target deleted since the last run is reported without being re-read. The
+findings cache is dropped wholesale when this file, bake_faq.py or --today
+changes, because any of those changes what a finding is.
+
 Static checks run without a browser. Rendered checks need Playwright and a
 local server with the real components/ directory -- serving a page without
 components/styles.css produced two consecutive panels whose headline finding
@@ -31,23 +50,33 @@ was an artifact of the missing stylesheet, so --serve wires it up properly or
 refuses to run the rendered half.
 """
 import argparse
+import hashlib
 import html as H
 import json
 import os
 import re
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
 from pathlib import Path
 
 REPO = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(Path(__file__).resolve().parent))
+CACHE = REPO / ".audit-cache.json"
+# Generated page trees --all adds to the top-level pages.
+GENERATED_DIRS = ("daily", "hail", "hail-map", "rent")
 
 # One definition of "what counts as a visible FAQ question". The first version
 # of this file had its own copy, and its copy had the bug bake_faq had: a
 # backreference regex stops at the INNER </div> when <div class="faq"> wraps
 # <div class="ans">, so half the questions vanish and the page looks drifted.
 # Two copies of one rule is the failure this site keeps relearning.
+# Links, data refs and head metadata come from the persisted site graph, and
+# so does the one definition of what counts as a link in real markup.
+import site_graph                                             # noqa: E402
+from site_graph import DATA_REF_RX, DESC_RX, TITLE_RX, local_links  # noqa: E402,F401
+
 try:
     from bake_faq import visible_faq as _visible_faq
 except Exception:                                             # noqa: BLE001
@@ -147,15 +176,54 @@ FUTURE_OK = {
 }
 
 
-def static_checks(page, html, today):
+class Snapshot:
+    """One page, parsed once for its copy. Every static check reads these
+    instead of re-running its own pass over the HTML; links, data refs and
+    head metadata live in the site graph."""
+
+    __slots__ = ("page", "html", "head", "text", "low", "stub")
+
+    def __init__(self, page, html):
+        self.page, self.html = page, html
+        self.head = html[:html.find("</head>")] if "</head>" in html else html
+        self.text = strip_tags(html)
+        self.low = self.text.lower()
+        # basis-map, cookies and disclaimer are 800-byte noindex redirect stubs
+        # with a meta refresh. A meta description on a page Google is told not to
+        # index is busywork, and reporting it three times trains people to ignore
+        # the report.
+        self.stub = bool(re.search(r'name="robots"\s+content="[^"]*noindex', html))
+
+
+class FileIndex:
+    """Every file and directory in the repo, from one walk, so an existence
+    check is a set lookup rather than a stat() per candidate path."""
+
+    def __init__(self, root=REPO):
+        self.paths = set()
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d != ".git"]
+            rel = os.path.relpath(dirpath, root)
+            base = "" if rel == "." else rel + "/"
+            if base:
+                self.paths.add(rel)
+            self.paths.update(base + f for f in filenames)
+
+    def exists(self, rel):
+        rel = os.path.normpath(rel)            # "hail/" -> "hail", like Path does
+        return rel == "." or rel in self.paths
+
+
+def _on_disk(rel):
+    return (REPO / rel).exists()
+
+
+def static_checks(page, html, today, snap=None):
     out = []
-    text = strip_tags(html)
+    snap = snap or Snapshot(page, html)
+    text = snap.text
     quotes = page in QUOTES_DEFECTS
-    # basis-map, cookies and disclaimer are 800-byte noindex redirect stubs
-    # with a meta refresh. A meta description on a page Google is told not to
-    # index is busywork, and reporting it three times trains people to ignore
-    # the report.
-    stub = bool(re.search(r'name="robots"\s+content="[^"]*noindex', html))
+    stub = snap.stub
 
     # ---- head essentials (the new-page checklist, enforced) -------------
     # Measure what a search result shows, not what the file stores. The first
@@ -166,15 +234,14 @@ def static_checks(page, html, today):
     # Scoped to <head>. Four of these pages build an SVG <title> in a chart
     # script, so an unscoped search would happily accept "Hail History Report"
     # as the page title if the real one ever went missing.
-    head = html[:html.find("</head>")] if "</head>" in html else html
-    title = re.search(r"<title>(.*?)</title>", head, re.S)
+    title = TITLE_RX.search(snap.head)
     if not title:
         out.append(Finding(page, "HIGH", "no-title", "page has no <title>"))
     else:
         t = H.unescape(re.sub(r"\s+", " ", title.group(1)).strip())
         if len(t) > 70:
             out.append(Finding(page, "LOW", "title-long", f"{len(t)} chars: {t[:60]}…"))
-    desc = re.search(r'<meta name="description"\s+content="([^"]*)"', html)
+    desc = DESC_RX.search(html)
     if not desc:
         if not stub:
             out.append(Finding(page, "MEDIUM", "no-description", "no meta description"))
@@ -211,7 +278,7 @@ def static_checks(page, html, today):
                                f"{bad!r} in rendered-ish text"))
 
     # ---- emoji, four forms ----------------------------------------------
-    for ch in set(text):
+    for ch in sorted(set(text)):         # stable order: findings are cached across runs
         cp = ord(ch)
         if ch in ALLOWED_GLYPHS:
             continue
@@ -223,7 +290,7 @@ def static_checks(page, html, today):
                            "escaped emoji codepoint in source"))
 
     # ---- AI tells --------------------------------------------------------
-    low = text.lower()
+    low = snap.low
     for tell in AI_TELLS:
         if tell in low and not quotes:
             out.append(Finding(page, "MEDIUM", "ai-tell", f"{tell!r} in copy"))
@@ -303,32 +370,13 @@ def static_checks(page, html, today):
     return out
 
 
-def local_links(html):
-    """Only hrefs in real markup. A template literal like
-
-        '<a href="/daily/'+escHtml(iso)+'">'
-
-    is a link the browser never sees as written, and the first run of this
-    script reported three of them as dead links. Strip scripts first, and
-    refuse anything carrying a quote, plus or brace."""
-    body = re.sub(r"<script.*?</script>", " ", html, flags=re.S)
-    out = set()
-    for m in re.finditer(r'href="(/[^"#?\s]*)"', body):
-        href = m.group(1)
-        if any(c in href for c in "'+{}$`"):
-            continue
-        out.add(href)
-    return out
-
-
-def link_targets_exist(page, html):
+def link_targets_exist(page, html, links=None, exists=_on_disk):
     out = []
-    for href in sorted(local_links(html)):
+    for href in sorted(local_links(html) if links is None else links):
         if href in ("/",) or href.startswith("/#"):
             continue
         p = href.lstrip("/")
-        cands = [REPO / p, REPO / (p + ".html"), REPO / p / "index.html"]
-        if any(c.exists() for c in cands):
+        if any(exists(c) for c in (p, p + ".html", p + "/index.html")):
             continue
         if re.match(r"^(img|components|data|workers|docs)/", p):
             out.append(Finding(page, "MEDIUM", "dead-asset", href))
@@ -337,15 +385,14 @@ def link_targets_exist(page, html):
     return out
 
 
-def data_refs_exist(page, html):
+def data_refs_exist(page, html, refs=None, exists=_on_disk):
     out = []
-    for m in re.finditer(r"['\"](/?data/[a-zA-Z0-9_\-/]+\.json)['\"]", html):
-        rel = m.group(1).lstrip("/")
-        if not (REPO / rel).exists():
-            if (page, "missing-data", m.group(1)) in KNOWN:
+    for ref in (refs if refs is not None else (m.group(1) for m in DATA_REF_RX.finditer(html))):
+        if not exists(ref.lstrip("/")):
+            if (page, "missing-data", ref) in KNOWN:
                 continue
             out.append(Finding(page, "HIGH", "missing-data",
-                               f"fetches {m.group(1)} which does not exist"))
+                               f"fetches {ref} which does not exist"))
     return out
 
 
@@ -378,29 +425,87 @@ def css_structure(path="components/styles.css"):
     return out
 
 
-def audit(pages, today):
+def audit_page(page, today):
+    """Parse one page and run the checks that read its copy. Returns a plain,
+    cacheable record; links, data refs and metadata come from the site graph."""
+    raw, html = site_graph.read_page(REPO / page)
+    snap = Snapshot(page, html)
+    return {"hash": hashlib.sha1(raw).hexdigest(), "stub": snap.stub,
+            "static": [[f.sev, f.code, f.detail] for f in static_checks(page, html, today, snap)]}
+
+
+def _audit_chunk(pages, today):
+    return [audit_page(p, today) for p in pages]
+
+
+def checker_version():
+    """Changes whenever a check could: this file and the FAQ rule it imports."""
+    h = hashlib.sha1()
+    for f in (Path(__file__), Path(__file__).with_name("bake_faq.py")):
+        if f.exists():
+            h.update(f.read_bytes())
+    return h.hexdigest()
+
+
+def load_cache(path, today):
+    try:
+        c = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if c.get("checker") != checker_version() or c.get("today") != today.isoformat():
+        return {}
+    return c.get("pages", {})
+
+
+def save_cache(path, today, records):
+    Path(path).write_text(json.dumps({"checker": checker_version(), "today": today.isoformat(),
+                                      "pages": records}, separators=(",", ":")),
+                          encoding="utf-8")
+
+
+def audit(pages, today, jobs=None, cache=None, stats=None, graph=None):
+    """Audit pages. cache is a {page: record} dict from a previous run (it is
+    updated in place); only pages whose bytes no longer match are parsed.
+    graph is a site_graph.SiteGraph, refreshed from disk if not given."""
     findings = css_structure()
-    titles, descs = {}, {}
+    index = FileIndex()
+    graph = graph or site_graph.SiteGraph.load(save=False)
     for page in pages:
-        p = REPO / page
-        html = p.read_text(encoding="utf-8", errors="replace")
-        findings += static_checks(page, html, today)
-        findings += link_targets_exist(page, html)
-        findings += data_refs_exist(page, html)
-        t = re.search(r"<title>(.*?)</title>", html, re.S)
-        d = re.search(r'<meta name="description"\s+content="([^"]*)"', html)
-        if t:
-            titles.setdefault(re.sub(r"\s+", " ", t.group(1)).strip(), []).append(page)
-        if d:
-            descs.setdefault(d.group(1).strip(), []).append(page)
-    for t, pgs in titles.items():
-        if len(pgs) > 1:
-            findings.append(Finding(pgs[0], "MEDIUM", "duplicate-title",
-                                    f"{len(pgs)} pages share this title: {', '.join(pgs)}"))
-    for d, pgs in descs.items():
-        if len(pgs) > 1:
-            findings.append(Finding(pgs[0], "LOW", "duplicate-desc",
-                                    f"{len(pgs)} pages share a description: {', '.join(pgs)}"))
+        if page not in graph.nodes:
+            raise FileNotFoundError(REPO / page)
+    cache = {} if cache is None else cache
+    todo = [p for p in pages if cache.get(p, {}).get("hash") != graph.nodes[p]["hash"]]
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    if jobs == 1 or len(todo) < 2 * jobs:
+        fresh = _audit_chunk(todo, today)
+    else:
+        # a few chunks per worker: ~500 pages cost less to ship in 4-page
+        # tasks than one at a time, and a slow page still spreads out
+        size = max(1, len(todo) // (jobs * 4))
+        chunks = [todo[i:i + size] for i in range(0, len(todo), size)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            fresh = [r for part in pool.map(_audit_chunk, chunks, [today] * len(chunks)) for r in part]
+    cache.update(zip(todo, fresh))
+    if stats is not None:
+        stats.update(parsed=len(todo), cached=len(pages) - len(todo), jobs=jobs)
+
+    orphans = set(graph.orphans(pages))
+    for page in pages:
+        node = graph.nodes[page]
+        findings += [Finding(page, *f) for f in cache[page]["static"]]
+        findings += link_targets_exist(page, None, node["links"], index.exists)
+        findings += data_refs_exist(page, None, node["refs"], index.exists)
+        # A page only the sitemap knows about gets no link equity and no
+        # reader who did not arrive from a search result. Redirect stubs are
+        # meant to be reached only by their old URL.
+        if page in orphans and not cache[page]["stub"]:
+            findings.append(Finding(page, "LOW", "orphan", "no page or nav fragment links here"))
+    for t, pgs in graph.duplicates("title", pages).items():
+        findings.append(Finding(pgs[0], "MEDIUM", "duplicate-title",
+                                f"{len(pgs)} pages share this title: {', '.join(pgs)}"))
+    for d, pgs in graph.duplicates("desc", pages).items():
+        findings.append(Finding(pgs[0], "LOW", "duplicate-desc",
+                                f"{len(pgs)} pages share a description: {', '.join(pgs)}"))
     return findings
 
 
@@ -485,6 +590,30 @@ def selftest():
     f = data_refs_exist("x.html", "fetch('/data/changelog.json')")
     ck("a fetch of a real data file is quiet", not f)
 
+    print("\nsnapshot, file index and cache")
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "hail").mkdir()
+        (Path(tmp) / "hail" / "index.html").write_text("x")
+        (Path(tmp) / "cot.html").write_text("x")
+        idx = FileIndex(Path(tmp))
+    ck("the index answers as Path.exists would",
+       idx.exists("hail") and idx.exists("hail/") and idx.exists("hail//index.html")
+       and idx.exists("cot.html") and not idx.exists("cot") and not idx.exists("nope.html"))
+    page = ('<title>T</title><a href="/cot">c</a><a href="/hail/">h</a>'
+            "<script>fetch('/data/changelog.json')</script>")
+    ck("one snapshot serves every static check",
+       [repr(f) for f in static_checks("x.html", page, T, Snapshot("x.html", page))]
+       == [repr(f) for f in static_checks("x.html", page, T)])
+    links = site_graph.node(page)["links"]
+    ck("links from the graph need no re-parse",
+       not link_targets_exist("x.html", None, links, idx.exists))
+    idx.paths.discard("cot.html")
+    ck("...and a target deleted since the last run is still reported",
+       [f.detail for f in link_targets_exist("x.html", None, links, idx.exists)] == ["/cot"])
+    rec = audit_page("changelog.html", T)
+    ck("a page record survives the JSON cache", json.loads(json.dumps(rec)) == rec)
+
     print()
     if fails:
         print(f"{len(fails)} FAILED: " + "; ".join(fails))
@@ -499,6 +628,10 @@ def main():
     ap.add_argument("--selftest", action="store_true")
     ap.add_argument("--today", default=None)
     ap.add_argument("--json", default=None, help="write findings to this file")
+    ap.add_argument("--all", action="store_true", help="include the generated daily/hail/rent pages")
+    ap.add_argument("--jobs", type=int, default=None, help="parser processes (default: one per CPU)")
+    ap.add_argument("--incremental", action="store_true",
+                    help=f"reuse findings for unchanged pages from {CACHE.name}")
     a = ap.parse_args()
     if a.selftest:
         return selftest()
@@ -507,8 +640,17 @@ def main():
         pages = [a.page]
     else:
         pages = sorted(p.name for p in REPO.glob("*.html") if p.name not in SKIP)
+        if a.all:
+            pages += sorted(str(p.relative_to(REPO)) for d in GENERATED_DIRS
+                            for p in (REPO / d).rglob("*.html"))
     print(f"auditing {len(pages)} pages as of {today}")
-    findings = audit(pages, today)
+    cache = load_cache(CACHE, today) if a.incremental else {}
+    stats = {}
+    graph = site_graph.SiteGraph.load(save=a.incremental)
+    findings = audit(pages, today, jobs=a.jobs, cache=cache, stats=stats, graph=graph)
+    print(f"  {stats['parsed']} parsed on {stats['jobs']} worker(s), {stats['cached']} unchanged from cache")
+    if a.incremental:
+        save_cache(CACHE, today, {p: r for p, r in cache.items() if (REPO / p).exists()})
     if a.json:
         Path(a.json).write_text(json.dumps(
             [{"page": f.page, "sev": f.sev, "code": f.code, "detail": f.detail}
@@ -0,0 +1,810 @@
+#!/usr/bin/env python3
+"""
+bake_engine.py — ONE splice engine for every page baker.
+
+WHY THIS FILE EXISTS
+  build_croptour, build_condyield, build_changelog, build_farmbill,
+  prerender_wpi_scorecard, bake_homepage, bake_faq, bake_seo and seed_static
+  each grew their own splice() / replace_inner() / seed_between(), and three
+  of them their own DivBalance. Every splice compiled a fresh
+  `marker(.*?)marker` regex and rescanned the whole document, so crop-tour.html
+  (12 regions) was scanned a dozen times per bake, and a page touched by four
+  bakers in one workflow was read and written four times. The copies had also
+  drifted: prerender's version treated the body as a regex replacement
+  template (a backslash in a title would have been eaten), seed's silently
+  filled only the first pair, farm-bill's counted divs with a regex.
+
+HOW IT WORKS
+  A Markers grammar says how a page spells its region comments:
+
+      CT   = Markers("<!-- CT:{name} -->", "<!-- /CT:{name} -->")
+      SEED = Markers("<!--SEED:{name}-->", "<!--/SEED-->")      # generic closer
+
+  Page parses the text ONCE into a region tree (every grammar in play is one
+  alternation, so one scan), queues fills, element fills and whole-document
+  edits, and render() rebuilds the text in one pass:
+
+      1. regions   every queued fill is emitted in a single walk of the tree.
+                   A fill body that itself carries markers is parsed and filled
+                   too -- crop-tour's CT:flow emits the empty CT:nights/CT:bench
+                   pairs the other fills land in. Pairing is the old lazy-regex
+                   rule: an opener closes at the next closer of its name.
+      2. elements  replace_inner-style fills (an element's opening tag by
+                   regex, up to its next close tag), all in one combined scan.
+      3. edits     text -> text functions in the order they were queued
+                   (meta tags, JSON-LD, dateModified).
+      4. checks    gauntlets, run once on the finished text.
+
+  write() touches the file only when the bytes changed.
+
+  Expectations are part of the fill: expect=1 (exactly one region, the
+  croptour/condyield/changelog/farm-bill rule), expect="+" (at least one,
+  prerender), expect=None (optional, seed). A miss raises BakeError, which is
+  an AssertionError on purpose -- it is the same failed precondition the
+  bakers' own asserts have always raised.
+
+WHOLE-SITE BAKE
+  Bakers register a bake(site) function with @baker(name, reads=, writes=).
+  A Site holds one Page per file and one parse per data file (site.json), so
+  running every baker in one process loads each page and each JSON input
+  once, and writes each page once.
+
+  reads/writes make a dependency graph: a baker that reads what another
+  writes runs after it (bake_faq reads every page, so it runs after all of
+  them), and bakers writing the same file keep BAKER_MODULES order. Given the
+  files that changed, only the bakers they reach run, in topological order:
+
+      python3 scripts/bake_engine.py                        # every baker
+      python3 scripts/bake_engine.py --only seo,faq         # a subset
+      python3 scripts/bake_engine.py --changed data/cot.json
+      python3 scripts/bake_engine.py --since HEAD           # whatever the fetchers just wrote
+      python3 scripts/bake_engine.py --since HEAD --dry-run # what would rebuild, and why
+      python3 scripts/bake_engine.py --check                # exit 1 on drift, write nothing
+      python3 scripts/bake_engine.py --selftest
+
+  Every run prints a per-baker timing breakdown. Date-driven bakers (the
+  seed dateModified stamps, crop-tour's phase) have no file to trigger them;
+  run them with --only or a full bake. With --changed/--since, --dry-run also
+  lists the pages that fetch each changed data/*.json in the browser (from
+  site_graph.py), which no baker's writes= covers.
+
+  Each baker's own CLI keeps working unchanged; it just builds a one-baker
+  Site and flushes it.
+"""
+import argparse
+import heapq
+import importlib
+import json
+import re
+import subprocess
+import sys
+import time
+from fnmatch import fnmatch
+from html.parser import HTMLParser
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+class BakeError(AssertionError):
+    """A region, anchor or gauntlet precondition failed; the page is not written."""
+
+
+# ---------------------------------------------------------------- grammars
+
+class Markers:
+    """How a page spells the open/close comments around a named region."""
+
+    NAME = r"[\w-]+"
+
+    def __init__(self, open_fmt, close_fmt):
+        self.open_fmt, self.close_fmt = open_fmt, close_fmt
+        self.generic_close = "{name}" not in close_fmt
+
+    def pattern(self, fmt, group):
+        """Regex for one side; the region name (if any) lands in `group`."""
+        if "{name}" not in fmt:
+            return re.escape(fmt)
+        a, b = fmt.split("{name}")
+        return re.escape(a) + f"(?P<{group}>{self.NAME})" + re.escape(b)
+
+    def __eq__(self, other):
+        return isinstance(other, Markers) and \
+            (self.open_fmt, self.close_fmt) == (other.open_fmt, other.close_fmt)
+
+    def __hash__(self):
+        return hash((self.open_fmt, self.close_fmt))
+
+    def open(self, name):
+        return self.open_fmt.format(name=name)
+
+    def close(self, name):
+        return self.close_fmt.format(name=name) if not self.generic_close else self.close_fmt
+
+    def __repr__(self):
+        return f"Markers({self.open_fmt!r}, {self.close_fmt!r})"
+
+
+# The one grammar several bakers share: seed_static's stat lines and
+# build_condyield's summary both sit in <!--SEED:tag-->...<!--/SEED-->.
+SEED = Markers("<!--SEED:{name}-->", "<!--/SEED-->")
+
+
+class _Region:
+    __slots__ = ("grammar", "name", "open", "close", "children")
+
+    def __init__(self, grammar, name, open_, close, children):
+        self.grammar, self.name = grammar, name
+        self.open, self.close, self.children = open_, close, children
+
+
+def _token_re(grammars):
+    alts = []
+    for i, g in enumerate(grammars):
+        alts.append(f"(?P<o{i}>{g.pattern(g.open_fmt, f'on{i}')})")
+        alts.append(f"(?P<c{i}>{g.pattern(g.close_fmt, f'cn{i}')})")
+    return re.compile("|".join(alts))
+
+
+def _tokens(text, grammars, rx):
+    """[(grammar index, is_open, name or None, start, end)] from one scan."""
+    out = []
+    for m in rx.finditer(text):
+        kind = m.lastgroup
+        name = m.groupdict().get(kind[0] + "n" + kind[1:])
+        out.append((int(kind[1:]), kind[0] == "o", name, m.start(), m.end()))
+    return out
+
+
+def _tree(text, toks, i, j, pos, end, grammars):
+    nodes, k = [], i
+    while k < j:
+        gi, is_open, name, s, e = toks[k]
+        if not is_open:
+            k += 1
+            continue
+        generic = grammars[gi].generic_close
+        close_k = None
+        for x in range(k + 1, j):
+            g2, o2, n2, _, _ = toks[x]
+            if g2 == gi and not o2 and (generic or n2 == name):
+                close_k = x
+                break
+        if close_k is None:          # unpaired opener: plain text, as the regex left it
+            k += 1
+            continue
+        cs, ce = toks[close_k][3], toks[close_k][4]
+        nodes.append(text[pos:s])
+        nodes.append(_Region(grammars[gi], name, text[s:e], text[cs:ce],
+                             _tree(text, toks, k + 1, close_k, e, cs, grammars)))
+        pos, k = ce, close_k + 1
+    nodes.append(text[pos:end])
+    return nodes
+
+
+def _parse_with(text, grammars, rx):
+    toks = _tokens(text, grammars, rx)
+    return _tree(text, toks, 0, len(toks), 0, len(text), grammars)
+
+
+def parse(text, grammars):
+    """Region tree for text under the given grammars (one scan)."""
+    grammars = list(grammars)
+    return _parse_with(text, grammars, _token_re(grammars)) if grammars else [text]
+
+
+def region_map(text, markers):
+    """{name: inner text} for every region of one grammar (first occurrence wins)."""
+    out = {}
+
+    def walk(nodes):
+        for n in nodes:
+            if isinstance(n, _Region):
+                out.setdefault(n.name, "".join(_flat(n.children)))
+                walk(n.children)
+    walk(parse(text, [markers]))
+    return out
+
+
+def _flat(nodes):
+    for n in nodes:
+        if isinstance(n, str):
+            yield n
+        else:
+            yield n.open
+            yield from _flat(n.children)
+            yield n.close
+
+
+# ---------------------------------------------------------------- balance
+
+class DivBalance(HTMLParser):
+    """Depth counter for block tags; bad is set the moment a close has no open."""
+
+    def __init__(self, tags=("div",)):
+        super().__init__(convert_charrefs=False)
+        self.tags = tags
+        self.depth = 0
+        self.bad = False
+
+    def handle_starttag(self, t, a):
+        if t in self.tags:
+            self.depth += 1
+
+    def handle_endtag(self, t):
+        if t in self.tags:
+            self.depth -= 1
+            if self.depth < 0:
+                self.bad = True
+
+
+def balanced(html, tags=("div",)):
+    p = DivBalance(tags)
+    p.feed(html)
+    return not p.bad and p.depth == 0
+
+
+# ---------------------------------------------------------------- page
+
+class Page:
+    """One HTML file: read once, edits queued, rebuilt once, written if changed."""
+
+    def __init__(self, path, text=None):
+        self.path = Path(path)
+        self.original = self.path.read_text(encoding="utf-8") if text is None else text
+        self._grammars = []
+        self._fills = {}          # (grammar index, name) -> (body, expect)
+        self._elements = []       # (label, open_pat, close_tag, inner, required)
+        self._edits = []          # text -> text
+        self._checks = []         # text -> None (raise to refuse)
+        self._cache = None
+
+    # -- queueing -----------------------------------------------------------
+    def _gi(self, markers):
+        if markers not in self._grammars:
+            self._grammars.append(markers)
+        return self._grammars.index(markers)
+
+    def fill(self, markers, name, body, expect=1):
+        """Queue a region fill. A later fill of the same region replaces an earlier one."""
+        self._fills[(self._gi(markers), name)] = (body, expect)
+        self._cache = None
+        return self
+
+    def element(self, label, open_pat, close_tag, inner, required=True):
+        """Queue replace_inner: element opened by open_pat (regex) up to its next close_tag."""
+        self._elements.append((label, open_pat, close_tag, inner, required))
+        self._cache = None
+        return self
+
+    def edit(self, fn):
+        """Queue a whole-document text -> text edit, applied after fills, in order."""
+        self._edits.append(fn)
+        self._cache = None
+        return self
+
+    def sub(self, pattern, repl, label, expect=1, count=0, flags=0):
+        """Queue a regex substitution. expect: exact match count, "+" for >=1, None for any."""
+        rx = re.compile(pattern, flags)
+
+        def _sub(text):
+            new, n = rx.subn(repl, text, count=count)
+            _expect(n, expect, label)
+            return new
+        return self.edit(_sub)
+
+    def check(self, fn):
+        """Queue a gauntlet; it runs once on the rendered text and raises to refuse."""
+        self._checks.append(fn)
+        return self
+
+    def balance(self, tags=("div",), label=None):
+        def _chk(text):
+            if not balanced(text, tags):
+                raise BakeError(label or f"{'/'.join(tags)} balance broken in {self.path.name}")
+        return self.check(_chk)
+
+    # -- snapshot (whole-site runs roll a failed baker back) -------------------
+    def snapshot(self):
+        return (list(self._grammars), dict(self._fills), list(self._elements),
+                list(self._edits), list(self._checks))
+
+    def restore(self, snap):
+        g, f, el, ed, ch = snap
+        self._grammars, self._fills = list(g), dict(f)
+        self._elements, self._edits, self._checks = list(el), list(ed), list(ch)
+        self._cache = None
+
+    # -- render -------------------------------------------------------------
+    def render(self):
+        if self._cache is not None:
+            return self._cache
+        text = self.original
+        if self._fills:
+            text = self._render_regions(text)
+        if self._elements:
+            text = self._render_elements(text)
+        for fn in self._edits:
+            text = fn(text)
+        self._cache = text
+        return text
+
+    @property
+    def text(self):
+        return self.render()
+
+    def _render_regions(self, text):
+        grammars = self._grammars
+        rx = _token_re(grammars)
+        seen = {k: 0 for k in self._fills}
+        out = []
+
+        def emit(nodes, active):
+            for n in nodes:
+                if isinstance(n, str):
+                    out.append(n)
+                    continue
+                key = (grammars.index(n.grammar), n.name)
+                out.append(n.open)
+                if key in self._fills and key not in active:
+                    seen[key] += 1
+                    emit(_parse_with(self._fills[key][0], grammars, rx), active | {key})
+                else:
+                    emit(n.children, active)
+                out.append(n.close)
+
+        emit(_parse_with(text, grammars, rx), frozenset())
+        for (gi, name), (_, expect) in self._fills.items():
+            _expect(seen[(gi, name)], expect,
+                    f"marker {name} ({grammars[gi].open(name)}) in {self.path.name}")
+        return "".join(out)
+
+    def _render_elements(self, text):
+        # one alternation of every anchor; each alternative is
+        # (?P<eN>(open)(inner)(close)) so its groups sit right after eN
+        rx = re.compile("|".join(f"(?P<e{i}>({op})(.*?)({re.escape(ct)}))"
+                                 for i, (_, op, ct, _, _) in enumerate(self._elements)), re.S)
+        matches = list(rx.finditer(text))
+        hits = [0] * len(self._elements)
+        for m in matches:
+            hits[int(m.lastgroup[1:])] += 1
+        # an anchor that matches twice is drift, refused before anything is touched
+        for (label, _, _, _, required), n in zip(self._elements, hits):
+            if n != 1 and required:
+                raise BakeError(f"ANCHOR DRIFT: {label} matched {n} times")
+        out, pos = [], 0
+        for m in matches:
+            i = int(m.lastgroup[1:])
+            if hits[i] != 1:
+                continue
+            g = rx.groupindex[m.lastgroup]
+            out += [text[pos:m.start()], m.group(g + 1), self._elements[i][3], m.group(g + 3)]
+            pos = m.end()
+        out.append(text[pos:])
+        return "".join(out)
+
+    # -- output -------------------------------------------------------------
+    def run_checks(self):
+        text = self.render()
+        for fn in self._checks:
+            fn(text)
+        return text
+
+    @property
+    def changed(self):
+        return self.render() != self.original
+
+    def write(self):
+        """Checks, then write only if the bytes changed. Returns True if written."""
+        text = self.run_checks()
+        if text == self.original:
+            return False
+        self.path.write_text(text, encoding="utf-8")
+        self.original = text
+        return True
+
+
+def _expect(n, expect, label):
+    if expect is None:
+        return
+    if expect == "+":
+        if n < 1:
+            raise BakeError(f"{label}: not found")
+    elif n != expect:
+        raise BakeError(f"{label}: expected exactly {expect}, found {n}")
+
+
+# ---------------------------------------------------------------- site
+
+class Site:
+    """One Page per file, and one parse per data file, for the life of the process."""
+
+    def __init__(self, root=REPO):
+        self.root = Path(root)
+        self._pages = {}
+        self._json = {}
+        self.json_reads = 0
+        self.json_reuses = 0
+
+    def _path(self, path):
+        p = Path(path)
+        return p if p.is_absolute() else self.root / p
+
+    def page(self, path):
+        p = self._path(path)
+        key = p.resolve()
+        if key not in self._pages:
+            self._pages[key] = Page(p)
+        return self._pages[key]
+
+    def json(self, path):
+        """Parsed JSON shared by every baker in the run. Read-only: never mutate it.
+        A missing or unparseable file raises, as json.load(open(path)) would."""
+        key = self._path(path).resolve()
+        if key in self._json:
+            self.json_reuses += 1
+        else:
+            self._json[key] = json.loads(key.read_text(encoding="utf-8"))
+            self.json_reads += 1
+        return self._json[key]
+
+    def pages(self):
+        return list(self._pages.values())
+
+    def snapshot(self):
+        return {k: pg.snapshot() for k, pg in self._pages.items()}
+
+    def restore(self, snap):
+        for k in list(self._pages):
+            if k in snap:
+                self._pages[k].restore(snap[k])
+            else:
+                del self._pages[k]
+
+    def flush(self, check=False):
+        """Render + gauntlet every page once. Returns (written, drifted, refused)."""
+        written, drifted, refused = [], [], []
+        for pg in self._pages.values():
+            rel = _rel(pg.path, self.root)
+            try:
+                text = pg.run_checks()
+            except AssertionError as exc:
+                refused.append((rel, str(exc) or exc.__class__.__name__))
+                continue
+            if text == pg.original:
+                continue
+            drifted.append(rel)
+            if not check:
+                pg.write()
+                written.append(rel)
+        return written, drifted, refused
+
+
+def _rel(path, root):
+    try:
+        return str(Path(path).resolve().relative_to(Path(root).resolve()))
+    except ValueError:
+        return str(path)
+
+
+# ---------------------------------------------------------------- registry
+
+class Baker:
+    """A registered bake(site) plus what it consumes and what it writes.
+
+    reads / writes are repo-relative paths or globs ("data/cash-rent/*.json",
+    "rent/*.html"). A baker that reads a page another baker writes runs after
+    it; two bakers writing the same file run in BAKER_MODULES order. external
+    marks a generator that writes whole files itself instead of queuing them on
+    the Site (--check skips it, since it cannot be run without writing).
+    """
+
+    __slots__ = ("name", "fn", "reads", "writes", "external", "rank")
+
+    def __init__(self, name, fn, reads, writes, external, rank):
+        self.name, self.fn, self.rank = name, fn, rank
+        self.reads, self.writes, self.external = tuple(reads), tuple(writes), external
+
+
+BAKERS = {}
+
+# Import order is the tie-break when the graph does not decide: two bakers
+# writing the same page run in this order. bake_seo stamps titles after the
+# page bakers so nothing after it can undo one.
+BAKER_MODULES = [
+    "generate_hail_states", "generate_hail_events", "build_state_rent_pages",
+    "build_county_rent_pages", "seed_static", "build_changelog", "build_farmbill", "build_condyield",
+    "build_croptour", "prerender_wpi_scorecard", "bake_homepage", "bake_seo",
+    "bake_faq",
+]
+
+
+def baker(name, reads=(), writes=(), external=False):
+    """Register fn(site) -> summary str as a named baker."""
+    def deco(fn):
+        BAKERS[name] = Baker(name, fn, reads, writes, external, len(BAKERS))
+        return fn
+    return deco
+
+
+def load_bakers():
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    for mod in BAKER_MODULES:
+        importlib.import_module(mod)
+    return BAKERS
+
+
+def _overlap(a, b):
+    return any(x == y or fnmatch(x, y) or fnmatch(y, x) for x in a for y in b)
+
+
+def graph(bakers=None, data_only=False):
+    """{name: set of bakers that must run after it}. data_only keeps just the
+    writes -> reads edges (what a change propagates along), not the
+    same-file ordering ones."""
+    bakers = BAKERS if bakers is None else bakers
+    after = {n: set() for n in bakers}
+    for a in bakers.values():
+        for b in bakers.values():
+            if a is b:
+                continue
+            if _overlap(a.writes, b.reads):
+                after[a.name].add(b.name)
+            elif not data_only and _overlap(a.writes, b.writes) and a.rank < b.rank \
+                    and not _overlap(b.writes, a.reads):
+                after[a.name].add(b.name)
+    return after
+
+
+def order(names, bakers=None):
+    """names in dependency order; ties broken by registration rank."""
+    bakers = BAKERS if bakers is None else bakers
+    names = set(names)
+    after = graph(bakers)
+    need = {n: 0 for n in names}
+    for a in names:
+        for b in after[a] & names:
+            need[b] += 1
+    ready = [(bakers[n].rank, n) for n in names if not need[n]]
+    heapq.heapify(ready)
+    out = []
+    while ready:
+        _, n = heapq.heappop(ready)
+        out.append(n)
+        for b in after[n] & names:
+            need[b] -= 1
+            if not need[b]:
+                heapq.heappush(ready, (bakers[b].rank, b))
+    if len(out) != len(names):
+        raise BakeError(f"dependency cycle among {sorted(names - set(out))}")
+    return out
+
+
+def affected(changed, bakers=None):
+    """{baker: reason} for every baker a changed file reaches, directly or downstream."""
+    bakers = BAKERS if bakers is None else bakers
+    after = graph(bakers, data_only=True)
+    why = {}
+    for b in bakers.values():
+        hit = [f for f in changed if _overlap([f], b.reads)]
+        if hit:
+            why[b.name] = "reads " + ", ".join(hit[:3]) + (f" +{len(hit) - 3}" if len(hit) > 3 else "")
+    todo = list(why)
+    while todo:
+        a = todo.pop()
+        for b in after[a]:
+            if b not in why:
+                why[b] = f"downstream of {a}"
+                todo.append(b)
+    return why
+
+
+def changed_since(ref, root=REPO):
+    """Repo-relative files that differ from ref in the working tree, untracked included."""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=root, capture_output=True, text=True,
+                              check=True).stdout.split("\n")
+    files = git("diff", "--name-only", ref, "--") + git("ls-files", "--others", "--exclude-standard")
+    return sorted({f for f in files if f})
+
+
+def consumers_note(changed):
+    """Which pages fetch each changed data file in the browser, from the site
+    graph: a baker's writes cover the HTML it bakes, not the pages that read
+    the same JSON client-side, and those change shape with it."""
+    import site_graph
+    g = site_graph.SiteGraph.load(save=False)
+    for f in changed:
+        if f.startswith("data/") and f.endswith(".json"):
+            pages = g.consumers(f)
+            print(f"{f} is fetched by {len(pages)} page(s)"
+                  + (f": {', '.join(pages[:8])}{' ...' if len(pages) > 8 else ''}" if pages else ""))
+
+
+def run(names=None, check=False, site=None, dry_run=False, reasons=None):
+    """Run bakers into one Site in dependency order, flush once.
+    Returns (exit code, site)."""
+    load_bakers()
+    site = site or Site()
+    unknown = [n for n in names or () if n not in BAKERS]
+    for n in unknown:
+        print(f"  {n:<14} unknown baker")
+    plan = order([n for n in (names or BAKERS) if n in BAKERS])
+    reasons = reasons or {}
+    if dry_run:
+        print(f"would rebuild {len(plan)} of {len(BAKERS)} bakers:")
+        for n in plan:
+            b = BAKERS[n]
+            print(f"  {n:<14} {reasons.get(n, 'selected'):<40} -> {', '.join(b.writes)[:70]}")
+        return (1 if unknown else 0), site
+    failed = list(unknown)
+    t_all = time.perf_counter()
+    for name in plan:
+        b = BAKERS[name]
+        if check and b.external:
+            print(f"  {name:<14} skipped (writes its own files; not checkable)")
+            continue
+        snap = site.snapshot()
+        t0 = time.perf_counter()
+        try:
+            note = b.fn(site)
+        except (Exception, SystemExit) as exc:           # noqa: BLE001
+            site.restore(snap)
+            failed.append(name)
+            print(f"  {name:<14} FAILED: {exc}")
+            continue
+        print(f"  {name:<14} {(time.perf_counter() - t0) * 1000:6.0f} ms  {note or ''}")
+    t0 = time.perf_counter()
+    written, drifted, refused = site.flush(check=check)
+    print(f"  {'(render+write)':<14} {(time.perf_counter() - t0) * 1000:6.0f} ms  "
+          f"{len(site.pages())} pages")
+    print(f"  {'(total)':<14} {(time.perf_counter() - t_all) * 1000:6.0f} ms  "
+          f"{site.json_reads} data files parsed, {site.json_reuses} reused from cache")
+    print("-" * 68)
+    for rel, why in refused:
+        print(f"refused {rel}: {why}")
+    if check:
+        print(f"drifted {len(drifted)}: {', '.join(drifted) or 'none'}")
+    else:
+        print(f"wrote {len(written)} of {len(site.pages())} pages: {', '.join(written) or 'none'}")
+    bad = failed or refused or (check and drifted)
+    return (1 if bad else 0), site
+
+
+def selftest():
+    ok = True
+
+    def chk(cond, msg):
+        nonlocal ok
+        print(("  OK   " if cond else "  FAIL ") + msg)
+        if not cond:
+            ok = False
+
+    print("bake_engine selftest")
+    CT = Markers("<!-- CT:{name} -->", "<!-- /CT:{name} -->")
+
+    def old_splice(html, name, body):
+        a, b = CT.open(name), CT.close(name)
+        pat = re.compile(re.escape(a) + r".*?" + re.escape(b), re.S)
+        assert len(pat.findall(html)) == 1
+        return pat.sub(lambda _: a + body + b, html)
+
+    src = ("<div><!-- CT:flow -->old flow<!-- /CT:flow --><p><!-- CT:stamp -->x<!-- /CT:stamp --></p>"
+           "<!--SEED:px-->$1<!--/SEED--> <!--SEED:note-->n<!--/SEED--></div>")
+    flow = "<section><!-- CT:a --><!-- /CT:a --></section><!-- CT:b --><!-- /CT:b -->"
+    want = old_splice(src, "flow", flow)
+    want = old_splice(want, "a", "A\\1 & $2")
+    want = old_splice(want, "b", "B")
+    want = old_splice(want, "stamp", "today")
+    pg = Page("x.html", text=src)
+    pg.fill(CT, "flow", flow).fill(CT, "a", "A\\1 & $2").fill(CT, "b", "B").fill(CT, "stamp", "today")
+    chk(pg.render() == want, "nested fills in one rebuild == sequential splices")
+    pg.fill(SEED, "px", "$4.59", expect=None)
+    chk("<!--SEED:px-->$4.59<!--/SEED--> <!--SEED:note-->n<!--/SEED-->" in pg.render(),
+        "generic-closer grammar fills only its own pair")
+    chk(region_map(pg.render(), CT)["a"] == "A\\1 & $2", "region_map reads a nested region back")
+    chk(pg.render() is pg.render(), "render is cached until the next queued change")
+
+    try:
+        Page("x.html", text=src).fill(CT, "missing", "z").render()
+        chk(False, "a missing required marker raises")
+    except BakeError:
+        chk(True, "a missing required marker raises")
+    dup = src + "<!-- CT:stamp -->y<!-- /CT:stamp -->"
+    try:
+        Page("x.html", text=dup).fill(CT, "stamp", "z").render()
+        chk(False, "a duplicated marker raises with expect=1")
+    except BakeError:
+        chk(True, "a duplicated marker raises with expect=1")
+    chk(Page("x.html", text=dup).fill(CT, "stamp", "z", expect="+").render().count(">z<") == 2,
+        'expect="+" fills every occurrence (prerender rule)')
+    chk(Page("x.html", text=src).fill(SEED, "nope", "z", expect=None).render() == src,
+        "expect=None leaves a page without the marker alone (seed rule)")
+
+    el = Page("i.html", text='<h2 id="h" class="c">old</h2><p id="s">a</p><p id="t">b</p>')
+    el.element("headline", r'<h2 id="h" class="c">', "</h2>", "New")
+    el.element("sub", r'<p id="s"[^>]*>', "</p>", "Sub")
+    chk(el.render() == '<h2 id="h" class="c">New</h2><p id="s">Sub</p><p id="t">b</p>',
+        "element fills land in one combined pass")
+    try:
+        Page("i.html", text="<p id=s>a</p><p id=s>b</p>").element("s", r"<p id=s>", "</p>", "x").render()
+        chk(False, "an anchor that matches twice is drift")
+    except BakeError:
+        chk(True, "an anchor that matches twice is drift")
+
+    ed = Page("e.html", text='{"dateModified":"2026-01-01"}')
+    ed.sub(r'("dateModified":")\d{4}-\d{2}-\d{2}(")', r"\g<1>2026-10-19\g<2>", "dateModified")
+    chk(ed.render() == '{"dateModified":"2026-10-19"}', "queued regex edit applied after fills")
+
+    chk(balanced("<div><section></section></div>", ("div", "section")), "balanced html passes")
+    chk(not balanced("<div></div></div><div>"), "an early close fails even if totals match")
+    bad = Page("b.html", text="<div>").fill(SEED, "x", "", expect=None).balance()
+    try:
+        bad.run_checks()
+        chk(False, "balance check raises on the rendered text")
+    except BakeError:
+        chk(True, "balance check raises on the rendered text")
+
+    reg = {}
+    for i, (n, r, w) in enumerate([("gen", ("data/x/*.json",), ("x/*.html", "sitemap.xml")),
+                                   ("page", ("data/p.json",), ("p.html",)),
+                                   ("seo", ("data/p.json",), ("p.html", "q.html")),
+                                   ("faq", ("*.html",), ("*.html",))]):
+        reg[n] = Baker(n, None, r, w, False, i)
+    chk(order(reg, reg) == ["gen", "page", "seo", "faq"], "registry order: writers before readers")
+    chk(affected(["data/x/ia.json"], reg) == {"gen": "reads data/x/ia.json", "faq": "downstream of gen"},
+        "a changed input reaches its baker and everything downstream")
+    chk(set(affected(["data/p.json"], reg)) == {"page", "seo", "faq"}, "shared input reaches both readers")
+    chk(affected(["README.md"], reg) == {}, "an unrelated file reaches nothing")
+    reg["loop"] = Baker("loop", None, ("*.html",), ("data/p.json",), False, 4)
+    try:
+        order(reg, reg)
+        chk(False, "a read/write cycle raises")
+    except BakeError:
+        chk(True, "a read/write cycle raises")
+
+    load_bakers()
+    plan = order(BAKERS)
+    chk(plan[-1] == "faq" and plan.index("seo") > plan.index("croptour"),
+        f"site plan ends seo -> faq ({' '.join(plan)})")
+
+    print("SELFTEST OK" if ok else "SELFTEST FAILED")
+    return 0 if ok else 1
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--only", default=None, help="comma-separated baker names")
+    ap.add_argument("--changed", nargs="*", default=None,
+                    help="run only the bakers these repo-relative files reach")
+    ap.add_argument("--since", default=None,
+                    help="like --changed, with every file that differs from this git ref")
+    ap.add_argument("--dry-run", action="store_true", help="list what would rebuild and why")
+    ap.add_argument("--check", action="store_true", help="report drift, write nothing")
+    ap.add_argument("--selftest", action="store_true")
+    a = ap.parse_args()
+    if a.selftest:
+        return selftest()
+    load_bakers()
+    names = [n.strip() for n in a.only.split(",")] if a.only else None
+    reasons = None
+    if a.changed is not None or a.since:
+        changed = list(a.changed or [])
+        if a.since:
+            changed += changed_since(a.since)
+        reasons = affected(changed)
+        if a.dry_run:
+            consumers_note(changed)
+        names = [n for n in (names or BAKERS) if n in reasons]
+        if not names:
+            print(f"{len(changed)} changed files reach no baker — nothing to do")
+            return 0
+    code, _ = run(names, check=a.check, dry_run=a.dry_run, reasons=reasons)
+    return code
+
+
+if __name__ == "__main__":
+    # run as the importable module, not __main__: the bakers register into
+    # bake_engine.BAKERS, which would otherwise be a second copy of this file
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    sys.exit(importlib.import_module("bake_engine").main())
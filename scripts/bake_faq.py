@@ -45,6 +45,8 @@ import re
 import sys
 from pathlib import Path
 
+import bake_engine
+
 REPO = Path(__file__).resolve().parent.parent
 
 MIN_ANSWER = 25
@@ -164,21 +166,47 @@ def rebuild(html):
     return new, note
 
 
+def queue(page):
+    """Queue the rebuild on a bake_engine.Page; it runs on the page as the
+    other bakers leave it. Returns the list its note is appended to."""
+    notes = []
+
+    def _rebuild(html):
+        new, note = rebuild(html)
+        notes.append(note)
+        return html if new is None else new
+    page.edit(_rebuild)
+    return notes
+
+
+def all_pages():
+    return sorted(p.name for p in REPO.glob("*.html") if p.name not in {"404.html", "index1.html"})
+
+
+@bake_engine.baker("faq", reads=("*.html",), writes=("*.html",))
+def bake_site(site):
+    pages = all_pages()
+    for page in pages:
+        queue(site.page(REPO / page))
+    return f"{len(pages)} pages queued"
+
+
 def run(pages, write=True, check=False):
+    site = bake_engine.Site(REPO)
     changed, drifted = [], []
     for page in pages:
         p = REPO / page
         if not p.exists():
             print(f"  {page}: missing"); continue
-        src = p.read_text(encoding="utf-8")
-        new, note = rebuild(src)
-        flag = " " if new is None else "*"
-        print(f" {flag} {page:<30} {note}")
-        if new is None:
+        pg = site.page(p)
+        notes = queue(pg)
+        flag = "*" if pg.changed else " "
+        print(f" {flag} {page:<30} {notes[-1]}")
+        if not pg.changed:
             continue
         drifted.append(page)
         if write and not check:
-            p.write_text(new, encoding="utf-8")
+            pg.write()
             changed.append(page)
     print("-" * 68)
     if check:
@@ -261,8 +289,7 @@ def main():
     a = ap.parse_args()
     if a.selftest:
         return selftest()
-    pages = [a.page] if a.page else sorted(
-        p.name for p in REPO.glob("*.html") if p.name not in {"404.html", "index1.html"})
+    pages = [a.page] if a.page else all_pages()
     return run(pages, check=a.check)
 
 
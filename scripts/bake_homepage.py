@@ -27,6 +27,8 @@ import re
 import sys
 from pathlib import Path
 
+import bake_engine
+
 HERE = Path(__file__).resolve().parent
 REPO_ROOT = HERE.parent
 INDEX = REPO_ROOT / "index.html"
@@ -78,63 +80,38 @@ def ordinal(n):
     return f"{n}{suf}"
 
 
-def replace_inner(html, open_pat, close_tag, new_inner, tag, required=True):
-    """Replace everything between an element's opening tag (regex) and its
-    next close_tag with new_inner. Returns (html, ok)."""
-    pat = re.compile("(" + open_pat + r")(.*?)(" + re.escape(close_tag) + ")",
-                     re.S)
-    n = len(pat.findall(html))
-    if n != 1:
-        if required:
-            print(f"[bake] ANCHOR DRIFT: {tag} matched {n} times")
-            sys.exit(3)
-        return html, False
-    html = pat.sub(lambda m: m.group(1) + new_inner + m.group(3), html, count=1)
-    return html, True
+def replace_inner(page, open_pat, close_tag, new_inner, tag, required=True):
+    """Queue: replace everything between an element's opening tag (regex) and
+    its next close_tag with new_inner. All anchors land in one pass; one that
+    does not match exactly once is drift (exit 3 when required)."""
+    page.element(tag, open_pat, close_tag, new_inner, required)
 
 
-def main():
-    if not INDEX.exists():
-        print("[bake] index.html missing"); sys.exit(2)
-    try:
-        daily = json.loads(DAILY.read_text())
-    except Exception as e:
-        print(f"[bake] daily.json unreadable: {e}"); sys.exit(2)
-    try:
-        stats = json.loads(STATS.read_text())
-    except Exception as e:
-        print(f"[bake] price-stats.json unreadable ({e}) — baking briefing only")
-        stats = {}
-
-    if not daily.get("headline"):
-        print("[bake] daily.json has no headline — refusing to bake empties")
-        sys.exit(2)
-
-    html = INDEX.read_text(encoding="utf-8")
+def bake(page, daily, stats):
+    """Queue today's briefing + The Read on the index Page. Returns what was baked."""
     baked = []
 
     # ── Briefing core ────────────────────────────────────────────────
-    html, _ = replace_inner(
-        html, r'<h2 id="daily-headline" class="daily-headline">', "</h2>",
+    replace_inner(
+        page, r'<h2 id="daily-headline" class="daily-headline">', "</h2>",
         esc(daily.get("headline", "")), "headline")
     baked.append("headline")
 
-    html, _ = replace_inner(
-        html, r'<p id="daily-subheadline"[^>]*>', "</p>",
+    replace_inner(
+        page, r'<p id="daily-subheadline"[^>]*>', "</p>",
         esc(daily.get("subheadline", "")), "subheadline")
 
-    html, _ = replace_inner(
-        html, r'<p id="daily-lead" class="daily-lead">', "</p>",
+    replace_inner(
+        page, r'<p id="daily-lead" class="daily-lead">', "</p>",
         md(daily.get("lead", "")), "lead")
 
     takeaway = (daily.get("the_takeaway") or "").strip()
     if takeaway:
         # un-hide the container for the no-JS view (JS manages it after)
-        html = re.sub(
-            r'(<div id="daily-takeaway"[^>]*?)\s*style="display:none"(>)',
-            r"\1\2", html, count=1)
-        html, _ = replace_inner(
-            html, r'<p id="daily-takeaway-text" class="daily-takeaway-text">',
+        page.sub(r'(<div id="daily-takeaway"[^>]*?)\s*style="display:none"(>)',
+                 r"\1\2", "takeaway display", expect=None, count=1)
+        replace_inner(
+            page, r'<p id="daily-takeaway-text" class="daily-takeaway-text">',
             "</p>", esc(takeaway), "takeaway")
         baked.append("takeaway")
 
@@ -142,11 +119,11 @@ def main():
     sections = daily.get("sections") or []
     for i in range(1, MAX_SECTIONS + 1):
         sec = sections[i - 1] if i <= len(sections) else {}
-        html, _ = replace_inner(
-            html, rf'<div id="daily-section-{i}-title" class="daily-sec-label">',
+        replace_inner(
+            page, rf'<div id="daily-section-{i}-title" class="daily-sec-label">',
             "</div>", esc(sec.get("title", "")), f"sec{i}-title")
-        html, _ = replace_inner(
-            html, rf'<div id="daily-section-{i}-body" class="daily-sec-text">',
+        replace_inner(
+            page, rf'<div id="daily-section-{i}-body" class="daily-sec-text">',
             "</div>", md_body(sec.get("body", "")), f"sec{i}-body")
     baked.append(f"{min(len(sections), MAX_SECTIONS)} sections")
 
@@ -157,32 +134,70 @@ def main():
         if not st.get("read"):
             continue
         pct = st.get("pct")
-        html, _ = replace_inner(
-            html, rf'<span id="sig-{sig}-num">', "</span>",
+        replace_inner(
+            page, rf'<span id="sig-{sig}-num">', "</span>",
             esc(pct), f"{sig}-num")
-        html, _ = replace_inner(
-            html, rf'<small id="sig-{sig}-sub">', "</small>",
+        replace_inner(
+            page, rf'<small id="sig-{sig}-sub">', "</small>",
             esc(ordinal(pct) + " pctile") if pct is not None else "",
             f"{sig}-sub")
         cur, lo, hi = st.get("cur"), st.get("lo"), st.get("hi")
         if cur is not None and lo is not None and hi is not None:
-            html, _ = replace_inner(
-                html, rf'<div class="sig-price" id="sig-{sig}-price">', "</div>",
+            replace_inner(
+                page, rf'<div class="sig-price" id="sig-{sig}-price">', "</div>",
                 f"${cur:.2f} &middot; range ${lo:.2f}&ndash;${hi:.2f}",
                 f"{sig}-price")
-        html, _ = replace_inner(
-            html, rf'<div class="sig-read" id="sig-{sig}-read">', "</div>",
+        replace_inner(
+            page, rf'<div class="sig-read" id="sig-{sig}-read">', "</div>",
             esc(st["read"]), f"{sig}-read")
         baked.append(f"read:{key}")
 
     cattle = stats.get("cattle") or {}
     if cattle.get("read"):
-        html, _ = replace_inner(
-            html, r'<div class="sig-read" id="sig-cattle-read">', "</div>",
+        replace_inner(
+            page, r'<div class="sig-read" id="sig-cattle-read">', "</div>",
             esc(cattle["read"]), "cattle-read")
         baked.append("read:cattle")
 
-    INDEX.write_text(html, encoding="utf-8")
+    return baked
+
+
+@bake_engine.baker("homepage", reads=("data/daily.json", "data/price-stats.json"),
+                   writes=("index.html",))
+def bake_site(site):
+    daily = site.json(DAILY)
+    try:
+        stats = site.json(STATS)
+    except Exception:
+        stats = {}
+    assert daily.get("headline"), "daily.json has no headline — refusing to bake empties"
+    return ", ".join(bake(site.page(INDEX), daily, stats))
+
+
+def main():
+    if not INDEX.exists():
+        print("[bake] index.html missing"); sys.exit(2)
+    try:
+        daily = json.loads(DAILY.read_text())
+    except Exception as e:
+        print(f"[bake] daily.json unreadable: {e}"); sys.exit(2)
+    try:
+        stats = json.loads(STATS.read_text())
+    except Exception as e:
+        print(f"[bake] price-stats.json unreadable ({e}) — baking briefing only")
+        stats = {}
+
+    if not daily.get("headline"):
+        print("[bake] daily.json has no headline — refusing to bake empties")
+        sys.exit(2)
+
+    page = bake_engine.Page(INDEX)
+    baked = bake(page, daily, stats)
+    try:
+        page.write()
+    except bake_engine.BakeError as e:
+        print(f"[bake] {e}")
+        sys.exit(3)
     print(f"[bake] OK ({daily.get('date', '?')}): " + ", ".join(baked))
     return 0
 
@@ -56,6 +56,8 @@ REPO = Path(__file__).resolve().parent.parent
 DATA = REPO / "data"
 sys.path.insert(0, str(REPO / "scripts"))
 
+import bake_engine  # noqa: E402
+
 TITLE_MAX = 68          # Google truncates around 600px; 68 chars is a safe ceiling
 DESC_MAX = 160          # the site's own new-page checklist
 SUFFIX = " | AGSIST"
@@ -80,25 +82,27 @@ def span(a, b):
 
 # ---------------------------------------------------------------- context
 
-def _load(name):
+def _load(name, site=None):
     p = DATA / name
     if not p.exists():
         return None
     try:
+        if site is not None:
+            return site.json(p)
         return json.loads(p.read_text(encoding="utf-8"))
     except Exception:                                     # noqa: BLE001
         return None
 
 
-def build_ctx(today):
+def build_ctx(today, site=None):
     import usda_dates
     return {
         "today": today,
         "next_wasde": usda_dates.next_wasde(today),
-        "cot": _load("cot.json"),
-        "state_stats": _load("state-stats.json"),
-        "crop_tour": _load("crop-tour.json"),
-        "prices": _load("prices.json"),
+        "cot": _load("cot.json", site),
+        "state_stats": _load("state-stats.json", site),
+        "crop_tour": _load("crop-tour.json", site),
+        "prices": _load("prices.json", site),
     }
 
 
@@ -437,9 +441,14 @@ def expected_tags(owns):
 
 # ---------------------------------------------------------------- main
 
-def run(today, dry=False, only=None):
-    ctx = build_ctx(today)
-    changed, skipped = [], []
+def queue(ctx, site, only=None):
+    """Compute every page's title/description and queue the stamp on its Page.
+
+    Returns (queued, skipped); queued is [(page, Page, title, desc, owns)].
+    A page whose tags do not all match is left alone when the stamp runs and
+    lands in skipped then, so a half-updated head is never written.
+    """
+    queued, skipped = [], []
     for page, (fn, owns) in PAGES.items():
         if only and page != only:
             continue
@@ -457,22 +466,50 @@ def run(today, dry=False, only=None):
             check(title, desc, page, owns)
         except ValueError as exc:
             skipped.append((page, str(exc))); continue
-        src = p.read_text(encoding="utf-8")
-        out, n = stamp(src, title, desc, owns)
-        want = expected_tags(owns)
+        pg = site.page(p)
+        pg.edit(_stamper(page, title, desc, owns, skipped))
+        queued.append((page, pg, title, desc, owns))
+    return queued, skipped
+
+
+def _stamper(page, title, desc, owns, skipped):
+    want = expected_tags(owns)
+
+    def _stamp(text):
+        out, n = stamp(text, title, desc, owns)
         if n != want:
             skipped.append((page, f"stamped {n} of {want} tags — markup changed; "
                                   f"refusing to half-update"))
+            return text
+        return out
+    return _stamp
+
+
+@bake_engine.baker("seo", reads=("data/cot.json", "data/state-stats.json", "data/crop-tour.json",
+                                "data/prices.json"),
+                   writes=tuple(PAGES))
+def bake_site(site):
+    queued, skipped = queue(build_ctx(date.today(), site), site)
+    return f"{len(queued)} pages stamped" + (f", {len(skipped)} skipped" if skipped else "")
+
+
+def run(today, dry=False, only=None):
+    queued, skipped = queue(build_ctx(today), bake_engine.Site(REPO), only)
+    changed = []
+    for page, pg, title, desc, owns in queued:
+        n_skipped = len(skipped)
+        pg.render()
+        if len(skipped) > n_skipped:
             continue
-        print(f"\n{page}  ({n} tags, owns {'+'.join(sorted(owns))})")
+        print(f"\n{page}  ({expected_tags(owns)} tags, owns {'+'.join(sorted(owns))})")
         if title:
             print(f"  title [{len(title):>3}] {title}")
         if desc:
             print(f"  desc  [{len(desc):>3}] {desc}")
-        if not dry and out != src:
-            p.write_text(out, encoding="utf-8")
+        if not dry and pg.changed:
+            pg.write()
             changed.append(page)
-        elif out == src:
+        elif not pg.changed:
             print("  (unchanged)")
     print("\n" + "-" * 60)
     print(f"changed {len(changed)}: {', '.join(changed) or 'none'}")
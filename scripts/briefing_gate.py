@@ -44,21 +44,30 @@ WEEKDATE=re.compile(r'\b(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunda
                     r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2})')
 LEVEL_TOL=0.006
 
-def prose_fields(d):
-    out=[('headline',d.get('headline')),('subheadline',d.get('subheadline')),
-         ('lead',d.get('lead')),('the_takeaway',d.get('the_takeaway')),
-         ('subject_line',d.get('subject_line'))]
-    for i,s in enumerate(d.get('sections') or []):
-        for k in ('title','body','bottom_line','farmer_action'):
-            out.append((f'sections[{i}].{k}', s.get(k)))
+def _dig(d, loc):
+    """d['sections'][0]['body'] for loc 'sections[0].body'; None if any step is missing."""
+    cur=d
+    for part in re.findall(r'[^.\[\]]+|\[\d+\]', loc):
+        try: cur=cur[int(part[1:-1])] if part[0]=='[' else cur.get(part)
+        except (AttributeError, IndexError, TypeError): return None
+        if cur is None: return None
+    return cur
+
+def prose_fields(d, fields=None):
+    """[(loc, text)] for every prose field the checks read. fields: a
+    briefing_scrub.Fields view of d (the generator's scrub walk) to read
+    from instead of walking d again."""
+    get=fields.get if fields is not None else (lambda loc: _dig(d, loc))
+    locs=['headline','subheadline','lead','the_takeaway','subject_line']
+    for i in range(len(get('sections') or [])):
+        locs+=[f'sections[{i}].{k}' for k in ('title','body','bottom_line','farmer_action')]
     for blk,keys in [('the_more_you_know',('title','body')),('spread_to_watch',('label','level','commentary')),
                      ('basis',('headline','body')),('yesterdays_call',('summary','note')),
                      ('one_number',('value','unit','context'))]:
-        b=d.get(blk) or {}
-        for k in keys: out.append((f'{blk}.{k}', b.get(k)))
-    for i,w in enumerate(d.get('watch_list') or []):
-        out.append((f'watch_list[{i}].desc', w.get('desc')))
-        out.append((f'watch_list[{i}].time', w.get('time')))
+        locs+=[f'{blk}.{k}' for k in keys]
+    for i in range(len(get('watch_list') or [])):
+        locs+=[f'watch_list[{i}].desc', f'watch_list[{i}].time']
+    out=[(loc,get(loc)) for loc in locs]
     return [(loc,str(v)) for loc,v in out if v]
 
 def wasde_fabrication_hits(daily, today=None):
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+briefing_scrub.py — the generator's post-processing scrubbers as ONE walk.
+
+WHY THIS FILE EXISTS
+  generate_daily ran sanitize_weekend_blocks, sanitize_em_dashes,
+  sanitize_html_tags, scrub_drama_verbs and scrub_emoji back to back. Each
+  walked the whole briefing tree again, and the drama scrubber ran ~90
+  compiled regexes one after another over every text field. Then
+  validate_level_coherence (and briefing_gate.prose_fields) dug the same
+  prose fields out of the tree a sixth time.
+
+HOW IT WORKS
+  Each scrubber registers rules on PIPELINE:
+      regex rules   (pattern, replacement, field filter), applied per string
+      dict hooks    structural edits (drop sections[].icon, weekend wipes)
+  run() walks the briefing once. Every string gets the rules in the order the
+  old chain ran them (dashes -> html tags -> drama -> emoji), so the output is
+  the same as the chain's. A field filter is the set of dict keys whose direct
+  string values the rule touches; None means every string, list items too.
+
+  Where a scrubber's patterns can merge without changing the result they are
+  one alternation: the ~90 drama verbs are one regex (all whole-word literals;
+  multi-word forms listed first win at the same position), and each dash
+  pair (" — " then "—") is one regex. <strong> and <em> stay two passes:
+  merged, "<em><strong>x</strong></em>" would keep the inner tags.
+
+  Every substitution lands in one log: {"rule", "field", "before", "after"}.
+  The walk also returns a Fields view (loc -> live value, locs spelled the
+  way briefing_gate spells them: "sections[0].body") so the validators read
+  the prose without walking the tree again.
+
+USAGE
+    import briefing_scrub
+    res = briefing_scrub.scrub(briefing, market_status)
+    res.briefing, res.log, res.fields.get("sections[0].body")
+
+Golden test against the old chain: python3 scripts/test_briefing_scrub.py
+"""
+import re
+
+# v4.5.0: BODY FIELDS that may contain prose with bold emphasis. The
+# html-tag rules only convert <strong>/<em> in these fields, leaving the
+# rest of the briefing untouched (icons, IDs, etc).
+BOLD_BODY_FIELDS = {
+    "lead", "subheadline", "the_takeaway", "teaser",
+    "body", "bottom_line", "vs_yesterday", "catalyst",
+    "context", "commentary", "status_text", "note", "summary",
+}
+
+# v4.6.1: DRAMA VERB SCRUBBER. Deterministic catch-all that runs AFTER the
+# critic rewrite, before save_briefing(). The critic rewrites the single
+# weakest_target per pass (lead OR section_N OR basis OR ...), which means
+# drama verbs in headlines, section titles, takeaways, TMYK titles, and the
+# Number unit text can survive the critic pass. The critic also cannot rewrite
+# the headline at all (not in the weakest_target enum). This scrubber catches
+# every banned drama verb in every text field, deterministically, with no
+# model judgment.
+#
+# Design choices:
+# - Word-boundary regex prevents matching inside compounds (uncrashed, etc.)
+# - Verb forms only: "crashed" matches, "crash" the noun in "the crash of 2020"
+#   is preserved (no -ed/-ing/-es suffix means likely noun, leave it).
+# - Case preserving: "CRATER" in headline becomes "FALL HARD" (upper).
+#   "Crater" becomes "Fall hard" (title). "crater" becomes "fall hard" (lower).
+# - Idempotent: replacements never reintroduce banned words.
+# - Walks ALL text fields, not just body fields. Headlines/titles included.
+# - Records substitutions made for audit logging.
+DRAMA_SUBSTITUTIONS = [
+    # (pattern, replacement) - replacement is lowercase form;
+    # case is restored from the matched span by _drama_sub_case_preserve.
+    # Pattern uses \b word boundaries on BOTH sides and requires verb form.
+
+    # CRASH family
+    (r"\bcrashed\b", "fell sharply"),
+    (r"\bcrashes\b", "falls sharply"),
+    (r"\bcrashing\b", "falling sharply"),
+    # Bare "crash" used as verb in headline-shorthand: "HOGS CRASH 6%", "CATTLE CRASH"
+    # Verb interpretation is dominant in briefing context. "The crash of 2020" type
+    # noun usage doesn't appear in this generator's vocabulary.
+    (r"\bcrash\b", "fall"),
+
+    # CRATER family (all forms - "crater" in price context is always verb/drama)
+    (r"\bcratered\b", "fell sharply"),
+    (r"\bcraters\b", "falls sharply"),
+    (r"\bcratering\b", "falling sharply"),
+    (r"\bcrater\b", "fall sharply"),
+
+    # EXPLODE family
+    (r"\bexploded\b", "ran higher"),
+    (r"\bexplodes\b", "runs higher"),
+    (r"\bexploding\b", "running higher"),
+    (r"\bexplode\b", "run higher"),
+    (r"\bexplosion\b", "sharp gain"),
+
+    # SURGE family
+    (r"\bsurged\b", "gained"),
+    (r"\bsurges\b", "gains"),
+    (r"\bsurging\b", "gaining"),
+    (r"\bsurge\b", "move higher"),
+
+    # SOAR family
+    (r"\bsoared\b", "moved higher"),
+    (r"\bsoars\b", "moves higher"),
+    (r"\bsoaring\b", "moving higher"),
+    (r"\bsoar\b", "rise"),
+
+    # ROCKET / SKYROCKET
+    (r"\brocketed\b", "ran higher"),
+    (r"\brocketing\b", "running higher"),
+    (r"\bskyrocketed\b", "ran higher"),
+    (r"\bskyrocketing\b", "running higher"),
+
+    # PLUNGE family
+    (r"\bplunged\b", "fell"),
+    (r"\bplunges\b", "falls"),
+    (r"\bplunging\b", "falling"),
+    (r"\bplunge\b", "drop"),
+
+    # PLUMMET family
+    (r"\bplummeted\b", "fell sharply"),
+    (r"\bplummets\b", "falls sharply"),
+    (r"\bplummeting\b", "falling sharply"),
+
+    # SPIKE family - flagged as headline failure on 2026-05-28 (hogs spike 2%)
+    # "Spike" verb form is drama; "spike" noun ("a spike in volatility") is fine
+    # but rare in briefing language. Bare form treated as verb here.
+    (r"\bspiked\b", "gained"),
+    (r"\bspikes\b", "gains"),
+    (r"\bspiking\b", "gaining"),
+    (r"\bspike\b", "move higher"),
+
+    # JUMP / JUMPS (verb form only - drama in headline/lead context)
+    # The editorial-notes May 28 entry flagged "jumped" in lead specifically.
+    (r"\bjumped\b", "gained"),
+    (r"\bjumps\b", "gains"),
+    (r"\bjumping\b", "gaining"),
+
+    # TUMBLE - "tumble" is in my replacement vocabulary so this is intentionally NOT scrubbed.
+    # It's working-ag voice for big drops, distinct from CNBC "crash/plunge/crater".
+
+    # SLASH (verb form only, "slash" as noun e.g. "/" preserved)
+    (r"\bslashed\b", "cut"),
+    (r"\bslashes\b", "cuts"),
+    (r"\bslashing\b", "cutting"),
+
+    # COLLAPSE family
+    (r"\bcollapsed\b", "broke down"),
+    (r"\bcollapses\b", "breaks down"),
+    (r"\bcollapsing\b", "breaking down"),
+    (r"\bcollapse\b", "breakdown"),
+
+    # ROUT
+    (r"\brout\b", "selling"),
+    (r"\brouted\b", "sold off"),
+
+    # EXODUS / FLEEING / PANIC
+    (r"\bexodus\b", "stepping out"),
+    (r"\bfleeing\b", "rotating out"),
+    (r"\bpanic\b", "selling pressure"),
+    (r"\bpanicked\b", "stepped out"),
+
+    # IGNITED / CAUGHT FIRE / TORCHED
+    (r"\bignited\b", "started"),
+    (r"\bignites\b", "starts"),
+    (r"\bigniting\b", "starting"),
+    (r"\bignite\b", "kick off"),
+    (r"\btorched\b", "broke"),
+    (r"\btorches\b", "breaks"),
+
+    # BLOODBATH / CARNAGE / MELTDOWN
+    (r"\bbloodbath\b", "heavy selling"),
+    (r"\bcarnage\b", "heavy selling"),
+    (r"\bmeltdown\b", "selloff"),
+
+    # VAULTED / LEAPED
+    (r"\bvaulted\b", "moved up"),
+    (r"\bleaped\b", "moved up"),
+    (r"\bleapt\b", "moved up"),
+
+    # CAUGHT FIRE (multi-word - must come before single-word patterns)
+    (r"\bcaught fire\b", "took off"),
+
+    # BINARY (already in critic ban list, mechanically scrub anyway)
+    (r"\bbinary level\b", "make-or-break level"),
+    (r"\bbinary week\b", "make-or-break week"),
+    (r"\bbinary support\b", "key support"),
+    (r"\bbinary test\b", "make-or-break test"),
+    (r"\bbinary\b", "make-or-break"),
+]
+
+# Fields where we walk and scrub. Includes EVERY text-bearing field, not just
+# body fields, because drama verbs in headlines/titles are exactly the failure
+# mode the critic cannot fix.
+SCRUBBED_FIELDS = {
+    # Top-level
+    "headline", "subheadline", "lead", "subhead",
+    "the_takeaway", "teaser", "title", "label", "name",
+    # Section fields
+    "body", "bottom_line", "vs_yesterday", "catalyst", "driver",
+    "context", "commentary", "note", "status_text", "summary",
+    "farmer_action", "action", "story",
+    # Watch list / spread / basis
+    "headline", "commentary", "question",
+    # The Number
+    "value", "unit", "explanation",
+    # TMYK
+    "title", "body",
+    # Outside the Pit
+    "headline", "summary",
+    # Misc
+    "call", "outcome_note", "level",
+}
+
+EMOJI_RE = re.compile(
+    "[\u2600-\u26FF\u2700-\u2712\u2714-\u2716\u2718-\u27BF"  # misc symbols + dingbats, sparing check/x
+    "\u2B00-\u2BFF\uFE0F\u200D"
+    "\U0001F000-\U0001FBFF]"
+)
+
+# v4.2 (Phase 2 C4): blocks the prompt tells the model to leave empty on
+# Sat/Sun/holidays.
+WEEKEND_DISALLOWED = ["yesterdays_call", "weekly_thread"]
+
+
+# ---------------------------------------------------------------- engine
+
+class Rule:
+    """One regex scrub: pattern, replacement (template or fn(match) -> str),
+    the dict keys whose string values it touches (None = every string), and
+    an optional after(text) run once on a string the rule changed."""
+
+    __slots__ = ("name", "rx", "fn", "fields", "after")
+
+    def __init__(self, name, rx, repl, fields=None, after=None):
+        self.name, self.rx = name, rx
+        self.fn = repl if callable(repl) else (lambda m: m.expand(repl))
+        self.fields, self.after = fields, after
+
+
+class Pipeline:
+    def __init__(self):
+        self.rules = []
+        self.dict_hooks = []      # (name, fn(obj, loc, ctx) -> [(field, before, after)])
+
+    def rule(self, name, pattern, repl, fields=None, flags=0, after=None):
+        rx = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+        self.rules.append(Rule(name, rx, repl, fields, after))
+
+    def dict_hook(self, name):
+        def deco(fn):
+            self.dict_hooks.append((name, fn))
+            return fn
+        return deco
+
+    def run(self, briefing, market_status=None, only=None):
+        """Scrub briefing in place in one walk. Returns a Scrubbed."""
+        ctx = {"market_status": market_status or {}}
+        rules = [r for r in self.rules if only is None or r.name in only]
+        hooks = [(n, fn) for n, fn in self.dict_hooks if only is None or n in only]
+        every = [r for r in rules if r.fields is None]
+        keyed = {}
+        for r in rules:
+            if r.fields is not None:
+                for k in r.fields:
+                    keyed.setdefault(k, set()).add(r)
+        # per-key rule lists, in registration order
+        by_key = {k: [r for r in rules if r.fields is None or r in rs] for k, rs in keyed.items()}
+        log, slots = [], {}
+
+        def scrub_text(s, loc, key):
+            for r in (by_key.get(key, every) if key is not None else every):
+                hits = []
+
+                def _sub(m, _fn=r.fn):
+                    out = _fn(m)
+                    hits.append((m.group(0), out))
+                    return out
+                new = r.rx.sub(_sub, s)
+                if not hits:
+                    continue
+                if r.after is not None:
+                    new = r.after(new)
+                path = "$." + loc if loc else "$"
+                log.extend({"rule": r.name, "field": path, "before": b, "after": a} for b, a in hits)
+                s = new
+            return s
+
+        def walk(obj, loc):
+            if isinstance(obj, dict):
+                for name, fn in hooks:
+                    for field, before, after in fn(obj, loc, ctx) or ():
+                        log.append({"rule": name, "field": "$." + field if field else "$",
+                                    "before": before, "after": after})
+                for k, v in obj.items():
+                    child = f"{loc}.{k}" if loc else k
+                    slots[child] = (obj, k)
+                    obj[k] = scrub_text(v, child, k) if isinstance(v, str) else walk(v, child)
+            elif isinstance(obj, list):
+                for i, v in enumerate(obj):
+                    child = f"{loc}[{i}]"
+                    slots[child] = (obj, i)
+                    obj[i] = scrub_text(v, child, None) if isinstance(v, str) else walk(v, child)
+            return obj
+
+        walk(briefing, "")
+        return Scrubbed(briefing, log, Fields(briefing, slots))
+
+
+class Fields:
+    """loc -> value view over a walked briefing. Reads the live container, so
+    a later in-place fix (fix_weekday_labels) is seen."""
+
+    def __init__(self, briefing, slots):
+        self.briefing, self._slots = briefing, slots
+
+    @classmethod
+    def of(cls, briefing):
+        return PIPELINE.run(briefing, only=()).fields
+
+    def get(self, loc, default=None):
+        slot = self._slots.get(loc)
+        if slot is None:
+            return default
+        parent, key = slot
+        try:
+            return parent[key]
+        except (KeyError, IndexError):
+            return default
+
+    def __contains__(self, loc):
+        return loc in self._slots
+
+
+class Scrubbed:
+    __slots__ = ("briefing", "log", "fields")
+
+    def __init__(self, briefing, log, fields):
+        self.briefing, self.log, self.fields = briefing, log, fields
+
+    def counts(self):
+        out = {}
+        for e in self.log:
+            out[e["rule"]] = out.get(e["rule"], 0) + 1
+        return out
+
+
+PIPELINE = Pipeline()
+
+
+# ---------------------------------------------------------------- scrubbers
+
+@PIPELINE.dict_hook("weekend")
+def _weekend(obj, loc, ctx):
+    """v4.2 (Phase 2 C4): the prompt instructs the model to set
+    weekend-disallowed fields to empty on Sat/Sun/holidays. Models
+    occasionally violate. Wipe them in post to enforce the contract
+    regardless of what the model returned. Only acts when market_closed;
+    weekday data is untouched."""
+    if loc or not ctx["market_status"].get("is_closed"):
+        return None
+    wiped = []
+    for key in WEEKEND_DISALLOWED:
+        if key in obj:
+            if obj[key] != {}:
+                wiped.append((key, "(block)", "{}"))
+            obj[key] = {}
+    return wiped
+
+
+# v4.4.1: post-generation safety net for em/en dashes. The prompt bans em
+# dashes (Writing Rule 1); the sweep cleans any that slip through.
+# Space-bracketed dash becomes ", " (mid-sentence beat), a bare one a hyphen.
+# One alternation per dash is the same as the old two str.replace calls: the
+# spaced form only ever starts on a space, which the bare form never consumes.
+for _dash in ("\u2014", "\u2013"):
+    PIPELINE.rule("dashes", f" {_dash} |{_dash}", lambda m: ", " if len(m.group(0)) == 3 else "-")
+
+# v4.5.0: literal <strong>/<em> in body fields -> **markdown**. Idempotent.
+PIPELINE.rule("html_tags", r"<strong>(.+?)</strong>", r"**\1**", BOLD_BODY_FIELDS, re.DOTALL | re.IGNORECASE)
+PIPELINE.rule("html_tags", r"<em>(.+?)</em>", r"*\1*", BOLD_BODY_FIELDS, re.DOTALL | re.IGNORECASE)
+
+
+def _drama_sub_case_preserve(match, replacement):
+    """Match case of the original token: upper -> upper, title -> title, lower -> lower.
+    For multi-word replacements, applies case to first word; subsequent words follow
+    the same case style if the match was all-caps, otherwise lowercase."""
+    matched = match.group(0)
+    if matched.isupper():
+        return replacement.upper()
+    if matched[0].isupper() and matched[1:].islower():
+        # Title case: capitalize first letter only
+        return replacement[0].upper() + replacement[1:].lower()
+    return replacement.lower()
+
+
+def _drama_alternation(subs):
+    words = []
+    for pat, _ in subs:
+        assert re.fullmatch(r"\\b[a-z ]+\\b", pat), f"drama pattern is not a whole-word literal: {pat}"
+        words.append(pat[2:-2])
+    # a longer phrase must win over a word it starts with at the same position
+    # ("binary level" before "binary"); list order already does, and the sort
+    # keeps it true if someone appends a phrase below its head word
+    words.sort(key=lambda w: -len(w.split()))
+    return re.compile(r"\b(?:" + "|".join(re.escape(w) for w in words) + r")\b", re.IGNORECASE)
+
+
+DRAMA_REPLACEMENT = {pat[2:-2]: repl for pat, repl in DRAMA_SUBSTITUTIONS}
+PIPELINE.rule("drama", _drama_alternation(DRAMA_SUBSTITUTIONS),
+              lambda m: _drama_sub_case_preserve(m, DRAMA_REPLACEMENT[m.group(0).lower()]),
+              SCRUBBED_FIELDS)
+
+
+# v4.7: strip emoji/pictographs from every string and delete sections[].icon
+# (the frontends render nothing when absent). Keeps plain UI glyphs
+# (checkmark U+2713, ballot X U+2717, arrows, geometric shapes). Idempotent.
+PIPELINE.rule("emoji", EMOJI_RE, "", after=lambda s: re.sub(r"  +", " ", s).strip())
+
+
+@PIPELINE.dict_hook("emoji")
+def _drop_icon(obj, loc, ctx):
+    if "icon" in obj:
+        icon = obj.pop("icon")
+        return [((loc + "." if loc else "") + "icon", str(icon), "")]
+    return None
+
+
+def scrub(briefing, market_status=None, only=None):
+    """Every scrubber over briefing in one walk. only: rule names to limit to."""
+    return PIPELINE.run(briefing, market_status, only)
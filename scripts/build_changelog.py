@@ -25,9 +25,12 @@ import json
 import re
 import sys
 from datetime import date
-from html.parser import HTMLParser
 from pathlib import Path
 
+import bake_engine
+
+CL = bake_engine.Markers("<!-- CHANGELOG:{name} -->", "<!-- /CHANGELOG:{name} -->")
+
 TAGS = {"new": "New", "improved": "Improved", "fixed": "Fixed"}
 
 MONTHS = ["", "January", "February", "March", "April", "May", "June", "July",
@@ -101,40 +104,32 @@ def render_stamp(data, n_items):
             f'{n_items} changes across {len(data["entries"])} days')
 
 
-def splice(html, name, body):
-    a, b = f"<!-- CHANGELOG:{name} -->", f"<!-- /CHANGELOG:{name} -->"
-    pat = re.compile(re.escape(a) + r".*?" + re.escape(b), re.S)
-    assert len(pat.findall(html)) == 1, f"marker {name}: expected exactly 1 region"
-    return pat.sub(lambda _: a + body + b, html)
-
-
-class DivBalance(HTMLParser):
-    def __init__(self):
-        super().__init__(convert_charrefs=False)
-        self.depth = 0
-        self.bad = False
-
-    def handle_starttag(self, t, a):
-        if t == "div":
-            self.depth += 1
-
-    def handle_endtag(self, t):
-        if t == "div":
-            self.depth -= 1
-            if self.depth < 0:
-                self.bad = True
-
-
 def gauntlet(html):
-    p = DivBalance()
-    p.feed(html)
-    assert not p.bad and p.depth == 0, "div balance broken"
+    assert bake_engine.balanced(html), "div balance broken"
     m = re.search(r'<script type="application/ld\+json">(.*?)</script>', html, re.S)
     assert m, "JSON-LD block missing"
     json.loads(m.group(1))  # raises if the bake corrupted it
     assert html.count("cl-day") >= 2, "suspiciously few baked entries"
 
 
+def bake(page, data):
+    """Queue the entries, stamp and head dateModified on a bake_engine.Page."""
+    n_items = validate(data)
+    page.fill(CL, "entries", render_entries(data))
+    page.fill(CL, "stamp", render_stamp(data, n_items))
+    page.sub(r'("dateModified":")\d{4}-\d{2}-\d{2}(")',
+             r'\g<1>' + data["updated"] + r'\g<2>', "dateModified in head")
+    page.check(gauntlet)
+    return n_items
+
+
+@bake_engine.baker("changelog", reads=("data/changelog.json",), writes=("changelog.html",))
+def bake_site(site):
+    data = site.json("data/changelog.json")
+    n_items = bake(site.page("changelog.html"), data)
+    return f"{n_items} items, {len(data['entries'])} days"
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--check", action="store_true")
@@ -147,16 +142,9 @@ def main():
     json_path = Path(args.json) if args.json else root / "data" / "changelog.json"
 
     data = json.loads(json_path.read_text(encoding="utf-8"))
-    n_items = validate(data)
-
-    html = html_path.read_text(encoding="utf-8")
-    baked = splice(html, "entries", render_entries(data))
-    baked = splice(baked, "stamp", render_stamp(data, n_items))
-    baked, n = re.subn(r'("dateModified":")\d{4}-\d{2}-\d{2}(")',
-                       r'\g<1>' + data["updated"] + r'\g<2>', baked)
-    assert n == 1, f"expected exactly 1 dateModified in head, found {n}"
-
-    gauntlet(baked)
+    page = bake_engine.Page(html_path)
+    n_items = bake(page, data)
+    html, baked = page.original, page.run_checks()
 
     if baked == html:
         print("changelog.html already in sync.")
@@ -164,7 +152,7 @@ def main():
     if args.check:
         print("changelog.html OUT OF SYNC with data/changelog.json — run the baker.")
         return 1
-    html_path.write_text(baked, encoding="utf-8")
+    page.write()
     print(f"Baked changelog.html — {n_items} items, {len(data['entries'])} days.")
     return 0
 
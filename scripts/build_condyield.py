@@ -34,9 +34,12 @@ import argparse
 import json
 import re
 import sys
-from html.parser import HTMLParser
 from pathlib import Path
 
+import bake_engine
+
+CY = bake_engine.Markers("<!-- CY:{name} -->", "<!-- /CY:{name} -->")
+
 # Only the states the page's own selector knows how to name.
 ST_NAME = {
     "AL": "Alabama", "AR": "Arkansas", "CO": "Colorado", "DE": "Delaware",
@@ -188,32 +191,7 @@ def meta_desc(rows):
             f"vs yield, every state, every week, from USDA data.")
 
 
-# ── splice + gauntlet ─────────────────────────────────────────────────────
-
-def splice(html, name, body, opener=None, closer=None):
-    a = opener or f"<!-- CY:{name} -->"
-    b = closer or f"<!-- /CY:{name} -->"
-    pat = re.compile(re.escape(a) + r".*?" + re.escape(b), re.S)
-    assert len(pat.findall(html)) == 1, f"marker {name}: expected exactly 1 region"
-    return pat.sub(lambda _: a + body + b, html)
-
-
-class DivBalance(HTMLParser):
-    def __init__(self):
-        super().__init__(convert_charrefs=False)
-        self.depth = 0
-        self.bad = False
-
-    def handle_starttag(self, t, a):
-        if t == "div":
-            self.depth += 1
-
-    def handle_endtag(self, t):
-        if t == "div":
-            self.depth -= 1
-            if self.depth < 0:
-                self.bad = True
-
+# ── gauntlet ──────────────────────────────────────────────────────────────
 
 def bake_faq(html, rows):
     """Rewrite the FAQ answer by editing the parsed JSON-LD.
@@ -244,9 +222,7 @@ def bake_faq(html, rows):
 
 
 def gauntlet(html, rows):
-    p = DivBalance()
-    p.feed(html)
-    assert not p.bad and p.depth == 0, "div balance broken"
+    assert bake_engine.balanced(html), "div balance broken"
     m = re.search(r'<script type="application/ld\+json">(.*?)</script>', html, re.S)
     assert m, "JSON-LD block missing"
     json.loads(m.group(1))
@@ -270,6 +246,30 @@ def validate(rows):
         assert 1 <= r["week"] <= 53, f"{r['st']}: week {r['week']}"
 
 
+def bake(page, data):
+    """Queue every conditions-yield region on a bake_engine.Page. Returns the rows."""
+    rows = rows_for(data, "corn")
+    validate(rows)
+    page.fill(CY, "table", render_table(rows))
+    page.fill(CY, "tiles", render_tiles(data, rows))
+    page.fill(bake_engine.SEED, "cystats", render_seed(data, rows))
+    page.fill(CY, "stamp", f"Data refreshed {stamp_date(data)}.")
+    md = meta_desc(rows)
+    if md:
+        page.sub(r'(<meta name="description" content=")[^"]*(">)',
+                 lambda m: m.group(1) + md + m.group(2), "expected exactly 1 meta description")
+    page.edit(lambda html: bake_faq(html, rows))
+    page.check(lambda html: gauntlet(html, rows))
+    return rows
+
+
+@bake_engine.baker("condyield", reads=("data/cond-yield/fit.json",),
+                   writes=("conditions-yield.html",))
+def bake_site(site):
+    rows = bake(site.page("conditions-yield.html"), site.json("data/cond-yield/fit.json"))
+    return f"week {rows[0]['week']}, {len(rows)} states"
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--check", action="store_true")
@@ -282,23 +282,9 @@ def main():
     json_path = Path(args.json) if args.json else root / "data" / "cond-yield" / "fit.json"
 
     data = json.loads(json_path.read_text(encoding="utf-8"))
-    rows = rows_for(data, "corn")
-    validate(rows)
-
-    html = html_path.read_text(encoding="utf-8")
-    baked = splice(html, "table", render_table(rows))
-    baked = splice(baked, "tiles", render_tiles(data, rows))
-    baked = splice(baked, "seed", render_seed(data, rows),
-                   opener="<!--SEED:cystats-->", closer="<!--/SEED-->")
-    baked = splice(baked, "stamp", f"Data refreshed {stamp_date(data)}.")
-    md = meta_desc(rows)
-    if md:
-        pat = re.compile(r'(<meta name="description" content=")[^"]*(">)')
-        assert len(pat.findall(baked)) == 1, "expected exactly 1 meta description"
-        baked = pat.sub(lambda m: m.group(1) + md + m.group(2), baked)
-    baked = bake_faq(baked, rows)
-
-    gauntlet(baked, rows)
+    page = bake_engine.Page(html_path)
+    rows = bake(page, data)
+    html, baked = page.original, page.run_checks()
 
     if baked == html:
         print("conditions-yield.html already in sync.")
@@ -306,7 +292,7 @@ def main():
     if args.check:
         print("conditions-yield.html OUT OF SYNC with fit.json — run the baker.")
         return 1
-    html_path.write_text(baked, encoding="utf-8")
+    page.write()
     top = rows[0]
     print(f"Baked conditions-yield.html — week {top['week']}, {len(rows)} states, "
           f"top {top['name']} {round(top['r2']*100)}%.")
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""build_county_rent_pages.py — one /rent/county/<state>/<county> page per
+USDA-published county (~2,900), from data/cash-rent/*.json. OFFLINE, like
+build_state_rent_pages.py, whose helpers, styles and honesty rules it reuses.
+The pages are MACHINE-OWNED: edit this script, never the emitted HTML.
+
+WHY: every county's rent history, yields and trend fits were already in the
+state files, but only the /cash-rent map's JS ever showed them, so "adair
+county iowa cash rent" had no page to land on. The state pages link each
+county row here.
+
+INCREMENTAL, because 2,900 pages is the whole rent tree times sixty:
+  - rent/county/pages.json (committed with the pages) maps each page to a
+    hash of what it is built from: the county's record, the handful of state
+    figures it quotes, the state's county list (the link cloud), and
+    PAGE_VERSION. A county whose hash matches and whose file exists is not
+    rendered at all; an August release rewrites only the counties it moved.
+  - The state file's "generated" stamp is deliberately NOT on the page:
+    it changes on every fetch and would rewrite all 2,900 pages weekly.
+  - State files are read one at a time and their pages stream through
+    page_render (pooled), so memory is one state's records plus the pages
+    in flight, not the country.
+  - The sitemap gets all county URLs in ONE block edit (RENT-COUNTY-PAGES),
+    each <lastmod> the day its page last changed, kept in pages.json.
+  - A county that drops out of the data loses its page and its URL.
+
+Bump PAGE_VERSION whenever the page template changes, or counties whose data
+did not move keep the old markup.
+
+Honesty rules carried in from the state pages: gap years are gaps ("no
+survey" for 2015, "not published" otherwise), deltas need both years
+published, the state-median comparison is only made like-for-like (same
+year, same land type), and the gross-revenue share says which price it uses.
+
+    python3 scripts/build_county_rent_pages.py              build, sitemap block
+    python3 scripts/build_county_rent_pages.py --selftest   temp-dir build + invariants
+"""
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import date
+
+import bake_engine
+import page_render
+import sitemap_model
+from build_state_rent_pages import (DATA_DIR, EXPLORE_NAV, NOTICE, SITE, STATE_NAMES, TYPE_LABEL,
+                                    TYPE_SHORT, county_path, esc, head, latest, money,
+                                    rent_verdict, slug, state_stats)
+
+OUT_DIR = "rent/county"
+INDEX = "pages.json"
+SITEMAP = "sitemap.xml"
+BLOCK = "RENT-COUNTY-PAGES"
+PAGE_VERSION = 1
+TYPES = ("nonirr", "irr", "pasture")
+CROPS = (("corn", "Corn"), ("beans", "Soybeans"))
+
+
+def page_name(st, name):
+    """Path under OUT_DIR: /rent/county/iowa/adair -> iowa/adair.html."""
+    return county_path(st, name)[len("/rent/county/"):] + ".html"
+
+
+def county_label(st, name):
+    return f"{name} {'Parish' if st == 'LA' else 'County'}"
+
+
+def state_context(st, d, s):
+    """The state figures a county page quotes. Part of every page's hash, so
+    keep it to what the page actually prints."""
+    yr = s["yr"]
+    return {
+        "st": st, "yr": yr, "primary": s["primary"], "median": s["median"], "n": s["n"],
+        "no_survey": d.get("no_survey_years", []),
+        "price": {crop: (d.get("prices", {}).get(crop) or {}).get(str(yr)) for crop, _ in CROPS},
+        "prelim": yr in d.get("price_prelim", []),
+        "peers": sorted(c["name"] for c in d.get("counties", [])),
+    }
+
+
+def record_hash(ctx, c):
+    blob = json.dumps([PAGE_VERSION, ctx, c], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+
+def peer_links(ctx):
+    """{county name: link} for the state, built once per state, not per page."""
+    return {n: f'<a href="{county_path(ctx["st"], n)}">{esc(n)}</a>' for n in ctx["peers"]}
+
+
+def county_type(c, ctx):
+    """The state's primary land type if this county publishes it, else the
+    county's most-published one: a pasture-only county gets a pasture page."""
+    if c["rent"].get(ctx["primary"]):
+        return ctx["primary"]
+    return max((t for t in TYPES if c["rent"].get(t)), key=lambda t: (len(c["rent"][t]), t == "nonirr"))
+
+
+def change(r, now, then):
+    """% change between two published years of one county, or None."""
+    a, b = r.get(str(now)), r.get(str(then))
+    return round(100 * (a - b) / b, 1) if a is not None and b else None
+
+
+def delta_html(v, label):
+    if v is None:
+        return f'<div class="v mut">&mdash;</div><div class="l">{label}</div><div class="s">not published that year</div>'
+    cls = "up" if v >= 0 else "dn"
+    return (f'<div class="v {cls}">{"+" if v >= 0 else ""}{v}%</div><div class="l">{label}</div>'
+            f'<div class="s">both years published</div>')
+
+
+def history_table(c, ctx, types):
+    years = sorted({int(y) for t in types for y in c["rent"][t]})
+    thead = "<th>Year</th>" + "".join(f'<th title="{TYPE_LABEL[t]}, $/acre">{TYPE_SHORT[t]}</th>' for t in types)
+    body = []
+    for y in range(ctx["yr"], years[0] - 1, -1) if years else []:
+        if not any(str(y) in c["rent"][t] for t in types):
+            why = "no survey" if y in ctx["no_survey"] else "not published"
+            body.append(f'<tr><td>{y}</td><td class="mut" colspan="{len(types)}">{why}</td></tr>')
+            continue
+        cells = "".join(f'<td>{money(c["rent"][t][str(y)])}</td>' if str(y) in c["rent"][t]
+                        else '<td class="mut">&mdash;</td>' for t in types)
+        body.append(f"<tr><td>{y}</td>{cells}</tr>")
+    return (f'<table class="rs-t"><thead><tr>{thead}</tr></thead>'
+            f'<tbody>{"".join(body)}</tbody></table>')
+
+
+def revenue_rows(c, ctx, rent):
+    """[(crop label, trend, last yr, last, price, gross, share)] for crops with a
+    trend yield and a state price. Cropland only: pasture is not farmed for grain."""
+    out = []
+    for crop, label in CROPS:
+        y = (c.get("yield") or {}).get(crop) or {}
+        price = ctx["price"].get(crop)
+        if y.get("trend") is None or not price:
+            continue
+        ly, lv = latest(y.get("hist") or {})
+        gross = y["trend"] * price
+        out.append((label, y["trend"], ly, lv, price, gross, 100 * rent / gross if gross else None))
+    return out
+
+
+def build_county_page(c, ctx, peers):
+    st = ctx["st"]
+    state = STATE_NAMES[st]
+    label = county_label(st, c["name"])
+    where = f"{label}, {state}"
+    path = county_path(st, c["name"])
+    t = county_type(c, ctx)
+    plabel = TYPE_LABEL[t]
+    r = c["rent"][t]
+    ly, lv = latest(r)
+    types = [x for x in TYPES if c["rent"].get(x)]
+    yoy, dec = change(r, ly, ly - 1), change(r, ly, ly - 9)
+    # like-for-like only: same year, same land type as the state median
+    vs_state = (round(100 * (lv - ctx["median"]) / ctx["median"], 1)
+                if ly == ctx["yr"] and t == ctx["primary"] and ctx["median"] else None)
+    vw, vc = rent_verdict(yoy) if yoy is not None else ("NO PRIOR-YEAR RATE", "#8a948f")
+    stale = "" if ly == ctx["yr"] else f" (the most recent year NASS published here; there is no {ctx['yr']} rate)"
+
+    title = f"{where} Cash Rent {ly}"
+    desc = (f"{where} farmland cash rent: {money(lv)}/acre for {plabel} in {ly}, every USDA NASS rate "
+            f"back to {min(int(y) for x in types for y in c['rent'][x])}. Free, sources shown.")[:160]
+    others = [f"{TYPE_LABEL[x]} {money(v)} ({y})" for x in types if x != t for y, v in [latest(c["rent"][x])]]
+    if yoy is not None:
+        moved = f"{'up' if yoy >= 0 else 'down'} {abs(yoy)}% from {money(r[str(ly - 1)])} in {ly - 1}"
+    else:
+        moved = f"NASS did not publish a {ly - 1} {plabel} rate here, so there is no year-over-year change"
+    faq = [
+        {"q": f"What is the cash rent per acre in {where}?",
+         "a": (f"USDA NASS published {money(lv)} per acre for {plabel} in {label} for {ly}{stale}."
+               + (" Other land types: " + "; ".join(others) + "." if others else "")
+               + " It is the mean of a voluntary survey, not a rate card.")},
+        {"q": f"How much did {label} cash rent change?",
+         "a": (f"The {ly} {plabel} rate of {money(lv)} is {moved}."
+               + (f" Over nine years it moved {'+' if dec >= 0 else ''}{dec}% (vs {ly - 9})." if dec is not None else ""))},
+    ]
+    if st in NOTICE:
+        faq.append({"q": f"When must I give notice to terminate a farm lease in {state}?",
+                    "a": f"{state} statute sets the deadline at {NOTICE[st].replace('&sect;', 'section ')}."})
+    jsonld = {"@context": "https://schema.org", "@graph": [
+        {"@type": "Dataset", "@id": f"{SITE}{path}#dataset",
+         "name": f"{where} Cash Rental Rates",
+         "description": f"USDA NASS county cash rent for {', '.join(TYPE_LABEL[x] for x in types)} in {where}.",
+         "url": f"{SITE}{path}", "license": "https://www.usa.gov/government-works",
+         "isAccessibleForFree": True,
+         "creator": {"@type": "Organization", "name": "AGSIST", "url": SITE},
+         "spatialCoverage": {"@type": "Place", "name": f"{where}, United States"}},
+        {"@type": "BreadcrumbList", "itemListElement": [
+            {"@type": "ListItem", "position": 1, "name": "AGSIST", "item": f"{SITE}/"},
+            {"@type": "ListItem", "position": 2, "name": "Cash Rent by State", "item": f"{SITE}/rent/"},
+            {"@type": "ListItem", "position": 3, "name": state, "item": f"{SITE}/rent/{slug(state)}"},
+            {"@type": "ListItem", "position": 4, "name": label, "item": f"{SITE}{path}"}]},
+        {"@type": "FAQPage", "mainEntity": [
+            {"@type": "Question", "name": f["q"],
+             "acceptedAnswer": {"@type": "Answer", "text": f["a"]}} for f in faq]},
+    ]}
+
+    if vs_state is not None:
+        cmp_state = (f" That is {abs(vs_state)}% {'above' if vs_state >= 0 else 'below'} the {state} median of "
+                     f"{money(ctx['median'])} across {ctx['n']} published counties.")
+    else:
+        cmp_state = ""
+    hero = f"""
+  <div style="background:#101415;border:1px solid #1a1f20;border-radius:14px;padding:20px 24px;margin:14px 0;display:flex;gap:22px;flex-wrap:wrap;align-items:center">
+    <div style="font-family:'JetBrains Mono',monospace;font-size:3.6rem;font-weight:800;line-height:1;color:{vc}">{money(lv)}</div>
+    <div>
+      <div style="font-family:'JetBrains Mono',monospace;font-size:1.25rem;font-weight:800;letter-spacing:.05em;color:{vc}">{vw}</div>
+      <div style="font-size:1rem;line-height:1.7;color:#e6ebe9;max-width:540px">{esc(label)} paid <b style="color:{vc}">{money(lv)} an acre</b> for {plabel} in {ly}{stale}.{cmp_state}</div>
+    </div>
+  </div>
+  <div class="rs-hero">
+    <div class="rs-stat"><div class="v">{money(lv)}</div><div class="l">rent /ac &middot; {ly}</div><div class="s">{plabel}</div></div>
+    <div class="rs-stat">{delta_html(yoy, f'vs {ly - 1}')}</div>
+    <div class="rs-stat">{delta_html(dec, f'vs {ly - 9}')}</div>
+    <div class="rs-stat"><div class="v">{money(ctx['median'])}</div><div class="l">{state} median &middot; {ctx['yr']}</div><div class="s">{TYPE_LABEL[ctx['primary']]}, {ctx['n']} counties</div></div>
+  </div>"""
+
+    rev = revenue_rows(c, ctx, lv) if t != "pasture" else []
+    if rev:
+        price_note = (f"{ctx['yr']} {state} marketing-year average price received"
+                      + (" (preliminary)" if ctx["prelim"] else ""))
+        rev_html = (f'<h2>What the acre grosses at trend yield</h2>\n'
+                    f'  <p class="sub">AGSIST least-squares trend yield from NASS county estimates, times the {price_note}. '
+                    f'Rent share is the {ly} {plabel} rent over that gross.</p>\n'
+                    '  <table class="rs-t"><thead><tr><th>Crop</th><th>Trend yield</th><th>Last reported</th>'
+                    '<th>Price</th><th>Gross /ac</th><th>Rent share</th></tr></thead><tbody>'
+                    + "".join(f'<tr><td>{lab}</td><td>{tr:.1f} bu</td>'
+                              + (f'<td>{v:.1f} bu ({y})</td>' if v is not None else '<td class="mut">&mdash;</td>')
+                              + f'<td>{money(p)}</td><td>{money(round(g))}</td>'
+                              + (f'<td>{sh:.0f}%</td>' if sh is not None else '<td class="mut">&mdash;</td>') + "</tr>"
+                              for lab, tr, y, v, p, g, sh in rev)
+                    + "</tbody></table>")
+    else:
+        rev_html = ""
+    cloud = '<p class="rs-cloud">' + " &middot; ".join(a for n, a in peers.items() if n != c["name"]) + "</p>"
+
+    return head(title, desc, path, jsonld) + f"""
+<body>
+<div id="site-header"></div>
+<main class="rs-wrap">
+  <p class="sub" style="margin-top:14px"><a href="/rent/" style="color:#8a948f">Cash Rent by State</a> &rsaquo; <a href="/rent/{slug(state)}" style="color:#8a948f">{state}</a> &rsaquo; <b style="color:#e6ebe9">{esc(label)}</b></p>
+  <h1>{esc(where)} Cash Rent &mdash; {ly}</h1>
+  <p class="sub">Every USDA-published cash rental rate for {esc(label)}, straight from the NASS Cash Rents
+  Survey &mdash; no estimates, no modeling, no login.</p>
+  {hero}
+  <h2>{esc(label)} cash rent by year</h2>
+  <p class="sub">County means as published, $/acre. Gap years are shown as gaps &mdash; a year NASS did not
+  publish is not filled in.</p>
+  {history_table(c, ctx, types)}
+  {rev_html}
+  <div class="rs-note"><b>What this can&rsquo;t tell you.</b> This is a county <b>mean from a voluntary USDA survey</b> &mdash;
+  rents vary widely inside a county, driven by soil, drainage, field size and how badly a neighbor wants the
+  ground. Treat it as the start of a conversation, not a rate card.</div>
+  <div class="rs-note rs-links" style="border-left-color:#5fc28a"><b>Do something with it:</b>
+  compare every county on the <a href="/rent/{slug(state)}">{state} cash rent page</a> &middot; see it on the
+  <a href="/cash-rent">national rent map</a> &middot; put a number in a
+  <a href="/cash-lease?st={st}">printable {state} cash lease</a>{
+      " &mdash; termination notice: " + NOTICE[st] if st in NOTICE else ""}.</div>
+  <h2>Other {state} counties</h2>
+  {cloud}
+  <p class="sub" style="font-size:.75rem;margin:18px 0">Source: USDA NASS Quick Stats &mdash; Cash Rents Survey county
+  estimates (released each August) and county yield estimates. AGSIST is free and sells nothing on this page.</p>
+</main>
+{EXPLORE_NAV}
+<div id="site-footer"></div>
+<script src="/components/loader.js?v=14"></script>
+</body>
+</html>
+"""
+
+
+# ---------------------------------------------------------------- build
+def load_index(out_dir):
+    try:
+        with open(os.path.join(out_dir, INDEX)) as fh:
+            saved = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return saved.get("pages", {}) if saved.get("version") == PAGE_VERSION else {}
+
+
+def save_index(out_dir, pages):
+    text = json.dumps({"version": PAGE_VERSION, "pages": pages}, indent=1, sort_keys=True) + "\n"
+    path = os.path.join(out_dir, INDEX)
+    try:
+        if open(path).read() == text:
+            return
+    except OSError:
+        pass
+    with open(path, "w") as fh:
+        fh.write(text)
+
+
+def build_all(out_dir=OUT_DIR, data_dir=DATA_DIR, today=None):
+    """Render every county whose inputs changed. -> (urls, pages, stats)"""
+    today = today or date.today().isoformat()
+    t0 = time.perf_counter()
+    old = load_index(out_dir)
+    pages = {}                      # every county this run: name -> {"hash", "day"}
+    n = {"states": 0, "skipped": 0}
+
+    def tasks():
+        for f in sorted(glob.glob(f"{data_dir}/[A-Z][A-Z].json")):
+            with open(f) as fh:
+                d = json.load(fh)
+            st = d.get("state")
+            if st not in STATE_NAMES or not d.get("counties"):
+                continue
+            n["states"] += 1
+            ctx = state_context(st, d, state_stats(d))
+            peers = peer_links(ctx)
+            for c in d["counties"]:
+                name = page_name(st, c["name"])
+                h = record_hash(ctx, c)
+                prev = old.get(name)
+                if prev and prev["hash"] == h and os.path.exists(os.path.join(out_dir, name)):
+                    pages[name] = prev
+                    n["skipped"] += 1
+                    continue
+                pages[name] = {"hash": h, "day": today}
+                yield name, build_county_page, (c, ctx, peers)
+
+    res = page_render.render(tasks(), out_dir)
+    if not n["states"]:
+        raise SystemExit(f"FATAL: no state files in {data_dir} — refusing to build empty pages")
+    for name in res.unchanged:      # re-rendered to the same bytes: not a change
+        if name in old:
+            pages[name]["day"] = old[name]["day"]
+    gone = sorted(set(old) - set(pages))
+    for name in gone:
+        try:
+            os.remove(os.path.join(out_dir, name))
+        except FileNotFoundError:
+            pass
+    save_index(out_dir, pages)
+    urls = [(f"{SITE}/{OUT_DIR}/{name[:-len('.html')]}", pages[name]["day"]) for name in sorted(pages)]
+    stats = {"pages": len(pages), "skipped": n["skipped"], "written": len(res.written),
+             "unchanged": len(res.unchanged), "removed": len(gone), "secs": time.perf_counter() - t0}
+    print(f"county pages: {stats['pages']} across {n['states']} states — {stats['skipped']} skipped by hash, "
+          f"{stats['written']} written, {stats['unchanged']} re-rendered unchanged, {stats['removed']} removed "
+          f"({stats['secs']:.1f}s)", file=sys.stderr)
+    return urls, pages, stats
+
+
+def sitemap_rows(urls):
+    return [(u, day, "yearly", "0.5") for u, day in urls]
+
+
+@bake_engine.baker("rent_counties", reads=(DATA_DIR + "/*.json",), writes=(OUT_DIR + "/*.html", f"{OUT_DIR}/{INDEX}", SITEMAP),
+                   external=True)
+def bake_site(site):
+    urls, _, stats = build_all()
+    sitemap_model.edit(site.page(SITEMAP), lambda sm: sm.set_block(BLOCK, sitemap_rows(urls)))
+    return f"{stats['written']} of {stats['pages']} county pages rewritten"
+
+
+def selftest():
+    import shutil
+    import tempfile
+    with tempfile.TemporaryDirectory() as td:
+        data, out = os.path.join(td, "data"), os.path.join(td, "out")
+        shutil.copytree(DATA_DIR, data)
+        urls, pages, s1 = build_all(out, data, today="2026-08-20")
+        assert s1["pages"] >= 2000 and s1["written"] == s1["pages"], s1
+        assert len(urls) == len(pages) and len(set(u for u, _ in urls)) == len(urls), "duplicate county URL"
+        ia = open(os.path.join(out, "iowa/adair.html"), encoding="utf-8").read()
+        c = next(c for c in json.load(open(os.path.join(data, "IA.json")))["counties"] if c["name"] == "Adair")
+        ly, lv = latest(c["rent"]["nonirr"])
+        assert money(lv) in ia and "FAQPage" in ia and f'href="{SITE}/rent/county/iowa/adair"' in ia
+        assert "no survey" in ia, "2015 gap not shown honestly"
+        assert '/rent/county/iowa/black-hawk"' in ia and '/rent/county/iowa/adair"' not in ia.split("rs-cloud")[1]
+        assert "Parish" in open(os.path.join(out, "louisiana/acadia.html"), encoding="utf-8").read()
+
+        # second run: every county skipped by hash, nothing rendered
+        _, _, s2 = build_all(out, data, today="2026-08-27")
+        assert s2["skipped"] == s2["pages"] and s2["written"] == 0, s2
+
+        # one county revised, one dropped: only that page rewritten, the other removed
+        ia_d = json.load(open(os.path.join(data, "IA.json")))
+        ia_d["counties"][0]["rent"]["nonirr"][str(ly)] = lv + 1
+        ia_d["counties"] = [x for x in ia_d["counties"] if x["name"] != "Adams"]
+        json.dump(ia_d, open(os.path.join(data, "IA.json"), "w"))
+        urls3, pages3, s3 = build_all(out, data, today="2026-09-03")
+        # Adams leaving the cloud touches every Iowa page; other states untouched
+        n_ia = len(ia_d["counties"])
+        assert s3["written"] == n_ia and s3["removed"] == 1, s3
+        assert not os.path.exists(os.path.join(out, "iowa/adams.html"))
+        assert pages3["iowa/adair.html"]["day"] == "2026-09-03" and pages3["texas/anderson.html"]["day"] == "2026-08-20"
+        assert money(lv + 1) in open(os.path.join(out, "iowa/adair.html"), encoding="utf-8").read()
+
+        sm = sitemap_model.Sitemap("<urlset>\n</urlset>\n")
+        sm.set_block(BLOCK, sitemap_rows(urls3))
+        assert len(sm) == len(urls3) and f"{SITE}/rent/county/iowa/adams" not in sm
+        print(f"SELFTEST OK — {s1['pages']} county pages in {s1['secs']:.1f}s; rerun skipped all "
+              f"({s2['secs']:.1f}s); one revised + one dropped county rewrote {s3['written']} Iowa pages, "
+              f"removed 1; sitemap block, gap honesty, link cloud verified")
+
+
+def main():
+    if "--selftest" in sys.argv:
+        return selftest()
+    urls, _, _ = build_all()
+    try:
+        sm = sitemap_model.Sitemap.load(SITEMAP)
+    except FileNotFoundError:
+        print("sitemap.xml missing — skipped")
+        return
+    sm.set_block(BLOCK, sitemap_rows(urls))
+    print("sitemap: county pages block updated" if sm.write(SITEMAP) else "sitemap: no change")
+
+
+if __name__ == "__main__":
+    main()
@@ -59,9 +59,12 @@ import json
 import re
 import sys
 from datetime import date, datetime, timedelta, timezone
-from html.parser import HTMLParser
 from pathlib import Path
 
+import bake_engine
+
+CT = bake_engine.Markers("<!-- CT:{name} -->", "<!-- /CT:{name} -->")
+
 # The tour lives on Central time. Every nightly meeting, every "about 8pm
 # Central", every phase boundary is a Central-time fact.
 TOUR_TZ = "America/Chicago"
@@ -1465,38 +1468,10 @@ def render_flow(ph):
     return "".join(out)
 
 
-# ── splice + gauntlet ─────────────────────────────────────────────────────
-
-def splice(html, name, body):
-    a, b = f"<!-- CT:{name} -->", f"<!-- /CT:{name} -->"
-    pat = re.compile(re.escape(a) + r".*?" + re.escape(b), re.S)
-    assert len(pat.findall(html)) == 1, f"marker {name}: expected exactly 1 region"
-    return pat.sub(lambda _: a + body + b, html)
-
-
-class DivBalance(HTMLParser):
-    def __init__(self):
-        super().__init__(convert_charrefs=False)
-        self.depth = 0
-        self.bad = False
-
-    TAGS = ("div", "section")
-
-    def handle_starttag(self, t, a):
-        if t in self.TAGS:
-            self.depth += 1
-
-    def handle_endtag(self, t):
-        if t in self.TAGS:
-            self.depth -= 1
-            if self.depth < 0:
-                self.bad = True
-
+# ── gauntlet ──────────────────────────────────────────────────────────────
 
 def gauntlet(html, st, ph=None):
-    p = DivBalance()
-    p.feed(html)
-    assert not p.bad and p.depth == 0, "div balance broken"
+    assert bake_engine.balanced(html, ("div", "section")), "div balance broken"
     m = re.search(r'<script type="application/ld\+json">(.*?)</script>', html, re.S)
     assert m, "JSON-LD block missing"
     json.loads(m.group(1))
@@ -2332,23 +2307,9 @@ def _region_diff(was, now, limit=6):
     return out
 
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--check", action="store_true")
-    ap.add_argument("--selftest", action="store_true")
-    ap.add_argument("--html", default=None)
-    ap.add_argument("--json", default=None)
-    ap.add_argument("--today", default=None, help="override date (YYYY-MM-DD) for testing")
-    args = ap.parse_args()
-
-    if args.selftest:
-        return selftest()
-
-    root = Path(__file__).resolve().parent.parent
-    html_path = Path(args.html) if args.html else root / "crop-tour.html"
-    json_path = Path(args.json) if args.json else root / "data" / "crop-tour.json"
-
-    data = json.loads(json_path.read_text(encoding="utf-8"))
+def prepare(json_path, today=None):
+    """Load, validate and score the manifest. Returns (data, st, ph, today)."""
+    data = json.loads(Path(json_path).read_text(encoding="utf-8"))
     # Read the nowcast from the model's own file before anything renders, and
     # refuse if the manifest still carries a rival copy of the same figure.
     data["_nowcast"] = nowcast_now(json_path)
@@ -2359,38 +2320,73 @@ def main():
     st = stats(data["history"])
     sst = state_stats(data)
     attach_state_context(data, sst)
-    today = date.fromisoformat(args.today) if args.today else today_tour()
-    ph = phase(data, today)
-
-    html = html_path.read_text(encoding="utf-8")
-    # FLOW FIRST. It emits the empty CT:nights / CT:bench / CT:history / CT:soy
-    # marker pairs in phase order; the splices below then fill them. Order
-    # matters: filling before the flow is emitted would have the flow overwrite
-    # the content it just wrote.
-    baked = splice(html, "flow", render_flow(ph))
-    baked = splice(baked, "hero", render_hero(data, st, ph, today, sst))
-    baked = splice(baked, "nights", render_nights(data, ph, sst, today))
-    baked = splice(baked, "bench", render_bench(data, ph))
-    baked = splice(baked, "record", render_record(data, st, ph, today))
-    baked = splice(baked, "history", render_history(st))
-    baked = splice(baked, "soy", render_soy(st))
-    baked = splice(baked, "soytbl", render_soy_table(st))
-    baked = splice(baked, "band", render_band(data))
-    baked = splice(baked, "benchnote", render_benchnote(data))
-    baked = splice(baked, "sources", render_sources(data))
+    data["_sst"] = sst
+    today = date.fromisoformat(today) if today else today_tour()
+    return data, st, phase(data, today), today
+
+
+def bake(page, data, st, ph, today):
+    """Queue every crop-tour region, the FAQ answer and the stamps on a bake_engine.Page."""
+    sst = data["_sst"]
+    # THE FLOW CARRIES THE OTHER MARKERS. It emits the empty CT:nights /
+    # CT:bench / CT:history / CT:soy pairs in phase order, and the engine fills
+    # them from the same rebuild, so no fill can be overwritten by the flow.
+    page.fill(CT, "flow", render_flow(ph))
+    page.fill(CT, "hero", render_hero(data, st, ph, today, sst))
+    page.fill(CT, "nights", render_nights(data, ph, sst, today))
+    page.fill(CT, "bench", render_bench(data, ph))
+    page.fill(CT, "record", render_record(data, st, ph, today))
+    page.fill(CT, "history", render_history(st))
+    page.fill(CT, "soy", render_soy(st))
+    page.fill(CT, "soytbl", render_soy_table(st))
+    page.fill(CT, "band", render_band(data))
+    page.fill(CT, "benchnote", render_benchnote(data))
+    page.fill(CT, "sources", render_sources(data))
+    page.fill(CT, "stamp", f"Record updated {pretty(data['updated'])} &middot; "
+                           f"{st['n']} tours scored")
     # The FAQ answer restates the headline statistics. It used to be hand-typed
     # in the head, which meant adding a tour year would leave a stale claim in
     # the structured data that nobody would notice. Bake it from the same stats.
-    baked = bake_faq(baked, st)
-    baked = splice(baked, "stamp", f"Record updated {pretty(data['updated'])} &middot; "
-                                   f"{st['n']} tours scored")
-    baked, n = re.subn(r'("dateModified":")\d{4}-\d{2}-\d{2}(")',
-                       r"\g<1>" + data["updated"] + r"\g<2>", baked)
+    page.edit(lambda html: bake_faq(html, st))
     # This page carries two: the WebPage node and the Dataset node. Both should
     # move together. Zero means the JSON-LD block was renamed or lost.
-    assert n >= 1, "no dateModified found in the JSON-LD — head block changed?"
+    page.sub(r'("dateModified":")\d{4}-\d{2}-\d{2}(")',
+             r"\g<1>" + data["updated"] + r"\g<2>",
+             "no dateModified found in the JSON-LD — head block changed?", expect="+")
+    page.check(lambda html: gauntlet(html, st, ph))
+    return page
+
+
+@bake_engine.baker("croptour", reads=("data/crop-tour.json", "data/yield-nowcast.json"),
+                   writes=("crop-tour.html",))
+def bake_site(site):
+    root = Path(__file__).resolve().parent.parent
+    data, st, ph, today = prepare(root / "data" / "crop-tour.json")
+    bake(site.page(root / "crop-tour.html"), data, st, ph, today)
+    return f"phase={ph}, {st['n']} tours scored"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--check", action="store_true")
+    ap.add_argument("--selftest", action="store_true")
+    ap.add_argument("--html", default=None)
+    ap.add_argument("--json", default=None)
+    ap.add_argument("--today", default=None, help="override date (YYYY-MM-DD) for testing")
+    args = ap.parse_args()
+
+    if args.selftest:
+        return selftest()
+
+    root = Path(__file__).resolve().parent.parent
+    html_path = Path(args.html) if args.html else root / "crop-tour.html"
+    json_path = Path(args.json) if args.json else root / "data" / "crop-tour.json"
 
-    gauntlet(baked, st, ph)
+    data, st, ph, today = prepare(json_path, args.today)
+    page = bake_engine.Page(html_path)
+    bake(page, data, st, ph, today)
+    html = page.original
+    baked = page.run_checks()
 
     if baked == html:
         print("crop-tour.html already in sync.")
@@ -2403,19 +2399,17 @@ def main():
         # reader can tell "the daily bake has not run today" from "somebody
         # hand-edited the history table".
         print("crop-tour.html OUT OF SYNC with data/crop-tour.json — run the baker.")
+        disk, ours = bake_engine.region_map(html, CT), bake_engine.region_map(baked, CT)
         for name in ("stamp", "hero", "flow", "sources"):
-            a, bnd = f"<!-- CT:{name} -->", f"<!-- /CT:{name} -->"
-            pat = re.compile(re.escape(a) + r"(.*?)" + re.escape(bnd), re.S)
-            was = pat.search(html)
-            now = pat.search(baked)
-            if was and now and was.group(1) != now.group(1):
+            was, now = disk.get(name), ours.get(name)
+            if was is not None and now is not None and was != now:
                 print(f"  region {name}: differs "
-                      f"({len(was.group(1))} chars on disk, {len(now.group(1))} baked)")
-                for ln in _region_diff(was.group(1), now.group(1)):
+                      f"({len(was)} chars on disk, {len(now)} baked)")
+                for ln in _region_diff(was, now):
                     print(f"      {ln}")
         print(f"  (baked for phase={ph}, today={today.isoformat()})")
         return 1
-    html_path.write_text(baked, encoding="utf-8")
+    page.write()
     print(f"Baked crop-tour.html — phase={ph}, {st['n']} tours scored, "
           f"tour MAE {st['tour_mae']:.2f} vs USDA {st['usda_mae']:.2f}.")
     return 0
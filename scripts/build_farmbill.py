@@ -28,6 +28,10 @@ import re
 import sys
 from html.parser import HTMLParser
 
+import bake_engine
+
+FB = bake_engine.Markers("<!--FB:{name}-->", "<!--/FB:{name}-->")
+
 # ── region renderers — each reproduces the page's existing markup exactly ──
 
 def render_pills(data):
@@ -80,35 +84,6 @@ BLOCK_REGIONS = {
 }
 
 
-def replace_block(html, name, inner, close_indent):
-    """Replace content between <!--FB:name--> ... <!--/FB:name--> markers."""
-    pat = re.compile(r"(<!--FB:%s-->)(.*?)(<!--/FB:%s-->)" % (name, name), re.S)
-    n = len(pat.findall(html))
-    if n != 1:
-        raise SystemExit(f"ERROR: expected exactly 1 '{name}' marker pair, found {n}. "
-                         f"Is farm-bill.html instrumented?")
-    return pat.sub(lambda m: f"{m.group(1)}\n{inner}\n{close_indent}{m.group(3)}", html)
-
-
-def replace_inline(html, name, text):
-    """Replace content between inline <!--FB:name-->...<!--/FB:name--> markers."""
-    pat = re.compile(r"(<!--FB:%s-->).*?(<!--/FB:%s-->)" % (name, name), re.S)
-    n = len(pat.findall(html))
-    if n != 1:
-        raise SystemExit(f"ERROR: expected exactly 1 inline '{name}' marker, found {n}.")
-    return pat.sub(lambda m: f"{m.group(1)}{text}{m.group(2)}", html)
-
-
-def replace_anchored(html, pattern, repl, label):
-    """Targeted single-match replace for fields that can't carry HTML comments
-    (e.g. inside a JSON-LD <script> block)."""
-    rx = re.compile(pattern)
-    n = len(rx.findall(html))
-    if n != 1:
-        raise SystemExit(f"ERROR: expected exactly 1 '{label}' match, found {n}.")
-    return rx.sub(repl, html)
-
-
 # ── validation gauntlet (runs before any write) ──
 
 def validate(html):
@@ -122,9 +97,11 @@ def validate(html):
     except Exception as e:
         problems.append(f"HTMLParser: {e}")
 
-    o, c = len(re.findall(r"<div\b", html)), len(re.findall(r"</div>", html))
-    if o != c:
-        problems.append(f"div balance: {o} open / {c} close")
+    div = bake_engine.DivBalance()
+    div.feed(html)
+    if div.bad or div.depth:
+        problems.append(f"div balance: depth {div.depth} at end"
+                        + (", closed before opened" if div.bad else ""))
 
     if len(re.findall(r"<h1[\s>]", html)) != 1:
         problems.append("h1 count != 1")
@@ -143,26 +120,40 @@ def validate(html):
     return problems
 
 
-def bake(html, data):
+def bake(page, data):
+    """Queue every farm-bill region and head date on a bake_engine.Page."""
     for name, (renderer, indent) in BLOCK_REGIONS.items():
-        html = replace_block(html, name, renderer(data), indent)
+        page.fill(FB, name, f"\n{renderer(data)}\n{indent}")
     # the "Updated <date>" stamp in the TL;DR header
-    html = replace_inline(html, "stamp", f'Updated {data["updated_display"]}')
+    page.fill(FB, "stamp", f'Updated {data["updated_display"]}')
     # head: <meta property="article:modified_time" content="YYYY-MM-DD">
-    html = replace_anchored(
-        html,
-        r'(<meta property="article:modified_time" content=")[0-9-]+(">)',
-        lambda m: m.group(1) + data["updated"] + m.group(2),
-        "article:modified_time",
-    )
-    # head: JSON-LD "dateModified":"YYYY-MM-DD"
-    html = replace_anchored(
-        html,
-        r'("dateModified":")[0-9-]+(")',
-        lambda m: m.group(1) + data["updated"] + m.group(2),
-        "dateModified",
-    )
-    return html
+    # and JSON-LD "dateModified":"YYYY-MM-DD" -- fields that can't carry
+    # HTML comments, so a targeted single-match replace
+    page.sub(r'(<meta property="article:modified_time" content=")[0-9-]+(">)',
+             lambda m: m.group(1) + data["updated"] + m.group(2), "article:modified_time")
+    page.sub(r'("dateModified":")[0-9-]+(")',
+             lambda m: m.group(1) + data["updated"] + m.group(2), "dateModified")
+    return page
+
+
+def render(page):
+    """Rendered page, or SystemExit naming the marker that drifted."""
+    try:
+        return page.render()
+    except bake_engine.BakeError as e:
+        raise SystemExit(f"ERROR: {e}. Is farm-bill.html instrumented?")
+
+
+@bake_engine.baker("farmbill", reads=("data/farm-bill.json",), writes=("farm-bill.html",))
+def bake_site(site):
+    data = site.json("data/farm-bill.json")
+    page = bake(site.page("farm-bill.html"), data)
+
+    def _gauntlet(html):
+        problems = validate(html)
+        assert not problems, "VALIDATION FAILED: " + "; ".join(problems)
+    page.check(_gauntlet)
+    return f"updated {data['updated']}"
 
 
 def main():
@@ -175,10 +166,8 @@ def main():
 
     with open(args.json, encoding="utf-8") as f:
         data = json.load(f)
-    with open(args.html, encoding="utf-8") as f:
-        original = f.read()
-
-    baked = bake(original, data)
+    page = bake(bake_engine.Page(args.html), data)
+    original, baked = page.original, render(page)
 
     problems = validate(baked)
     if problems:
@@ -199,8 +188,7 @@ def main():
         print("No change: farm-bill.html already up to date.")
         return
 
-    with open(args.html, "w", encoding="utf-8") as f:
-        f.write(baked)
+    page.write()
     print(f"Baked farm-bill.html from farm-bill.json (updated {data['updated']}).")
 
 
@@ -20,8 +20,24 @@ Output: data/scorecard.json
   }
 
 Runs in daily.yml after the briefing publishes. Exit 0 ok, 2 nothing to build.
+
+Grade ledger (2026-10-19): every run used to parse every archived briefing
+and re-grade every date against its prior, so the work grew with the
+archive while only today's call was new. data/scorecard-ledger.json keeps
+each date's record under a key hashed from its briefing's bytes, the prior
+briefing's bytes and the grading rules (this file's and grade_calls.py's
+source). A date is re-graded only when that key changes: a new day, an edited
+archive file, a changed grader. scorecard.json is then summarised from the
+ledger, and everything downstream (the scorecard.html prerender, the social
+card totals) reads scorecard.json, so it follows the ledger too.
+
+  python3 scripts/build_scorecard.py           incremental
+  python3 scripts/build_scorecard.py --full    re-grade every date, diff against
+                                               the incremental result (exit 1 on
+                                               any difference), write the full one
 """
 
+import hashlib
 import json
 import sys
 try:
@@ -35,139 +51,174 @@ HERE = Path(__file__).resolve().parent
 REPO_ROOT = HERE.parent
 ARCHIVE = REPO_ROOT / "data" / "daily-archive"
 OUT = REPO_ROOT / "data" / "scorecard.json"
+LEDGER_NAME = "scorecard-ledger.json"      # next to OUT
 
 VALID = {"played_out", "didnt", "pending"}
 
 
-def main():
-    if not ARCHIVE.exists():
-        print("[scorecard] no archive dir"); sys.exit(2)
-    dates = sorted(p.stem for p in ARCHIVE.glob("*.json") if p.stem != "index")
-    if not dates:
-        print("[scorecard] no archive briefings"); sys.exit(2)
+# Words a briefing might use for each instrument, so we can tell whether the
+# published prose is even about the call we scored.
+_WORDS = {"corn": ("corn",), "beans": ("bean", "soybean"), "wheat": ("wheat",),
+          "cattle": ("cattle",), "feeders": ("feeder",), "hogs": ("hog",),
+          "crude": ("crude", "oil"), "natgas": ("natural gas", "natgas")}
+
+def _summary_mentions(summary, instrument):
+    low = summary.lower()
+    return any(w in low for w in _WORDS.get(instrument, (instrument,)))
+
+def _plain_call(call, p0, p1, outcome):
+    """Reader-facing description built from the structured call itself."""
+    names = {"corn": "corn", "beans": "soybeans", "wheat": "wheat",
+             "cattle": "cattle", "feeders": "feeder cattle", "hogs": "hogs",
+             "crude": "crude", "natgas": "natural gas"}
+    inst = names.get((call.get("instrument") or "").lower(), call.get("instrument"))
+    d = (call.get("direction") or "").lower()
+    lvl = call.get("level")
+    way = "up toward" if d == "up" else "down toward"
+    got = f" It closed at ${p1}." if p1 is not None else ""
+    made = f" (${p0} when the call was made)" if p0 is not None else ""
+    return f"Called {inst} {way} ${lvl}{made}.{got}"
+
+
+
+def record(d, made, briefing, prior):
+    """The scorecard record judged on date d (the call made on date `made`,
+    in `prior`), or None when the day grades nothing."""
+    yc = briefing.get("yesterdays_call") or {}
+    summary = (yc.get("summary") or "").strip()
+    stored = (yc.get("outcome") or "").strip()
+
+    # Bulletproof: recompute the outcome from the structured call + actual
+    # closes (direction AND level). The public record cannot show a miss as a
+    # win even if a bad outcome reached the archive. Falls back to the stored
+    # value only when no structured call exists (legacy entries).
+    outcome = stored
+    _computed_call = _p0v = _p1v = None
+    if grade_calls is not None and prior is not None:
+        computed, _c, _p0, _p1, _n = grade_calls.grade_from_archives(briefing, prior)
+        _computed_call, _p0v, _p1v = _c, _p0, _p1
+        if computed in VALID:
+            if stored and stored != computed:
+                print(f"[scorecard] {d}: stored outcome '{stored}' -> recomputed '{computed}'")
+                # Show the correction on the record rather than silently
+                # overriding — the published note may tell the old story.
+                _lbl = "played out" if computed == "played_out" else "didn't"
+                _regrade = f" [Regraded {_lbl} by the deterministic checker — direction and level scored against the actual closes; the note above is the text as originally published.]"
+                yc["_regrade_note"] = _regrade
+            outcome = computed
+
+    if not summary or outcome not in VALID:
+        return None
+
+    # ── Instrument cross-check ────────────────────────────────────────
+    # `summary` is the LLM's prose about what it THOUGHT it was grading;
+    # `outcome` is recomputed from the PRIOR briefing's structured
+    # todays_call. Nothing used to check those were the same call. During
+    # the Jun 26 - Aug 4 date bug they diverged on 23 of 40 rows, so the
+    # page showed a "played out" badge next to the text of a different,
+    # failed call. When they disagree the prose cannot be trusted to
+    # describe this grade: publish the deterministic call instead, say so,
+    # and keep the original text reachable via the briefing link.
+    method = "self" if _computed_call is None else "deterministic"
+    mismatch = False
+    if _computed_call is not None:
+        inst = (_computed_call.get("instrument") or "").lower()
+        if inst and not _summary_mentions(summary, inst):
+            mismatch = True
+
+    call_text = summary
+    note_text = ((yc.get("note") or "").strip() + (yc.get("_regrade_note") or "")).strip()
+    if mismatch:
+        call_text = _plain_call(_computed_call, _p0v, _p1v, outcome)
+        note_text = (
+            "The write-up published with this grade described a different call, "
+            "a known effect of the grading bug fixed on Aug 4. What is scored here "
+            "is the call actually made in the previous briefing, checked against the "
+            "closes. The original wording is still in that day's briefing."
+        )
+
+    rec = {
+        "made": made,
+        "judged": d,
+        "call": call_text,
+        "outcome": outcome,
+        "method": method,
+        "mismatch": mismatch,
+        "note": note_text,
+    }
+    # v2 (2026-08-10): carry the structured call on the record so the
+    # feedback loop (call_calibration.feedback_block) and the new splits
+    # below don't have to re-parse prose. Also mark which CALL DESIGN
+    # produced it — v1 = uncalibrated levels, v2 = vol-scaled bands —
+    # the same series-split precedent as by_method: never blend eras.
+    if _computed_call is not None:
+        _raw_inst = (_computed_call.get("instrument") or "").lower()
+        # normalize through the grader's own mapping so "soybeans" and
+        # "beans" are one instrument in every split, not two.
+        rec["instrument"] = (grade_calls.locked_key(_raw_inst) if grade_calls else None) or _raw_inst
+        rec["direction"] = (_computed_call.get("direction") or "").lower()
+        rec["level"] = _computed_call.get("level")
+        rec["p0"] = _p0v
+        rec["p1"] = _p1v
+        rec["design"] = (((prior or {}).get("todays_call")) or {}).get("design") or "v1"
+        # direction-only sub-grade: same closes, level ignored. Published
+        # so readers can see whether misses were wrong-way or just
+        # short-of-level — the two failure modes mean different things.
+        if _p0v is not None and _p1v is not None and rec["direction"] in ("up", "down"):
+            rec["direction_ok"] = (_p1v > _p0v) if rec["direction"] == "up" else (_p1v < _p0v)
+    return rec
+
 
-    records = []
+def rules_version():
+    """The grading rules, as the source that applies them: an edit to either
+    file re-grades the archive without anyone remembering to bump a number."""
+    h = hashlib.sha1(Path(__file__).read_bytes())
+    if grade_calls is not None:
+        h.update(Path(grade_calls.__file__).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def load_ledger(path, rules):
+    """{date: {"key", "rec"}} from the ledger, empty if absent or graded
+    under other rules."""
+    try:
+        led = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return led.get("dates", {}) if led.get("rules") == rules else {}
+
+
+def grade(dates, ledger, rules, raw):
+    """-> (ledger for `dates`, dates re-graded). A date whose key matches its
+    ledger entry keeps that entry without its briefing being parsed."""
     loaded = {}
+
     def load(dt):
         if dt not in loaded:
             try:
-                loaded[dt] = json.loads((ARCHIVE / f"{dt}.json").read_text())
+                loaded[dt] = json.loads(raw[dt])
             except Exception as e:
                 print(f"[scorecard] skip {dt}: {e}"); loaded[dt] = None
         return loaded[dt]
 
-    # Words a briefing might use for each instrument, so we can tell whether the
-    # published prose is even about the call we scored.
-    _WORDS = {"corn": ("corn",), "beans": ("bean", "soybean"), "wheat": ("wheat",),
-              "cattle": ("cattle",), "feeders": ("feeder",), "hogs": ("hog",),
-              "crude": ("crude", "oil"), "natgas": ("natural gas", "natgas")}
-
-    def _summary_mentions(summary, instrument):
-        low = summary.lower()
-        return any(w in low for w in _WORDS.get(instrument, (instrument,)))
-
-    def _plain_call(call, p0, p1, outcome):
-        """Reader-facing description built from the structured call itself."""
-        names = {"corn": "corn", "beans": "soybeans", "wheat": "wheat",
-                 "cattle": "cattle", "feeders": "feeder cattle", "hogs": "hogs",
-                 "crude": "crude", "natgas": "natural gas"}
-        inst = names.get((call.get("instrument") or "").lower(), call.get("instrument"))
-        d = (call.get("direction") or "").lower()
-        lvl = call.get("level")
-        way = "up toward" if d == "up" else "down toward"
-        got = f" It closed at ${p1}." if p1 is not None else ""
-        made = f" (${p0} when the call was made)" if p0 is not None else ""
-        return f"Called {inst} {way} ${lvl}{made}.{got}"
-
+    digest = {dt: hashlib.sha1(raw[dt]).hexdigest() for dt in dates}
+    out, regraded = {}, []
     for i, d in enumerate(dates):
-        briefing = load(d)
-        if briefing is None:
-            continue
-        yc = briefing.get("yesterdays_call") or {}
-        summary = (yc.get("summary") or "").strip()
-        stored = (yc.get("outcome") or "").strip()
-
-        # Bulletproof: recompute the outcome from the structured call + actual
-        # closes (direction AND level). The public record cannot show a miss as a
-        # win even if a bad outcome reached the archive. Falls back to the stored
-        # value only when no structured call exists (legacy entries).
-        outcome = stored
-        _computed_call = _p0v = _p1v = None
-        prior = load(dates[i - 1]) if i > 0 else None
-        if grade_calls is not None and prior is not None:
-            computed, _c, _p0, _p1, _n = grade_calls.grade_from_archives(briefing, prior)
-            _computed_call, _p0v, _p1v = _c, _p0, _p1
-            if computed in VALID:
-                if stored and stored != computed:
-                    print(f"[scorecard] {d}: stored outcome '{stored}' -> recomputed '{computed}'")
-                    # Show the correction on the record rather than silently
-                    # overriding — the published note may tell the old story.
-                    _lbl = "played out" if computed == "played_out" else "didn't"
-                    _regrade = f" [Regraded {_lbl} by the deterministic checker — direction and level scored against the actual closes; the note above is the text as originally published.]"
-                    yc["_regrade_note"] = _regrade
-                outcome = computed
-
-        if not summary or outcome not in VALID:
+        made = dates[i - 1] if i > 0 else None
+        key = hashlib.sha1(f"{rules}|{digest[d]}|{digest[made] if made else ''}".encode()).hexdigest()
+        hit = ledger.get(d)
+        if hit and hit.get("key") == key:
+            out[d] = hit
             continue
+        briefing = load(d)
+        rec = record(d, made, briefing, load(made) if made else None) if briefing is not None else None
+        out[d] = {"key": key, "rec": rec}
+        regraded.append(d)
+    return out, regraded
 
-        # ── Instrument cross-check ────────────────────────────────────────
-        # `summary` is the LLM's prose about what it THOUGHT it was grading;
-        # `outcome` is recomputed from the PRIOR briefing's structured
-        # todays_call. Nothing used to check those were the same call. During
-        # the Jun 26 - Aug 4 date bug they diverged on 23 of 40 rows, so the
-        # page showed a "played out" badge next to the text of a different,
-        # failed call. When they disagree the prose cannot be trusted to
-        # describe this grade: publish the deterministic call instead, say so,
-        # and keep the original text reachable via the briefing link.
-        method = "self" if _computed_call is None else "deterministic"
-        mismatch = False
-        if _computed_call is not None:
-            inst = (_computed_call.get("instrument") or "").lower()
-            if inst and not _summary_mentions(summary, inst):
-                mismatch = True
-
-        call_text = summary
-        note_text = ((yc.get("note") or "").strip() + (yc.get("_regrade_note") or "")).strip()
-        if mismatch:
-            call_text = _plain_call(_computed_call, _p0v, _p1v, outcome)
-            note_text = (
-                "The write-up published with this grade described a different call, "
-                "a known effect of the grading bug fixed on Aug 4. What is scored here "
-                "is the call actually made in the previous briefing, checked against the "
-                "closes. The original wording is still in that day's briefing."
-            )
-
-        rec = {
-            "made": dates[i - 1] if i > 0 else None,
-            "judged": d,
-            "call": call_text,
-            "outcome": outcome,
-            "method": method,
-            "mismatch": mismatch,
-            "note": note_text,
-        }
-        # v2 (2026-08-10): carry the structured call on the record so the
-        # feedback loop (call_calibration.feedback_block) and the new splits
-        # below don't have to re-parse prose. Also mark which CALL DESIGN
-        # produced it — v1 = uncalibrated levels, v2 = vol-scaled bands —
-        # the same series-split precedent as by_method: never blend eras.
-        if _computed_call is not None:
-            _raw_inst = (_computed_call.get("instrument") or "").lower()
-            # normalize through the grader's own mapping so "soybeans" and
-            # "beans" are one instrument in every split, not two.
-            rec["instrument"] = (grade_calls.locked_key(_raw_inst) if grade_calls else None) or _raw_inst
-            rec["direction"] = (_computed_call.get("direction") or "").lower()
-            rec["level"] = _computed_call.get("level")
-            rec["p0"] = _p0v
-            rec["p1"] = _p1v
-            rec["design"] = (((prior or {}).get("todays_call")) or {}).get("design") or "v1"
-            # direction-only sub-grade: same closes, level ignored. Published
-            # so readers can see whether misses were wrong-way or just
-            # short-of-level — the two failure modes mean different things.
-            if _p0v is not None and _p1v is not None and rec["direction"] in ("up", "down"):
-                rec["direction_ok"] = (_p1v > _p0v) if rec["direction"] == "up" else (_p1v < _p0v)
-        records.append(rec)
 
+def summarize(records):
+    """scorecard.json from the records, oldest first."""
     played = sum(1 for r in records if r["outcome"] == "played_out")
     missed = sum(1 for r in records if r["outcome"] == "didnt")
     pending = sum(1 for r in records if r["outcome"] == "pending")
@@ -254,7 +305,37 @@ def main():
         "current_streak": streak,
         "records": list(reversed(records)),   # newest first for the page
     }
+    return out
+
+
+def main(full=False):
+    if not ARCHIVE.exists():
+        print("[scorecard] no archive dir"); sys.exit(2)
+    dates = sorted(p.stem for p in ARCHIVE.glob("*.json") if p.stem != "index")
+    if not dates:
+        print("[scorecard] no archive briefings"); sys.exit(2)
+
+    raw = {d: (ARCHIVE / f"{d}.json").read_bytes() for d in dates}
+    rules = rules_version()
+    ledger_path = OUT.with_name(LEDGER_NAME)
+    ledger, regraded = grade(dates, load_ledger(ledger_path, rules), rules, raw)
+    print(f"[scorecard] {len(regraded)} of {len(dates)} dates graded"
+          + (f" ({regraded[0]}..{regraded[-1]})" if regraded else "") + ", the rest from the ledger")
+    status = 0
+    if full:
+        fresh, _ = grade(dates, {}, rules, raw)
+        diff = [d for d in dates if fresh[d]["rec"] != ledger[d]["rec"]]
+        for d in diff:
+            print(f"[scorecard] --full: {d} differs from the incremental record")
+        print(f"[scorecard] --full: {len(diff)} of {len(dates)} dates differ from the incremental build")
+        ledger, status = fresh, (1 if diff else 0)
+    ledger_path.write_text(json.dumps({"rules": rules, "dates": ledger}, indent=1, ensure_ascii=False))
+
+    records = [ledger[d]["rec"] for d in dates if ledger[d]["rec"] is not None]
+    out = summarize(records)
     OUT.write_text(json.dumps(out, indent=1, ensure_ascii=False))
+    by_method, mismatched = out["by_method"], out["mismatched"]
+    played, missed, pending, hit_rate = out["played_out"], out["didnt"], out["pending"], out["hit_rate"]
     d_, s_ = by_method["deterministic"], by_method["self_reported"]
     print(f"[scorecard] method split — deterministic {d_['played']}/{d_['graded']} "
           f"({d_['hit_rate']}%) {d_['first']}..{d_['last']} | self-reported "
@@ -263,8 +344,8 @@ def main():
     print(f"[scorecard] {len(records)} calls — {played} played out, "
           f"{missed} didn't, {pending} pending"
           + (f", hit rate {hit_rate}%" if hit_rate is not None else ""))
-    return 0
+    return status
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(main(full="--full" in sys.argv))
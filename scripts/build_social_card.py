@@ -24,11 +24,34 @@ daily.yml treats it as best-effort (continue-on-error as belt+braces).
 Failure honesty: if the scorecard can't be read, the footer says so rather
 than inventing a record. Same doctrine as everything else here: no number
 appears unless it was measured.
+
+Cached layers + batch mode (2026-10-19): every render used to reload nine
+TrueType faces and redraw the whole 2400x1350 frame, and one invocation made
+one card, so re-styling the 37 dated cards meant 37 interpreter starts.
+_font() is now memoised per (face, size), and _frame() draws what every card
+shares (background, gold rule, footer rule, site mark) once per process;
+render() draws only the day's text on a copy of it. --range renders every
+archived briefing between two dates in a process pool (each worker builds
+its fonts and frame once), with the footer record counted as of that date
+from scorecard.json's records. It writes dated cards only: card-latest.png
+and the homepage og:image stay with the daily run.
+
+  --palette   256-colour PNG (a card has ~1,100 colours, all text
+              antialiasing): ~40 KB instead of ~110 KB, same URL
+  --webp      a lossless card-<date>.webp next to each PNG
+
+  python3 scripts/build_social_card.py [--palette] [--webp]
+  python3 scripts/build_social_card.py --range 2026-07-18 2026-08-22 [--jobs N] [--palette] [--webp]
+  python3 scripts/build_social_card.py --selftest
 """
+import argparse
 import json
 import os
+import shutil
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 
 # ---------------------------------------------------------------- palette
 BG      = (10, 12, 13)      # #0a0c0d
@@ -54,6 +77,7 @@ FONT_DIRS = (
 )
 
 
+@lru_cache(maxsize=None)
 def _font(name, size):
     from PIL import ImageFont
     for d in FONT_DIRS:
@@ -88,11 +112,43 @@ def _tracked(draw, xy, text, font, fill, tracking):
     return x - tracking  # right edge
 
 
-def build(daily_path="data/daily.json", scorecard_path="data/scorecard.json",
-          out_dir="data/social"):
+SITE = "agsist.com · FREE"
+FOOTER_Y = H - 170
+
+
+@lru_cache(maxsize=1)
+def _frame():
+    """The pixels every card shares. Callers draw on a copy, never on this."""
     from PIL import Image, ImageDraw
+    img = Image.new("RGB", (W, H), BG)
+    d = ImageDraw.Draw(img)
+    d.rectangle([0, 0, W, 12], fill=GOLD)                     # gold top rule
+    d.line([0, FOOTER_Y, W, FOOTER_Y], fill=BORDER, width=2)
+    sans_42 = _font("DejaVuSans.ttf", 42)
+    d.text((W - MARGIN - d.textlength(SITE, font=sans_42), FOOTER_Y + 56), SITE,
+           font=sans_42, fill=GOLD)
+    return img
+
+
+def _record(sc, upto=None):
+    """(played, judged) for the footer, from scorecard.json; as of date `upto`
+    (records judged that day or earlier) when given. None if unreadable."""
+    try:
+        if upto is None:
+            played, judged = int(sc["played_out"]), int(sc["played_out"]) + int(sc["didnt"])
+        else:
+            recs = [r for r in sc["records"] if r["judged"] <= upto]
+            played = sum(1 for r in recs if r["outcome"] == "played_out")
+            judged = played + sum(1 for r in recs if r["outcome"] == "didnt")
+        return played, judged
+    except Exception:
+        return None
+
+
+def render(daily, sc, upto=None):
+    """The card for one briefing dict, as a PIL image."""
+    from PIL import ImageDraw
 
-    daily = json.load(open(daily_path, encoding="utf-8"))
     headline = (daily.get("headline") or "").strip() or "AGSIST DAILY BRIEFING"
     one = daily.get("one_number") or {}
     num_val = str(one.get("value", "")).strip()
@@ -103,21 +159,14 @@ def build(daily_path="data/daily.json", scorecard_path="data/scorecard.json",
     # Public record. Absent/broken scorecard -> honest fallback, never invented.
     score_line = "WE GRADE OUR OWN CALLS — DAILY, IN PUBLIC. NO MEMORY-HOLING."
     score_bold = None
-    try:
-        sc = json.load(open(scorecard_path, encoding="utf-8"))
-        judged = int(sc["played_out"]) + int(sc["didnt"])
-        if judged > 0:
-            score_line = "WE GRADE OUR OWN CALLS — "
-            score_bold = "%d of %d" % (int(sc["played_out"]), judged)
-    except Exception:
-        pass
+    rec = _record(sc, upto) if sc is not None else None
+    if rec and rec[1] > 0:
+        score_line = "WE GRADE OUR OWN CALLS — "
+        score_bold = "%d of %d" % rec
 
-    img = Image.new("RGB", (W, H), BG)
+    img = _frame().copy()
     d = ImageDraw.Draw(img)
 
-    # gold top rule
-    d.rectangle([0, 0, W, 12], fill=GOLD)
-
     mono_b_52 = _font("DejaVuSansMono-Bold.ttf", 52)
     mono_40   = _font("DejaVuSansMono.ttf", 40)
     mono_34   = _font("DejaVuSansMono.ttf", 34)
@@ -185,11 +234,9 @@ def build(daily_path="data/daily.json", scorecard_path="data/scorecard.json",
         uy += 58
 
     # ---- footer: flowing mixed-weight text, wrapped clear of the site mark
-    fy = H - 170
-    d.line([0, fy, W, fy], fill=BORDER, width=2)
-
-    site = "agsist.com · FREE"
-    site_w = d.textlength(site, font=sans_42)
+    # (the rule and the mark itself are on the frame)
+    fy = FOOTER_Y
+    site_w = d.textlength(SITE, font=sans_42)
 
     if score_bold:
         segs = [(score_line, sans_38, MUTED), (score_bold, sans_b38, TEXT),
@@ -215,20 +262,66 @@ def build(daily_path="data/daily.json", scorecard_path="data/scorecard.json",
             x, ty, line = MARGIN, ty + 52, 1
         d.text((x, ty), wtext, font=font, fill=color)
         x += wlen + space
+    return img
+
+
+def save(img, path, palette=False, webp=False):
+    """Write the card as PNG (256-colour with palette) and, with webp, a
+    lossless .webp beside it."""
+    from PIL import Image
+    out = img.quantize(256, method=Image.Quantize.FASTOCTREE) if palette else img
+    out.save(path, optimize=True)
+    if webp:
+        img.save(os.path.splitext(path)[0] + ".webp", "WEBP", lossless=True, method=6)
 
-    d.text((W - MARGIN - site_w, fy + 56), site, font=sans_42, fill=GOLD)
+
+def _load_scorecard(path):
+    try:
+        return json.load(open(path, encoding="utf-8"))
+    except Exception:
+        return None
+
+
+def build(daily_path="data/daily.json", scorecard_path="data/scorecard.json",
+          out_dir="data/social", palette=False, webp=False):
+    daily = json.load(open(daily_path, encoding="utf-8"))
+    img = render(daily, _load_scorecard(scorecard_path))
 
     # ---- write outputs
     os.makedirs(out_dir, exist_ok=True)
     stamp = datetime.now(timezone.utc).strftime("%Y-%m-%d")
     dated = os.path.join(out_dir, "card-%s.png" % stamp)
     latest = os.path.join(out_dir, "card-latest.png")
-    img.save(dated, optimize=True)
-    img.save(latest, optimize=True)
+    save(img, dated, palette, webp)
+    shutil.copyfile(dated, latest)
     print("[social-card] wrote %s and card-latest.png (%dx%d)" % (dated, W, H))
     return dated
 
 
+def _range_card(job):
+    date, daily_path, sc, out_dir, palette, webp = job
+    daily = json.load(open(daily_path, encoding="utf-8"))
+    path = os.path.join(out_dir, "card-%s.png" % date)
+    save(render(daily, sc, upto=date), path, palette, webp)
+    return path
+
+
+def build_range(start, end, archive="data/daily-archive", scorecard_path="data/scorecard.json",
+                out_dir="data/social", jobs=None, palette=False, webp=False):
+    """Dated cards for every archived briefing from start to end inclusive.
+    -> the paths written, in date order."""
+    dates = sorted(f[:-5] for f in os.listdir(archive)
+                   if f.endswith(".json") and f[:4].isdigit() and start <= f[:-5] <= end)
+    sc = _load_scorecard(scorecard_path)
+    os.makedirs(out_dir, exist_ok=True)
+    todo = [(d, os.path.join(archive, d + ".json"), sc, out_dir, palette, webp) for d in dates]
+    jobs = min(jobs or os.cpu_count() or 1, len(todo))
+    if jobs <= 1:
+        return [_range_card(t) for t in todo]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_range_card, todo, chunksize=max(1, len(todo) // (jobs * 4))))
+
+
 def update_homepage_og(index_path="index.html", dated_url=None):
     """Point the homepage's share-preview image at today's dated card.
 
@@ -258,9 +351,82 @@ def update_homepage_og(index_path="index.html", dated_url=None):
     return True
 
 
+# ---------------------------------------------------------------- selftest
+def selftest():
+    import tempfile
+    from PIL import Image, ImageChops
+    ok = True
+
+    def chk(cond, msg):
+        nonlocal ok
+        print(("  OK   " if cond else "  FAIL ") + msg)
+        ok = ok and cond
+
+    print("build_social_card selftest")
+    chk(_font("DejaVuSans.ttf", 42) is _font("DejaVuSans.ttf", 42), "fonts load once per face and size")
+    frame = _frame().tobytes()
+    daily = {"headline": "Beans hold, crude runs", "date": "Thursday, August 20, 2026",
+             "one_number": {"value": "$130M", "unit": "supertanker VLCC price, all-time high"},
+             "meta": {"market_mood": "mixed"}}
+    sc = {"played_out": 3, "didnt": 2, "records": [
+        {"judged": "2026-08-21", "outcome": "didnt"}, {"judged": "2026-08-20", "outcome": "played_out"},
+        {"judged": "2026-08-19", "outcome": "pending"}, {"judged": "2026-08-18", "outcome": "played_out"},
+        {"judged": "2026-08-17", "outcome": "didnt"}, {"judged": "2026-08-14", "outcome": "played_out"}]}
+    a = render(daily, sc)
+    chk(_frame().tobytes() == frame, "rendering leaves the shared frame untouched")
+    chk(ImageChops.difference(a, render(daily, sc)).getbbox() is None, "same inputs, same pixels")
+    chk(ImageChops.difference(a, render(dict(daily, headline="Corn breaks"), sc)).getbbox() is not None,
+        "headline reaches the card")
+    chk(_record(sc) == (3, 5) and _record(sc, "2026-08-20") == (3, 4) and _record(sc, "2026-08-01") == (0, 0),
+        "record counted as of a date from the records")
+    chk(_record({"played_out": "x"}) is None, "unreadable scorecard: no record")
+
+    with tempfile.TemporaryDirectory() as td:
+        arch, out = os.path.join(td, "arch"), os.path.join(td, "social")
+        os.makedirs(arch)
+        dates = ["2026-08-%02d" % i for i in range(17, 22)]
+        for i, dt in enumerate(dates):
+            json.dump(dict(daily, headline="Day %d" % i, date=dt), open(os.path.join(arch, dt + ".json"), "w"))
+        open(os.path.join(arch, "index.json"), "w").write("[]")
+        sp = os.path.join(td, "scorecard.json")
+        json.dump(sc, open(sp, "w"))
+        got = build_range("2026-08-18", "2026-08-20", arch, sp, out, jobs=2)
+        chk([os.path.basename(p) for p in got] == ["card-2026-08-%d.png" % i for i in (18, 19, 20)],
+            "range renders the archived dates in [start, end]")
+        one = os.path.join(td, "one.png")
+        save(render(json.load(open(os.path.join(arch, "2026-08-19.json"))), sc, upto="2026-08-19"), one)
+        chk(open(one, "rb").read() == open(got[1], "rb").read(), "pooled card == in-process card")
+        build_range("2026-08-19", "2026-08-19", arch, sp, out, palette=True, webp=True)
+        pal = Image.open(got[1])
+        chk(pal.mode == "P" and os.path.getsize(got[1]) < os.path.getsize(one) * 0.6,
+            "palette PNG (%d vs %d bytes)" % (os.path.getsize(got[1]), os.path.getsize(one)))
+        wp = os.path.join(out, "card-2026-08-19.webp")
+        chk(os.path.exists(wp) and ImageChops.difference(Image.open(wp).convert("RGB"),
+                                                         Image.open(one).convert("RGB")).getbbox() is None,
+            "lossless webp beside the PNG")
+        chk(not os.path.exists(os.path.join(out, "card-latest.png")), "range mode leaves card-latest alone")
+
+    print("SELFTEST OK" if ok else "SELFTEST FAILED")
+    return 0 if ok else 1
+
+
 def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--range", nargs=2, metavar=("START", "END"),
+                    help="render dated cards for the archived briefings START..END (YYYY-MM-DD)")
+    ap.add_argument("--jobs", type=int, default=None, help="worker processes for --range")
+    ap.add_argument("--palette", action="store_true", help="256-colour PNG")
+    ap.add_argument("--webp", action="store_true", help="also write a lossless .webp")
+    ap.add_argument("--selftest", action="store_true")
+    a = ap.parse_args()
+    if a.selftest:
+        return selftest()
+    if a.range:
+        paths = build_range(*a.range, jobs=a.jobs, palette=a.palette, webp=a.webp)
+        print("[social-card] wrote %d dated cards %s..%s" % (len(paths), a.range[0], a.range[1]))
+        return 0
     try:
-        dated = build()
+        dated = build(palette=a.palette, webp=a.webp)
         url = "https://agsist.com/" + dated.replace(os.sep, "/")
         update_homepage_og(dated_url=url)
         return 0
@@ -22,14 +22,25 @@ Honesty rules carried in:
 No naked squiggles: history is a labeled bar table (year + $ printed on
 every bar), not a sparkline.
 
+Pages render through page_render: the nav and the state link cloud are
+built once per run, and a page is written only when its bytes changed (the
+log line says how many were written vs unchanged).
+
 --selftest builds everything to a temp dir and asserts invariants.
 """
 import glob
 import html
 import json
 import os
+import re
 import statistics
 import sys
+from datetime import date
+
+import bake_engine
+import page_render
+import sitemap_model
+import update_sitemap
 
 DATA_DIR = "data/cash-rent"
 OUT_DIR = "rent"
@@ -79,6 +90,12 @@ def slug(name):
     return name.lower().replace(" ", "-")
 
 
+def county_path(st, name):
+    """/rent/county/<state>/<county>, written by build_county_rent_pages.py.
+    Its own tree so /rent/iowa never has to share a name with a directory."""
+    return f"/rent/county/{slug(STATE_NAMES[st])}/" + re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
 def esc(s):
     return html.escape(str(s), quote=True)
 
@@ -211,6 +228,7 @@ def head(title, desc, path, jsonld):
     .rs-t td{{padding:6px 9px;border-bottom:1px solid #14181a;text-align:right;font-family:'JetBrains Mono',monospace;white-space:nowrap;color:#e6ebe9}}
     .rs-t td:first-child{{font-family:Archivo,Inter,sans-serif;color:#e6ebe9}}
     .rs-t tr:hover td{{background:#101415}}
+    .rs-t td a{{color:#e6ebe9;text-decoration:none;border-bottom:1px dotted #2a3133}}
     .rs-t .mut{{color:#5a6467}}
     .rs-bars{{margin:8px 0}}
     .rs-bar{{display:flex;align-items:center;gap:10px;margin:3px 0;font-family:'JetBrains Mono',monospace;font-size:.78rem}}
@@ -280,7 +298,7 @@ def county_table(st, s):
     thead += "<th>YoY</th><th>Corn trend</th>"
     body = []
     for c in sorted(s["counties"], key=lambda c: c["name"]):
-        cells = [f"<td>{esc(c['name'])}</td>"]
+        cells = [f'<td><a href="{county_path(st, c["name"])}">{esc(c["name"])}</a></td>']
         for t, _ in cols:
             r = c["rent"].get(t, {})
             if str(yr) in r:
@@ -335,13 +353,20 @@ def explore_nav():
             + "</nav>")
 
 
-def state_cloud(states, exclude=None):
-    links = [f'<a href="/rent/{slug(STATE_NAMES[st])}">{STATE_NAMES[st]}</a>'
-             for st in sorted(states, key=lambda s: STATE_NAMES[s]) if st != exclude]
-    return '<p class="rs-cloud">' + " &middot; ".join(links) + "</p>"
+EXPLORE_NAV = explore_nav()       # identical on every page: built once
+
 
+def cloud_links(states):
+    """{st: link}, in name order: built once per run, shared by every page."""
+    return {st: f'<a href="/rent/{slug(STATE_NAMES[st])}">{STATE_NAMES[st]}</a>'
+            for st in sorted(states, key=lambda s: STATE_NAMES[s])}
 
-def build_state_page(st, d, s, all_states):
+
+def state_cloud(links, exclude=None):
+    return '<p class="rs-cloud">' + " &middot; ".join(a for st, a in links.items() if st != exclude) + "</p>"
+
+
+def build_state_page(st, d, s, cloud):
     name = STATE_NAMES[st]
     sl = slug(name)
     yr = s["yr"]
@@ -431,7 +456,7 @@ def build_state_page(st, d, s, all_states):
   <aside class="ag-sponsor-ribbon"><span class="ag-sponsor-tag">Sponsor this page</span> Everyone on this page is pricing {name} ground &mdash; one category-exclusive slot. <a href="/sponsor?slot=rent-{st.lower()}&amp;utm_source=rent-{sl}&amp;utm_medium=slot">Put your name here &rarr;</a></aside>
   {hero}
   <h2>Every published county, {yr}</h2>
-  <p class="sub">Click a column to sort. Greyed values are the county&rsquo;s most recent published year where {yr}
+  <p class="sub">Click a column to sort, or a county for its own page. Greyed values are the county&rsquo;s most recent published year where {yr}
   wasn&rsquo;t published.{other_types} Corn trend is the AGSIST least-squares trend yield from NASS county estimates.</p>
   {county_table(st, s)}
   <h2>{name} median county rent by year</h2>
@@ -448,12 +473,12 @@ def build_state_page(st, d, s, all_states):
       " &mdash; termination notice: " + NOTICE[st] if st in NOTICE else ""} &middot;
   check <a href="/basis">local basis vs normal</a> before you commit to a rent that needs a price.</div>
   <h2>Other states</h2>
-  {state_cloud(all_states, exclude=st)}
+  {state_cloud(cloud, exclude=st)}
   <p class="sub" style="font-size:.75rem;margin:18px 0">Source: USDA NASS Quick Stats &mdash; Cash Rents Survey county
   estimates (released each August) and county yield estimates. Page rebuilt automatically from data refreshed
   {esc(d.get('generated', ''))}. AGSIST is free and sells nothing on this page.</p>
 </main>
-{explore_nav()}
+{EXPLORE_NAV}
 <div id="site-footer"></div>
 <script src="/components/loader.js?v=14"></script>
 {SORT_JS}
@@ -535,7 +560,7 @@ def build_hub(states, stats, generated):
   <p class="sub" style="font-size:.75rem;margin:18px 0">Source: USDA NASS Cash Rents Survey county estimates.
   Pages rebuild automatically when NASS publishes (each August). Data refreshed {esc(generated)}.</p>
 </main>
-{explore_nav()}
+{EXPLORE_NAV}
 <div id="site-footer"></div>
 <script src="/components/loader.js?v=14"></script>
 {SORT_JS}
@@ -550,20 +575,31 @@ def build_all(out_dir=OUT_DIR):
     if not data:
         raise SystemExit("FATAL: no state files in data/cash-rent — refusing to build empty pages")
     stats = {st: state_stats(d) for st, d in data.items()}
-    os.makedirs(out_dir, exist_ok=True)
-    urls = [f"{SITE}/rent/"]
-    open(os.path.join(out_dir, "index.html"), "w").write(
-        build_hub(list(data), stats, next(iter(data.values())).get("generated", "")))
-    for st, d in data.items():
-        p = build_state_page(st, d, stats[st], list(data))
-        open(os.path.join(out_dir, f"{slug(STATE_NAMES[st])}.html"), "w").write(p)
-        urls.append(f"{SITE}/rent/{slug(STATE_NAMES[st])}")
+    cloud = cloud_links(data)
+    tasks = [("index.html", build_hub, (list(data), stats, next(iter(data.values())).get("generated", "")))]
+    tasks += [(f"{slug(STATE_NAMES[st])}.html", build_state_page, (st, d, stats[st], cloud))
+              for st, d in data.items()]
+    res = page_render.render(tasks, out_dir)
+    urls = [f"{SITE}/rent/"] + [f"{SITE}/rent/{slug(STATE_NAMES[st])}" for st in data]
     # stderr, NOT stdout: --print-urls pipes stdout into the sitemap step,
     # and this line as line 1 of that file broke the first live run (exit 2).
-    print(f"built {len(data)} state pages + hub -> {out_dir}/", file=sys.stderr)
+    print(f"built {len(data)} state pages + hub -> {out_dir}/ "
+          f"({len(res.written)} written, {len(res.unchanged)} unchanged)", file=sys.stderr)
     return urls, stats
 
 
+@bake_engine.baker("rent", reads=(DATA_DIR + "/*.json",), writes=(OUT_DIR + "/*.html", "sitemap.xml"),
+                   external=True)
+def bake_site(site):
+    urls, _ = build_all()
+    # the same --add the workflow pipes --print-urls into, queued on the Site
+    # so sitemap.xml is still written once
+    today = date.today().isoformat()
+    sitemap_model.edit(site.page(update_sitemap.SITEMAP),
+                       lambda sm: update_sitemap.add_urls(sm, urls, today, [], "yearly", "0.7"))
+    return f"{len(urls) - 1} state pages + hub"
+
+
 def selftest():
     import tempfile
     with tempfile.TemporaryDirectory() as td:
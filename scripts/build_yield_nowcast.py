@@ -41,12 +41,28 @@ Inputs (all repo-local, refreshed by their own workflows):
 Output:
   data/yield-nowcast.json           latest nowcast + backtest + history
 
+BACKTEST ENGINE (2026-10-19):
+  The leave-one-year-out loop re-fitted both regressions per state per held
+  year, re-ran the calibration over every year and state per held year, and
+  found each actual yield by linear search: ~O(years^3 x states) of Python.
+  backtest() now holds the panel as dense state x year arrays with a mask,
+  takes every state's regression sums once, and downdates them by the held
+  year (both stages are OLS, so the LOO fit is closed form from the sums).
+  The calibration for every exclusion comes from one sum and count. Same
+  mae / band80 / skill_pct as the loop to float tolerance (the selftest keeps
+  the loop as its reference), cheap enough to run for every ISO week:
+  skill_surface() does, for fetch_cond_yield's data/cond-yield/skill.json.
+
 Usage: python3 scripts/build_yield_nowcast.py [--selftest] [--force-stale]
 """
 import json
 import sys
 from datetime import datetime, timezone, date
 
+import numpy as np
+
+from trend_fit import linfit
+
 OUT = "data/yield-nowcast.json"
 MIN_STATES = 10
 MIN_YEARS = 12
@@ -69,15 +85,6 @@ CROPS = {
 }
 
 
-def linfit(xs, ys):
-    n = len(xs)
-    mx, my = sum(xs) / n, sum(ys) / n
-    sxx = sum((x - mx) ** 2 for x in xs)
-    sxy = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
-    b = sxy / sxx if sxx else 0.0
-    return my - b * mx, b
-
-
 def state_estimate(pairs, target_year, ge_now):
     """pairs: [(year, ge, yield)] -> model estimate for target_year at ge_now."""
     yrs = [p[0] for p in pairs]
@@ -99,8 +106,14 @@ def load_pairs_panel(crop, cond_week_ending, yrows, arows):
     iso_wk = date.fromisoformat(cond_week_ending).isocalendar()[1]
     if p.get("week") != iso_wk:
         return None
+    return pairs_panel(p["states"], yrows, arows)
+
+
+def pairs_panel(states, yrows, arows):
+    """{st: [[year, ge, yield], ...]} (pairs.json rows) -> panel of the states
+    the NASS mirrors can weight, or None under MIN_STATES."""
     panel = {}
-    for s, rows in p["states"].items():
+    for s, rows in states.items():
         if s not in yrows or s not in arows:
             continue
         pairs = [(int(y), float(g), float(v)) for y, g, v in rows]
@@ -138,13 +151,147 @@ def aggregate(panel, arows, year, per_state_value):
     return (num / den) if den else None
 
 
-def run_crop(crop, cond, fit_states, nass_dir="data/nass"):
+def panel_arrays(panel, arows, years):
+    """Dense state x year arrays for a panel: (ge, yield, mask, acre weight).
+    A state's weight in year y is its planted acres in y, else y-1, else 0,
+    as in aggregate()."""
+    col = {y: j for j, y in enumerate(years)}
+    shape = (len(panel), len(years))
+    ge, val, have = np.zeros(shape), np.zeros(shape), np.zeros(shape, dtype=bool)
+    for i, pairs in enumerate(panel.values()):
+        for y, g, v in pairs:
+            j = col.get(y)
+            if j is not None and not have[i, j]:
+                ge[i, j], val[i, j], have[i, j] = g, v, True
+    w = np.array([[arows[s].get(str(y)) or arows[s].get(str(y - 1)) or 0 for y in years]
+                  for s in panel], dtype=float).reshape(shape)
+    return ge, val, have, w
+
+
+def _ols(n, sx, sy, sxx, sxy):
+    """Intercept and slope from regression sums, elementwise; slope 0 where x
+    has no spread, as in linfit."""
+    cxx = sxx - sx * sx / n
+    cxy = sxy - sx * sy / n
+    b = np.divide(cxy, cxx, out=np.zeros_like(cxx), where=cxx > 1e-9)
+    return (sy - b * sx) / n, b
+
+
+def _wavg(v, w, ok):
+    """Acre-weighted mean down the state axis over ok cells; NaN where no
+    state counts (aggregate()'s None)."""
+    w = np.where(ok & (w != 0), w, 0.0)
+    den = w.sum(axis=0)
+    num = (np.where(w != 0, v, 0.0) * w).sum(axis=0)
+    return np.divide(num, den, out=np.full_like(den, np.nan), where=den != 0)
+
+
+def backtest(panel, arows, us, us_years):
+    """Leave-one-year-out backtest of the two-stage model over us_years.
+
+    Returns {"errors": calibrated national error per held year that produced
+    an estimate, "trend_errs": |error| of the no-ratings trend per held year,
+    "k": the calibration over all us_years}."""
+    years = sorted({p[0] for pairs in panel.values() for p in pairs} | set(us_years))
+    ge, val, have, w = panel_arrays(panel, arows, years)
+    m = have.astype(float)
+    x = np.asarray(years, dtype=float)
+    x = np.broadcast_to(x - x.mean(), ge.shape)         # centring leaves both fits' predictions unchanged
+    g = ge - ge[have].mean()
+
+    hj = [years.index(y) for y in us_years]
+    mh = m[:, hj]
+
+    def train(a):
+        """per-state sum of a over each training set: all pairs minus the held year."""
+        a = a * m
+        return a.sum(axis=1, keepdims=True) - a[:, hj]
+
+    n = train(1.0)
+    sx, sv, sg = train(x), train(val), train(g)
+    sxx, sxv, sgx, sgg, sgv = train(x * x), train(x * val), train(g * x), train(g * g), train(g * val)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ta, tb = _ols(n, sx, sv, sxx, sxv)
+        # stage 2 regresses dev = yield - trend on G+E: its sums follow from the above
+        sd = sv - ta * n - tb * sx
+        sgd = sgv - ta * sg - tb * sgx
+        da, db = _ols(n, sg, sd, sgg, sgd)
+        est = ta + tb * x[:, hj] + da + db * g[:, hj]
+    ok = have[:, hj] & (n >= MIN_YEARS - 2)
+    agg = _wavg(est, w[:, hj], ok)
+
+    # ratio calibration: k_y = US_y / panel_y, averaged with the held year left out
+    actual = _wavg(val[:, hj], w[:, hj], have[:, hj])
+    usv = np.array([us[y] for y in us_years], dtype=float)
+    kin = np.isfinite(actual)
+    k = np.where(kin, usv / np.where(kin, actual, 1.0), 0.0)
+    cal = (k.sum() - k) / (kin.sum() - kin)
+
+    # trend-only baseline: national yield on year, same held years
+    ux = np.asarray(us_years, dtype=float) - np.mean(us_years)
+    un = len(us_years) - 1.0
+    ua, ub = _ols(un, ux.sum() - ux, usv.sum() - usv, (ux * ux).sum() - ux * ux, (ux * usv).sum() - ux * usv)
+    done = np.isfinite(agg)
+    return {
+        "errors": (agg * cal - usv)[done],
+        "trend_errs": np.abs(ua + ub * ux - usv),
+        "k": k.sum() / kin.sum(),
+    }
+
+
+def skill(bt):
+    """Backtest -> mae, band80, trend_mae, skill_pct (unrounded), years."""
+    abs_err = sorted(abs(float(e)) for e in bt["errors"])
+    mae = sum(abs_err) / len(abs_err)
+    trend_mae = float(bt["trend_errs"].mean())
+    return {
+        "mae": mae,
+        "band80": abs_err[max(0, int(0.8 * len(abs_err)) - 1)],
+        "trend_mae": trend_mae,
+        "skill_pct": 100 * (1 - mae / trend_mae),
+        "years": len(abs_err),
+    }
+
+
+def skill_surface(week_states, yrows, arows, us, this_year=None):
+    """Backtest skill at every ISO week the pairs cover.
+
+    week_states: {iso_week: {st: [[year, ge, yield], ...]}}, one pairs.json
+    'states' block per week. Weeks too thin to pass run_crop's gates are
+    left out. -> {"wk": {mae, band80, trend_mae, skill_pct, years, states}}"""
+    this_year = this_year or date.today().year
+    out = {}
+    for wk in sorted(week_states):
+        panel = pairs_panel(week_states[wk], yrows, arows)
+        if panel is None:
+            continue
+        panel_years = {p[0] for pairs in panel.values() for p in pairs}
+        us_years = sorted(y for y in us if y in panel_years and y < this_year)
+        if len(us_years) < MIN_YEARS:
+            continue
+        bt = backtest(panel, arows, us, us_years)
+        if len(bt["errors"]) < MIN_YEARS - 2:
+            continue
+        sk = skill(bt)
+        out[str(wk)] = {"mae": round(sk["mae"], 1), "band80": round(sk["band80"], 1),
+                        "trend_mae": round(sk["trend_mae"], 1), "skill_pct": round(sk["skill_pct"]),
+                        "years": sk["years"], "states": len(panel)}
+    return out
+
+
+def load_nass(crop, nass_dir="data/nass"):
+    """(state yields, state planted acres, US yields) from the NASS mirrors."""
     yield_f, acres_f, us_f = CROPS[crop]
     yrows = {ST_ABBR.get(r["state"]): r["values"]
              for r in json.load(open(f"{nass_dir}/{yield_f}"))["rows"] if r["state"] in ST_ABBR}
     arows = {ST_ABBR.get(r["state"]): r["values"]
              for r in json.load(open(f"{nass_dir}/{acres_f}"))["rows"] if r["state"] in ST_ABBR}
     us = {int(k): v for k, v in json.load(open(f"{nass_dir}/{us_f}"))["values"].items()}
+    return yrows, arows, us
+
+
+def run_crop(crop, cond, fit_states, nass_dir="data/nass"):
+    yrows, arows, us = load_nass(crop, nass_dir)
 
     panel = load_pairs_panel(crop, cond["week_ending"], yrows, arows)
     history_source = "pairs-2000" if panel else "nass-local-2010"
@@ -157,44 +304,12 @@ def run_crop(crop, cond, fit_states, nass_dir="data/nass"):
     if len(us_years) < MIN_YEARS:
         raise SystemExit(f"FATAL {crop}: only {len(us_years)} backtest years (need {MIN_YEARS})")
 
-    def calibration(exclude=None):
-        ks = []
-        for y in us_years:
-            if y == exclude:
-                continue
-            actual = {s: next((p[2] for p in pairs if p[0] == y), None) for s, pairs in panel.items()}
-            agg = aggregate(panel, arows, y, actual)
-            if agg:
-                ks.append(us[y] / agg)
-        return sum(ks) / len(ks)
-
-    # ── leave-one-year-out backtest at this week ──
-    errors = []
-    for hold in us_years:
-        est = {}
-        for s, pairs in panel.items():
-            train = [p for p in pairs if p[0] != hold]
-            cur = [p for p in pairs if p[0] == hold]
-            if not cur or len(train) < MIN_YEARS - 2:
-                continue
-            est[s] = state_estimate(train, hold, cur[0][1])
-        agg = aggregate(panel, arows, hold, est)
-        if agg is None:
-            continue
-        errors.append(agg * calibration(exclude=hold) - us[hold])
-    if len(errors) < MIN_YEARS - 2:
-        raise SystemExit(f"FATAL {crop}: backtest produced only {len(errors)} years")
-    abs_err = sorted(abs(e) for e in errors)
-    mae = sum(abs_err) / len(abs_err)
-    band80 = abs_err[max(0, int(0.8 * len(abs_err)) - 1)]
-
-    # trend-only baseline (no ratings): what "nobody knows in July" implies
-    trend_errs = []
-    for hold in us_years:
-        yrs = [y for y in us_years if y != hold]
-        a, b = linfit(yrs, [us[y] for y in yrs])
-        trend_errs.append(abs(a + b * hold - us[hold]))
-    trend_mae = sum(trend_errs) / len(trend_errs)
+    # ── leave-one-year-out backtest at this week, and the trend-only
+    #    baseline (no ratings): what "nobody knows in July" implies ──
+    bt = backtest(panel, arows, us, us_years)
+    if len(bt["errors"]) < MIN_YEARS - 2:
+        raise SystemExit(f"FATAL {crop}: backtest produced only {len(bt['errors'])} years")
+    sk = skill(bt)
 
     # ── this year's nowcast ──
     this_year = date.today().year
@@ -206,7 +321,7 @@ def run_crop(crop, cond, fit_states, nass_dir="data/nass"):
         est_now[s] = state_estimate(pairs, this_year, float(ge_now))
     if len(est_now) < MIN_STATES:
         raise SystemExit(f"FATAL {crop}: only {len(est_now)} states have a current rating")
-    nowcast = aggregate(panel, arows, this_year, est_now) * calibration()
+    nowcast = aggregate(panel, arows, this_year, est_now) * bt["k"]
 
     a, b = linfit(us_years, [us[y] for y in us_years])
     trend = a + b * this_year
@@ -214,14 +329,14 @@ def run_crop(crop, cond, fit_states, nass_dir="data/nass"):
     return {
         "history_source": history_source,
         "week_ending": cond["week_ending"],
-        "nowcast": round(nowcast, 1),
-        "band80": round(band80, 1),
-        "mae": round(mae, 1),
+        "nowcast": round(float(nowcast), 1),
+        "band80": round(sk["band80"], 1),
+        "mae": round(sk["mae"], 1),
         "trend": round(trend, 1),
-        "trend_mae": round(trend_mae, 1),
-        "skill_pct": round(100 * (1 - mae / trend_mae)),
+        "trend_mae": round(sk["trend_mae"], 1),
+        "skill_pct": round(sk["skill_pct"]),
         "states": len(est_now),
-        "backtest_years": len(errors),
+        "backtest_years": sk["years"],
         "unit": "bu/acre",
     }
 
@@ -266,6 +381,40 @@ def main(force_stale=False):
     print(f"wrote {OUT}")
 
 
+def _loo_reference(panel, arows, us, us_years):
+    """The pre-engine backtest loop, kept as backtest()'s reference."""
+    def calibration(exclude=None):
+        ks = []
+        for y in us_years:
+            if y == exclude:
+                continue
+            actual = {s: next((p[2] for p in pairs if p[0] == y), None) for s, pairs in panel.items()}
+            agg = aggregate(panel, arows, y, actual)
+            if agg:
+                ks.append(us[y] / agg)
+        return sum(ks) / len(ks)
+
+    errors = []
+    for hold in us_years:
+        est = {}
+        for s, pairs in panel.items():
+            train = [p for p in pairs if p[0] != hold]
+            cur = [p for p in pairs if p[0] == hold]
+            if not cur or len(train) < MIN_YEARS - 2:
+                continue
+            est[s] = state_estimate(train, hold, cur[0][1])
+        agg = aggregate(panel, arows, hold, est)
+        if agg is None:
+            continue
+        errors.append(agg * calibration(exclude=hold) - us[hold])
+    trend_errs = []
+    for hold in us_years:
+        yrs = [y for y in us_years if y != hold]
+        a, b = linfit(yrs, [us[y] for y in yrs])
+        trend_errs.append(abs(a + b * hold - us[hold]))
+    return {"errors": errors, "trend_errs": trend_errs, "k": calibration()}
+
+
 def _selftest():
     """Synthetic panel with a PLANTED signal: yield dev = 0.5*(GE-70) + noise.
     The model must recover the signal (LOO MAE well under trend-only MAE) and
@@ -328,8 +477,39 @@ def _selftest():
     chk(sum(e2) / len(e2) < 1.6 * (sum(t2) / len(t2)),
         "no-signal panel shows no runaway fake skill (LOO stays near trend baseline)")
 
+    # vectorised engine vs the reference loop, on a ragged panel: gaps, a
+    # state too thin to train without its held year, missing and prior-year
+    # acres, a year with no US figure, and a held year no state reported
+    ragged = {s: [p for p in pairs if rnd.random() > 0.15] for s, pairs in panel.items()}
+    ragged["S1"] = ragged["S1"][:MIN_YEARS - 2]
+    ragged["S2"] = [p for p in ragged["S2"] if p[0] != 2015] + [(2015, 60.0, 170.0)]
+    acres = {s: {str(y): rnd.choice([0, None, 80.0 + rnd.random() * 900]) for y in years + [2026]}
+             for s in states}
+    us_r = {y: v * 1.07 for y, v in us_actual.items() if y != 2012}
+    uyrs = [y for y in years if y in us_r]
+    for s in ragged:
+        ragged[s] = [p for p in ragged[s] if p[0] != 2020]
+    want, got = _loo_reference(ragged, acres, us_r, uyrs), backtest(ragged, acres, us_r, uyrs)
+    chk(len(got["errors"]) == len(want["errors"]) == len(uyrs) - 1, "held year with no estimate skipped")
+    chk(np.allclose(got["errors"], want["errors"], rtol=0, atol=1e-8)
+        and np.allclose(got["trend_errs"], want["trend_errs"], rtol=0, atol=1e-8)
+        and abs(got["k"] - want["k"]) < 1e-12,
+        "backtest() matches the per-year loop "
+        f"(max err diff {np.max(np.abs(got['errors'] - np.array(want['errors']))):.1e})")
+
+    # skill surface: one backtest per week, thin weeks dropped
+    rows = {s: [list(p) for p in pairs] for s, pairs in panel.items()}
+    surf = skill_surface({30: rows, 24: {s: [list(p) for p in ps] for s, ps in panel2.items()},
+                          23: dict(list(rows.items())[:MIN_STATES - 1])},
+                         {s: {} for s in states}, arows, us_actual, this_year=2026)
+    direct = skill(backtest(panel, arows, us_actual, years))
+    chk(sorted(surf) == ["24", "30"], f"weeks under MIN_STATES left out ({sorted(surf)})")
+    chk(surf["30"]["mae"] == round(direct["mae"], 1) and surf["30"]["years"] == len(years)
+        and surf["30"]["states"] == len(states), "surface week equals a direct backtest")
+    chk(surf["30"]["skill_pct"] > surf["24"]["skill_pct"] + 30,
+        f"signal week shows skill, noise week does not ({surf['30']['skill_pct']}% vs {surf['24']['skill_pct']}%)")
+
     # thin panel refusal
-    thin = {"S0": panel["S0"][:6]}
     chk(len(build_panel({"S0": {"hist": []}}, {}, {}, ["S0"])) == 0, "thin/absent states are dropped, not fitted")
 
     # linfit sanity
@@ -74,20 +74,37 @@ NOT VERIFIED -- see the note by PRODUCT_RULE before trusting these
   business day is the widely quoted rule). MONTH_END is the conservative choice
   -- it holds too long rather than rolling early -- but it is a placeholder.
 
+MEMOISED (2026-10-19)
+  Every is_expired / expiry_date / recent_expiry / front_key call used to
+  re-parse its key and re-derive the calendar rule (month lengths, last
+  Thursdays), per key, per call, across ~110 feed keys and several passes a
+  run. A key's expiry cannot change within a process, so the first lookup
+  stores it: _expiry(key) parses once and caches the UTC datetime it dies
+  (or None), and every query after that is a dict hit and a date compare.
+  PRODUCT_RULE is read at that first lookup; it is a constant, not a knob.
+
+  live_keys(keys, dates) answers "which of these keys are live on each of
+  these dates" for backtests in one pass: keys sorted by expiry once, then a
+  bisect per date, so a season of dates costs a sort, not dates x keys rule
+  evaluations.
+
 USAGE
     from contract_calendar import is_expired, front_key
     if is_expired("corn-jul26"): ...
     k = front_key(["corn-jul26", "corn-sep26"])   # -> "corn-sep26" on Jul 15+
+    live = live_keys(keys, season_dates)          # {date: (live keys, nearest expiry first)}
 
   Run `python scripts/contract_calendar.py` to execute the selftest.
 """
 
 import calendar
+from bisect import bisect_right
 from datetime import datetime, timezone, date, timedelta
+from functools import lru_cache
 
 __all__ = ["is_expired", "front_key", "month_num", "EXPIRY_DAY",
            "expiry_date", "recent_expiry", "ROLL_WINDOW_DAYS",
-           "PRODUCT_RULE", "rule_for", "dead_from"]
+           "PRODUCT_RULE", "rule_for", "dead_from", "live_keys"]
 
 # How long after a dated contract dies we consider the continuous front-month
 # to be "in the roll window". Yahoo's continuous series (ZC=F etc.) switches
@@ -194,29 +211,39 @@ def _parse(key):
     return 2000 + int(yr2), mon
 
 
+@lru_cache(maxsize=4096)
+def _expiry(key):
+    """expiry_date() for a key as a string, computed once per key."""
+    p = _parse(key)
+    if p is None:
+        return None
+    d = dead_from(p[0], p[1], rule_for(key))
+    return datetime(d.year, d.month, d.day, tzinfo=timezone.utc)
+
+
+def _day(when):
+    """A date from a date or datetime."""
+    return when.date() if isinstance(when, datetime) else when
+
+
 def is_expired(key, now=None):
     """True if this dated contract key is past its last trading day.
 
     Undated keys ('corn', 'corn-dec', 'beans-nov', 'cattle') are NEVER expired:
     they are continuous series or rolling benchmark aliases, not a fixed month.
     """
-    p = _parse(key)
-    if p is None:
+    exp = _expiry(str(key))
+    if exp is None:
         return False
-    yr, mon = p
     now = now or datetime.now(timezone.utc)
-    return now.date() >= dead_from(yr, mon, rule_for(key))
+    return now.date() >= exp.date()
 
 
 def expiry_date(key):
     """The UTC datetime this dated key dies -- the first moment it is treated as
     expired, which depends on the product's calendar (see PRODUCT_RULE).
     None for undated keys."""
-    p = _parse(key)
-    if p is None:
-        return None
-    d = dead_from(p[0], p[1], rule_for(key))
-    return datetime(d.year, d.month, d.day, tzinfo=timezone.utc)
+    return _expiry(str(key))
 
 
 def recent_expiry(key, now=None, window_days=ROLL_WINDOW_DAYS):
@@ -246,6 +273,22 @@ def front_key(keys, now=None):
     return None
 
 
+def live_keys(keys, dates):
+    """{date: tuple of the keys not expired on it} for every date in `dates`
+    (dates or datetimes; the dict is keyed by what was passed). Dated keys
+    come nearest expiry first, ties in the order given, then undated keys,
+    which are always live. Same rule as is_expired, one sort for all dates."""
+    dated, undated = [], []
+    for i, k in enumerate(keys):
+        exp = _expiry(str(k))
+        (undated if exp is None else dated).append((exp.date() if exp else None, i, k))
+    dated.sort()
+    dies = [d for d, _, _ in dated]
+    tail = tuple(k for _, _, k in undated)
+    order = tuple(k for _, _, k in dated)
+    return {when: order[bisect_right(dies, _day(when)):] + tail for when in dates}
+
+
 def _selftest():
     ok = True
 
@@ -342,6 +385,21 @@ def _selftest():
     for k in ("", "corn-", "corn-xyz26", "corn-jul2", "corn-jul266", 12345):
         chk(is_expired(k, T(2026, 7, 15)) is False, f"unparseable key {k!r} -> not expired (no crash)")
 
+    # --- memoised lookups and the many-dates query ---------------------------
+    chk(expiry_date("cattle-aug26") is expiry_date("cattle-aug26"), "expiry computed once per key")
+    keys = [f"{p}-{mo}{yy}" for p in ("corn", "cattle", "feeders", "hogs") for mo in _MONTH for yy in (26, 27)]
+    keys += ["corn", "corn-dec", "junk-"]
+    dates = [date(2026, 1, 1) + timedelta(days=i) for i in range(0, 730, 3)]
+    live = live_keys(keys, dates)
+    same = all(set(live[d]) == {k for k in keys if not is_expired(k, T(d.year, d.month, d.day))} for d in dates)
+    chk(same, f"live_keys agrees with is_expired on {len(dates)} dates x {len(keys)} keys")
+    lj = live[date(2026, 7, 15)]
+    chk(lj[:4] == ("feeders-jul26", "cattle-jul26", "hogs-jul26", "corn-aug26"),
+        f"nearest expiry first on Jul 15, ties in key order ({lj[:4]})")
+    chk(lj[-3:] == ("corn", "corn-dec", "junk-"), "undated keys last, in the order given")
+    chk(live_keys(["corn-jul26"], [T(2026, 7, 14), T(2026, 7, 15)]) ==
+        {T(2026, 7, 14): ("corn-jul26",), T(2026, 7, 15): ()}, "datetimes accepted, same boundary")
+
     # --- the divergence that caused the outage cannot recur -----------------
     def old_generate_rule(key, now):
         p = _parse(key)
@@ -17,6 +17,11 @@ re-saved + re-archived.
 This is the quality gate that keeps the rules from drifting after
 the first three weeks. Without it, the editorial spine softens.
 
+Prompt caching (2026-10-19): CRITIC_SYSTEM goes out as a cache_control
+block, so every pass after the first reads it from cache. Per-request
+tokens, cache reads and retry attempts land in meta.api_usage.critic,
+next to the generator's (scripts/test_prompt_cache.py).
+
 v1.2 changes (2026-05-08): added 4 new rules covering the failure modes
 that surfaced during the week of 2026-05-04:
   - Rule 14: Math/level coherence (Monday's $253-vs-$252 contradiction)
@@ -61,15 +66,20 @@ MODEL = "claude-sonnet-4-6"  # match generator; -20250514 now 404s
 sys.path.insert(0, str(REPO_ROOT / "scripts"))
 
 
-def http_post_json(url, payload, headers, timeout=60):
+BACKOFF_SECONDS = [4, 12, 30]
+
+
+def http_post_json(url, payload, headers, timeout=60, stats=None):
     """v1.1 (Phase 2 C5): retry with exponential backoff on transient
     failures. 429 (rate-limited) and 5xx are retryable. 4xx errors are
-    surfaced immediately (auth/format issues won't fix themselves)."""
+    surfaced immediately (auth/format issues won't fix themselves).
+    If a stats dict is passed, its "attempts" is set to the HTTP requests made."""
     import time as _time
     MAX_RETRIES = 3
-    BACKOFF_SECONDS = [4, 12, 30]
     last_err = None
     for attempt in range(MAX_RETRIES):
+        if stats is not None:
+            stats["attempts"] = attempt + 1
         try:
             if requests:
                 r = requests.post(url, json=payload, headers=headers, timeout=timeout)
@@ -259,7 +269,7 @@ def critique_briefing(briefing, threshold=7):
         "weekly_thread": briefing.get("weekly_thread", {}),
         "the_more_you_know": briefing.get("the_more_you_know", {}),
         "watch_list": briefing.get("watch_list", []),
-        "meta": briefing.get("meta", {}),
+        "meta": {k: v for k, v in (briefing.get("meta") or {}).items() if k != "api_usage"},
         "market_closed": briefing.get("market_closed", False),
         "surprise_count": briefing.get("surprise_count", 0),
         "locked_prices": briefing.get("locked_prices", {}),
@@ -277,7 +287,8 @@ Respond with ONLY the JSON output. No preamble, no markdown."""
     payload = {
         "model": MODEL,
         "max_tokens": 4000,
-        "system": CRITIC_SYSTEM,
+        # CRITIC_SYSTEM never changes between passes or days: cache it
+        "system": [{"type": "text", "text": CRITIC_SYSTEM, "cache_control": {"type": "ephemeral"}}],
         "messages": [{"role": "user", "content": user_message}],
     }
     headers = {
@@ -286,7 +297,15 @@ Respond with ONLY the JSON output. No preamble, no markdown."""
         "anthropic-version": "2023-06-01",
     }
 
-    result = http_post_json(ANTHROPIC_API, payload, headers, timeout=90)
+    import time as _time
+    stats = {}
+    t0 = _time.monotonic()
+    try:
+        result = http_post_json(ANTHROPIC_API, payload, headers, timeout=90, stats=stats)
+    except Exception:
+        critique_briefing.usage.append(usage_record({}, stats.get("attempts", 0), False, t0))
+        raise
+    critique_briefing.usage.append(usage_record(result.get("usage") or {}, stats["attempts"], True, t0))
     text = ""
     for block in result.get("content", []):
         if block.get("type") == "text":
@@ -302,6 +321,25 @@ Respond with ONLY the JSON output. No preamble, no markdown."""
     return json.loads(text)
 
 
+# One entry per critic request, persisted as briefing.meta.api_usage.critic.
+critique_briefing.usage = []
+
+
+def usage_record(usage, attempts, ok, t0):
+    """Token counts and retry accounting for one critic request, in the same
+    shape generate_daily writes to meta.api_usage.generate."""
+    import time as _time
+    rec = {"ok": ok, "attempts": attempts}
+    for k in ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "output_tokens"):
+        rec[k] = int(usage.get(k) or 0)
+    rec["ttft_ms"] = None            # not streamed: the whole answer arrives at once
+    rec["total_ms"] = round((_time.monotonic() - t0) * 1000)
+    print(f"  [usage] in {rec['input_tokens']} + cache-read {rec['cache_read_input_tokens']}"
+          f" + cache-write {rec['cache_creation_input_tokens']}, out {rec['output_tokens']};"
+          f" {attempts} attempt(s), total {rec['total_ms']} ms")
+    return rec
+
+
 def apply_rewrite(briefing, critique):
     """Apply rewritten_content to the briefing. Returns (modified_briefing, applied_target)."""
     target = critique.get("weakest_target", "")
@@ -444,6 +482,7 @@ def main():
         "rewrites_applied": rewrite_log,
         "dry_run": args.dry_run,
     }
+    briefing.setdefault("meta", {}).setdefault("api_usage", {})["critic"] = critique_briefing.usage
 
     # Save back, re-archive if anything was rewritten
     with open(DAILY_PATH, "w") as f:
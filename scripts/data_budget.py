@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+data_budget.py — a gzip size budget for the JSON the site serves out of
+data/.
+
+WHY THIS FILE EXISTS
+  The map and the tools fetch data/*.json straight off GitHub Pages: the
+  hail events files are 300-550 KB each, plus recent.json, the NCEI tiles,
+  the MESH swaths, cash-rent, tenure. fetch_hail.events_year reasons about
+  "~90 KB over the wire", but nothing measured the wire, and nothing would
+  have noticed a year file doubling. This is the measurement, and the
+  tripwire.
+
+WHAT IT DOES
+  Every data/**/*.json of at least MIN_BYTES is gzipped in memory (-9, the
+  worst case for what Pages sends, since Pages compresses on the fly) and
+  the size checked against BUDGETS. It writes nothing: there are no
+  precompressed sidecars, because Pages deploys straight from the branch,
+  does not negotiate them, and no worker routes /data/ (sw.js leaves it
+  network-only).
+
+BUDGETS
+  BUDGETS maps a glob to the most gzip bytes that file may put on the wire;
+  the first match wins. A file over budget is listed and the run exits 1,
+  so the workflow can commit the data and still go red.
+
+    python3 scripts/data_budget.py
+    python3 scripts/data_budget.py --selftest
+"""
+import argparse
+import fnmatch
+import gzip
+import os
+import sys
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+DATA = "data"
+MIN_BYTES = 32 * 1024
+KB = 1024
+# fetchers' own state, never fetched by a page: no budget
+SKIP = ("data/transport/store/*", "data/feed-items.json")
+
+# first match wins; gzip bytes over the wire
+BUDGETS = [
+    ("data/hail/events-*.json", 150 * KB),     # point lookup, ~90 KB a year today
+    ("data/hail/[0-9][0-9][0-9][0-9].json", 120 * KB),
+    ("data/hail/recent.json", 48 * KB),
+    ("data/hail/mesh/*.json", 64 * KB),        # one swath day
+    ("data/hail/ncei/tiles/*.json", 32 * KB),
+    ("data/cash-rent/*.json", 64 * KB),
+    ("data/afida/county.json", 256 * KB),
+    ("data/tenure/tenure.json", 256 * KB),
+    ("*", 128 * KB),
+]
+
+
+def budget(rel):
+    return next(b for pat, b in BUDGETS if fnmatch.fnmatch(rel, pat))
+
+
+def data_files(root):
+    """rel path of every data/**/*.json at or over MIN_BYTES, SKIP excluded."""
+    out = []
+    for dirpath, dirnames, filenames in os.walk(root / DATA):
+        dirnames.sort()
+        for f in sorted(filenames):
+            if not f.endswith(".json"):
+                continue
+            p = Path(dirpath) / f
+            rel = p.relative_to(root).as_posix()
+            if (p.stat().st_size >= MIN_BYTES
+                    and not any(fnmatch.fnmatch(rel, pat) for pat in SKIP)):
+                out.append(rel)
+    return out
+
+
+def gz(raw):
+    return gzip.compress(raw, compresslevel=9, mtime=0)
+
+
+def measure(root=REPO):
+    """-> {rel: {"raw": bytes, "gz": gzip bytes}}"""
+    files = {}
+    for rel in data_files(root):
+        raw = (root / rel).read_bytes()
+        files[rel] = {"raw": len(raw), "gz": len(gz(raw))}
+    return files
+
+
+def over_budget(files):
+    return [(rel, e["gz"], budget(rel)) for rel, e in sorted(files.items()) if e["gz"] > budget(rel)]
+
+
+def report(files, secs):
+    raw = sum(e["raw"] for e in files.values())
+    gzb = sum(e["gz"] for e in files.values())
+    print(f"data budget: {len(files)} files >= {MIN_BYTES // KB} KB measured, "
+          f"raw {raw / KB / KB:.1f} MB -> gzip {gzb / KB / KB:.1f} MB ({secs:.1f}s)")
+    for rel, e in sorted(files.items(), key=lambda kv: -kv[1]["gz"])[:5]:
+        print(f"  {rel:42s} {e['raw'] // KB:5d} KB raw  {e['gz'] // KB:4d} KB gz"
+              f"  (budget {budget(rel) // KB} KB)")
+
+
+# ---------------------------------------------------------------- selftest
+def selftest():
+    import json
+    import random
+    import tempfile
+    ok = True
+
+    def chk(cond, msg):
+        nonlocal ok
+        print(("  OK   " if cond else "  FAIL ") + msg)
+        ok = ok and cond
+
+    print("data_budget selftest")
+    rnd = random.Random(7)
+    with tempfile.TemporaryDirectory() as td:
+        root = Path(td)
+        (root / "data/hail").mkdir(parents=True)
+        (root / "data/transport/store").mkdir(parents=True)
+        big = json.dumps({"ev": [[round(rnd.uniform(25, 49), 2), round(rnd.uniform(-125, -67), 2),
+                                  rnd.choice([None, .75, 1.0, 1.75]), "06-11", "IA"] for _ in range(4000)]})
+        (root / "data/hail/events-2026.json").write_text(big)
+        (root / "data/small.json").write_text('{"a": 1}')
+        (root / "data/prices.json").write_text(json.dumps({"p": list(range(20000))}))
+        (root / "data/transport/store/grain_basis.json").write_text(big)
+
+        files = measure(root)
+        ev = root / "data/hail/events-2026.json"
+        chk(sorted(files) == ["data/hail/events-2026.json", "data/prices.json"],
+            "only files over MIN_BYTES, fetcher state skipped")
+        chk(files["data/hail/events-2026.json"] == {"raw": len(big), "gz": len(gz(ev.read_bytes()))},
+            "raw and gzip sizes recorded")
+        chk(sorted(os.listdir(root / "data")) == ["hail", "prices.json", "small.json", "transport"],
+            "writes nothing")
+
+        chk(not over_budget(files), "nothing over budget")
+        global BUDGETS
+        saved, BUDGETS = BUDGETS, [("data/hail/events-*.json", 10 * KB)] + BUDGETS
+        try:
+            over = over_budget(measure(root))
+            chk([r for r, _, _ in over] == ["data/hail/events-2026.json"], "a tight budget is reported")
+        finally:
+            BUDGETS = saved
+
+    print("SELFTEST OK" if ok else "SELFTEST FAILED")
+    return 0 if ok else 1
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--selftest", action="store_true")
+    a = ap.parse_args()
+    if a.selftest:
+        return selftest()
+    t0 = time.perf_counter()
+    files = measure()
+    report(files, time.perf_counter() - t0)
+    over = over_budget(files)
+    for rel, size, cap in over:
+        print(f"::error::{rel} is {size / KB:.0f} KB gzipped, over its {cap // KB} KB budget")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
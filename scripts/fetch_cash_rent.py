@@ -40,6 +40,10 @@ import urllib.parse
 import urllib.request
 from datetime import datetime, timezone
 
+import numpy as np
+
+import trend_fit
+
 API = "https://quickstats.nass.usda.gov/api/api_GET/"
 OUTDIR = "data/cash-rent"
 FIRST_YEAR = 2008
@@ -114,26 +118,26 @@ def fips(rec):
 def fit_trend(pairs):
     """Ordinary least squares yield ~ year.
 
-    Returns (slope, intercept, r2, n) or None. Pure python: no numpy needed in
-    the workflow, and the math is auditable by anyone reading this file.
+    Returns (slope, intercept, r2, n) or None.
     """
-    pairs = sorted(pairs)
-    n = len(pairs)
-    if n < MIN_TREND_N:
-        return None
-    xs = [p[0] for p in pairs]
-    ys = [p[1] for p in pairs]
-    mx, my = sum(xs) / n, sum(ys) / n
-    sxx = sum((x - mx) ** 2 for x in xs)
-    if sxx == 0:
-        return None
-    sxy = sum((xs[i] - mx) * (ys[i] - my) for i in range(n))
-    slope = sxy / sxx
-    intercept = my - slope * mx
-    sst = sum((y - my) ** 2 for y in ys)
-    ssr = sum((ys[i] - (slope * xs[i] + intercept)) ** 2 for i in range(n))
-    r2 = 1.0 - (ssr / sst) if sst > 0 else 0.0
-    return slope, intercept, r2, n
+    return fit_trends({0: pairs})[0]
+
+
+def fit_trends(series):
+    """fit_trend for many series in one batched fit (trend_fit): {key: pairs}
+    -> {key: (slope, intercept, r2, n) or None}. Each series is a row, padded
+    with NaN, so a state's counties cost one call, not one loop each."""
+    keys = list(series)
+    width = max((len(p) for p in series.values()), default=0)
+    xs = np.full((len(keys), width), np.nan)
+    ys = np.full((len(keys), width), np.nan)
+    for i, k in enumerate(keys):
+        for j, (x, y) in enumerate(series[k]):
+            xs[i, j], ys[i, j] = x, y
+    f = trend_fit.fit(xs, ys)
+    return {k: (float(f.slope[i]), float(f.intercept[i]), float(f.r2[i]), int(f.n[i]))
+            if f.n[i] >= MIN_TREND_N and f.sxx[i] != 0 else None
+            for i, k in enumerate(keys)}
 
 
 def api_get(key, short_desc, state, extra=None):
@@ -225,18 +229,19 @@ def collect_state(key, state):
                 continue
             raw.setdefault(f, []).append((year, v))
         cur = datetime.now(timezone.utc).year
+        # yield but no rent: nothing to contextualise, skip
+        raw = {f: pairs for f, pairs in raw.items() if f in counties}
+        fits = fit_trends({f: [p for p in pairs if p[0] > cur - TREND_WINDOW] for f, pairs in raw.items()})
         for f, pairs in raw.items():
-            if f not in counties:
-                continue   # yield but no rent: nothing to contextualise, skip
             # Full per-year history is retained: the ratio chart needs the
             # ACTUAL yield of each year, not a trend line evaluated at it.
             # A trend is what you expect; history is what happened.
             hist = {str(y): round(v, 1) for y, v in sorted(pairs)}
             entry = {"hist": hist}
-            recent = [p for p in pairs if p[0] > cur - TREND_WINDOW]
-            fit = fit_trend(recent)
+            fit = fits[f]
             if fit:
                 slope, intercept, r2, n = fit
+                recent = [p for p in pairs if p[0] > cur - TREND_WINDOW]
                 entry.update({
                     "trend": round(slope * cur + intercept, 1),
                     "slope": round(slope, 3),
@@ -28,6 +28,21 @@ Output data/cond-yield/fit.json:
   {generated, crops:{corn:{states:{IA:{weeks:{wk:{r2,r2_raw,n,slope}},
    latest:{week,ge,year}}}}}}
 
+Panel (2026-10-19): collect() returns a Panel, the G+E as a dense state x
+year x ISO-week array and final yields as state x year, NaN where NASS has no
+value. shape() detrends every state and fits every (state, week) in three
+batched trend_fit calls instead of two list-built regressions per pair;
+MIN_N still omits thin fits, and the output is unchanged.
+
+Skill surface (2026-10-19): pairs.json only carries the current week, so the
+nowcast's backtest said how good a call is THIS week and nothing about the
+rest of the season. skill_surface() builds the same-week pairs for every
+week in WEEKS from the ge/yields already collected (no further NASS calls)
+and runs build_yield_nowcast's vectorised backtest on each:
+  data/cond-yield/skill.json
+  {generated, weeks:[22..40], crops:{corn:{weeks:{wk:{mae,band80,trend_mae,
+   skill_pct,years,states}}}}}
+
 Fail-loud: zero condition rows exits 1. --selftest offline, gates workflow.
 """
 import json
@@ -37,16 +52,24 @@ import time
 import urllib.error
 import urllib.parse
 import urllib.request
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 from datetime import datetime, timezone
 
+import numpy as np
+
+import trend_fit
+
 API = "https://quickstats.nass.usda.gov/api/api_GET/"
 KEY = os.environ.get("NASS_API_KEY", "").strip()
 OUT = "data/cond-yield/fit.json"
 PAIRS_OUT = "data/cond-yield/pairs.json"   # full-history (2000+) pairs at the current week, feeds the Yield Nowcast
+SKILL_OUT = "data/cond-yield/skill.json"   # nowcast backtest at every week in WEEKS, for the page's skill curve
 FIRST_YEAR = 2000
 WEEKS = range(22, 41)          # ISO weeks late-May .. early-Oct
 MIN_N = 15
+# states x years (G+E: x 53 ISO weeks); years ascending, NaN = no NASS value
+Panel = namedtuple("Panel", "states years ge yld")
+
 CROPS = {"corn": ("CORN", "CORN, GRAIN - YIELD, MEASURED IN BU / ACRE"),
          "soybeans": ("SOYBEANS", "SOYBEANS - YIELD, MEASURED IN BU / ACRE")}
 
@@ -82,28 +105,6 @@ def iso_week(date_s):
     return dt.strptime(date_s, "%Y-%m-%d").isocalendar()[1]
 
 
-def lin_r2(xs, ys):
-    """(r2, slope) of simple linear fit y~x."""
-    n = len(xs)
-    mx, my = sum(xs) / n, sum(ys) / n
-    sxy = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
-    sxx = sum((x - mx) ** 2 for x in xs)
-    syy = sum((y - my) ** 2 for y in ys)
-    if not sxx or not syy:
-        return 0.0, 0.0
-    return (sxy * sxy) / (sxx * syy), sxy / sxx
-
-
-def detrend(year_yield):
-    """{yr: yield} -> {yr: deviation from linear time trend}."""
-    yrs = sorted(year_yield)
-    xs = [float(y) for y in yrs]
-    ys = [year_yield[y] for y in yrs]
-    _, slope = lin_r2(xs, ys)
-    my, mx = sum(ys) / len(ys), sum(xs) / len(xs)
-    return {y: year_yield[y] - (my + slope * (float(y) - mx)) for y in yrs}
-
-
 def collect(crop_desc, yield_sd, fetch):
     ge = defaultdict(dict)     # st -> (yr, wk) -> ge
     for cat in ("GOOD", "EXCELLENT"):
@@ -127,59 +128,106 @@ def collect(crop_desc, yield_sd, fetch):
     yields = defaultdict(dict)
     for r in yrows:
         try:
-            yields[r.get("state_alpha")][str(r.get("year"))] = float(str(r["Value"]).replace(",", ""))
-        except (ValueError, KeyError):
+            yields[r.get("state_alpha")][int(r.get("year"))] = float(str(r["Value"]).replace(",", ""))
+        except (ValueError, KeyError, TypeError):
             continue
-    return ge, yields
+    return to_panel(ge, yields)
+
 
+def to_panel(ge, yields):
+    """{st: {(yr, wk): ge}}, {st: {yr: yield}} -> Panel: the rated states x
+    every year seen, G+E by ISO week (index wk - 1), NaN where NASS has none.
+    Yields of states that were never rated are dropped, as before."""
+    states = sorted(ge)
+    years = sorted({k[0] for st in states for k in ge[st]}
+                   | {y for st in states for y in yields.get(st, {})})
+    yi = {y: j for j, y in enumerate(years)}
+    g = np.full((len(states), len(years), 53), np.nan)
+    yld = np.full((len(states), len(years)), np.nan)
+    for i, st in enumerate(states):
+        for (y, wk), v in ge[st].items():
+            g[i, yi[y], wk - 1] = v
+        for y, v in yields.get(st, {}).items():
+            yld[i, yi[y]] = v
+    return Panel(states, np.array(years), g, yld)
 
-def shape(ge, yields):
+
+def newest(p):
+    """Per state, indices (year, week - 1) of its latest rating."""
+    rated = ~np.isnan(p.ge)
+    yr = len(p.years) - 1 - np.argmax(rated.any(axis=2)[:, ::-1], axis=1)
+    rows = rated[np.arange(len(p.states)), yr]
+    return yr, 52 - np.argmax(rows[:, ::-1], axis=1)
+
+
+def shape(p):
+    """Every state x week fit in one batch: yield detrended per state, then
+    G+E against deviation (and raw yield) for each week in WEEKS over the
+    years that have both, up to the state's latest rated year."""
     out = {}
-    for st in sorted(ge):
-        yy = yields.get(st, {})
-        if len(yy) < MIN_N:
+    years = p.years.astype(float)
+    tr = trend_fit.fit(years, p.yld)
+    dev = p.yld - (tr.intercept[:, None] + tr.slope[:, None] * years)
+    ny, nw = newest(p)
+    g = np.moveaxis(p.ge[:, :, [wk - 1 for wk in WEEKS]], 2, 1)        # state x week x year
+    upto = np.arange(len(years))[None, :] <= ny[:, None]
+    raw = trend_fit.fit(g, np.where(upto, p.yld, np.nan)[:, None, :])
+    det = trend_fit.fit(g, np.where(upto, dev, np.nan)[:, None, :])
+    for i, st in enumerate(p.states):
+        if tr.n[i] < MIN_N:
             continue
-        dev = detrend(yy)
-        weeks = {}
-        newest = max(ge[st])   # (yr, wk)
-        for wk in WEEKS:
-            pairs = [(ge[st][(int(y), wk)], yy[y], dev[y]) for y in yy
-                     if (int(y), wk) in ge[st] and int(y) < newest[0] + 1]
-            pairs = [(g, r, d) for g, r, d in pairs]
-            if len(pairs) < MIN_N:
-                continue
-            r2_raw, _ = lin_r2([p[0] for p in pairs], [p[1] for p in pairs])
-            r2, slope = lin_r2([p[0] for p in pairs], [p[2] for p in pairs])
-            weeks[str(wk)] = {"r2": round(r2, 3), "r2_raw": round(r2_raw, 3),
-                              "n": len(pairs), "slope": round(slope, 3)}
+        weeks = {str(wk): {"r2": round(float(det.r2[i, j]), 3), "r2_raw": round(float(raw.r2[i, j]), 3),
+                           "n": int(det.n[i, j]), "slope": round(float(det.slope[i, j]), 3)}
+                 for j, wk in enumerate(WEEKS) if det.n[i, j] >= MIN_N}
         if weeks:
-            cur_yr, cur_wk = newest
             out[st] = {"weeks": weeks,
-                       "latest": {"year": cur_yr, "week": cur_wk,
-                                  "ge": round(ge[st][newest], 1)}}
+                       "latest": {"year": int(p.years[ny[i]]), "week": int(nw[i]) + 1,
+                                  "ge": round(float(p.ge[i, ny[i], nw[i]]), 1)}}
     return out
 
 
-def emit_pairs(ge, yields):
+def current_week(p):
+    """(yr, wk) of the latest rating in the panel, any state."""
+    ny, nw = newest(p)
+    return max((int(p.years[y]), int(w) + 1) for y, w in zip(ny, nw))
+
+
+def week_rows(p, i, wk, cur_yr):
+    """[year, ge, final_yield] for state i at ISO week wk, years before cur_yr."""
+    g, v = p.ge[i, :, wk - 1], p.yld[i]
+    return [[int(y), float(g[j]), float(v[j])] for j, y in enumerate(p.years)
+            if y < cur_yr and not np.isnan(g[j]) and not np.isnan(v[j])]
+
+
+def emit_pairs(p):
     """Full-history (year, ge, final_yield) pairs at the CURRENT ISO week —
     the Yield Nowcast's food. 26 paired years beat the 16 available from the
     repo-local NASS mirrors, which is the whole point of emitting this here."""
-    newest = max(k for st in ge for k in ge[st])          # (yr, wk) globally
-    cur_yr, cur_wk = newest
+    cur_yr, cur_wk = current_week(p)
     states = {}
     latest_ge = {}
-    for st in sorted(ge):
-        yy = yields.get(st, {})
-        rows = [[int(y), ge[st][(int(y), cur_wk)], yy[y]] for y in yy
-                if (int(y), cur_wk) in ge[st] and int(y) < cur_yr]
-        rows.sort()
+    cur = np.searchsorted(p.years, cur_yr)
+    for i, st in enumerate(p.states):
+        rows = week_rows(p, i, cur_wk, cur_yr)
         if len(rows) >= 12:
             states[st] = rows
-        if (cur_yr, cur_wk) in ge[st]:
-            latest_ge[st] = round(ge[st][(cur_yr, cur_wk)], 1)
+        if not np.isnan(p.ge[i, cur, cur_wk - 1]):
+            latest_ge[st] = round(float(p.ge[i, cur, cur_wk - 1]), 1)
     return {"year": cur_yr, "week": cur_wk, "states": states, "latest_ge": latest_ge}
 
 
+def skill_surface(p, crop):
+    """The nowcast's backtest at every week in WEEKS, from the pairs emit_pairs
+    would have written had that been the current week."""
+    import build_yield_nowcast as yn
+    cur_yr = current_week(p)[0]
+    week_states = {}
+    for wk in WEEKS:
+        rows = {st: week_rows(p, i, wk, cur_yr) for i, st in enumerate(p.states)}
+        week_states[wk] = {st: r for st, r in rows.items() if len(r) >= 12}
+    return yn.skill_surface(week_states, *yn.load_nass(crop))
+
+
 def main():
     if "--selftest" in sys.argv:
         return selftest()
@@ -196,9 +244,9 @@ def main():
     cached = {}
     for slug, (desc, ysd) in CROPS.items():
         print(f"{slug}:")
-        ge, yields = collect(desc, ysd, api_get)
-        cached[slug] = (ge, yields)
-        pkg = shape(ge, yields)
+        panel = collect(desc, ysd, api_get)
+        cached[slug] = panel
+        pkg = shape(panel)
         if pkg:
             out["crops"][slug] = {"states": pkg}
             total += len(pkg)
@@ -210,9 +258,19 @@ def main():
     print(f"wrote {OUT} ({total} state-crop fits)")
     pairs_out = {"generated": out["generated"],
                  "note": "Full-history (2000+) same-week G+E vs final-yield pairs for the Yield Nowcast. Rebuilt weekly; current year excluded from pairs (it has no final yield yet).",
-                 "crops": {slug: emit_pairs(*cached[slug]) for slug in cached}}
+                 "crops": {slug: emit_pairs(cached[slug]) for slug in cached}}
     json.dump(pairs_out, open(PAIRS_OUT, "w"), separators=(",", ":"))
     print(f"wrote {PAIRS_OUT} ({sum(len(c['states']) for c in pairs_out['crops'].values())} state panels)")
+    t0 = time.perf_counter()
+    skill_out = {"generated": out["generated"],
+                 "note": ("Yield Nowcast backtest at every ISO week of the season: MAE and 80% band of "
+                          "leave-one-year-out national errors, against the trend-only MAE. Same model "
+                          "and gates as the weekly nowcast; thin weeks are omitted."),
+                 "weeks": list(WEEKS),
+                 "crops": {slug: {"weeks": skill_surface(cached[slug], slug)} for slug in cached}}
+    json.dump(skill_out, open(SKILL_OUT, "w"), separators=(",", ":"))
+    print(f"wrote {SKILL_OUT} ({sum(len(c['weeks']) for c in skill_out['crops'].values())} crop-weeks, "
+          f"{time.perf_counter() - t0:.2f}s)")
 
 
 def selftest():
@@ -239,10 +297,10 @@ def selftest():
     real_sleep = _t.sleep
     _t.sleep = lambda s: None
     try:
-        ge, yields = collect("CORN", "CORN, GRAIN - YIELD, MEASURED IN BU / ACRE", fake)
+        panel = collect("CORN", "CORN, GRAIN - YIELD, MEASURED IN BU / ACRE", fake)
     finally:
         _t.sleep = real_sleep
-    pkg = shape(ge, yields)
+    pkg = shape(panel)
     ia = pkg["IA"]["weeks"]
     wk30, wk25 = ia.get("30"), ia.get("25")
     assert wk30 and wk30["r2"] > 0.9, f"signal week not detected: {wk30}"
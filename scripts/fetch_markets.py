@@ -1,7 +1,25 @@
 #!/usr/bin/env python3
 """
-AGSIST fetch_markets.py  v11
+AGSIST fetch_markets.py  v12
 ════════════════════════════
+v12 changes (2026-10-19):
+
+  COMPILED KEYWORD SCANNER — is_junk() ran one regex per blacklist entry
+  and score_relevance() walked each tier list with a fresh _has_word()
+  per keyword, several hundred regex searches per scanned market. All
+  tiers and blacklists now compile once into a KeywordIndex that returns
+  every whole-word hit from a single token pass; the sports-player and
+  Kalshi-junk patterns and the category rules are each one alternation.
+  Scores, tiers and categories are unchanged (scripts/test_market_scoring.py
+  checks them against the v11 loops).
+
+  ODDS HISTORY — every candidate's (yes, volume) is appended to
+  data/markets-history.json (market_history.py, compacted per market), and
+  the selected markets carry d24h / d7d point changes (against the `yes`
+  shown next to them) plus a daily spark array. markets.json is written
+  with the fresh prices every run: the history file changes every run and
+  is committed with it, so keeping old prices would save no commit.
+
 v10 changes (2026-04-23):
 
   STRIKE-LADDER DEDUP — v9 pushed 22 near-identical crude-strike markets
@@ -43,6 +61,8 @@ import sys
 import time
 from datetime import datetime, timezone
 
+import market_history  # v12: odds history + movement for /ag-odds
+
 try:
     import urllib.request as urllib_request
     from urllib.parse import quote as url_quote
@@ -217,107 +237,172 @@ SPORTS_PLAYER_RE = [
 KALSHI_JUNK_RE = [r"^KXMVE", r"CROSSCATEGORY", r"^KX.*PARLAY"]
 
 
-def is_junk(title, ticker=""):
+# ================================================================
+# 3b. COMPILED KEYWORD SCANNER  (v12)
+# ================================================================
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_ALNUM = frozenset("abcdefghijklmnopqrstuvwxyz0123456789")
+
+
+class KeywordIndex:
+    """
+    Every tier keyword and blacklist entry compiled once into a lookup
+    keyed by the keyword's leading alnum token. scan() walks the title's
+    tokens a single time and returns every whole-word keyword it contains,
+    with the same boundary rules as _has_word(): a match must start at a
+    token start and end before a non-alnum character (or end of text).
+
+    A keyword's first token is always a whole token of the text when the
+    keyword matches, so a dict probe per text token finds every candidate,
+    overlapping phrases included ("black sea" + "black sea grain").
+    """
+
+    def __init__(self, *vocabularies):
+        by_first = {}
+        for vocab in vocabularies:
+            for kw in vocab:
+                m = _TOKEN_RE.match(kw)
+                if not m:
+                    raise ValueError(f"keyword must start alnum: {kw!r}")
+                bucket = by_first.setdefault(m.group(0), [])
+                if kw not in bucket:
+                    bucket.append(kw)
+        self._by_first = {k: tuple(v) for k, v in by_first.items()}
+
+    def scan(self, t):
+        """All keywords present in lowercase text t as whole words."""
+        hits = set()
+        n = len(t)
+        for m in _TOKEN_RE.finditer(t):
+            cands = self._by_first.get(m.group(0))
+            if not cands:
+                continue
+            pos = m.start()
+            for kw in cands:
+                end = pos + len(kw)
+                if t.startswith(kw, pos) and (end == n or t[end] not in _ALNUM):
+                    hits.add(kw)
+        return hits
+
+
+def _tier_rank(keywords):
+    """keyword -> list position, for 'first keyword in tier order' picks."""
+    rank = {}
+    for i, kw in enumerate(keywords):
+        rank.setdefault(kw, i)
+    return rank
+
+
+_BLACKLIST = frozenset(MEME_BLACKLIST + SPORTS_BLACKLIST)
+_TIER_RANKS = (None, _tier_rank(TIER1_KEYWORDS),
+               _tier_rank(TIER2_KEYWORDS), _tier_rank(TIER3_KEYWORDS))
+_KEYWORD_INDEX = KeywordIndex(TIER1_KEYWORDS, TIER2_KEYWORDS, TIER3_KEYWORDS,
+                              MEME_BLACKLIST, SPORTS_BLACKLIST)
+_SPORTS_PLAYER_ONE_RE = re.compile("|".join(f"(?:{p})" for p in SPORTS_PLAYER_RE))
+_KALSHI_JUNK_ONE_RE = re.compile("|".join(f"(?:{p})" for p in KALSHI_JUNK_RE))
+# Alternation order == dict order, so the first prefix that matches is the
+# same one the v10 startswith() loop picked.
+_TICKER_HINT_RE = re.compile("|".join(re.escape(p) for p in KALSHI_TICKER_HINTS))
+
+
+def match_keywords(text):
+    """Every tier/blacklist keyword found in text, from one token scan."""
+    return _KEYWORD_INDEX.scan(text.lower())
+
+
+def _first_in_tier(hits, tier):
+    """The hit that comes first in the tier's own list order, or None."""
+    rank = _TIER_RANKS[tier]
+    best, best_i = None, None
+    for kw in hits:
+        i = rank.get(kw)
+        if i is not None and (best_i is None or i < best_i):
+            best, best_i = kw, i
+    return best
+
+
+def is_junk(title, ticker="", hits=None):
+    if ticker and _KALSHI_JUNK_ONE_RE.search(ticker.upper()):
+        return True
     t = title.lower()
-    if ticker:
-        for p in KALSHI_JUNK_RE:
-            if re.search(p, ticker.upper()):
-                return True
     # v11: whole-word match so short tokens (nfl, nba, mls, ipo) do not
     # match inside real words ("nfl" was junking every "inflation" market).
-    for p in MEME_BLACKLIST + SPORTS_BLACKLIST:
-        if _has_word(t, p):
-            return True
-    for p in SPORTS_PLAYER_RE:
-        if re.search(p, t):
-            return True
-    return False
+    if hits is None:
+        hits = _KEYWORD_INDEX.scan(t)
+    if not _BLACKLIST.isdisjoint(hits):
+        return True
+    return bool(_SPORTS_PLAYER_ONE_RE.search(t))
 
 
 # ================================================================
 # 4. RELEVANCE SCORING  (v10: intra-tier bumps for differentiation)
 # ================================================================
 
-def score_relevance(text, ticker=""):
+def score_relevance(text, ticker="", hits=None):
     """
     Returns (score, tier). v10 additions over v9:
       - Intra-tier bumps for multi-keyword matches (prevents flat 70s/40s)
       - Kalshi ticker-prefix hint fallback (catches KXCORN-* when title is empty)
+    v12: keyword hits come from one KeywordIndex scan (pass `hits` to reuse
+    a scan already made for is_junk on the same text).
     """
-    t = text.lower()
+    if hits is None:
+        hits = _KEYWORD_INDEX.scan(text.lower())
     score, tier = 0, 0
     matched_kws = []
 
     # v10: Kalshi ticker-prefix fallback (runs BEFORE text match)
     if ticker:
-        tkr = ticker.upper()
-        for prefix, implied_kw in KALSHI_TICKER_HINTS.items():
-            if tkr.startswith(prefix):
-                # Check which tier the implied keyword belongs to
-                if implied_kw in TIER1_KEYWORDS:
-                    score, tier = 100, 1
-                    matched_kws.append(implied_kw)
-                elif implied_kw in TIER2_KEYWORDS:
-                    score, tier = 70, 2
+        m = _TICKER_HINT_RE.match(ticker.upper())
+        if m:
+            implied_kw = KALSHI_TICKER_HINTS[m.group(0)]
+            for hint_tier, hint_score in ((1, 100), (2, 70), (3, 40)):
+                if implied_kw in _TIER_RANKS[hint_tier]:
+                    score, tier = hint_score, hint_tier
                     matched_kws.append(implied_kw)
-                elif implied_kw in TIER3_KEYWORDS:
-                    score, tier = 40, 3
-                    matched_kws.append(implied_kw)
-                break
+                    break
 
     # TIER 1 — whole-word match
     if tier < 1:
-        for kw in TIER1_KEYWORDS:
-            if _has_word(t, kw):
-                score, tier = 100, 1
-                matched_kws.append(kw)
-                break
+        kw = _first_in_tier(hits, 1)
+        if kw:
+            score, tier = 100, 1
+            matched_kws.append(kw)
 
     # TIER 2 — substring match (phrases OK)
     if score < 100:
-        for kw in TIER2_KEYWORDS:
-            if _has_word(t, kw):
-                if tier == 0:
-                    score, tier = 70, 2
-                matched_kws.append(kw)
-                break
+        kw = _first_in_tier(hits, 2)
+        if kw:
+            if tier == 0:
+                score, tier = 70, 2
+            matched_kws.append(kw)
 
     # TIER 3 — substring match
     if score < 70:
-        for kw in TIER3_KEYWORDS:
-            if _has_word(t, kw):
-                score, tier = 40, 3
-                matched_kws.append(kw)
-                break
+        kw = _first_in_tier(hits, 3)
+        if kw:
+            score, tier = 40, 3
+            matched_kws.append(kw)
 
     # Tier-3 upgrade if it ALSO contains a tier-1/2 keyword
     if tier == 3:
-        for kw in TIER1_KEYWORDS:
-            if _has_word(t, kw):
-                score = min(100, score + 30)
-                matched_kws.append(kw)
-                break
+        kw = _first_in_tier(hits, 1)
+        if kw:
+            score = min(100, score + 30)
+            matched_kws.append(kw)
         else:
-            for kw in TIER2_KEYWORDS:
-                if _has_word(t, kw):
-                    score = min(100, score + 15)
-                    matched_kws.append(kw)
-                    break
+            kw = _first_in_tier(hits, 2)
+            if kw:
+                score = min(100, score + 15)
+                matched_kws.append(kw)
 
-    # v10: intra-tier bumps for differentiation
+    # v10: intra-tier bumps for differentiation (max 3 extra hits, +3 each)
     if tier > 0:
-        # Bonus for multiple keyword matches across any tier
-        extra_hits = 0
-        for kw in TIER1_KEYWORDS:
-            if kw not in matched_kws and _has_word(t, kw):
-                extra_hits += 1
-                if extra_hits >= 3:
-                    break
-        for kw in TIER2_KEYWORDS:
-            if kw not in matched_kws and _has_word(t, kw):
-                extra_hits += 1
-                if extra_hits >= 3:
-                    break
+        extra_hits = sum(1 for kw in hits
+                         if kw not in matched_kws and kw in _TIER_RANKS[1])
+        extra_hits += sum(1 for kw in hits
+                          if kw not in matched_kws and kw in _TIER_RANKS[2])
         score += min(extra_hits * 3, 9)
 
     return score, tier
@@ -362,13 +447,24 @@ AG_CATEGORIES = [
 ]
 
 
+# v12: one lookahead alternation over every category keyword, one named
+# group per category in priority order. At each position the regex takes
+# the first group that matches, so the lowest group index seen anywhere in
+# the text is exactly the category the nested substring loop returned.
+_CATEGORY_RE = re.compile("(?=" + "|".join(
+    f"(?P<c{i}>" + "|".join(re.escape(kw) for kw in kws) + ")"
+    for i, (_, kws) in enumerate(AG_CATEGORIES)) + ")")
+
+
 def get_category(text):
-    t = text.lower()
-    for cat, kws in AG_CATEGORIES:
-        for kw in kws:
-            if kw in t:
-                return cat
-    return "Other"
+    best = None
+    for m in _CATEGORY_RE.finditer(text.lower()):
+        i = int(m.lastgroup[1:])
+        if i == 0:
+            return AG_CATEGORIES[0][0]
+        if best is None or i < best:
+            best = i
+    return AG_CATEGORIES[best][0] if best is not None else "Other"
 
 
 # ----------------------------------------------------------------
@@ -805,9 +901,10 @@ def _make_poly_record(m, question, seen, event_slug=""):
     mid = str(m.get("id") or m.get("condition_id") or m.get("conditionId") or "").strip()
     if not mid or mid in seen:
         return None
-    if is_junk(question):
+    hits = match_keywords(question)
+    if is_junk(question, hits=hits):
         return None
-    score, tier = score_relevance(question)
+    score, tier = score_relevance(question, hits=hits)
     if score < MIN_RELEVANCE:
         return None
     prob = _parse_poly_prob(m)
@@ -1080,7 +1177,7 @@ def apply_quotas(markets):
 
 def main():
     now = datetime.now(timezone.utc)
-    print(f"\nAGSIST fetch_markets.py v11 -- {now.strftime('%Y-%m-%d %H:%M UTC')}")
+    print(f"\nAGSIST fetch_markets.py v12 -- {now.strftime('%Y-%m-%d %H:%M UTC')}")
     print("=" * 60)
 
     kalshi = fetch_kalshi()
@@ -1107,6 +1204,14 @@ def main():
     top = apply_quotas(deduped)
     print(f"  Final selection: {len(top)} markets")
 
+    # v12: every candidate goes into the odds history (so a market that
+    # climbs into the top 20 arrives with its past), then the selection
+    # is annotated with movement read back from it.
+    history = market_history.load()
+    market_history.record(history, combined, now)
+    for m in top:
+        m.update(market_history.summary(history, market_history.market_id(m), now, m.get("yes")))
+
     cats = {}
     for m in top:
         cats.setdefault(m["category"], []).append(m)
@@ -1120,7 +1225,7 @@ def main():
 
     output = {
         "fetched":        now.strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "version":        5,
+        "version":        6,
         "count":          len(top),
         "total_found":    len(combined),
         "tier_breakdown": {
@@ -1133,11 +1238,13 @@ def main():
     }
 
     os.makedirs("data", exist_ok=True)
+    market_history.save(history, now)
+
     with open("data/markets.json", "w") as f:
         json.dump(output, f, indent=2)
 
     print(f"\n{'=' * 60}")
-    print(f"OK data/markets.json written -- v11")
+    print(f"OK data/markets.json written -- v12")
     print(f"  Kalshi:      {len(kalshi)}")
     print(f"  Polymarket:  {len(poly)}")
     print(f"  After ladders: {len(collapsed)}")
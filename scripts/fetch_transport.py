@@ -22,9 +22,25 @@ Gotcha honored: the barge location is 'Lower Illinois' (the AMS docs'
 'Illinois River' returns zero rows silently — probe-verified).
 
 Fail-loud: zero rows from any dataset exits 1 (red workflow beats a
-silently stale page). Retry/backoff on transport errors. --selftest is
+silently stale page), and so does an empty revision window where the store
+holds rows. Retry/backoff on transport errors. --selftest is
 offline and gates the workflow.
+
+Incremental sync (2026-10-19): every run used to pull six years of
+grain_basis, barge_rates and transport_cost_idx in one request each, capped at
+$limit 50000 -- grain_basis alone is ~16k rows and growing, and Socrata
+truncates past the cap without a word. Each of the three now has a row store,
+data/transport/store/<name>.json (committed; one row per line), holding the
+window the pages use plus a date watermark. A run asks only for rows dated
+from REVISION_DAYS before the watermark on, in PAGE-row pages ordered by
+date,:id with $offset, and those rows replace the store's from that date
+(AMS revises recent weeks). Rows older than the window are pruned. The pages
+are shaped from the store, so the output is what a full pull would give.
+The grain_basis store also keeps an order-free hash per (commodity, market)
+series, updated by the rows added and removed, and the duplicate-region check
+compares those instead of re-sorting every series.
 """
+import hashlib
 import json
 import os
 import sys
@@ -32,13 +48,24 @@ import time
 import urllib.parse
 import urllib.request
 from collections import defaultdict
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 
 BASE = "https://agtransport.usda.gov/resource/{}.json"
 UA = {"User-Agent": "AGSIST/1.0 (+https://agsist.com)"}
 OUT_DIR = "data/transport"
+STORE_DIR = f"{OUT_DIR}/store"
 HIST_WEEKS = 26
 AVG_YEARS = 5
+PAGE = 50000                   # Socrata's per-request cap
+REVISION_DAYS = 28             # re-pulled every run: AMS revises recent weeks
+
+# name -> (dataset id, $select or None for every column, series hashed for the dupe check)
+SYNCED = {
+    "grain_basis": ("v85y-3hep", "date,market_name,market_type,commodity,basis",
+                    (("commodity", "market_name"), ("date", "basis"))),
+    "barge_rates": ("deqi-uken", "date,location,rate", None),
+    "transport_cost_idx": ("8uye-ieij", None, None),
+}
 
 
 def get_json(dataset, params):
@@ -101,16 +128,109 @@ def series_stats(rows, key_fields, value_field, date_field="date"):
     return out
 
 
-def build(fetch=get_json):
+# ── incremental Socrata sync ─────────────────────────────────────────────────
+def fetch_all(fetch, dataset, where, select=None):
+    """Every row matching where, PAGE rows a request, in a stable order."""
+    rows = []
+    while True:
+        params = {"$where": where, "$order": "date,:id", "$limit": PAGE, "$offset": len(rows)}
+        if select:
+            params["$select"] = select
+        page = fetch(dataset, params)
+        rows += page
+        if len(page) < PAGE:
+            return rows
+
+
+def row_hash(r, fields):
+    return int.from_bytes(hashlib.sha1(repr(tuple(r.get(f) for f in fields)).encode()).digest()[:16], "big")
+
+
+def series_hashes(rows, sig, hashes=None, sign=1):
+    """Fold rows into {"k1|k2": hex} order-free series hashes (sum of row
+    hashes mod 2**128): sign=1 adds rows, -1 takes them back out."""
+    key_fields, val_fields = sig
+    acc = {k: int(v, 16) for k, v in (hashes or {}).items()}
+    for r in rows:
+        k = "|".join(str(r.get(f)) for f in key_fields)
+        acc[k] = (acc.get(k, 0) + sign * row_hash(r, val_fields)) % (1 << 128)
+    return {k: f"{v:032x}" for k, v in acc.items() if v}
+
+
+def store_path(name, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f"{name}.json")
+
+
+def load_store(name, store_dir=STORE_DIR):
+    """-> {"watermark", "rows" (dicts, no null fields), "sig"}; empty if none."""
+    try:
+        d = json.load(open(store_path(name, store_dir)))
+    except (OSError, ValueError):
+        return {"watermark": None, "rows": [], "sig": {}}
+    f = d["fields"]
+    rows = [{k: v for k, v in zip(f, r) if v is not None} for r in d["rows"]]
+    return {"watermark": d.get("watermark"), "rows": rows, "sig": d.get("sig") or {}}
+
+
+def save_store(name, store, store_dir=STORE_DIR):
+    fields = []
+    for r in store["rows"]:
+        fields += [k for k in r if k not in fields]
+    head = {"watermark": store["watermark"], "fields": fields, "sig": store["sig"]}
+    lines = [json.dumps([r.get(k) for k in fields], separators=(",", ":")) for r in store["rows"]]
+    os.makedirs(store_dir, exist_ok=True)
+    with open(store_path(name, store_dir), "w") as fh:
+        fh.write(json.dumps(head, separators=(",", ":"))[:-1] + ',"rows":[\n' + ",\n".join(lines) + "\n]}\n")
+
+
+def sync(name, since, fetch, store_dir=STORE_DIR):
+    """Bring one dataset's store up to date. -> (store, rows fetched)"""
+    dataset, select, sig = SYNCED[name]
+    old = load_store(name, store_dir)
+    start = since
+    if old["watermark"]:
+        start = max(since, (date.fromisoformat(old["watermark"]) - timedelta(days=REVISION_DAYS)).isoformat())
+    fresh = fetch_all(fetch, dataset, f"date >= '{start}'", select)
+    if not fresh and any(r["date"][:10] >= start for r in old["rows"]):
+        # an outage or an empty page, not a revision: replacing the window with
+        # nothing would walk the watermark and the pages back REVISION_DAYS
+        raise SystemExit(f"FATAL: {name} returned zero rows since {start} — refusing to drop "
+                         f"the stored revision window")
+    keep = [r for r in old["rows"] if since <= r["date"][:10] < start]
+    rows = keep + fresh
+    store = {"rows": rows, "watermark": max((r["date"][:10] for r in rows), default=None), "sig": {}}
+    if sig:
+        if old["sig"]:
+            gone = [r for r in old["rows"] if not since <= r["date"][:10] < start]
+            store["sig"] = series_hashes(fresh, sig, series_hashes(gone, sig, old["sig"], -1))
+        else:
+            store["sig"] = series_hashes(rows, sig)
+    return store, len(fresh)
+
+
+def duplicate_series(hashes):
+    """{"commodity|market": hash} -> {(commodity, market): the market it copies}.
+    Of identical series the alphabetically first market is kept."""
+    first, dupes = {}, {}
+    for k in sorted(hashes):
+        comm, mkt = k.split("|", 1)
+        orig = first.setdefault((comm, hashes[k]), mkt)
+        if orig != mkt:
+            dupes[(comm, mkt)] = orig
+    return dupes
+
+
+def build(fetch=get_json, store_dir=STORE_DIR):
+    """-> (basis_doc, journey_doc, stores); stores are saved by the caller
+    once the documents are written."""
     since = f"{datetime.now(timezone.utc).year - AVG_YEARS - 1}-01-01"
-    basis_rows = fetch("v85y-3hep", {
-        "$where": f"date >= '{since}'", "$limit": 50000,
-        "$select": "date,market_name,market_type,commodity,basis"})
-    barge_rows = fetch("deqi-uken", {
-        "$where": f"date >= '{since}'", "$limit": 50000,
-        "$select": "date,location,rate"})
-    cost_rows = fetch("8uye-ieij", {
-        "$where": f"date >= '{since}'", "$limit": 50000})
+    stores = {}
+    for name in SYNCED:
+        stores[name], n = sync(name, since, fetch, store_dir)
+        print(f"  {name}: {n} rows fetched, {len(stores[name]['rows'])} in store")
+    basis_rows = stores["grain_basis"]["rows"]
+    barge_rows = stores["barge_rates"]["rows"]
+    cost_rows = stores["transport_cost_idx"]["rows"]
     spread_rows = fetch("an4w-mnp7", {
         "$order": "date DESC", "$limit": 400,
         "$select": "date,commodity,origin,destination,origin_bid,destination_bid,price_spread"})
@@ -119,28 +239,17 @@ def build(fetch=get_json):
                        ("transport_cost_idx", cost_rows), ("grain_price_spreads", spread_rows)):
         if not rows:
             raise SystemExit(f"FATAL: {name} returned zero rows — refusing to write stale data")
-        print(f"  {name}: {len(rows)} rows")
 
     # AUDIT 2026-08-11: USDA AgTransport currently publishes "Southeast" rows
     # byte-identical to "North Dakota" (verified upstream on four consecutive
     # weeks). Drop any region whose full series duplicates another region's —
     # republishing the copy as regional data is worse than omitting it.
-    _sig = {}
-    for r in basis_rows:
-        k = (r.get("commodity"), r.get("market_name"))
-        _sig.setdefault(k, []).append((r.get("date"), r.get("basis")))
-    _dupes = set()
-    _seen = {}
-    for (comm, mkt), series in _sig.items():
-        key = (comm, tuple(sorted(series)))
-        if key in _seen and mkt != _seen[key]:
-            _dupes.add((comm, mkt))
-            print(f"  grain_basis: dropping {mkt!r} ({comm}) — series identical to {_seen[key]!r}")
-        else:
-            _seen.setdefault(key, mkt)
+    _dupes = duplicate_series(stores["grain_basis"]["sig"])
+    for (comm, mkt), orig in sorted(_dupes.items()):
+        print(f"  grain_basis: dropping {mkt!r} ({comm}) — series identical to {orig!r}")
     if _dupes:
         basis_rows = [r for r in basis_rows
-                      if (r.get("commodity"), r.get("market_name")) not in _dupes]
+                      if (str(r.get("commodity")), str(r.get("market_name"))) not in _dupes]
     basis = series_stats(basis_rows, ["commodity", "market_name", "market_type"], "basis")
     barge = series_stats(barge_rows, ["location"], "rate")
 
@@ -168,7 +277,7 @@ def build(fetch=get_json):
                    "barge": barge,
                    "cost_index": {k: v for k, v in cost_latest.items()},
                    "spreads": spreads_latest}
-    return basis_doc, journey_doc
+    return basis_doc, journey_doc, stores
 
 
 def selftest():
@@ -185,22 +294,120 @@ def selftest():
     assert s[k]["avg5"] is not None, "same-week avg failed"
     assert abs(s[k]["delta"] - (-0.05)) < 0.011, f"delta wrong: {s[k]['delta']}"
     assert len(s[k]["hist"]) == HIST_WEEKS, "history window wrong"
-    # fail-loud path: empty dataset must raise
+    import tempfile
+    with tempfile.TemporaryDirectory() as td:
+        # fail-loud path: empty dataset must raise
+        try:
+            build(fetch=lambda ds, p: [], store_dir=td)
+            raise AssertionError("empty dataset did not fail loud")
+        except SystemExit:
+            pass
+        sync_selftest(td)
+    print("SELFTEST OK — shaping, same-week avg, delta, history window, fail-loud, "
+          "paged + watermarked sync, revisions, incremental dupe hashes, empty revision window")
+
+
+class _FakeSocrata:
+    """Answers $where date >= / $order / $offset / $limit / $select like the
+    API, and logs every request."""
+
+    def __init__(self, tables):
+        self.tables, self.log = tables, []
+
+    def __call__(self, ds, params):
+        self.log.append((ds, dict(params)))
+        rows = self.tables.get(ds, [])
+        if "$where" in params:
+            since = params["$where"].split("'")[1]
+            rows = [r for r in rows if r["date"][:10] >= since]
+        if params.get("$order", "").startswith("date DESC"):
+            rows = sorted(rows, key=lambda r: r["date"], reverse=True)
+        else:
+            rows = sorted(rows, key=lambda r: (r["date"], r[":id"]))
+        off = params.get("$offset", 0)
+        rows = rows[off:off + params.get("$limit", 1000)]
+        sel = params.get("$select")
+        return [{k: v for k, v in r.items() if k != ":id" and (not sel or k in sel.split(","))}
+                for r in rows]
+
+
+def sync_selftest(td):
+    global PAGE
+    cur = datetime.now(timezone.utc).year
+    weeks = [(date(cur - 6, 1, 3) + timedelta(weeks=i)).isoformat() for i in range(6 * 52 + 20)]
+    weeks = [d for d in weeks if d <= date.today().isoformat()]
+    ids = iter(range(10 ** 6))
+    basis = [{":id": next(ids), "date": d + "T00:00:00.000", "market_name": m, "market_type": "Elevator Bid",
+              "commodity": "Corn", "basis": f"{-0.3 - 0.01 * (i % 7) - (0.2 if m == 'Iowa' else 0):.2f}"}
+             for i, d in enumerate(weeks) for m in ("Iowa", "North Dakota", "Southeast")]
+    barge = [{":id": next(ids), "date": d + "T00:00:00.000", "location": "St. Louis", "rate": str(300 + i % 40)}
+             for i, d in enumerate(weeks)]
+    cost = [{":id": next(ids), "date": d + "T00:00:00.000", "truck": "1.1", "barge": str(i)} for i, d in enumerate(weeks[::13])]
+    spreads = [{":id": 0, "date": weeks[-1] + "T00:00:00.000", "commodity": "Corn", "origin": "IA",
+                "destination": "Gulf", "origin_bid": "4", "destination_bid": "4.5", "price_spread": "0.5"}]
+    fake = _FakeSocrata({"v85y-3hep": basis, "deqi-uken": barge, "8uye-ieij": cost, "an4w-mnp7": spreads})
+    saved, PAGE = PAGE, 500
     try:
-        build(fetch=lambda ds, p: [])
-        raise AssertionError("empty dataset did not fail loud")
-    except SystemExit:
-        pass
-    print("SELFTEST OK — shaping, same-week avg, delta, history window, fail-loud")
+        b1, j1, stores = build(fetch=fake, store_dir=td)
+        pages = [p["$offset"] for ds, p in fake.log if ds == "v85y-3hep"]
+        since = f"{cur - AVG_YEARS - 1}-01-01"
+        want = [r for r in basis if r["date"][:10] >= since]
+        assert pages == [i * PAGE for i in range(len(want) // PAGE + 1)], f"paging wrong: {pages}"
+        assert len(stores["grain_basis"]["rows"]) == len(want), "store lost rows across pages"
+        assert "Corn|Southeast|Elevator Bid" not in b1["series"] and "Corn|North Dakota|Elevator Bid" in b1["series"], \
+            "identical Southeast series not dropped (or the wrong copy dropped)"
+        for name, st in stores.items():
+            save_store(name, st, td)
+
+        # second run: only the trailing window is asked for, and a revision in
+        # it breaks the duplication
+        fake.log[:] = []
+        basis[-1]["basis"] = "-0.99"             # last Southeast row revised upstream
+        basis.append({**basis[-3], ":id": next(ids), "date": "9999-01-01T00:00:00.000"})
+        b2, j2, stores = build(fetch=fake, store_dir=td)
+        start = (date.fromisoformat(weeks[-1]) - timedelta(days=REVISION_DAYS)).isoformat()
+        asked = [p["$where"] for ds, p in fake.log if ds == "v85y-3hep"]
+        assert asked == [f"date >= '{start}'"], f"not incremental: {asked}"
+        full = [r for r in basis if r["date"][:10] >= since]
+        assert stores["grain_basis"]["sig"] == series_hashes(full, SYNCED["grain_basis"][2]), \
+            "incremental series hashes drifted from a full recompute"
+        assert "Corn|Southeast|Elevator Bid" in b2["series"], "revised series still treated as a duplicate"
+        want_b = series_stats([{k: v for k, v in r.items() if k != ":id"} for r in full],
+                              ["commodity", "market_name", "market_type"], "basis")
+        assert b2["series"] == want_b, "stats from the store differ from a full pull"
+        assert j2["cost_index"]["barge"] == str(len(weeks[::13]) - 1), "cost index not the latest row"
+
+        # store round-trips through its file
+        save_store("grain_basis", stores["grain_basis"], td)
+        back = load_store("grain_basis", td)
+        assert back["rows"] == stores["grain_basis"]["rows"] and back["sig"] == stores["grain_basis"]["sig"]
+
+        # an empty answer for the revision window (outage, empty page) must
+        # fail loud, not drop the window and walk the watermark back
+        for name, st in stores.items():
+            save_store(name, st, td)
+        before = open(store_path("grain_basis", td)).read()
+        outage = _FakeSocrata({"v85y-3hep": [r for r in basis if r["date"][:10] < start],
+                               "deqi-uken": barge, "8uye-ieij": cost, "an4w-mnp7": spreads})
+        try:
+            build(fetch=outage, store_dir=td)
+            raise AssertionError("empty revision window did not fail loud")
+        except SystemExit as e:
+            assert "grain_basis" in str(e), f"wrong dataset blamed: {e}"
+        assert open(store_path("grain_basis", td)).read() == before, "store touched on a failed sync"
+    finally:
+        PAGE = saved
 
 
 def main():
     if "--selftest" in sys.argv:
         return selftest()
-    basis_doc, journey_doc = build()
+    basis_doc, journey_doc, stores = build()
     os.makedirs(OUT_DIR, exist_ok=True)
     json.dump(basis_doc, open(f"{OUT_DIR}/basis.json", "w"), separators=(",", ":"))
     json.dump(journey_doc, open(f"{OUT_DIR}/journey.json", "w"), separators=(",", ":"))
+    for name, store in stores.items():
+        save_store(name, store)
     print(f"wrote {OUT_DIR}/basis.json ({len(basis_doc['series'])} series) and "
           f"journey.json ({len(journey_doc['barge'])} barge locations, "
           f"{len(journey_doc['spreads'])} spreads)")
@@ -4,6 +4,17 @@ AGSIST Daily Briefing Generator, v4.6.3
 ═══════════════════════════════════════════════════════════════════
 Generates the daily agricultural intelligence briefing via Claude API.
 
+Prompt caching (2026-10-19): the system prompt goes out as two blocks, the
+byte-stable static prefix (voice, rules, schema) marked cache_control and the
+per-day context blocks after it, so retries and regenerations read the prefix
+from cache. Per-request token counts, cache hits, retries and time-to-first-
+token land in meta.api_usage (scripts/test_prompt_cache.py).
+
+Scrubbers in one walk (2026-10-19): the weekend, dash, html-tag, drama-verb
+and emoji scrubbers are rules in briefing_scrub.py, applied in a single walk of
+the briefing with one substitution log; validate_level_coherence reads the
+prose from that walk. Output unchanged (scripts/test_briefing_scrub.py).
+
 v4.6.3 (model migration, 2026-06-16): MODEL -> claude-sonnet-4-6 (the old
 claude-sonnet-4-20250514 was retired from the Claude API on 2026-06-15, causing 404s);
 retry loop now fails fast on non-429 4xx instead of retrying a permanent error.
@@ -136,6 +147,7 @@ import re
 from datetime import datetime, timezone, timedelta
 
 from contract_calendar import is_expired   # ONE definition of contract expiry
+import briefing_scrub                       # the post-generation scrubbers, one walk
 from pathlib import Path
 
 try:
@@ -1497,7 +1509,24 @@ Set weekly_thread.day = 1, weekly_thread.question = (your question), weekly_thre
         thread_block.strip() if thread_block else "",
     ) if b]
     context_blocks = "\n\n".join(_optional_blocks) if _optional_blocks else ""
+    return system_blocks(static_system_prompt(), context_blocks)
+
+
+def system_blocks(static, context):
+    """The system prompt as API content blocks: the static prefix, marked for
+    prompt caching, then today's context. Every byte that changes day to day
+    lives in the second block, so the prefix the cache keys on never moves."""
+    blocks = [{"type": "text", "text": static, "cache_control": {"type": "ephemeral"}}]
+    if context:
+        blocks.append({"type": "text", "text": "══ TODAY'S CONTEXT ══\n\n" + context})
+    return blocks
+
 
+def static_system_prompt():
+    """Voice, rules and JSON schema: identical on every call, every day. Nothing
+    per-day may be interpolated here (build_system_prompt's context blocks go in
+    the uncached tail), or each morning writes a fresh cache entry instead of
+    reading one. scripts/test_prompt_cache.py holds it byte-stable."""
     # v4.6: alias the module-level constants into local scope for the f-string below.
     CALENDAR_FACTS_2026_LOCAL = CALENDAR_FACTS_2026
     return f"""You are the voice of AGSIST Daily, a trusted morning agricultural intelligence briefing read every day by US producers across grain, livestock, dairy, and specialty operations.
@@ -1600,7 +1629,6 @@ GEOGRAPHIC SCOPE: National. NEVER narrow to "Wisconsin and Minnesota farmers" or
 HEADLINE NUMERALS: Always digit format. Write "9.2%" or "9%", not "NINE PERCENT". AI search engines query digits, not spelled-out numbers. The headline is the canonical anchor and must be queryable.
 
 NEWS DISCIPLINE: News is INPUT, not flavor. The news block below is organized by bucket (GRAINS, LIVESTOCK, ENERGY, POLICY, WEATHER, MACRO). Every section with medium or high conviction MUST identify the catalyst, the news / data / event / report that drove or contextualizes the price action. If the relevant news bucket has NO recent items, you may write "no clean catalyst, looks like fund liquidation" or similar, but only if the bucket was actually empty. Default behavior: thread a specific news item from the relevant bucket into each section's body. Do NOT recap the news; weave it into the price story as the why. Lead with the price + so-what; the catalyst is the why behind it.
-{context_blocks}
 
 {CALENDAR_FACTS_2026_LOCAL}
 
@@ -1635,7 +1663,7 @@ For genuinely once-a-decade events, you may use "historic" once. Otherwise descr
   - Number-first: "12 cents. The spread that's running the corn market."
   - Named concept: "The 'planting paradox' explained."
   - Historical parallel: "The 2012 drought premium showed up first in the calendar spread."
-Past TMYK titles from the last 3 briefings are listed above; do NOT repeat their shape OR topic.
+Past TMYK titles from the last 3 briefings are listed under TODAY'S CONTEXT; do NOT repeat their shape OR topic.
 
 4. WATCH LIST ITEMS MUST BE CONDITIONAL. At least HALF of items must include a specific level, threshold, or trigger. Calendar entries are weakest.
 
@@ -1821,10 +1849,13 @@ Apply all 18 IMPACT RULES. Voice samples are NON-NEGOTIABLE, no wire-service neu
     # 429 (rate-limited) and 5xx are retryable. 4xx auth/format errors are not.
     import time as _time
     MAX_RETRIES = 3
-    BACKOFF_SECONDS = [4, 12, 30]
     last_err = None
     result = None
+    usage = {}
+    t_first = None
+    attempt = 0
     for attempt in range(MAX_RETRIES):
+        t_start = _time.monotonic()
         try:
             if requests:
                 # v4.6.2: STREAM the response. A non-streaming POST puts the entire
@@ -1853,7 +1884,13 @@ Apply all 18 IMPACT RULES. Voice samples are NON-NEGOTIABLE, no wire-service neu
                     if _t == "content_block_delta":
                         _d = _evt.get("delta", {})
                         if _d.get("type") == "text_delta":
+                            if t_first is None:
+                                t_first = _time.monotonic()
                             _parts.append(_d.get("text", ""))
+                    elif _t == "message_start":
+                        usage.update((_evt.get("message") or {}).get("usage") or {})
+                    elif _t == "message_delta":
+                        usage.update(_evt.get("usage") or {})
                     elif _t == "error":
                         raise requests.exceptions.HTTPError(
                             f"stream error: {_evt.get('error')}")
@@ -1869,9 +1906,11 @@ Apply all 18 IMPACT RULES. Voice samples are NON-NEGOTIABLE, no wire-service neu
                 req = urllib.request.Request(ANTHROPIC_API, data=data_bytes, headers=headers, method="POST")
                 with urllib.request.urlopen(req, timeout=600) as resp:
                     result = json.loads(resp.read().decode("utf-8"))
+                usage.update(result.get("usage") or {})
             break
         except Exception as e:
             last_err = e
+            usage.clear(); t_first = None
             _sc = getattr(getattr(e, "response", None), "status_code", None)
             if _sc is not None and 400 <= _sc < 500 and _sc != 429:
                 # Permanent client error (e.g. 404 model-not-found, 401 bad key) -
@@ -1880,10 +1919,12 @@ Apply all 18 IMPACT RULES. Voice samples are NON-NEGOTIABLE, no wire-service neu
                       f"Verify MODEL is current (currently '{MODEL}').", file=sys.stderr)
                 break
             if attempt < MAX_RETRIES - 1:
-                wait = BACKOFF_SECONDS[attempt]
+                wait = API_BACKOFF_SECONDS[attempt]
                 print(f"  [warn] API call failed ({e}); retrying in {wait}s "
                       f"(attempt {attempt + 1}/{MAX_RETRIES})", file=sys.stderr)
                 _time.sleep(wait)
+    call_claude.usage.append(_usage_record(usage, attempt + 1, result is not None,
+                                           t_start, t_first, _time.monotonic()))
     if result is None:
         raise last_err if last_err else RuntimeError("API call failed with no error captured")
     text = ""
@@ -1914,6 +1955,29 @@ Apply all 18 IMPACT RULES. Voice samples are NON-NEGOTIABLE, no wire-service neu
         raise
 
 
+# Per-request API usage, appended by call_claude (one entry per request, the
+# parse-retry and WASDE self-heal regenerations included); main persists it as
+# briefing.meta.api_usage.generate.
+call_claude.usage = []
+API_BACKOFF_SECONDS = [4, 12, 30]
+
+
+def _usage_record(usage, attempts, ok, t_start, t_first, t_end):
+    """One call_claude request as it lands in meta.api_usage: the API's token
+    counts (cache_read_input_tokens > 0 means the static prefix was served from
+    cache), HTTP attempts including retries, and time-to-first-token / total
+    for the attempt that answered. ttft_ms is None off the streaming path."""
+    rec = {"ok": ok, "attempts": attempts}
+    for k in ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "output_tokens"):
+        rec[k] = int(usage.get(k) or 0)
+    rec["ttft_ms"] = round((t_first - t_start) * 1000) if t_first is not None else None
+    rec["total_ms"] = round((t_end - t_start) * 1000)
+    print(f"  [usage] in {rec['input_tokens']} + cache-read {rec['cache_read_input_tokens']}"
+          f" + cache-write {rec['cache_creation_input_tokens']}, out {rec['output_tokens']};"
+          f" {attempts} attempt(s), ttft {rec['ttft_ms']} ms, total {rec['total_ms']} ms")
+    return rec
+
+
 def validate_briefing(briefing, locked_prices):
     warnings = []
     known_values = {k: v for k, v in locked_prices.items() if v and v > 0}
@@ -2920,368 +2984,54 @@ def save_archive(briefing):
     print(f"  Archive index: {count} briefings")
 
 
-def sanitize_em_dashes(briefing):
-    """v4.4.1: post-generation safety net for em/en dashes.
-
-    The prompt explicitly bans em dashes (Writing Rule 1). v4.4 still
-    produced 10 of them in one run, almost certainly because the prompt
-    itself contained 60+ em dashes the model pattern-matched on. v4.4.1
-    strips em dashes from the prompt source AND adds this sweep so any
-    leftover gets cleaned before publish.
-
-    Replacement: space-bracketed em dash becomes ", " (mid-sentence beat).
-    Bare em dash becomes a hyphen. Hyphens, en dashes inside numeric
-    ranges, and other characters are untouched."""
-    def clean(s):
-        if not isinstance(s, str):
-            return s
-        return (s.replace(" \u2014 ", ", ")
-                 .replace("\u2014", "-")
-                 .replace(" \u2013 ", ", ")
-                 .replace("\u2013", "-"))
-
-    def walk(obj):
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                obj[k] = walk(v)
-            return obj
-        if isinstance(obj, list):
-            return [walk(item) for item in obj]
-        if isinstance(obj, str):
-            return clean(obj)
-        return obj
-
-    walk(briefing)
-    return briefing
-
-
-# v4.5.0: BODY FIELDS that may contain prose with bold emphasis. The
-# sanitize_html_tags walker only converts <strong>/<em> in these fields,
-# leaving the rest of the briefing untouched (icons, IDs, etc).
-_BOLD_BODY_FIELDS = {
-    "lead", "subheadline", "the_takeaway", "teaser",
-    "body", "bottom_line", "vs_yesterday", "catalyst",
-    "context", "commentary", "status_text", "note", "summary",
-}
+def scrub_briefing(briefing, market_status):
+    """2026-10-19: every post-generation scrubber in ONE walk of the briefing
+    (briefing_scrub): weekend block wipe, em/en dashes, <strong>/<em> ->
+    markdown, drama verbs, emoji + section icons. Same output as the
+    v4.7 chain of five walks (scripts/test_briefing_scrub.py holds it to
+    that on the archive). Returns (briefing, substitution_log, fields);
+    fields is the loc -> text view validate_level_coherence reads.
+    Idempotent."""
+    res = briefing_scrub.scrub(briefing, market_status)
+    counts = res.counts()
+    if counts:
+        print("  [scrub] " + ", ".join(f"{rule} {n}" for rule, n in counts.items()))
+    drama = [e for e in res.log if e["rule"] == "drama"]
+    if drama:
+        print(f"  [v4.6.1 scrubber] applied {len(drama)} drama-verb substitution(s):")
+        by_field = {}
+        for entry in drama:
+            by_field.setdefault(entry["field"], []).append((entry["before"], entry["after"]))
+        for field, subs in by_field.items():
+            print(f"    {field}: " + ", ".join(f"\"{b}\" -> \"{a}\"" for b, a in subs))
+    else:
+        print("  [v4.6.1 scrubber] no drama verbs found, briefing clean")
+    return res.briefing, res.log, res.fields
 
 
-def sanitize_html_tags(briefing):
-    """v4.5.0: convert any literal <strong>...</strong> or <em>...</em>
-    HTML tags in body fields to **markdown** equivalents.
-
-    The model has historically emitted <strong> in body JSON fields
-    despite the prompt asking for markdown. The frontend mdInline()
-    helper (daily.html v4.4.2, index.html v4.4.2) handles either format
-    so user-facing rendering is unaffected, but storing markdown in the
-    JSON keeps the source of truth clean and prevents downstream
-    consumers (email pipeline, RSS, AI crawlers) from having to do the
-    same conversion.
-
-    Only operates on the recognized body fields (_BOLD_BODY_FIELDS).
-    Leaves headline, icon, label, and structural fields untouched.
-    Idempotent: running twice produces the same result as once."""
-    strong_re = re.compile(r"<strong>(.+?)</strong>", re.DOTALL | re.IGNORECASE)
-    em_re = re.compile(r"<em>(.+?)</em>", re.DOTALL | re.IGNORECASE)
-
-    def clean(s):
-        if not isinstance(s, str):
-            return s
-        s = strong_re.sub(r"**\1**", s)
-        s = em_re.sub(r"*\1*", s)
-        return s
-
-    def walk(obj):
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                if k in _BOLD_BODY_FIELDS and isinstance(v, str):
-                    obj[k] = clean(v)
-                else:
-                    obj[k] = walk(v)
-            return obj
-        if isinstance(obj, list):
-            return [walk(item) for item in obj]
-        return obj
-
-    walk(briefing)
-    return briefing
-
-
-# v4.6.1: DRAMA VERB SCRUBBER. Deterministic catch-all that runs AFTER the
-# critic rewrite, before save_briefing(). The critic rewrites the single
-# weakest_target per pass (lead OR section_N OR basis OR ...), which means
-# drama verbs in headlines, section titles, takeaways, TMYK titles, and the
-# Number unit text can survive the critic pass. The critic also cannot rewrite
-# the headline at all (not in the weakest_target enum). This scrubber catches
-# every banned drama verb in every text field, deterministically, with no
-# model judgment.
-#
-# Design choices:
-# - Word-boundary regex prevents matching inside compounds (uncrashed, etc.)
-# - Verb forms only: "crashed" matches, "crash" the noun in "the crash of 2020"
-#   is preserved (no -ed/-ing/-es suffix means likely noun, leave it).
-# - Case preserving: "CRATER" in headline becomes "FALL HARD" (upper).
-#   "Crater" becomes "Fall hard" (title). "crater" becomes "fall hard" (lower).
-# - Idempotent: replacements never reintroduce banned words.
-# - Walks ALL text fields, not just body fields. Headlines/titles included.
-# - Records substitutions made for audit logging.
-_DRAMA_SUBSTITUTIONS = [
-    # (pattern, replacement) - replacement is lowercase form;
-    # case is restored from the matched span by _drama_sub_case_preserve.
-    # Pattern uses \b word boundaries on BOTH sides and requires verb form.
-
-    # CRASH family
-    (r"\bcrashed\b", "fell sharply"),
-    (r"\bcrashes\b", "falls sharply"),
-    (r"\bcrashing\b", "falling sharply"),
-    # Bare "crash" used as verb in headline-shorthand: "HOGS CRASH 6%", "CATTLE CRASH"
-    # Verb interpretation is dominant in briefing context. "The crash of 2020" type
-    # noun usage doesn't appear in this generator's vocabulary.
-    (r"\bcrash\b", "fall"),
-
-    # CRATER family (all forms - "crater" in price context is always verb/drama)
-    (r"\bcratered\b", "fell sharply"),
-    (r"\bcraters\b", "falls sharply"),
-    (r"\bcratering\b", "falling sharply"),
-    (r"\bcrater\b", "fall sharply"),
-
-    # EXPLODE family
-    (r"\bexploded\b", "ran higher"),
-    (r"\bexplodes\b", "runs higher"),
-    (r"\bexploding\b", "running higher"),
-    (r"\bexplode\b", "run higher"),
-    (r"\bexplosion\b", "sharp gain"),
-
-    # SURGE family
-    (r"\bsurged\b", "gained"),
-    (r"\bsurges\b", "gains"),
-    (r"\bsurging\b", "gaining"),
-    (r"\bsurge\b", "move higher"),
-
-    # SOAR family
-    (r"\bsoared\b", "moved higher"),
-    (r"\bsoars\b", "moves higher"),
-    (r"\bsoaring\b", "moving higher"),
-    (r"\bsoar\b", "rise"),
-
-    # ROCKET / SKYROCKET
-    (r"\brocketed\b", "ran higher"),
-    (r"\brocketing\b", "running higher"),
-    (r"\bskyrocketed\b", "ran higher"),
-    (r"\bskyrocketing\b", "running higher"),
-
-    # PLUNGE family
-    (r"\bplunged\b", "fell"),
-    (r"\bplunges\b", "falls"),
-    (r"\bplunging\b", "falling"),
-    (r"\bplunge\b", "drop"),
-
-    # PLUMMET family
-    (r"\bplummeted\b", "fell sharply"),
-    (r"\bplummets\b", "falls sharply"),
-    (r"\bplummeting\b", "falling sharply"),
-
-    # SPIKE family - flagged as headline failure on 2026-05-28 (hogs spike 2%)
-    # "Spike" verb form is drama; "spike" noun ("a spike in volatility") is fine
-    # but rare in briefing language. Bare form treated as verb here.
-    (r"\bspiked\b", "gained"),
-    (r"\bspikes\b", "gains"),
-    (r"\bspiking\b", "gaining"),
-    (r"\bspike\b", "move higher"),
-
-    # JUMP / JUMPS (verb form only - drama in headline/lead context)
-    # The editorial-notes May 28 entry flagged "jumped" in lead specifically.
-    (r"\bjumped\b", "gained"),
-    (r"\bjumps\b", "gains"),
-    (r"\bjumping\b", "gaining"),
-
-    # TUMBLE - "tumble" is in my replacement vocabulary so this is intentionally NOT scrubbed.
-    # It's working-ag voice for big drops, distinct from CNBC "crash/plunge/crater".
-
-    # SLASH (verb form only, "slash" as noun e.g. "/" preserved)
-    (r"\bslashed\b", "cut"),
-    (r"\bslashes\b", "cuts"),
-    (r"\bslashing\b", "cutting"),
-
-    # COLLAPSE family
-    (r"\bcollapsed\b", "broke down"),
-    (r"\bcollapses\b", "breaks down"),
-    (r"\bcollapsing\b", "breaking down"),
-    (r"\bcollapse\b", "breakdown"),
-
-    # ROUT
-    (r"\brout\b", "selling"),
-    (r"\brouted\b", "sold off"),
-
-    # EXODUS / FLEEING / PANIC
-    (r"\bexodus\b", "stepping out"),
-    (r"\bfleeing\b", "rotating out"),
-    (r"\bpanic\b", "selling pressure"),
-    (r"\bpanicked\b", "stepped out"),
-
-    # IGNITED / CAUGHT FIRE / TORCHED
-    (r"\bignited\b", "started"),
-    (r"\bignites\b", "starts"),
-    (r"\bigniting\b", "starting"),
-    (r"\bignite\b", "kick off"),
-    (r"\btorched\b", "broke"),
-    (r"\btorches\b", "breaks"),
-
-    # BLOODBATH / CARNAGE / MELTDOWN
-    (r"\bbloodbath\b", "heavy selling"),
-    (r"\bcarnage\b", "heavy selling"),
-    (r"\bmeltdown\b", "selloff"),
-
-    # VAULTED / LEAPED
-    (r"\bvaulted\b", "moved up"),
-    (r"\bleaped\b", "moved up"),
-    (r"\bleapt\b", "moved up"),
-
-    # CAUGHT FIRE (multi-word - must come before single-word patterns)
-    (r"\bcaught fire\b", "took off"),
-
-    # BINARY (already in critic ban list, mechanically scrub anyway)
-    (r"\bbinary level\b", "make-or-break level"),
-    (r"\bbinary week\b", "make-or-break week"),
-    (r"\bbinary support\b", "key support"),
-    (r"\bbinary test\b", "make-or-break test"),
-    (r"\bbinary\b", "make-or-break"),
-]
+# The single-purpose entry points, kept for callers that want one scrubber.
+# Each is the same rule set as in scrub_briefing, run alone.
 
-# Pre-compile patterns once
-_DRAMA_COMPILED = [(re.compile(pat, re.IGNORECASE), repl) for pat, repl in _DRAMA_SUBSTITUTIONS]
-
-
-def _drama_sub_case_preserve(match, replacement):
-    """Match case of the original token: upper -> upper, title -> title, lower -> lower.
-    For multi-word replacements, applies case to first word; subsequent words follow
-    the same case style if the match was all-caps, otherwise lowercase."""
-    matched = match.group(0)
-    if matched.isupper():
-        return replacement.upper()
-    if matched[0].isupper() and matched[1:].islower():
-        # Title case: capitalize first letter only
-        return replacement[0].upper() + replacement[1:].lower()
-    return replacement.lower()
-
-
-# Fields where we walk and scrub. Includes EVERY text-bearing field, not just
-# body fields, because drama verbs in headlines/titles are exactly the failure
-# mode the critic cannot fix.
-_SCRUBBED_FIELDS = {
-    # Top-level
-    "headline", "subheadline", "lead", "subhead",
-    "the_takeaway", "teaser", "title", "label", "name",
-    # Section fields
-    "body", "bottom_line", "vs_yesterday", "catalyst", "driver",
-    "context", "commentary", "note", "status_text", "summary",
-    "farmer_action", "action", "story",
-    # Watch list / spread / basis
-    "headline", "commentary", "question",
-    # The Number
-    "value", "unit", "explanation",
-    # TMYK
-    "title", "body",
-    # Outside the Pit
-    "headline", "summary",
-    # Misc
-    "call", "outcome_note", "level",
-}
+def sanitize_em_dashes(briefing):
+    """v4.4.1: em dash -> ", " when space-bracketed, else "-" (en dash too)."""
+    return briefing_scrub.scrub(briefing, only=("dashes",)).briefing
 
 
-_EMOJI_RE = re.compile(
-    "[\u2600-\u26FF\u2700-\u2712\u2714-\u2716\u2718-\u27BF"  # misc symbols + dingbats, sparing check/x
-    "\u2B00-\u2BFF\uFE0F\u200D"
-    "\U0001F000-\U0001FBFF]"
-)
+def sanitize_html_tags(briefing):
+    """v4.5.0: literal <strong>/<em> in body fields -> **markdown**."""
+    return briefing_scrub.scrub(briefing, only=("html_tags",)).briefing
 
 
 def scrub_emoji(briefing):
-    """v4.7: strip emoji/pictographs from every string in the briefing and
-    delete sections[].icon (the frontends render nothing when absent).
-    Keeps plain UI glyphs (checkmark U+2713, ballot X U+2717, arrows,
-    geometric shapes). Idempotent."""
-    def clean(s):
-        out = _EMOJI_RE.sub("", s)
-        if out != s:
-            out = re.sub(r"  +", " ", out).strip()
-        return out
-
-    def walk(obj):
-        if isinstance(obj, dict):
-            obj.pop("icon", None)
-            return {k: walk(v) for k, v in obj.items()}
-        if isinstance(obj, list):
-            return [walk(v) for v in obj]
-        if isinstance(obj, str):
-            return clean(obj)
-        return obj
-
-    return walk(briefing)
+    """v4.7: strip emoji/pictographs and drop sections[].icon."""
+    return briefing_scrub.scrub(briefing, only=("emoji",)).briefing
 
 
 def scrub_drama_verbs(briefing):
-    """v4.6.1: deterministic post-pass to remove banned CNBC drama verbs from
-    every text field in the briefing. Runs AFTER the critic rewrite, before
-    save_briefing(), as a belt-and-suspenders catch for fields the critic
-    cannot rewrite (headlines, section titles) or chose not to rewrite (the
-    critic rewrites only ONE weakest_target per pass).
-
-    Records all substitutions made and prints a summary for the workflow log.
-    Returns (modified_briefing, substitution_log) where log is a list of
-    dicts: [{field_path, before_phrase, after_phrase}, ...].
-
-    Idempotent: running this twice produces the same result as running once,
-    because the replacements never reintroduce banned words.
-
-    Case-preserving: handles UPPER, Title, and lower case input correctly.
-    Headline "HOGS CRATER 6%" becomes "HOGS SHARP DROP 6%" (preserves caps).
-    """
-    log = []
-
-    def scrub_string(s, field_path):
-        if not isinstance(s, str) or not s:
-            return s
-        original = s
-        for pattern, replacement in _DRAMA_COMPILED:
-            def _sub(m):
-                substituted = _drama_sub_case_preserve(m, replacement)
-                log.append({
-                    "field": field_path,
-                    "before": m.group(0),
-                    "after": substituted,
-                })
-                return substituted
-            s = pattern.sub(_sub, s)
-        return s
-
-    def walk(obj, path="$"):
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                child_path = f"{path}.{k}"
-                if isinstance(v, str) and k in _SCRUBBED_FIELDS:
-                    obj[k] = scrub_string(v, child_path)
-                else:
-                    obj[k] = walk(v, child_path)
-            return obj
-        if isinstance(obj, list):
-            return [walk(item, f"{path}[{i}]") for i, item in enumerate(obj)]
-        return obj
-
-    walk(briefing)
-
-    if log:
-        print(f"  [v4.6.1 scrubber] applied {len(log)} drama-verb substitution(s):")
-        # Group by field for readable output
-        from collections import defaultdict
-        by_field = defaultdict(list)
-        for entry in log:
-            by_field[entry["field"]].append((entry["before"], entry["after"]))
-        for field, subs in by_field.items():
-            print(f"    {field}: " + ", ".join(f"\"{b}\" -> \"{a}\"" for b, a in subs))
-    else:
-        print(f"  [v4.6.1 scrubber] no drama verbs found, briefing clean")
-
-    return briefing, log
+    """v4.6.1: banned CNBC drama verbs -> plain verbs, case-preserving.
+    Returns (briefing, log) with log entries {field, before, after}."""
+    res = briefing_scrub.scrub(briefing, only=("drama",))
+    return res.briefing, [{k: e[k] for k in ("field", "before", "after")} for e in res.log]
 
 
 # v4.5.0: lookup table mapping commodity keywords found in prose to the
@@ -3381,7 +3131,7 @@ def _has_tense_skip_marker(window):
     return any(m in w for m in _TENSE_SKIP_MARKERS)
 
 
-def validate_level_coherence(briefing, locked_prices):
+def validate_level_coherence(briefing, locked_prices, fields=None):
     """v4.5.0: deterministic check for the math contradiction class
     (close above $X paired with claim that the level was broken).
 
@@ -3395,9 +3145,14 @@ def validate_level_coherence(briefing, locked_prices):
     enough to allow editorial framing like 'broke $250' when the close
     is $250.05 (5 cent differential, ~0.02% off the level).
 
+    fields: the briefing_scrub.Fields view from scrub_briefing, so the prose
+    is read without walking the briefing again.
+
     Returns a list of human-readable warnings (empty if all coherent)."""
     if not locked_prices:
         return []
+    if fields is None:
+        fields = briefing_scrub.Fields.of(briefing)
 
     warnings = []
     parts = []
@@ -3406,21 +3161,16 @@ def validate_level_coherence(briefing, locked_prices):
     # the surrounding context tight so commodity inference works - we
     # don't want a section about cattle to inherit a level claim from a
     # different section's prose.
-    for field in ("headline", "subheadline", "lead", "the_takeaway"):
-        v = briefing.get(field, "")
+    for field in ("headline", "subheadline", "lead", "the_takeaway", "one_number.context"):
+        v = fields.get(field, "")
         if isinstance(v, str) and v:
             parts.append((v, field))
-    one_num = briefing.get("one_number") or {}
-    if isinstance(one_num, dict):
-        ctx = one_num.get("context", "")
-        if isinstance(ctx, str) and ctx:
-            parts.append((ctx, "one_number.context"))
-    for i, sec in enumerate(briefing.get("sections", []) or []):
+    for i, sec in enumerate(fields.get("sections") or []):
         if not isinstance(sec, dict):
             continue
-        title = sec.get("title", "")
+        title = fields.get(f"sections[{i}].title", "")
         for fname in ("body", "bottom_line", "catalyst", "vs_yesterday"):
-            v = sec.get(fname, "")
+            v = fields.get(f"sections[{i}].{fname}", "")
             if isinstance(v, str) and v:
                 # Carry the section title forward as commodity context;
                 # it often names the commodity even when the body is
@@ -3433,11 +3183,10 @@ def validate_level_coherence(briefing, locked_prices):
     # warning forces price_validation_clean=false, it would BLOCK THE SEND on every losing
     # call (~half of all days). yesterdays_call correctness is owned deterministically by
     # grade_calls.py and the gate's call-outcome check, not by this prose scanner.
-    tmyk = briefing.get("the_more_you_know") or briefing.get("tmyk") or {}
-    if isinstance(tmyk, dict):
-        v = tmyk.get("body", "")
-        if isinstance(v, str) and v:
-            parts.append((v, "the_more_you_know.body"))
+    tmyk = "the_more_you_know" if fields.get("the_more_you_know") else "tmyk"
+    v = fields.get(tmyk + ".body", "")
+    if isinstance(v, str) and v:
+        parts.append((v, "the_more_you_know.body"))
 
     # Pattern: any of the break verbs, then up to 30 chars, then $XX or
     # $XX.XX. The 30-char gap is generous enough to catch "broke through
@@ -3520,18 +3269,9 @@ def validate_level_coherence(briefing, locked_prices):
 
 
 def sanitize_weekend_blocks(briefing, market_status):
-    """v4.2 (Phase 2 C4): the prompt instructs the model to set
-    weekend-disallowed fields to empty on Sat/Sun/holidays. Models
-    occasionally violate. Wipe them in post to enforce the contract
-    regardless of what the model returned. Only acts when market_closed;
-    weekday data is untouched."""
-    if not market_status.get("is_closed"):
-        return briefing
-    weekend_disallowed = ["yesterdays_call", "weekly_thread"]
-    for key in weekend_disallowed:
-        if key in briefing:
-            briefing[key] = {}
-    return briefing
+    """v4.2 (Phase 2 C4): wipe the weekend-disallowed blocks when the market
+    is closed (briefing_scrub.WEEKEND_DISALLOWED); weekdays are untouched."""
+    return briefing_scrub.scrub(briefing, market_status, only=("weekend",)).briefing
 
 
 def main():
@@ -3683,28 +3423,14 @@ def main():
             # regime if report days turn out to grade differently.
             _tc["report_day"] = True
 
-    # v4.2 (Phase 2 C4): enforce weekend block contract regardless of
-    # what the model returned. On weekdays this is a no-op.
-    briefing = sanitize_weekend_blocks(briefing, market_status)
-    # v4.4.1: strip any em/en dashes that slipped through despite the
-    # prompt rule. Final defense before validation.
-    briefing = sanitize_em_dashes(briefing)
-    # v4.5.0: convert any literal <strong>/<em> HTML tags in body fields
-    # to **markdown**. The frontend mdInline helper handles either format
-    # but storing markdown keeps the JSON clean for downstream consumers
-    # (email pipeline, RSS, AI crawlers). Idempotent.
-    briefing = sanitize_html_tags(briefing)
-
-    # v4.6.1: drama-verb scrubber - deterministic post-pass after critic rewrite.
-    # Catches drama verbs in headlines/section titles/takeaways/TMYK titles that
-    # the critic cannot rewrite (not in weakest_target enum) or chose not to.
-    briefing, _scrub_log = scrub_drama_verbs(briefing)
-
-    # v4.7: EMOJI SCRUBBER. The briefing is emoji-free by prompt rule 20(d),
-    # but the model occasionally decorates anyway. Deterministic strip of all
-    # pictographs from every string field (keeps plain UI glyphs like check
-    # marks and arrows), and drops the legacy per-section icon field entirely.
-    briefing = scrub_emoji(briefing)
+    # Post-generation scrubbers, one walk (briefing_scrub, 2026-10-19):
+    #   v4.2  weekend block contract, regardless of what the model returned
+    #   v4.4.1 em/en dashes that slipped through the prompt rule
+    #   v4.5.0 literal <strong>/<em> in body fields -> **markdown**
+    #   v4.6.1 drama verbs in headlines/section titles/takeaways/TMYK titles
+    #          the critic cannot rewrite (not in weakest_target enum)
+    #   v4.7  emoji (prompt rule 20(d)) and the legacy per-section icon field
+    briefing, _scrub_log, prose = scrub_briefing(briefing, market_status)
 
     briefing, _wd_fixes = fix_weekday_labels(briefing)
     if _wd_fixes:
@@ -3716,7 +3442,7 @@ def main():
     # contradiction class (close above $X paired with claim that $X was
     # broken) that hit Monday 2026-05-04 and propagated forward via the
     # continuity feature for two days.
-    level_warnings = validate_level_coherence(briefing, locked_prices)
+    level_warnings = validate_level_coherence(briefing, locked_prices, fields=prose)
     if level_warnings:
         val_warnings.extend(level_warnings)
         # Level coherence is a PROSE heuristic: it can't tell "crude broke below $68
@@ -3779,6 +3505,9 @@ def main():
     briefing["market_status_reason"] = market_status["reason"]
     if "meta" not in briefing: briefing["meta"] = {}
     briefing["meta"]["overnight_surprises_count"] = len(surprises)
+    # Token and latency accounting for every generation request this run made;
+    # critique_briefing.py adds its own under "critic".
+    briefing["meta"]["api_usage"] = {"generate": list(call_claude.usage)}
     # Measured news coverage, not the model's claim about it. source_summary is
     # written BY the LLM and is a narrative; this is the tally. briefing_gate
     # holds it to a floor so a collapsing news base fails loudly instead of
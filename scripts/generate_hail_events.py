@@ -13,21 +13,38 @@ Honesty rules carried over: radar sizes labeled estimated, report counts
 labeled reported, no state named unless the data actually carries it.
 
 v1 — 2026-07-04
+v1.1 — 2026-10-19 (incremental). hail/pages.json persists the day index per
+events-YYYY.json, keyed by the file's hash, so a run re-parses only the year
+files that changed (normally just the current one). It also stores a hash of
+each page's inputs (the day's record and swath metadata) and the day they
+last changed: only days whose inputs moved are rendered, plus the hub. That
+day is the page's dateModified, which used to be today's date and made every
+run rewrite all ~200 pages. Each run prints rendered vs skipped counts and
+timings. The index is not shipped with the pages: the first mesh.yml run
+after this change finds none, renders every qualifying day once (the last
+full rewrite) and its commit step adds hail/pages.json with the pages.
 """
 
+import hashlib
 import json
 import os
 import re
 import sys
+import time
 from datetime import datetime, timezone
 
+import bake_engine
+import page_render
+import sitemap_model
+
 HAIL_DIR = "data/hail"
 MESH_DIR = "data/hail/mesh"
 OUT_DIR = "hail"
 SITEMAP = "sitemap.xml"
-MARK_A = "<!-- HAIL-EVENT-PAGES -->"
-MARK_B = "<!-- /HAIL-EVENT-PAGES -->"
+BLOCK = "HAIL-EVENT-PAGES"       # <!-- HAIL-EVENT-PAGES --> ... <!-- /HAIL-EVENT-PAGES -->
 MIN_REPORTS = 150          # report-count threshold for days with no swath file
+INDEX = "pages.json"       # in OUT_DIR; created by the first run, committed by mesh.yml
+PAGE_VERSION = 1           # bump when page_html changes, or unchanged days keep the old markup
 
 STATE_NAME = {"AL":"Alabama","AK":"Alaska","AZ":"Arizona","AR":"Arkansas","CA":"California","CO":"Colorado","CT":"Connecticut","DE":"Delaware","DC":"District of Columbia","FL":"Florida","GA":"Georgia","HI":"Hawaii","ID":"Idaho","IL":"Illinois","IN":"Indiana","IA":"Iowa","KS":"Kansas","KY":"Kentucky","LA":"Louisiana","ME":"Maine","MD":"Maryland","MA":"Massachusetts","MI":"Michigan","MN":"Minnesota","MS":"Mississippi","MO":"Missouri","MT":"Montana","NE":"Nebraska","NV":"Nevada","NH":"New Hampshire","NJ":"New Jersey","NM":"New Mexico","NY":"New York","NC":"North Carolina","ND":"North Dakota","OH":"Ohio","OK":"Oklahoma","OR":"Oregon","PA":"Pennsylvania","RI":"Rhode Island","SC":"South Carolina","SD":"South Dakota","TN":"Tennessee","TX":"Texas","UT":"Utah","VT":"Vermont","VA":"Virginia","WA":"Washington","WV":"West Virginia","WI":"Wisconsin","WY":"Wyoming"}
 
@@ -42,35 +59,57 @@ def nice_date(d):
         if sys.platform != "win32" else d
 
 
-def load_day_index():
-    """date -> {n, max, dmg (>=1.5in count), states Counter} from events files."""
-    days = {}
+def events_files():
     if not os.path.isdir(HAIL_DIR):
-        return days
-    for f in sorted(os.listdir(HAIL_DIR)):
-        m = re.match(r"events-(\d{4})\.json$", f)
-        if not m:
-            continue
-        year = m.group(1)
+        return []
+    return [f for f in sorted(os.listdir(HAIL_DIR)) if re.match(r"events-\d{4}\.json$", f)]
+
+
+def load_day_index(saved=None, stats=None):
+    """date -> {n, max, dmg (>=1.5in count), states Counter} from events files.
+    saved is the "years" map from a previous run ({file: {sha1, days}}): a
+    file whose bytes hash the same is not parsed again. It is updated in
+    place; stats["parsed"] lists the files that were."""
+    days = {}
+    saved = {} if saved is None else saved
+    for f in list(saved):
+        if not os.path.exists(os.path.join(HAIL_DIR, f)):
+            del saved[f]
+    for f in events_files():
         try:
-            d = json.load(open(os.path.join(HAIL_DIR, f)))
-        except (OSError, ValueError):
+            raw = open(os.path.join(HAIL_DIR, f), "rb").read()
+        except OSError:
             continue
-        for e in d.get("ev", []):
-            md = str(e[3]).replace("/", "-")
-            date = year + "-" + md
-            rec = days.setdefault(date, {"n": 0, "max": 0.0, "dmg": 0, "states": {}})
-            rec["n"] += 1
-            mag = e[2]
-            if mag is not None:
-                mag = float(mag)
-                if mag > rec["max"]:
-                    rec["max"] = mag
-                if mag >= 1.5:
-                    rec["dmg"] += 1
-            st = e[4] if len(e) > 4 and e[4] else None
-            if st:
-                rec["states"][st] = rec["states"].get(st, 0) + 1
+        digest = hashlib.sha1(raw).hexdigest()
+        if saved.get(f, {}).get("sha1") != digest:
+            try:
+                year_days = _year_days(f[len("events-"):-len(".json")], json.loads(raw))
+            except ValueError:
+                continue
+            saved[f] = {"sha1": digest, "days": year_days}
+            if stats is not None:
+                stats.setdefault("parsed", []).append(f)
+        days.update(saved[f]["days"])
+    return days
+
+
+def _year_days(year, d):
+    days = {}
+    for e in d.get("ev", []):
+        md = str(e[3]).replace("/", "-")
+        date = year + "-" + md
+        rec = days.setdefault(date, {"n": 0, "max": 0.0, "dmg": 0, "states": {}})
+        rec["n"] += 1
+        mag = e[2]
+        if mag is not None:
+            mag = float(mag)
+            if mag > rec["max"]:
+                rec["max"] = mag
+            if mag >= 1.5:
+                rec["dmg"] += 1
+        st = e[4] if len(e) > 4 and e[4] else None
+        if st:
+            rec["states"][st] = rec["states"].get(st, 0) + 1
     return days
 
 
@@ -91,7 +130,7 @@ def mesh_dates():
     return out
 
 
-def page_html(date, rec, has_swath, mesh_max, today):
+def page_html(date, rec, has_swath, mesh_max, modified):
     nd = nice_date(date)
     canonical = "https://agsist.com/hail/" + date
     n = rec["n"] if rec else 0
@@ -144,7 +183,7 @@ def page_html(date, rec, has_swath, mesh_max, today):
         "<link rel=\"stylesheet\" href=\"/components/styles.css\">\n"
         "<script type=\"application/ld+json\">{\"@context\":\"https://schema.org\",\"@graph\":["
         "{\"@type\":\"WebPage\",\"@id\":\"" + canonical + "#webpage\",\"url\":\"" + canonical + "\","
-        "\"name\":\"Hail on " + esc(nd) + "\",\"datePublished\":\"" + date + "\",\"dateModified\":\"" + today + "\","
+        "\"name\":\"Hail on " + esc(nd) + "\",\"datePublished\":\"" + date + "\",\"dateModified\":\"" + modified + "\","
         "\"isPartOf\":{\"@id\":\"https://agsist.com/#website\"},"
         "\"breadcrumb\":{\"@type\":\"BreadcrumbList\",\"itemListElement\":["
         "{\"@type\":\"ListItem\",\"position\":1,\"name\":\"Home\",\"item\":\"https://agsist.com/\"},"
@@ -214,55 +253,138 @@ def hub_html(dates_meta, today):
         "</div>\n</main>\n<div id=\"site-footer\"></div>\n<script src=\"/components/loader.js\" defer></script>\n</body>\n</html>\n")
 
 
-def main():
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    day_idx = load_day_index()
+def load_index():
+    try:
+        saved = json.load(open(os.path.join(OUT_DIR, INDEX)))
+    except (OSError, ValueError):
+        return {"years": {}, "pages": {}}
+    if saved.get("version") != PAGE_VERSION:
+        return {"years": saved.get("years", {}), "pages": {}}
+    return saved
+
+
+def save_index(idx):
+    text = json.dumps({"version": PAGE_VERSION, **idx}, sort_keys=True, separators=(",", ":")) + "\n"
+    path = os.path.join(OUT_DIR, INDEX)
+    if not os.path.exists(path) or open(path).read() != text:
+        open(path, "w", encoding="utf-8").write(text)
+
+
+def page_hash(rec, has_swath, mesh_max):
+    blob = json.dumps([PAGE_VERSION, rec, has_swath, mesh_max], sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+
+def generate(site=None, today=None):
+    """Write the storm pages + hub; the sitemap block is queued on site when given."""
+    today = today or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    t0 = time.perf_counter()
+    idx = load_index()
+    st = {}
+    day_idx = load_day_index(idx["years"], st)
     mdates = mesh_dates()
     qualifying = sorted(set(list(mdates.keys()) +
                             [d for d, r in day_idx.items() if r["n"] >= MIN_REPORTS]),
                         reverse=True)
     if not qualifying:
         print("no qualifying storm days — nothing to do")
-        return
-    os.makedirs(OUT_DIR, exist_ok=True)
-    made = 0
-    meta = []
+        return 0
+    t1 = time.perf_counter()
+    pages, tasks, meta = {}, [], []
     for d in qualifying:
         rec = day_idx.get(d)
         has_swath = d in mdates
-        html = page_html(d, rec, has_swath, mdates.get(d), today)
         meta.append((d, {"n": rec["n"] if rec else 0,
                          "max": rec["max"] if rec else 0, "swath": has_swath}))
-        path = os.path.join(OUT_DIR, d + ".html")
-        prev = open(path).read() if os.path.exists(path) else None
-        if prev != html:
-            open(path, "w", encoding="utf-8").write(html)
-            made += 1
-    hub = hub_html(meta, today)
-    hp = os.path.join(OUT_DIR, "index.html")
-    if not os.path.exists(hp) or open(hp).read() != hub:
-        open(hp, "w", encoding="utf-8").write(hub)
-    print(f"storm pages: {made} written/updated of {len(qualifying)} qualifying days · hub updated")
+        h = page_hash(rec, has_swath, mdates.get(d))
+        prev = idx["pages"].get(d)
+        if prev and prev["hash"] == h and os.path.exists(os.path.join(OUT_DIR, d + ".html")):
+            pages[d] = prev
+            continue
+        pages[d] = {"hash": h, "modified": today}
+        tasks.append((d + ".html", page_html, (d, rec, has_swath, mdates.get(d), today)))
+    tasks.append(("index.html", hub_html, (meta, today)))
+    res = page_render.render(tasks, OUT_DIR)
+    for f in res.unchanged:           # same bytes as before: keep the old dateModified
+        d = f[:-len(".html")]
+        if d in idx["pages"] and d in pages:
+            pages[d]["modified"] = idx["pages"][d]["modified"]
+    idx["pages"] = pages
+    save_index(idx)
+    t2 = time.perf_counter()
+    made = len([f for f in res.written if f != "index.html"])
+    print(f"storm pages: {len(tasks) - 1} rendered ({made} written), {len(qualifying) - len(tasks) + 1} "
+          f"skipped of {len(qualifying)} qualifying days · hub "
+          + ("updated" if "index.html" in res.written else "unchanged")
+          + f" · events re-parsed: {', '.join(st.get('parsed', [])) or 'none'}"
+          + f" · index {1000 * (t1 - t0):.0f} ms, render {1000 * (t2 - t1):.0f} ms")
 
     # sitemap block
+    rows = [("https://agsist.com/hail/", today, "daily", "0.7")] + [
+        ("https://agsist.com/hail/" + d, max(d, today if i == 0 else d), "monthly", "0.5")
+        for i, d in enumerate(qualifying)]
+    if site is not None:
+        sitemap_model.edit(site.page(SITEMAP), lambda sm: sm.set_block(BLOCK, rows))
+        return made
     try:
-        sm = open(SITEMAP, encoding="utf-8").read()
+        sm = sitemap_model.Sitemap.load(SITEMAP)
     except FileNotFoundError:
         print("sitemap.xml missing — skipped")
-        return
-    block = (MARK_A + "\n  <url><loc>https://agsist.com/hail/</loc><lastmod>" + today +
-             "</lastmod><changefreq>daily</changefreq><priority>0.7</priority></url>" +
-             "".join("\n  <url><loc>https://agsist.com/hail/" + d +
-                     "</loc><lastmod>" + max(d, today if i == 0 else d) +
-                     "</lastmod><changefreq>monthly</changefreq><priority>0.5</priority></url>"
-                     for i, d in enumerate(qualifying)) + "\n  " + MARK_B)
-    if MARK_A in sm and MARK_B in sm:
-        new = re.sub(re.escape(MARK_A) + r".*?" + re.escape(MARK_B), block, sm, flags=re.S)
-    else:
-        new = sm.replace("</urlset>", "  " + block + "\n</urlset>")
-    if new != sm:
-        open(SITEMAP, "w", encoding="utf-8").write(new)
+        return made
+    sm.set_block(BLOCK, rows)
+    if sm.write(SITEMAP):
         print(f"sitemap: {len(qualifying)+1} storm-log URLs")
+    return made
+
+
+@bake_engine.baker("hail_events", reads=(HAIL_DIR + "/events-*.json", MESH_DIR + "/index.json"),
+                   writes=(OUT_DIR + "/*.html", f"{OUT_DIR}/{INDEX}", SITEMAP), external=True)
+def bake_site(site):
+    return f"{generate(site)} storm pages rewritten"
+
+
+def selftest():
+    """Incremental behaviour on a temp copy of data/hail: a rerun renders
+    nothing but the hub, one new report re-parses one year and re-renders
+    one day, and unchanged days keep their dateModified."""
+    import shutil
+    import tempfile
+    here = os.getcwd()
+    with tempfile.TemporaryDirectory() as td:
+        shutil.copytree(HAIL_DIR, os.path.join(td, HAIL_DIR), ignore=shutil.ignore_patterns("ncei"))
+        os.chdir(td)
+        try:
+            n1 = generate(today="2026-08-01")
+            idx = load_index()
+            days = sorted(idx["pages"])
+            assert n1 == len(days) > 100 and len(idx["years"]) == len(events_files()), (n1, len(days))
+            assert generate(today="2026-08-02") == 0, "rerun rewrote storm pages"
+            day = days[-1]
+            y = day[:4]
+            f = os.path.join(HAIL_DIR, f"events-{y}.json")
+            d = json.load(open(f))
+            d["ev"].append([41.6, -93.6, 4.5, day[5:], "IA"])
+            json.dump(d, open(f, "w"))
+            st = {}
+            load_day_index(load_index()["years"], st)
+            assert st["parsed"] == [f"events-{y}.json"], st
+            assert generate(today="2026-08-03") == 1, "one new report should rewrite one day"
+            page = open(os.path.join(OUT_DIR, day + ".html")).read()
+            assert '"dateModified":"2026-08-03"' in page and "4.50&Prime;" in page
+            other = open(os.path.join(OUT_DIR, days[0] + ".html")).read()
+            assert '"dateModified":"2026-08-01"' in other, "an untouched day's dateModified moved"
+            hub = open(os.path.join(OUT_DIR, "index.html")).read()
+            assert '"dateModified":"2026-08-03"' in hub
+        finally:
+            os.chdir(here)
+    print(f"SELFTEST OK — {n1} storm pages; rerun rendered none; one new report "
+          f"re-parsed events-{y}.json only and rewrote {day} alone")
+
+
+def main():
+    if "--selftest" in sys.argv:
+        return selftest()
+    generate()
 
 
 if __name__ == "__main__":
@@ -14,19 +14,23 @@ Idempotent: identical inputs produce identical pages; sitemap entries live
 between marker comments and are fully regenerated each run.
 
 v1.1 — 2026-07-03 (cross-state link mesh on every page)
+v1.2 — 2026-10-19 (rendered through page_render: link mesh built once, a page
+is compared by stored hash instead of re-read, pool-ready for county pages)
 """
 
 import json
-import os
 import re
 import sys
 from datetime import datetime, timezone
 
+import bake_engine
+import page_render
+import sitemap_model
+
 SC = "data/hail/state-counties.json"
 OUTDIR = "hail-map"
 SITEMAP = "sitemap.xml"
-MARK_A = "<!-- HAIL-STATE-PAGES -->"
-MARK_B = "<!-- /HAIL-STATE-PAGES -->"
+BLOCK = "HAIL-STATE-PAGES"       # <!-- HAIL-STATE-PAGES --> ... <!-- /HAIL-STATE-PAGES -->
 
 STATE_NAME = {"AL":"Alabama","AK":"Alaska","AZ":"Arizona","AR":"Arkansas","CA":"California","CO":"Colorado","CT":"Connecticut","DE":"Delaware","DC":"District of Columbia","FL":"Florida","GA":"Georgia","HI":"Hawaii","ID":"Idaho","IL":"Illinois","IN":"Indiana","IA":"Iowa","KS":"Kansas","KY":"Kentucky","LA":"Louisiana","ME":"Maine","MD":"Maryland","MA":"Massachusetts","MI":"Michigan","MN":"Minnesota","MS":"Mississippi","MO":"Missouri","MT":"Montana","NE":"Nebraska","NV":"Nevada","NH":"New Hampshire","NJ":"New Jersey","NM":"New Mexico","NY":"New York","NC":"North Carolina","ND":"North Dakota","OH":"Ohio","OK":"Oklahoma","OR":"Oregon","PA":"Pennsylvania","RI":"Rhode Island","SC":"South Carolina","SD":"South Dakota","TN":"Tennessee","TX":"Texas","UT":"Utah","VT":"Vermont","VA":"Virginia","WA":"Washington","WV":"West Virginia","WI":"Wisconsin","WY":"Wyoming"}
 
@@ -42,9 +46,12 @@ def esc(s):
             .replace(">", "&gt;").replace('"', "&quot;"))
 
 
+STATE_LINKS = [(n, '<a href="/hail-map/' + slug(n) + '">' + esc(n) + "</a>")
+               for n in sorted(STATE_NAME.values())]      # built once, not per page
+
+
 def all_state_links(current):
-    return " ".join('<a href="/hail-map/' + slug(n) + '">' + esc(n) + "</a>"
-                    for n in sorted(STATE_NAME.values()) if n != current)
+    return " ".join(a for n, a in STATE_LINKS if n != current)
 
 
 def merge_counties(rows, n_yrs):
@@ -223,47 +230,49 @@ def page_html(abbr, name, rows, years, dmg_in, today):
         "<script src=\"/components/loader.js\" defer></script>\n</body>\n</html>\n")
 
 
-def main():
+def generate(site=None):
+    """Write the state pages; the sitemap block is queued on site when given."""
     today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
     try:
-        d = json.load(open(SC))
+        d = site.json(SC) if site is not None else json.load(open(SC))
     except Exception as e:
         print("FATAL: cannot read", SC, e)
         sys.exit(1)
     years = d.get("years", [])
     dmg_in = d.get("damaging_in", 1.5)
     states = d.get("states", {})
-    os.makedirs(OUTDIR, exist_ok=True)
-    made = []
-    for abbr, name in STATE_NAME.items():
-        rows = states.get(abbr) or []
-        html = page_html(abbr, name, rows, years, dmg_in, today)
-        path = os.path.join(OUTDIR, slug(name) + ".html")
-        prev = open(path).read() if os.path.exists(path) else None
-        if prev != html:
-            open(path, "w", encoding="utf-8").write(html)
-            made.append(slug(name))
+    tasks = [(slug(name) + ".html", page_html, (abbr, name, states.get(abbr) or [], years, dmg_in, today))
+             for abbr, name in STATE_NAME.items()]
+    res = page_render.render(tasks, OUTDIR)
+    made = [f[:-len(".html")] for f in res.written]
     print(f"pages written/updated: {len(made)} of {len(STATE_NAME)}")
 
     # sitemap block between markers, fully regenerated
+    rows = [("https://agsist.com/hail-map/" + slug(n), today, "monthly", "0.6")
+            for n in STATE_NAME.values()]
+    if site is not None:
+        sitemap_model.edit(site.page(SITEMAP), lambda sm: sm.set_block(BLOCK, rows))
+        return made
     try:
-        sm = open(SITEMAP, encoding="utf-8").read()
+        sm = sitemap_model.Sitemap.load(SITEMAP)
     except FileNotFoundError:
         print("sitemap.xml missing — skipped")
-        return
-    block = MARK_A + "".join(
-        "\n  <url><loc>https://agsist.com/hail-map/" + slug(n) + "</loc><lastmod>" + today +
-        "</lastmod><changefreq>monthly</changefreq><priority>0.6</priority></url>"
-        for n in STATE_NAME.values()) + "\n  " + MARK_B
-    if MARK_A in sm and MARK_B in sm:
-        new = re.sub(re.escape(MARK_A) + r".*?" + re.escape(MARK_B), block, sm, flags=re.S)
-    else:
-        new = sm.replace("</urlset>", "  " + block + "\n</urlset>")
-    if new != sm:
-        open(SITEMAP, "w", encoding="utf-8").write(new)
+        return made
+    sm.set_block(BLOCK, rows)
+    if sm.write(SITEMAP):
         print("sitemap: state pages block updated")
     else:
         print("sitemap: no change")
+    return made
+
+
+@bake_engine.baker("hail_states", reads=(SC,), writes=(OUTDIR + "/*.html", SITEMAP), external=True)
+def bake_site(site):
+    return f"{len(generate(site))} of {len(STATE_NAME)} state pages rewritten"
+
+
+def main():
+    generate()
 
 
 if __name__ == "__main__":
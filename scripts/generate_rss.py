@@ -3,10 +3,41 @@
 generate_rss.py — Build feed.xml from data/daily-archive/index.json
 Run via GitHub Actions after every daily briefing push.
 Output: /feed.xml (root of repo / served at agsist.com/feed.xml)
+
+Item cache + more feeds (2026-10-19): every run used to re-open up to 30
+dated briefings and rewrite feed.xml even when nothing new had published,
+so the feed changed every run on lastBuildDate alone. data/feed-items.json
+now keeps each briefing's item (title, dates, summary and full text,
+commodity tags, and its rendered feed.xml <item>) under a key hashed from
+its index entry, its briefing file's size and this file's source. All of
+that survives a fresh checkout, so a CI run opens only new or resized
+briefings (an edit that keeps both the index entry and the byte count is
+not seen). A feed whose body is unchanged is not written, so its
+lastBuildDate stays put too. Only briefings some feed can still publish are
+looked at and cached: newest first, until feed.xml and every commodity feed
+hold MAX_ITEMS, and never past LOOKBACK, so neither the work nor the cache
+grows with the archive.
+
+Tags come from the headline and subheadline, not the sections: every
+briefing carries a section per complex ("ENERGY & INPUTS", "Energy: Crude
+Holds"), and their titles and bodies name energy and cattle almost every
+day, which made those feeds copies of feed.xml.
+
+Every feed is a view over the same items, so another one is a few lines:
+  feed.xml              the last MAX_ITEMS briefings, summaries (as before)
+  feed-full.xml         the same briefings, full text
+  feed.json             JSON Feed 1.1 of feed.xml
+  feeds/<commodity>.xml the last MAX_ITEMS briefings that cover it (COMMODITIES)
+
+  python3 scripts/generate_rss.py
+  python3 scripts/generate_rss.py --selftest
 """
 
+import hashlib
 import json
 import os
+import re
+import sys
 from datetime import datetime
 from xml.sax.saxutils import escape
 
@@ -18,9 +49,24 @@ DESC     = ("Free daily agricultural market briefing for corn, soybean, and grai
 LINK     = f"{SITE}/daily"
 IMG_URL  = f"{SITE}/img/og/agsist.jpg"
 MAX_ITEMS = 30  # keep last 30 briefings in feed
+LOOKBACK  = 90  # newest briefings a commodity feed may reach back through (~a season)
+
+ROOT = "."                                  # repo root; the selftest points it at a temp dir
+CACHE = os.path.join("data", "feed-items.json")
+
+# slug -> (feed title, pattern over the headline and subheadline)
+COMMODITIES = {
+    "corn":     ("Corn", r"\bcorn\b"),
+    "soybeans": ("Soybeans", r"\bsoy|\bbeans?\b"),
+    "wheat":    ("Wheat", r"\bwheat\b"),
+    "cattle":   ("Cattle", r"\bcattle\b|\bfeeders?\b|\bbeef\b"),
+    "hogs":     ("Hogs", r"\bhogs?\b|\bpork\b"),
+    "dairy":    ("Dairy", r"\bdairy\b|\bmilk\b"),
+    "energy":   ("Energy", r"\bcrude\b|\bdiesel\b|\bwti\b|\bbrent\b|\bnat(?:ural)? ?gas\b|\benergy\b"),
+}
 
 def load_archive():
-    path = os.path.join("data", "daily-archive", "index.json")
+    path = os.path.join(ROOT, "data", "daily-archive", "index.json")
     if not os.path.exists(path):
         print(f"[RSS] index.json not found at {path}, skipping.")
         return []
@@ -36,19 +82,31 @@ def rfc822(date_iso: str) -> str:
     except Exception:
         return date_iso
 
+def briefing_bytes(date_iso: str) -> bytes:
+    """The dated briefing JSON as stored, b"" when absent."""
+    path = os.path.join(ROOT, "data", "daily-archive", f"{date_iso}.json")
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return b""
+
+def briefing_size(date_iso: str) -> int:
+    """Byte size of the dated briefing, -1 when absent."""
+    try:
+        return os.path.getsize(os.path.join(ROOT, "data", "daily-archive", f"{date_iso}.json"))
+    except OSError:
+        return -1
+
 def load_briefing_detail(date_iso: str) -> dict:
     """Try to load the full briefing JSON for richer description."""
-    path = os.path.join("data", "daily-archive", f"{date_iso}.json")
-    if not os.path.exists(path):
-        return {}
     try:
-        with open(path, "r") as f:
-            return json.load(f)
+        return json.loads(briefing_bytes(date_iso) or b"{}")
     except Exception:
         return {}
 
-def build_description(entry: dict, detail: dict) -> str:
-    """Build a plain-text RSS description from available data."""
+def description_text(entry: dict, detail: dict) -> str:
+    """Plain-text RSS description from available data."""
     parts = []
     lead = detail.get("lead") or entry.get("headline", "")
     if lead:
@@ -65,59 +123,284 @@ def build_description(entry: dict, detail: dict) -> str:
         if action:
             parts.append(f"  → {action}")
     parts.append(f"Read more: {SITE}/daily/{entry['date']}")
-    return escape("\n".join(parts))
+    return "\n".join(parts)
 
-def generate():
-    briefings = load_archive()
-    if not briefings:
-        print("[RSS] No briefings found, writing empty feed.")
-        briefings = []
+def build_description(entry: dict, detail: dict) -> str:
+    """Build a plain-text RSS description from available data."""
+    return escape(description_text(entry, detail))
+
+def full_text(entry: dict, detail: dict) -> str:
+    """The whole briefing as plain text: lead, takeaway, every section."""
+    parts = [p for p in (detail.get("lead") or entry.get("headline", ""),
+                         detail.get("subheadline", ""), detail.get("the_takeaway", "")) if p]
+    for sec in detail.get("sections", []):
+        parts.append(f"• {sec.get('title', '')}".rstrip(" •"))
+        for key in ("body", "bottom_line", "farmer_action"):
+            if sec.get(key):
+                parts.append(sec[key] if key == "body" else f"  → {sec[key]}")
+    parts.append(f"Read more: {SITE}/daily/{entry['date']}")
+    return "\n\n".join(parts)
 
-    # Sort newest first, cap at MAX_ITEMS
-    briefings = sorted(briefings, key=lambda x: x.get("date", ""), reverse=True)[:MAX_ITEMS]
+def tags(entry: dict, detail: dict) -> list:
+    """COMMODITIES slugs the briefing's headline or subheadline names."""
+    text = " ".join([entry.get("headline", ""), detail.get("subheadline", "")])
+    return [slug for slug, (_, pat) in COMMODITIES.items() if re.search(pat, text, re.I)]
 
-    now_rfc = datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S +0000")
+def rss_item(it: dict, text: str) -> str:
+    return f"""    <item>
+      <title>{escape(it["title"])}</title>
+      <link>{it["url"]}</link>
+      <guid isPermaLink="true">{it["url"]}</guid>
+      <pubDate>{rfc822(it["date"])}</pubDate>
+      <description>{escape(text)}</description>
+    </item>"""
+
+def make_item(entry: dict) -> dict:
+    date   = entry.get("date", "")
+    detail = load_briefing_detail(date)
+    it = {
+        "date":    date,
+        "title":   entry.get("headline", f"AGSIST Daily — {date}"),
+        "url":     f"{SITE}/daily/{date}",
+        "summary": description_text(entry, detail),
+        "full":    full_text(entry, detail),
+        "tags":    tags(entry, detail),
+    }
+    it["rss"] = rss_item(it, it["summary"])
+    return it
+
+def source_version() -> str:
+    with open(__file__, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:16]
+
+def load_cache(path: str, field: str = "items") -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get(field, {})
+    except (OSError, ValueError, AttributeError):
+        return {}
 
-    items = []
-    for entry in briefings:
-        date     = entry.get("date", "")
-        headline = escape(entry.get("headline", f"AGSIST Daily — {date}"))
-        url      = f"{SITE}/daily/{date}"
-        pub_date = rfc822(date)
-        detail   = load_briefing_detail(date)
-        desc     = build_description(entry, detail)
-
-        items.append(f"""    <item>
-      <title>{headline}</title>
-      <link>{url}</link>
-      <guid isPermaLink="true">{url}</guid>
-      <pubDate>{pub_date}</pubDate>
-      <description>{desc}</description>
-    </item>""")
-
-    feed = f"""<?xml version="1.0" encoding="UTF-8"?>
+def save_json(path: str, doc: dict, **kw) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, sort_keys=True, **kw)
+
+def items(briefings: list, stats: dict = None) -> list:
+    """Items newest first, from the cache where the key still matches, until
+    every feed is full or LOOKBACK entries are in. Rewrites the cache
+    (entries for those dates only)."""
+    path = os.path.join(ROOT, CACHE)
+    version = source_version()
+    cache, fresh, out, made = load_cache(path), {}, [], 0
+    need = {slug: MAX_ITEMS for slug in COMMODITIES}
+    for entry in sorted(briefings, key=lambda x: x.get("date", ""), reverse=True):
+        if len(out) >= LOOKBACK or (len(out) >= MAX_ITEMS and not any(need.values())):
+            break
+        date = entry.get("date", "")
+        h = hashlib.sha1(version.encode())
+        h.update(json.dumps(entry, sort_keys=True).encode())
+        h.update(str(briefing_size(date)).encode())
+        key = h.hexdigest()
+        hit = cache.get(date)
+        if hit and hit.get("key") == key:
+            it = hit["item"]
+        else:
+            it, made = make_item(entry), made + 1
+        fresh[date] = {"key": key, "item": it}
+        out.append(it)
+        for slug in it["tags"]:
+            need[slug] = max(0, need[slug] - 1)
+    if fresh != cache:
+        save_json(path, {"items": fresh}, indent=1)
+    if stats is not None:
+        stats.update(rendered=made, cached=len(out) - made, older=len(briefings) - len(out))
+    return out
+
+def rss_doc(title: str, self_url: str, fragments: list, build_date: str) -> str:
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
 <rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
   <channel>
-    <title>{escape(TITLE)}</title>
+    <title>{escape(title)}</title>
     <link>{LINK}</link>
     <description>{escape(DESC)}</description>
     <language>en-us</language>
-    <lastBuildDate>{now_rfc}</lastBuildDate>
-    <atom:link href="{SITE}/feed.xml" rel="self" type="application/rss+xml"/>
+    <lastBuildDate>{build_date}</lastBuildDate>
+    <atom:link href="{self_url}" rel="self" type="application/rss+xml"/>
     <image>
       <url>{IMG_URL}</url>
-      <title>{escape(TITLE)}</title>
+      <title>{escape(title)}</title>
       <link>{LINK}</link>
     </image>
-{chr(10).join(items)}
+{chr(10).join(fragments)}
   </channel>
 </rss>
 """
 
-    out_path = "feed.xml"
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(feed)
-    print(f"[RSS] Wrote {len(items)} items to {out_path}")
+def json_feed(its: list) -> str:
+    return json.dumps({
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": TITLE,
+        "home_page_url": LINK,
+        "feed_url": f"{SITE}/feed.json",
+        "description": DESC,
+        "icon": IMG_URL,
+        "language": "en-US",
+        "items": [{"id": it["url"], "url": it["url"], "title": it["title"],
+                   "content_text": it["summary"],
+                   "date_published": f"{it['date']}T05:00:00-06:00",
+                   "tags": it["tags"]} for it in its],
+    }, indent=1, ensure_ascii=False) + "\n"
+
+_BUILD_DATE = re.compile(r"<lastBuildDate>[^<]*</lastBuildDate>")
+
+def write_feed(rel: str, text: str) -> bool:
+    """Write text to ROOT/rel unless the file already says the same thing,
+    lastBuildDate aside. -> True if written."""
+    path = os.path.join(ROOT, rel)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            old = f.read()
+    except OSError:
+        old = None
+    if old is not None and _BUILD_DATE.sub("", old) == _BUILD_DATE.sub("", text):
+        return False
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return True
+
+def feeds(its: list, now_rfc: str) -> dict:
+    """{path: text} for every feed over the items (newest first)."""
+    top = its[:MAX_ITEMS]
+    out = {
+        "feed.xml": rss_doc(TITLE, f"{SITE}/feed.xml", [it["rss"] for it in top], now_rfc),
+        "feed-full.xml": rss_doc(f"{TITLE} (full text)", f"{SITE}/feed-full.xml",
+                                 [rss_item(it, it["full"]) for it in top], now_rfc),
+        "feed.json": json_feed(top),
+    }
+    for slug, (label, _) in COMMODITIES.items():
+        sel = [it for it in its if slug in it["tags"]][:MAX_ITEMS]
+        out[f"feeds/{slug}.xml"] = rss_doc(f"AGSIST Daily — {label}", f"{SITE}/feeds/{slug}.xml",
+                                          [it["rss"] for it in sel], now_rfc)
+    return out
+
+def generate():
+    briefings = load_archive()
+    if not briefings:
+        print("[RSS] No briefings found, writing empty feed.")
+        briefings = []
+
+    now_rfc = datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S +0000")
+
+    stats = {}
+    its = items(briefings, stats)
+    written = [rel for rel, text in feeds(its, now_rfc).items() if write_feed(rel, text)]
+    print(f"[RSS] {stats['rendered']} items rendered, {stats['cached']} from the cache, "
+          f"{stats['older']} older briefings not opened; "
+          f"feed.xml has {min(len(its), MAX_ITEMS)} items")
+    print(f"[RSS] wrote {', '.join(written)}" if written else "[RSS] every feed unchanged, nothing written")
+    return written
+
+# ---------------------------------------------------------------- selftest
+def selftest():
+    import shutil
+    import tempfile
+    global ROOT, MAX_ITEMS, LOOKBACK
+    ok = True
+
+    def chk(cond, msg):
+        nonlocal ok
+        print(("  OK   " if cond else "  FAIL ") + msg)
+        ok = ok and cond
+
+    # every briefing carries the stock per-complex sections; they must not tag
+    STOCK = ["GRAINS & OILSEEDS", "LIVESTOCK & DAIRY", "ENERGY & INPUTS"]
+
+    def day(d, head, sub=""):
+        return {"date": d, "headline": head, "subheadline": sub, "lead": f"Lead for {d} & more.",
+                "sections": [{"title": t, "body": f"Body of {t}: crude, diesel, cattle, milk.",
+                              "farmer_action": "Sell <10%>."} for t in STOCK]}
+
+    print("generate_rss selftest")
+    td = tempfile.mkdtemp()
+    saved = ROOT, MAX_ITEMS, LOOKBACK
+    ROOT = td
+    try:
+        arch = os.path.join(td, "data", "daily-archive")
+        os.makedirs(arch)
+        days = [day("2026-08-%02d" % i, f"Day {i}: corn firm", "Cattle ease." if i % 2 else "Crude runs.")
+                for i in range(1, 6)]
+
+        def publish(ds):
+            for b in ds:
+                with open(os.path.join(arch, b["date"] + ".json"), "w") as f:
+                    json.dump(b, f)
+            with open(os.path.join(arch, "index.json"), "w") as f:
+                json.dump({"briefings": [{"date": b["date"], "headline": b["headline"]} for b in ds]}, f)
+
+        publish(days)
+        written = generate()
+        chk(sorted(written) == sorted(feeds([], "").keys()), "first run writes every feed")
+        feed = open(os.path.join(td, "feed.xml"), encoding="utf-8").read()
+        chk(feed.index("2026-08-05") < feed.index("2026-08-01"), "feed.xml newest first")
+        chk("Sell &lt;10%&gt;." in feed and "Lead for 2026-08-05 &amp; more." in feed, "descriptions escaped")
+        cattle = open(os.path.join(td, "feeds", "cattle.xml"), encoding="utf-8").read()
+        chk(cattle.count("<item>") == 3 and "2026-08-02" not in cattle, "category feed holds its briefings only")
+        dairy = open(os.path.join(td, "feeds", "dairy.xml"), encoding="utf-8").read()
+        chk("<item>" not in dairy, "stock section titles and bodies tag nothing")
+        full = open(os.path.join(td, "feed-full.xml"), encoding="utf-8").read()
+        chk("Body of GRAINS" in full and "Body of" not in feed, "full text only in feed-full.xml")
+        jf = json.load(open(os.path.join(td, "feed.json"), encoding="utf-8"))
+        chk(len(jf["items"]) == 5 and jf["items"][0]["tags"] == ["corn", "cattle"], "JSON Feed items and tags")
+
+        def opened(fn):
+            """Run fn, -> (stats, dated briefings make_item opened)."""
+            seen, real = [], globals()["load_briefing_detail"]
+            globals()["load_briefing_detail"] = lambda d: (seen.append(d), real(d))[1]
+            try:
+                st = {}
+                fn(st)
+                return st, seen
+            finally:
+                globals()["load_briefing_detail"] = real
+
+        p1 = os.path.join(arch, "2026-08-01.json")
+        os.utime(p1, ns=(os.stat(p1).st_atime_ns, os.stat(p1).st_mtime_ns + 10 ** 9))
+        st, seen = opened(lambda st: items(load_archive(), st))
+        chk(st == {"rendered": 0, "cached": 5, "older": 0} and seen == [],
+            f"new mtimes (a fresh checkout) open nothing: the key is index entry + size ({st})")
+        mtime = os.stat(os.path.join(td, "feed.xml")).st_mtime_ns
+        chk(generate() == [] and os.stat(os.path.join(td, "feed.xml")).st_mtime_ns == mtime,
+            "unchanged feeds are not written, lastBuildDate kept")
+
+        days[2]["subheadline"] = "Wheat slides."
+        days.append(day("2026-08-06", "Day 6", "Beans hold."))
+        publish(days)
+        st, seen = opened(lambda st: items(load_archive(), st))
+        chk(st["rendered"] == 2 and sorted(seen) == ["2026-08-03", "2026-08-06"],
+            f"edit + new briefing: only those two opened and rendered ({st})")
+        written = generate()
+        chk("feeds/wheat.xml" in written and "feeds/hogs.xml" not in written, "only feeds that changed are written")
+
+        MAX_ITEMS, LOOKBACK = 2, 4
+        st, seen = opened(lambda st: items(load_archive(), st))
+        cached = load_cache(os.path.join(td, CACHE))
+        chk(st["older"] == 2 and sorted(cached) == ["2026-08-03", "2026-08-04", "2026-08-05", "2026-08-06"],
+            f"reading and the cache stop at LOOKBACK while a feed is short ({st})")
+        MAX_ITEMS, LOOKBACK = 1, 4
+        days[-1]["subheadline"] = ", ".join(label for label, _ in COMMODITIES.values())
+        publish(days)
+        st, seen = opened(lambda st: items(load_archive(), st))
+        chk(st["older"] == 5 and seen == ["2026-08-06"],
+            f"...and as soon as every feed is full ({st})")
+    finally:
+        ROOT, MAX_ITEMS, LOOKBACK = saved
+        shutil.rmtree(td)
+
+    print("SELFTEST OK" if ok else "SELFTEST FAILED")
+    return 0 if ok else 1
 
 if __name__ == "__main__":
+    if "--selftest" in sys.argv:
+        sys.exit(selftest())
     generate()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+market_history.py — compact odds history for the /ag-odds prediction markets.
+
+WHY THIS FILE EXISTS
+  fetch_markets.main() picks the top markets and overwrites data/markets.json,
+  so every run started from nothing: the page could say "57% yes" but never
+  "57%, up 9 points this week". Asking Kalshi/Polymarket for price history
+  would mean another call per market per run. We already see every candidate
+  market once a day, so we keep what we saw.
+
+STORE  (data/markets-history.json)
+  Columnar per market, keyed "<platform>:<ticker>":
+      {"t": [epoch minutes...], "p": [yes %...], "v": [volume...]}
+  Points are appended by each run and compacted on save:
+      newer than RAW_HOURS      every point kept
+      up to HOURLY_DAYS old     last point per SIX_HOURS bucket
+      up to KEEP_DAYS old       last point per UTC day
+      older                     dropped
+  A market with no point inside STALE_DAYS (closed / delisted) is removed.
+
+QUERIES
+  summary(store, market_id, now, yes=None) -> {"d24h", "d7d", "spark"}
+      deltas in percentage points from the latest point at or before
+      24 h / 7 d ago (SLACK_MIN of cron jitter allowed) to `yes`, the price
+      the page shows next to them (the newest stored point when omitted),
+      and a SPARK_DAYS daily sparkline, oldest first. Missing history ->
+      None / short list.
+
+USAGE
+    import market_history as mh
+    store = mh.load()
+    mh.record(store, markets, now)
+    info = mh.summary(store, mh.market_id(m), now, m["yes"])
+    mh.save(store, now)
+
+Run `python3 scripts/market_history.py` for the selftest.
+"""
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+HISTORY_PATH = "data/markets-history.json"
+
+RAW_HOURS = 48
+HOURLY_DAYS = 14
+SIX_HOURS = 6 * 60
+KEEP_DAYS = 120
+STALE_DAYS = 30
+SPARK_DAYS = 14
+SLACK_MIN = 3 * 60
+
+DAY = 24 * 60
+
+
+def _minutes(now):
+    return int(now.timestamp() // 60)
+
+
+def market_id(m):
+    return f"{m.get('platform', '')}:{m.get('ticker', '')}"
+
+
+def load(path=HISTORY_PATH):
+    try:
+        with open(path) as f:
+            d = json.load(f)
+        if isinstance(d, dict) and isinstance(d.get("markets"), dict):
+            return d
+    except (OSError, ValueError):
+        pass
+    return {"version": 1, "markets": {}}
+
+
+def record(store, markets, now):
+    """Append one (t, yes, volume) point per market. Same-minute reruns overwrite."""
+    t = _minutes(now)
+    series = store["markets"]
+    for m in markets:
+        yes = m.get("yes")
+        if yes is None:
+            continue
+        s = series.setdefault(market_id(m), {"t": [], "p": [], "v": []})
+        vol = int(round(m.get("volume_24h") or 0))
+        if s["t"] and s["t"][-1] >= t:
+            s["t"][-1], s["p"][-1], s["v"][-1] = t, int(yes), vol
+        else:
+            s["t"].append(t)
+            s["p"].append(int(yes))
+            s["v"].append(vol)
+
+
+def _bucket(age, t):
+    """Compaction bucket for a point of the given age (minutes). None = keep."""
+    if age <= RAW_HOURS * 60:
+        return None
+    if age <= HOURLY_DAYS * DAY:
+        return ("6h", t // SIX_HOURS)
+    return ("d", t // DAY)
+
+
+def compact(store, now):
+    """Downsample old points per market; drop expired points and dead markets."""
+    t_now = _minutes(now)
+    series = store["markets"]
+    for mid in list(series):
+        s = series[mid]
+        if not s["t"] or t_now - s["t"][-1] > STALE_DAYS * DAY:
+            del series[mid]
+            continue
+        keep, last_bucket = [], object()
+        # walk newest -> oldest so "last point per bucket" is the first seen
+        for i in range(len(s["t"]) - 1, -1, -1):
+            age = t_now - s["t"][i]
+            if age > KEEP_DAYS * DAY:
+                break
+            b = _bucket(age, s["t"][i])
+            if b is not None and b == last_bucket:
+                continue
+            last_bucket = b
+            keep.append(i)
+        keep.reverse()
+        for k in ("t", "p", "v"):
+            s[k] = [s[k][i] for i in keep]
+    return store
+
+
+def save(store, now, path=HISTORY_PATH):
+    compact(store, now)
+    store["updated"] = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(store, f, separators=(",", ":"), sort_keys=True)
+
+
+def _at_or_before(s, t):
+    """Index of the latest point with time <= t, or None."""
+    lo, hi = 0, len(s["t"])
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if s["t"][mid] <= t:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo - 1 if lo else None
+
+
+def summary(store, mid, now, yes=None):
+    s = store["markets"].get(mid)
+    out = {"d24h": None, "d7d": None, "spark": []}
+    if not s or not s["t"]:
+        return out
+    t_now = _minutes(now)
+    latest = s["p"][-1] if yes is None else int(yes)
+    for key, back in (("d24h", DAY), ("d7d", 7 * DAY)):
+        i = _at_or_before(s, t_now - back + SLACK_MIN)
+        if i is not None and i != len(s["t"]) - 1:
+            out[key] = latest - s["p"][i]
+    spark, last_day = [], None
+    for t, p in zip(s["t"], s["p"]):
+        if t_now - t > SPARK_DAYS * DAY:
+            continue
+        if t // DAY == last_day:
+            spark[-1] = p
+        else:
+            spark.append(p)
+            last_day = t // DAY
+    out["spark"] = spark
+    return out
+
+
+def _selftest():
+    ok = True
+
+    def chk(cond, msg):
+        nonlocal ok
+        print(("  OK   " if cond else "  FAIL ") + msg)
+        if not cond:
+            ok = False
+
+    print("market_history selftest")
+    T = lambda d, h=9: datetime(2026, 8, d, h, 23, tzinfo=timezone.utc)
+    m = lambda yes, tk="3096413", vol=1000.0: {"platform": "Polymarket", "ticker": tk,
+                                               "yes": yes, "volume_24h": vol}
+
+    store = {"version": 1, "markets": {}}
+    for day, yes in zip(range(1, 23), range(40, 62)):
+        record(store, [m(yes)], T(day))
+    mid = market_id(m(0))
+    info = summary(store, mid, T(22))
+    chk(info["d24h"] == 1, f"d24h = +1 point day over day (got {info['d24h']})")
+    chk(info["d7d"] == 7, f"d7d = +7 points on the week (got {info['d7d']})")
+    chk(info["spark"] == list(range(47, 62)), "spark = last 15 daily points, oldest first")
+
+    # cron jitter: today's run 20 minutes EARLIER than yesterday's still finds yesterday
+    sj = {"version": 1, "markets": {}}
+    record(sj, [m(60)], T(21).replace(minute=43))
+    record(sj, [m(69)], T(22))
+    chk(summary(sj, mid, T(22))["d24h"] == 9, "cron jitter inside SLACK_MIN tolerated")
+    record(sj, [m(70)], T(22))
+    chk(sj["markets"][mid]["p"] == [60, 70], "same-minute rerun overwrites instead of appending")
+
+    # compaction: intraday points beyond RAW_HOURS collapse to one per 6h bucket
+    s2 = {"version": 1, "markets": {}}
+    for d in (1, 2):
+        for h in range(24):
+            record(s2, [m(50 + h % 5)], T(d, h))
+    record(s2, [m(60)], T(10))
+    compact(s2, T(10))
+    chk(len(s2["markets"][mid]["t"]) == 9, f"2 old days of hourly points -> 8 six-hour points + today "
+                                           f"(got {len(s2['markets'][mid]['t'])})")
+    record(s2, [m(60)], T(28))
+    compact(s2, datetime(2026, 9, 10, tzinfo=timezone.utc))
+    chk(len(s2["markets"][mid]["t"]) == 4,
+        "after HOURLY_DAYS points fall back to one per day (Aug 1, Aug 2, Aug 10, Aug 28)")
+
+    # markets unseen for STALE_DAYS disappear
+    s3 = {"version": 1, "markets": {}}
+    record(s3, [m(50, tk="old")], T(1))
+    compact(s3, datetime(2026, 9, 15, tzinfo=timezone.utc))
+    chk(not s3["markets"], "closed market dropped after STALE_DAYS")
+
+    chk(summary(store, "Kalshi:nope", T(22)) == {"d24h": None, "d7d": None, "spark": []},
+        "unknown market -> empty summary, no crash")
+
+    chk(summary(store, mid, T(22), 64)["d24h"] == 4,
+        "deltas run to the price shown, not the newest stored point")
+
+    print("SELFTEST OK" if ok else "SELFTEST FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(_selftest())
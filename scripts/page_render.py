@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+page_render.py — render a generator's pages in one batch: in a process pool
+when there are enough of them, each compared against a stored content hash,
+written only when its bytes changed.
+
+WHY THIS FILE EXISTS
+  build_state_rent_pages and generate_hail_states each render ~50 whole
+  pages by string concatenation. The hail generator then read every old page
+  back off disk to see whether it changed; the rent builder did not compare
+  at all and rewrote all 48 files every run. Neither shape survives the
+  county pages (~3,000 rent counties, plus hail counties): serial rendering
+  and a full re-read of the output directory is minutes, not seconds.
+
+HOW IT WORKS
+  A generator hands render() its tasks, (filename, fn, args): fn is a
+  module-level page function, so a worker process can import it, and
+  fn(*args) returns the page's HTML. Fragments shared by every page (nav,
+  link clouds) are the generator's business: build them once at module level
+  so each worker builds them once too.
+
+  out_dir/.render-manifest.json maps each page (path under out_dir) to the
+  sha1 of the bytes last written, and is committed with the pages, so a
+  fresh CI checkout has it too. It is trusted: a page whose hash matches its
+  entry and whose file exists is not read back. A page without an entry is
+  read once to compare; one whose hash differs is written. The catch: a hand
+  edit to a generated page stays until that page's content changes (delete
+  its entry to force a rewrite). Entries for files that are gone are pruned.
+  One manifest per output directory keeps workflows that build different
+  directories from ever committing the same file.
+
+  tasks may be a generator and is consumed as the pool drains, a few chunks
+  ahead of the writes, so a run of 3,000 county pages never holds more than
+  a handful of rendered pages (or the records behind the rest) in memory.
+  A filename may carry subdirectories; they are created as needed.
+
+  render() returns Rendered(written, unchanged), the filenames in each list.
+
+      import page_render
+      res = page_render.render([("iowa.html", build_page, ("IA",))], "rent")
+      res.written, res.unchanged
+
+  Fewer than POOL_MIN pages render in-process: 50 pages take ~20 ms, less
+  than starting one worker.
+
+    python3 scripts/page_render.py --selftest
+"""
+import hashlib
+import json
+import os
+import sys
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from pathlib import Path
+
+MANIFEST = ".render-manifest.json"  # in out_dir, committed with the pages
+POOL_MIN = 200                  # below this, pool start-up costs more than it saves
+CHUNK = 25                      # pages per worker round trip
+
+Rendered = namedtuple("Rendered", "written unchanged")
+
+
+def _render_chunk(chunk):
+    return [(name, fn(*args)) for name, fn, args in chunk]
+
+
+def render_all(tasks, jobs=None):
+    """(filename, html) for each task, in order, as they are rendered."""
+    jobs = jobs or os.cpu_count() or 1
+    tasks = iter(tasks)
+    first = list(islice(tasks, POOL_MIN))
+    rest = chain(first, tasks)
+    if jobs == 1 or len(first) < POOL_MIN:
+        for name, fn, args in rest:
+            yield name, fn(*args)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        ahead = deque()
+        while True:
+            chunk = list(islice(rest, CHUNK))
+            if chunk:
+                ahead.append(pool.submit(_render_chunk, chunk))
+            if ahead and (not chunk or len(ahead) > jobs * 2):
+                yield from ahead.popleft().result()
+            elif not chunk:
+                return
+
+
+def load_manifest(path):
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(entries, path):
+    text = json.dumps(entries, indent=0, sort_keys=True) + "\n"
+    if not os.path.exists(path) or Path(path).read_text(encoding="utf-8") != text:
+        Path(path).write_text(text, encoding="utf-8")
+
+
+def _same_file(path, data):
+    """True if path holds exactly data. The one place a page is read back."""
+    try:
+        return os.path.getsize(path) == len(data) and Path(path).read_bytes() == data
+    except OSError:
+        return False
+
+
+def render(tasks, out_dir, jobs=None, manifest=MANIFEST):
+    """Render tasks into out_dir, writing only pages whose bytes changed.
+    manifest is a file name in out_dir; None compares against the files alone."""
+    os.makedirs(out_dir, exist_ok=True)
+    man_path = os.path.join(out_dir, manifest) if manifest else None
+    entries = load_manifest(man_path) if man_path else {}
+    written, unchanged = [], []
+    for name, html in render_all(tasks, jobs):
+        path = os.path.join(out_dir, name)
+        data = html.encode("utf-8")
+        digest = hashlib.sha1(data).hexdigest()
+        key = Path(name).as_posix()
+        known = entries.get(key)
+        if (known == digest and os.path.exists(path)) or (known is None and _same_file(path, data)):
+            unchanged.append(name)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as fh:
+                fh.write(data)
+            written.append(name)
+        entries[key] = digest
+    if man_path:
+        save_manifest({k: v for k, v in entries.items() if os.path.exists(os.path.join(out_dir, k))},
+                      man_path)
+    return Rendered(written, unchanged)
+
+
+# ---------------------------------------------------------------- selftest
+def _page(n, body):
+    return f"<!DOCTYPE html><title>{n}</title><p>{body}</p>\n"
+
+
+def selftest():
+    import tempfile
+    ok = True
+
+    def chk(cond, msg):
+        nonlocal ok
+        print(("  OK   " if cond else "  FAIL ") + msg)
+        ok = ok and cond
+
+    print("page_render selftest")
+    tasks = [(f"p{i}.html", _page, (i, "café — %d" % i)) for i in range(POOL_MIN + CHUNK * 9 + 3)]
+    want = [(t[0], _page(*t[2])) for t in tasks]
+    chk(list(render_all(tasks[:5])) == want[:5], "in-process render, in order")
+    chk(list(render_all(iter(tasks), jobs=2)) == want, "pooled render from a generator, in order")
+    chk(list(render_all(iter(tasks), jobs=1)) == want, "jobs=1 renders every task in-process")
+
+    with tempfile.TemporaryDirectory() as td:
+        out = os.path.join(td, "out")
+        man = os.path.join(out, MANIFEST)
+        small = tasks[:4]
+        reads = []
+        real = globals()["_same_file"]
+        globals()["_same_file"] = lambda p, d: (reads.append(os.path.basename(p)), real(p, d))[1]
+        try:
+            r = render(small, out)
+            chk(r.written == [t[0] for t in small] and not r.unchanged, "first run writes every page")
+            chk(open(os.path.join(out, "p1.html"), encoding="utf-8").read() == _page(*small[1][2]),
+                "page bytes as rendered")
+            chk(sorted(load_manifest(man)) == [t[0] for t in small], "manifest keyed by path under out_dir")
+            del reads[:]
+            r = render(small, out)
+            chk(r.written == [] and len(r.unchanged) == 4 and reads == [],
+                "identical inputs write nothing and read nothing")
+
+            # a fresh checkout: new mtimes, same bytes, same committed manifest
+            for t in small:
+                os.utime(os.path.join(out, t[0]), ns=(1, 1))
+            r = render(small, out)
+            chk(r.written == [] and reads == [], "new mtimes (fresh checkout) read nothing back")
+
+            changed = small[:2] + [("p2.html", _page, (2, "new"))] + small[3:]
+            r = render(changed, out)
+            chk(r.written == ["p2.html"] and reads == [], f"only the changed page is written ({r.written})")
+
+            # the manifest is trusted: a hand edit stays until the page changes
+            with open(os.path.join(out, "p0.html"), "a") as fh:
+                fh.write("edited by hand")
+            r = render(changed, out)
+            chk(r.written == [], "trusted manifest: a hand edit is not re-read")
+            os.remove(os.path.join(out, "p3.html"))
+            r = render(changed, out)
+            chk(r.written == ["p3.html"], "a deleted page is written again")
+            os.remove(man)
+            r = render(changed, out)
+            chk(r.written == ["p0.html"] and len(reads) == 4, "no manifest: every page compared against its file")
+            r = render(changed, out, manifest=None)
+            chk(r.written == [], "manifest=None compares against the files")
+            r = render([("sub/dir/p.html", _page, (9, "x"))], out)
+            chk(r.written == ["sub/dir/p.html"] and os.path.exists(os.path.join(out, "sub/dir/p.html"))
+                and "sub/dir/p.html" in load_manifest(man), "subdirectories created")
+            os.remove(os.path.join(out, "p1.html"))
+            render([], out)
+            chk("p1.html" not in load_manifest(man), "entries for deleted files are pruned")
+        finally:
+            globals()["_same_file"] = real
+
+    print("SELFTEST OK" if ok else "SELFTEST FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    if "--selftest" in sys.argv:
+        sys.exit(selftest())
+    print(__doc__)
@@ -33,12 +33,28 @@ exchange daily limit is an absolute physical bound and needs no reference
 contract, so it catches exactly the cases (2) and (2b) cannot see.
 
 Modes:  --check  (report only, exit 1 if would-block)   --repair  (rewrite file)
+        --replay SOURCE  (fire rate of every check over a history of feeds)
 Schema note: in prices.json the field "open" actually holds PREVIOUS CLOSE.
+
+Replay (2026-10-19): run() sees one feed, so "how many days last year would
+this band or limit table have blocked" meant a loop of run() calls over
+dicts nobody had collected. --replay loads a history of snapshots into
+date x key arrays (numpy, needed only for this mode) and evaluates every
+check of check mode over all dates at once: math, band, stale, no-front,
+contamination, prior-close, limit. It prints each rule's fire rate and the
+keys it fires on. Edit LIMIT_EXPANDED (or any table here), replay, compare.
+    SOURCE = git      the last data/prices.json committed each day (git log);
+                      every check applies
+             archive  data/daily-archive locked_prices, closes only, each
+                      day's prior close being the previous briefing's: band
+                      and limit only, as there is no dated curve or net/pct
+             DIR      a directory of prices.json snapshots, by filename
+    python3 scripts/preflight_prices.py --replay git --since 2025-10-19
 """
-import json, sys, argparse, math
+import json, sys, argparse, math, os, subprocess
 from datetime import datetime, timezone
 
-from contract_calendar import is_expired   # ONE definition of contract expiry
+from contract_calendar import is_expired, live_keys   # ONE definition of contract expiry
 
 # continuous alias -> ordered dated front-month candidates (calendar order)
 FRONT = {
@@ -277,6 +293,178 @@ def run(data, today=None, repair=False):
     passed = not any(s=="FAIL" for s,_,_ in issues)
     return passed, issues, data
 
+# ── replay: every check over a history of feeds ──────────────────────────────
+RULES = ("math", "band", "stale", "no-front", "contamination", "prior-close", "limit")
+# generate_daily.GRAIN_KEYS: locked_prices holds these in $/bu, the feed in cents
+LOCKED_IN_DOLLARS = {"corn", "corn-dec", "beans", "beans-nov", "wheat", "oats"}
+
+def _when(stamp):
+    """datetime (UTC) from an ISO date or timestamp."""
+    d = datetime.fromisoformat(str(stamp).replace("Z", "+00:00"))
+    return d if d.tzinfo else d.replace(tzinfo=timezone.utc)
+
+def archive_snapshots(archive="data/daily-archive", since=None):
+    """[(label, when, data)] from each briefing's locked_prices: close, and as
+    "open" the previous briefing's close for that key."""
+    out, last = [], {}
+    for f in sorted(os.listdir(archive)):
+        day = f[:-5]
+        if not (f.endswith(".json") and day[:4].isdigit()): continue
+        try: locked = json.load(open(os.path.join(archive, f))).get("locked_prices") or {}
+        except (OSError, ValueError): continue
+        quotes = {}
+        for k, v in locked.items():
+            if v is None: continue
+            close = float(v) * (100 if k in LOCKED_IN_DOLLARS else 1)
+            quotes[k] = {"close": close, "open": last.get(k, close)}
+            last[k] = close
+        if quotes and (since is None or day >= since):
+            out.append((day, _when(day), {"quotes": quotes}))
+    return out
+
+def git_snapshots(path="data/prices.json", since=None):
+    """[(label, when, data)]: the last commit of `path` on each UTC day, read
+    through one `git cat-file --batch`. `when` is the feed's own `fetched`
+    stamp where it has one (expiry is judged as of then), else the commit's."""
+    cmd = ["git", "log", "--format=%H %cI", "--reverse"] + (["--since", since] if since else []) + ["--", path]
+    day_rev = {}
+    for line in subprocess.run(cmd, capture_output=True, text=True, check=True).stdout.split("\n"):
+        if line:
+            rev, stamp = line.split(" ", 1)
+            when = _when(stamp).astimezone(timezone.utc)
+            day_rev[when.date().isoformat()] = (rev, when)
+    days = sorted(day_rev)
+    if not days: return []
+    req = "".join(f"{day_rev[d][0]}:{path}\n" for d in days).encode()
+    raw = subprocess.run(["git", "cat-file", "--batch"], input=req, capture_output=True, check=True).stdout
+    out, pos = [], 0
+    for d in days:
+        nl = raw.index(b"\n", pos)
+        head = raw[pos:nl].split()
+        if head[-1] == b"missing":
+            pos = nl + 1; continue
+        size = int(head[2]); body = raw[nl + 1:nl + 1 + size]; pos = nl + 2 + size
+        try: data = json.loads(body)
+        except ValueError: continue
+        out.append((d, _when(data["fetched"]) if data.get("fetched") else day_rev[d][1], data))
+    return out
+
+def dir_snapshots(folder, since=None):
+    """[(label, when, data)] for every *.json in folder, by name; the date is
+    the feed's own `fetched` stamp, else the file's mtime."""
+    out = []
+    for f in sorted(os.listdir(folder)):
+        if not f.endswith(".json"): continue
+        p = os.path.join(folder, f)
+        try: data = json.load(open(p))
+        except (OSError, ValueError): continue
+        when = _when(data["fetched"]) if data.get("fetched") else datetime.fromtimestamp(os.path.getmtime(p), timezone.utc)
+        if since is None or when.date().isoformat() >= since:
+            out.append((f[:-5], when, data))
+    return out
+
+def load_arrays(snaps):
+    """Snapshots -> dict of date x key arrays (NaN where a field is absent)."""
+    import numpy as np
+    keys = sorted({k for _, _, d in snaps for k in (d.get("quotes") or {})})
+    col = {k: j for j, k in enumerate(keys)}
+    T, K = len(snaps), len(keys)
+    a = {n: np.full((T, K), np.nan) for n in ("close", "open", "net", "pct")}
+    a["stale"] = np.zeros((T, K), bool); a["present"] = np.zeros((T, K), bool)
+    num = lambda v: float(v) if v is not None else np.nan
+    for t, (_, _, d) in enumerate(snaps):
+        for k, q in (d.get("quotes") or {}).items():
+            j = col[k]; a["present"][t, j] = True
+            if not q: continue
+            a["close"][t, j] = num(q.get("close")); a["open"][t, j] = num(q.get("open"))
+            a["net"][t, j] = num(q.get("netChange")); a["pct"][t, j] = num(q.get("pctChange"))
+            a["stale"][t, j] = bool(q.get("stale"))
+    a["keys"], a["labels"], a["whens"] = keys, [l for l, _, _ in snaps], [w for _, w, _ in snaps]
+    return a
+
+def replay(a, rules=RULES):
+    """{rule: (fail, warn, names)}: date x name boolean arrays of where the rule
+    FAILs and WARNs, names being keys (or commodities, for the curve rules).
+    Mirrors run(repair=False) check for check."""
+    import numpy as np
+    keys = a["keys"]; col = {k: j for j, k in enumerate(keys)}
+    close, opn, net, pct = a["close"], a["open"], a["net"], a["pct"]
+    has = ~np.isnan(close); none = np.zeros_like(has)
+    out = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if "math" in rules:
+            prev = np.where(np.isnan(opn), close, opn)
+            ok = has & (prev != 0) & ~np.isnan(prev)
+            cnet = np.round(close - prev, 5); cpct = np.round((close - prev) / prev * 100, 4)
+            bad = ok & ~np.isnan(pct) & (np.abs(pct - cpct) > PCT_TOL)
+            bad |= ok & ~np.isnan(net) & (np.abs(net - cnet) > np.maximum(0.02, np.abs(close) * 0.0005))
+            out["math"] = (bad, none, keys)
+        if "band" in rules:
+            bands = [band_for(k) or (-np.inf, np.inf) for k in keys]
+            lo = np.array([b[0] for b in bands]); hi = np.array([b[1] for b in bands])
+            out["band"] = (has & ((close < lo) | (close > hi)), none, keys)
+        if "stale" in rules:
+            out["stale"] = (none, has & a["stale"], keys)
+        if "limit" in rules:
+            lim = np.array([limit_for(k) if limit_for(k) is not None else np.inf for k in keys])
+            out["limit"] = (has & ~np.isnan(opn) & (np.abs(close - opn) > lim), none, keys)
+        curve = [c for c in ALL_FRONT if c in col]
+        if curve and {"no-front", "contamination", "prior-close"} & set(rules):
+            T = len(a["labels"]); shape = (T, len(curve))
+            nofail, nowarn, contam, prior = (np.zeros(shape, bool) for _ in range(4))
+            for i, c in enumerate(curve):
+                ladder = [k for k in ALL_FRONT[c] if k in col]
+                jc = col[c]
+                if ladder:
+                    js = [col[k] for k in ladder]
+                    alive = live_keys(ladder, a["whens"])
+                    live = has[:, js] & ~a["stale"][:, js] & np.array(
+                        [[k in alive[w] for k in ladder] for w in a["whens"]])
+                    found = live.any(1)
+                    jf = np.array(js)[live.argmax(1)]
+                    rows = np.arange(T)
+                    fc, fp = close[rows, jf], opn[rows, jf]
+                    rel = np.where(fc != 0, np.abs(close[:, jc] - fc) / fc, 1)
+                    prel = np.where(fp != 0, np.abs(opn[:, jc] - fp) / fp, 1)
+                    curve_seen = a["present"][:, js].any(1)
+                else:
+                    found = np.zeros(T, bool); rel = prel = np.zeros(T)
+                    curve_seen = np.zeros(T, bool)
+                cont = has[:, jc]
+                lost = cont & ~found
+                hard = lost & (curve_seen if c in FRONT_OPTIONAL else True)
+                nofail[:, i], nowarn[:, i] = hard, lost & ~hard
+                contam[:, i] = cont & found & (rel > REL_TOL)
+                if ladder:
+                    both = ~np.isnan(opn[:, jc]) & ~np.isnan(fp)
+                    prior[:, i] = cont & found & ~contam[:, i] & both & (prel > REL_TOL)
+            none_c = np.zeros(shape, bool)
+            out["no-front"] = (nofail, nowarn, curve)
+            out["contamination"] = (contam, none_c, curve)
+            out["prior-close"] = (prior, none_c, curve)
+    return out
+
+def replay_report(a, fired, source=""):
+    """Print the per-rule fire rate. -> fraction of dates that would block."""
+    import numpy as np
+    labels = a["labels"]; T = len(labels)
+    print(f"replay: {T} snapshots {labels[0]}..{labels[-1]}"
+          f"{' (' + source + ')' if source else ''}, {len(a['keys'])} keys")
+    print(f"  {'rule':14} {'FAIL days':>10} {'WARN days':>10}  keys it fires on (days)")
+    blocked = np.zeros(T, bool)
+    for rule in RULES:
+        if rule not in fired: continue
+        fail, warn, names = fired[rule]
+        blocked |= fail.any(1)
+        hits = (fail | warn).sum(0)
+        top = ", ".join(f"{names[j]}({hits[j]})" for j in np.argsort(-hits, kind="stable")[:6] if hits[j])
+        nf, nw = int(fail.any(1).sum()), int(warn.any(1).sum())
+        print(f"  {rule:14} {nf:>4} {100.0 * nf / T:4.1f}% {nw:>4} {100.0 * nw / T:4.1f}%  {top or '-'}")
+    nb = int(blocked.sum())
+    print(f"  would block {nb} of {T} snapshots ({100.0 * nb / T:.1f}%)"
+          + (": " + ", ".join(l for l, b in zip(labels, blocked) if b)[:400] if nb else ""))
+    return nb / T if T else 0.0
+
 def main():
     ap=argparse.ArgumentParser()
     ap.add_argument("path", nargs="?", default="data/prices.json")
@@ -288,9 +476,20 @@ def main():
     ap.add_argument("--check", action="store_true",
                     help="report only, exit 1 if the feed would block (default)")
     ap.add_argument("--out")
+    ap.add_argument("--replay", metavar="SOURCE", help="git | archive | a directory of prices.json snapshots")
+    ap.add_argument("--since", help="replay from this date (YYYY-MM-DD)")
     a=ap.parse_args()
     if a.check and a.repair:
         ap.error("--check and --repair are mutually exclusive")
+    if a.replay:
+        if a.replay == "git": snaps, rules = git_snapshots(a.path, a.since), RULES
+        elif a.replay == "archive": snaps, rules = archive_snapshots(since=a.since), ("band", "limit")
+        else: snaps, rules = dir_snapshots(a.replay, a.since), RULES
+        if not snaps:
+            print(f"replay: no snapshots from {a.replay}"); sys.exit(2)
+        arrays = load_arrays(snaps)
+        replay_report(arrays, replay(arrays, rules), a.replay)
+        sys.exit(0)
     data=json.load(open(a.path))
     passed,issues,data=run(data, repair=a.repair)
     for s,c,m in issues: print(f"  [{s:6}] {c}: {m}")
@@ -37,10 +37,11 @@ Paths are repo-root-relative; run from the repo root (CI does).
 import argparse
 import html as htmlmod
 import json
-import re
 import sys
 from datetime import datetime, timezone
 
+import bake_engine
+
 WPI_HTML = "whats-priced-in.html"
 SC_HTML = "scorecard.html"
 WPI_JSON = "data/whats-priced-in.json"
@@ -349,54 +350,67 @@ def sc_list_html(d, limit=25):
 
 # ── Marker machinery ───────────────────────────────────────────────────────
 
-def replace_region(src, name, content, fname):
-    open_m = f"<!-- PRERENDER:{name} -->"
-    close_m = f"<!-- /PRERENDER:{name} -->"
-    pat = re.compile(re.escape(open_m) + r".*?" + re.escape(close_m), re.S)
-    if not pat.search(src):
-        sys.exit(f"FATAL: marker {name} not found in {fname} — markers must exist in the HTML.")
-    return pat.sub(open_m + content + close_m, src)
-
-
-def bake_wpi(check_only=False):
-    with open(WPI_JSON, encoding="utf-8") as f:
-        wpi = json.load(f)
-    with open(AS_JSON, encoding="utf-8") as f:
-        asd = json.load(f)
-    with open(WPI_HTML, encoding="utf-8") as f:
-        src = f.read()
-    orig = src
-    src = replace_region(src, "wp-result", result_banner(wpi.get("latest_result")), WPI_HTML)
-    src = replace_region(src, "wp-nexthead", next_head(wpi.get("upcoming")), WPI_HTML)
-    src = replace_region(src, "wp-farmbox", farm_box(wpi.get("upcoming")), WPI_HTML)
-    src = replace_region(src, "wp-next", next_card(wpi.get("upcoming")), WPI_HTML)
-    src = replace_region(src, "wp-history", history_el(wpi.get("history")), WPI_HTML)
-    src = replace_region(src, "as-board", board_tbl(asd.get("leaderboard"), asd.get("building")), WPI_HTML)
+PRERENDER = bake_engine.Markers("<!-- PRERENDER:{name} -->", "<!-- /PRERENDER:{name} -->")
+
+
+def replace_region(page, name, content):
+    # every pair of the name is filled; a page without one is a setup error
+    page.fill(PRERENDER, name, content, expect="+")
+
+
+def _load(site, fname):
+    """Parsed JSON; through the Site's shared cache when run from bake_engine."""
+    if site is not None:
+        return site.json(fname)
+    with open(fname, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _page(site, fname):
+    """The Site's shared Page when run from bake_engine, else a fresh one."""
+    return site.page(fname) if site is not None else bake_engine.Page(fname)
+
+
+def _result(page, fname):
+    try:
+        new = page.render()
+    except bake_engine.BakeError as e:
+        sys.exit(f"FATAL: {e} — markers must exist in the HTML.")
+    return page.original, new, fname
+
+
+def bake_wpi(check_only=False, site=None):
+    wpi = _load(site, WPI_JSON)
+    asd = _load(site, AS_JSON)
+    page = _page(site, WPI_HTML)
+    replace_region(page, "wp-result", result_banner(wpi.get("latest_result")))
+    replace_region(page, "wp-nexthead", next_head(wpi.get("upcoming")))
+    replace_region(page, "wp-farmbox", farm_box(wpi.get("upcoming")))
+    replace_region(page, "wp-next", next_card(wpi.get("upcoming")))
+    replace_region(page, "wp-history", history_el(wpi.get("history")))
+    replace_region(page, "as-board", board_tbl(asd.get("leaderboard"), asd.get("building")))
     if wpi.get("updated"):
-        src = re.sub(r'("dateModified":")(\d{4}-\d{2}-\d{2})(")',
-                     lambda m: m.group(1) + wpi["updated"] + m.group(3), src, count=1)
-    return orig, src, WPI_HTML
+        page.sub(r'("dateModified":")(\d{4}-\d{2}-\d{2})(")',
+                 lambda m: m.group(1) + wpi["updated"] + m.group(3),
+                 "dateModified", expect=None, count=1)
+    return _result(page, WPI_HTML)
 
 
-def bake_scorecard(check_only=False):
-    with open(SC_JSON, encoding="utf-8") as f:
-        sc = json.load(f)
-    with open(SC_HTML, encoding="utf-8") as f:
-        src = f.read()
+def bake_scorecard(check_only=False, site=None):
+    sc = _load(site, SC_JSON)
     # the next-report pointer lives in whats-priced-in.json (single source for
     # "which report is next"), so scorecard reads it rather than keeping a copy
     try:
-        with open(WPI_JSON, encoding="utf-8") as f:
-            _up = json.load(f).get("upcoming")
+        _up = _load(site, WPI_JSON).get("upcoming")
     except (OSError, ValueError):
         _up = None
-    orig = src
-    src = replace_region(src, "sc-nextrep", sc_next_report(_up), SC_HTML)
-    src = replace_region(src, "sc-stats", "\n        " + sc_stats_html(sc) + "\n      ", SC_HTML)
-    src = replace_region(src, "sc-list", sc_list_html(sc), SC_HTML)
+    page = _page(site, SC_HTML)
+    replace_region(page, "sc-nextrep", sc_next_report(_up))
+    replace_region(page, "sc-stats", "\n        " + sc_stats_html(sc) + "\n      ")
+    replace_region(page, "sc-list", sc_list_html(sc))
     if sc.get("hit_rate") is not None:
-        src = replace_region(src, "sc-prose-hit", f"{round(sc['hit_rate'])}%", SC_HTML)
-    return orig, src, SC_HTML
+        replace_region(page, "sc-prose-hit", f"{round(sc['hit_rate'])}%")
+    return _result(page, SC_HTML)
 
 
 # ── COT + ag-odds bakes (same pattern; JS hides the baked block on hydrate) ──
@@ -448,24 +462,26 @@ def ao_summary(d):
             + ". Live odds refresh below; sources are real-money markets (Polymarket and similar).")
 
 
-def bake_cot():
-    with open(COT_JSON, encoding="utf-8") as f:
-        d = json.load(f)
-    with open(COT_HTML, encoding="utf-8") as f:
-        src = f.read()
-    orig = src
-    src = replace_region(src, "cot-summary", cot_summary(d), COT_HTML)
-    return orig, src, COT_HTML
-
-
-def bake_agodds():
-    with open(MKT_JSON, encoding="utf-8") as f:
-        d = json.load(f)
-    with open(AO_HTML, encoding="utf-8") as f:
-        src = f.read()
-    orig = src
-    src = replace_region(src, "ao-odds", ao_summary(d), AO_HTML)
-    return orig, src, AO_HTML
+def bake_cot(site=None):
+    d = _load(site, COT_JSON)
+    page = _page(site, COT_HTML)
+    replace_region(page, "cot-summary", cot_summary(d))
+    return _result(page, COT_HTML)
+
+
+def bake_agodds(site=None):
+    d = _load(site, MKT_JSON)
+    page = _page(site, AO_HTML)
+    replace_region(page, "ao-odds", ao_summary(d))
+    return _result(page, AO_HTML)
+
+
+@bake_engine.baker("prerender", reads=(WPI_JSON, AS_JSON, SC_JSON, COT_JSON, MKT_JSON),
+                   writes=(WPI_HTML, SC_HTML, COT_HTML, AO_HTML))
+def bake_site(site):
+    for bake in (bake_wpi, bake_scorecard, bake_cot, bake_agodds):
+        bake(site=site)
+    return f"{WPI_HTML}, {SC_HTML}, {COT_HTML}, {AO_HTML}"
 
 
 def main():
@@ -29,74 +29,102 @@ What it settles, per page:
      datacenter IPs (verified); Sig's browser download list re-issued.
 
 Every check prints a verdict line; a dead path is a finding, not a crash.
+
+The ~100 Quick Stats calls are declared up front (endpoints()) and go out
+through probe_runner (2026-10-19), two at a time against NASS where they used
+to go one by one with a 0.6 s sleep; throttled answers back off 45 s then
+120 s as before, inside the run's deadline. --replay re-runs every check
+offline from the recorded answers; --report writes latency, status and row
+counts per call.
 """
-import json
+import argparse
 import os
-import sys
-import time
 import urllib.parse
-import urllib.request
+
+import probe_runner as pr
 
 API = "https://quickstats.nass.usda.gov/api"
 KEY = os.environ.get("NASS_API_KEY", "").strip()
 UA = {"User-Agent": "AGSIST/1.0 (+https://agsist.com; data probe)"}
-
-
-def get(path, params, timeout=120):
+BACKOFF = (45, 120)
+
+# Enumerate short_descs under promising commodity groups. get_param_values
+# is the honest enumeration route (guessed strings die as silent 400s).
+TENURE_GROUPS = ("FARM OPERATIONS", "AG LAND", "LAND AREA")
+# For the top candidates, check county availability + years + suppression
+TENURE_CANDIDATES = [
+    "FARM OPERATIONS, TENURE, FULL OWNER - NUMBER OF OPERATIONS",
+    "FARM OPERATIONS, TENURE, PART OWNER - NUMBER OF OPERATIONS",
+    "FARM OPERATIONS, TENURE, TENANT - NUMBER OF OPERATIONS",
+    "AG LAND, OWNED, IN FARMS - ACRES",
+    "AG LAND, RENTED FROM OTHERS, IN FARMS - ACRES",
+]
+STORAGE = (("GRAIN STORAGE CAPACITY, OFF FARM - CAPACITY, MEASURED IN BU", "off-farm"),
+           ("GRAIN STORAGE CAPACITY, ON FARM - CAPACITY, MEASURED IN BU", "on-farm"))
+COND_YEARS = range(2000, 2026)
+COND_SERIES = {
+    "ge": {"short_desc": "CORN - CONDITION, MEASURED IN PCT GOOD"},
+    "ex": {"short_desc": "CORN - CONDITION, MEASURED IN PCT EXCELLENT"},
+    "yl": {"short_desc": "CORN, GRAIN - YIELD, MEASURED IN BU / ACRE", "reference_period_desc": "YEAR"},
+}
+
+
+def endpoint(name, path, params, timeout=120):
     q = dict(params)
     q["key"] = KEY
-    url = f"{API}/{path}/?" + urllib.parse.urlencode(q)
-    for attempt, pause in enumerate((0, 45, 120)):
-        if pause:
-            print(f"    throttled — backoff {pause}s", file=sys.stderr)
-            time.sleep(pause)
-        try:
-            req = urllib.request.Request(url, headers=UA)
-            with urllib.request.urlopen(req, timeout=timeout) as r:
-                return json.loads(r.read().decode("utf-8", "replace"))
-        except urllib.error.HTTPError as e:
-            if e.code == 400:
-                return {}
-            if e.code in (403, 429) or e.code >= 500:
-                continue
-            raise
-    return None
-
-
-def count(params):
-    d = get("api_GET", dict(params, format="JSON")) or {}
-    return d.get("data", [])
+    return pr.Endpoint(name, f"{API}/{path}/?" + urllib.parse.urlencode(q), UA, timeout, retry=BACKOFF)
+
+
+def query(name, params):
+    return endpoint(name, "api_GET", dict(params, format="JSON"))
+
+
+def endpoints():
+    for commodity in TENURE_GROUPS:
+        yield endpoint(f"tenure/{commodity}", "get_param_values",
+                       {"param": "short_desc", "commodity_desc": commodity})
+    for sd in TENURE_CANDIDATES:
+        for lvl in ("COUNTY", "STATE"):
+            yield query(f"tenure/{lvl}/{sd}", {"short_desc": sd, "agg_level_desc": lvl,
+                                               "source_desc": "CENSUS", "state_alpha": "IA"})
+    for sd, tag in STORAGE:
+        yield query(f"storage/{tag}", {"short_desc": sd, "agg_level_desc": "STATE", "year__GE": "2020"})
+    yield query("storage/IA corn production", {"short_desc": "CORN, GRAIN - PRODUCTION, MEASURED IN BU",
+                                               "agg_level_desc": "STATE", "state_alpha": "IA",
+                                               "year__GE": "2022"})
+    for yr in COND_YEARS:
+        for s, params in COND_SERIES.items():
+            yield query(f"cond/{yr}/{s}", dict(params, agg_level_desc="STATE", state_alpha="IA", year=str(yr)))
+
+
+def answer(r):
+    """Parsed answer: {} for NASS's 400 (no such rows), None if the call failed."""
+    if r.status == 400:
+        return {}
+    return pr.json_body(r)
+
+
+def count(r):
+    return (answer(r) or {}).get("data", [])
 
 
 def sect(t):
     print("\n" + "=" * 78 + f"\n  {t}\n" + "=" * 78)
 
 
-def probe_tenure():
+def probe_tenure(res):
     sect("1. TENURE — enumerate what actually exists (never probed before)")
-    # Enumerate short_descs under promising commodity groups. get_param_values
-    # is the honest enumeration route (guessed strings die as silent 400s).
-    for commodity in ("FARM OPERATIONS", "AG LAND", "LAND AREA"):
-        d = get("get_param_values", {"param": "short_desc",
-                                     "commodity_desc": commodity})
+    for commodity in TENURE_GROUPS:
+        d = answer(res[f"tenure/{commodity}"])
         vals = (d or {}).get("short_desc", [])
         hits = [v for v in vals if any(w in v.upper() for w in
                 ("TENURE", "TENANT", "OWNED", "OWNER", "RENTED", "LEASED"))]
         print(f"  {commodity}: {len(vals)} short_descs, {len(hits)} tenure-ish:")
         for h in hits[:12]:
             print(f"    · {h}")
-    # For the top candidates, check county availability + years + suppression
-    CANDIDATES = [
-        "FARM OPERATIONS, TENURE, FULL OWNER - NUMBER OF OPERATIONS",
-        "FARM OPERATIONS, TENURE, PART OWNER - NUMBER OF OPERATIONS",
-        "FARM OPERATIONS, TENURE, TENANT - NUMBER OF OPERATIONS",
-        "AG LAND, OWNED, IN FARMS - ACRES",
-        "AG LAND, RENTED FROM OTHERS, IN FARMS - ACRES",
-    ]
-    for sd in CANDIDATES:
+    for sd in TENURE_CANDIDATES:
         for lvl in ("COUNTY", "STATE"):
-            rows = count({"short_desc": sd, "agg_level_desc": lvl,
-                          "source_desc": "CENSUS", "state_alpha": "IA"})
+            rows = count(res[f"tenure/{lvl}/{sd}"])
             if rows:
                 yrs = sorted({r.get("year") for r in rows})
                 supp = sum(1 for r in rows if "(D)" in str(r.get("Value", "")))
@@ -105,11 +133,10 @@ def probe_tenure():
                 print(f"  {lvl:<6} {sd[:52]:<52} NO ROWS (IA census)")
 
 
-def probe_storage():
+def probe_storage(res):
     sect("2. STORAGE — re-verify the three known traps")
-    for sd, tag in (("GRAIN STORAGE CAPACITY, OFF FARM - CAPACITY, MEASURED IN BU", "off-farm"),
-                    ("GRAIN STORAGE CAPACITY, ON FARM - CAPACITY, MEASURED IN BU", "on-farm")):
-        rows = count({"short_desc": sd, "agg_level_desc": "STATE", "year__GE": "2020"})
+    for sd, tag in STORAGE:
+        rows = count(res[f"storage/{tag}"])
         refs = {}
         ot = 0
         for r in rows:
@@ -117,24 +144,17 @@ def probe_storage():
             if r.get("state_alpha") == "OT":
                 ot += 1
         print(f"  {tag}: {len(rows)} rows 2020+ · ref_periods={refs} · OT pseudo-state rows={ot}")
-    rows = count({"short_desc": "CORN, GRAIN - PRODUCTION, MEASURED IN BU",
-                  "agg_level_desc": "STATE", "state_alpha": "IA", "year__GE": "2022"})
+    rows = count(res["storage/IA corn production"])
     refs = sorted({r.get("reference_period_desc") for r in rows})
     print(f"  IA corn production 2022+: {len(rows)} rows, ref_periods={refs}")
     print("  → build rule: filter reference_period_desc='YEAR'; handle OT; pick ONE on-farm ref period and say which")
 
 
-def probe_cond_yield():
+def probe_cond_yield(res):
     sect("3. CONDITIONS→YIELD — is an honest fit even there? (IA sample)")
     pairs = []
-    for yr in range(2000, 2026):
-        ge = count({"short_desc": "CORN - CONDITION, MEASURED IN PCT GOOD",
-                    "agg_level_desc": "STATE", "state_alpha": "IA", "year": str(yr)})
-        ex = count({"short_desc": "CORN - CONDITION, MEASURED IN PCT EXCELLENT",
-                    "agg_level_desc": "STATE", "state_alpha": "IA", "year": str(yr)})
-        yl = count({"short_desc": "CORN, GRAIN - YIELD, MEASURED IN BU / ACRE",
-                    "agg_level_desc": "STATE", "state_alpha": "IA", "year": str(yr),
-                    "reference_period_desc": "YEAR"})
+    for yr in COND_YEARS:
+        ge, ex, yl = (count(res[f"cond/{yr}/{s}"]) for s in COND_SERIES)
         def wk(rows, w=28):
             # real ISO week, same matcher family as fetch_conditions.py —
             # the earlier month*4+day//7 shortcut wrongly matched late June
@@ -158,7 +178,6 @@ def probe_cond_yield():
                 pass
         if g is not None and e is not None and y is not None:
             pairs.append((yr, round(g + e, 1), y))
-        time.sleep(0.6)
     print(f"  IA pairs (yr, ~wk28 G+E, final yield): {len(pairs)}")
     for p in pairs[-8:]:
         print(f"    {p}")
@@ -174,12 +193,19 @@ def probe_cond_yield():
 
 
 def main():
-    print("PROBE EPIC-2 — reads only, writes nothing. Paste the full log back.")
-    if not KEY:
+    ap = argparse.ArgumentParser()
+    pr.add_args(ap, deadline=1800)
+    a = ap.parse_args()
+    print("PROBE EPIC-2 — reads only, writes nothing. Paste the full log back."
+          + (" (replay)" if a.replay else ""))
+    if not KEY and not a.replay:
         raise SystemExit("FATAL: NASS_API_KEY not set")
-    probe_tenure()
-    probe_storage()
-    probe_cond_yield()
+    run = pr.Runner.from_args("epic2", a)
+    res = run.fetch(endpoints())
+    probe_tenure(res)
+    probe_storage(res)
+    probe_cond_yield(res)
+    run.finish()
     print("\nDONE — tenure strings, storage traps, and the yield-fit honesty check "
           "decide the next three builds.")
 
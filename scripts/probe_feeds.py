@@ -27,18 +27,22 @@ WHAT THIS TESTS, PER FEED
   Every attempt reports status, bytes, item count, and newest item age, so a
   feed that returns 200 but is six weeks stale is not mistaken for a win.
 
-Writes nothing. Prints a verdict table.
+  The whole matrix (VARIANTS x FEEDS, plus gnews) goes out at once through
+  probe_runner (2026-10-19), at most two requests in flight per host where the
+  old loop slept 0.4 s between calls; --replay re-reads the recorded answers,
+  --report writes status, latency and item counts per attempt.
+
+Writes nothing to the site. Prints a verdict table.
 """
 
+import argparse
 import re
-import sys
-import time
-import urllib.error
 import urllib.parse
-import urllib.request
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
 
+import probe_runner as pr
+
 FEEDS = [
     ("nass_reports",  "https://www.nass.usda.gov/rss/reports.xml",              None),
     ("nass_news",     "https://www.nass.usda.gov/rss/news.xml",                 None),
@@ -73,26 +77,17 @@ ACCEPT = ("application/rss+xml, application/atom+xml, application/xml;q=0.9, "
           "text/xml;q=0.9, */*;q=0.8")
 
 
+# label, UA, timeout (s): attempts A-C against each publisher's own feed
+VARIANTS = (("A current", UA_CURRENT, 12),
+            ("B modern_ua", UA_MODERN, 12),
+            ("C long_to", UA_CURRENT, 30))
+
+
 def headers(ua):
     return {"User-Agent": ua, "Accept": ACCEPT, "Accept-Language": "en-US,en;q=0.9",
             "Accept-Encoding": "gzip, deflate", "Cache-Control": "no-cache"}
 
 
-def get(url, ua, timeout):
-    req = urllib.request.Request(url, headers=headers(ua))
-    try:
-        with urllib.request.urlopen(req, timeout=timeout) as r:
-            raw = r.read()
-            if r.headers.get("Content-Encoding") == "gzip":
-                import gzip
-                raw = gzip.decompress(raw)
-            return r.status, raw.decode("utf-8", "replace"), None
-    except urllib.error.HTTPError as e:
-        return e.code, "", f"HTTP {e.code}"
-    except Exception as e:
-        return None, "", f"{type(e).__name__}: {str(e)[:60]}"
-
-
 def analyse(body):
     """-> (n_items, age_days_of_newest or None). A 200 that is six weeks stale
     is not a working feed, and must not be counted as one."""
@@ -121,44 +116,41 @@ def gnews_url(domain):
     return f"https://news.google.com/rss/search?q={q}&hl=en-US&gl=US&ceid=US:en"
 
 
+def endpoints():
+    for name, url, domain in FEEDS:
+        for label, ua, to in VARIANTS:
+            yield pr.Endpoint(f"{name}/{label}", url, headers(ua), to)
+        if domain:
+            yield pr.Endpoint(f"{name}/D gnews", gnews_url(domain), headers(UA_MODERN), 20)
+
+
+def attempt(label, r):
+    """Print one attempt's line. -> True if it is a live, recent feed."""
+    body = pr.text(r)
+    if r.error or not body:
+        print(f"     {label:<12} {str(r.status):<5} {'':>7}   {r.error or 'empty body'}")
+        return False
+    n, age = analyse(body)
+    ok = n > 0 and (age is None or age < 7)
+    print(f"     {label:<12} {str(r.status):<5} {len(body):>7}B  items={n:<3} "
+          f"newest={'?' if age is None else f'{age:.1f}d'}  {'OK' if ok else 'stale/empty'}")
+    return ok
+
+
 def main():
-    print("PROBE FEEDS — reads only, writes nothing")
+    ap = argparse.ArgumentParser()
+    pr.add_args(ap, deadline=300)
+    a = ap.parse_args()
+    print("PROBE FEEDS — reads only, writes nothing" + (" (replay)" if a.replay else ""))
     print(f"runner egress IP class matters here; this runs from GitHub's Azure ranges\n")
+    run = pr.Runner.from_args("feeds", a)
+    got = run.fetch(endpoints())
     rows = []
     for name, url, domain in FEEDS:
         print(f"── {name}  {url}")
-        res = {}
-
-        for label, ua, to in (("A current", UA_CURRENT, 12),
-                              ("B modern_ua", UA_MODERN, 12),
-                              ("C long_to", UA_CURRENT, 30)):
-            st, body, err = get(url, ua, to)
-            if body:
-                n, age = analyse(body)
-                ok = n > 0 and (age is None or age < 7)
-                res[label] = ok
-                print(f"     {label:<12} {str(st):<5} {len(body):>7}B  items={n:<3} "
-                      f"newest={'?' if age is None else f'{age:.1f}d'}  {'OK' if ok else 'stale/empty'}")
-            else:
-                res[label] = False
-                print(f"     {label:<12} {str(st):<5} {'':>7}   {err}")
-            time.sleep(0.4)
-
-        if domain:
-            st, body, err = get(gnews_url(domain), UA_MODERN, 20)
-            if body:
-                n, age = analyse(body)
-                ok = n > 0 and (age is None or age < 7)
-                res["D gnews"] = ok
-                print(f"     {'D gnews':<12} {str(st):<5} {len(body):>7}B  items={n:<3} "
-                      f"newest={'?' if age is None else f'{age:.1f}d'}  {'OK' if ok else 'stale/empty'}")
-            else:
-                res["D gnews"] = False
-                print(f"     {'D gnews':<12} {str(st):<5} {'':>7}   {err}")
-            time.sleep(0.4)
-        else:
-            res["D gnews"] = None   # USDA/EIA: no point routing gov feeds via Google
-
+        res = {label: attempt(label, got[f"{name}/{label}"]) for label, _, _ in VARIANTS}
+        # USDA/EIA: no point routing gov feeds via Google
+        res["D gnews"] = attempt("D gnews", got[f"{name}/D gnews"]) if domain else None
         rows.append((name, res))
         print()
 
@@ -191,6 +183,7 @@ def main():
     print(f"  genuinely dead         : {len(fixes['dead'])}  {fixes['dead']}")
     total = len(fixes['already']) + len(fixes['modern_ua']) + len(fixes['long_to']) + len(fixes['gnews'])
     print(f"\n  ACHIEVABLE COVERAGE    : {total}/22  (today: {len(fixes['already'])}/22)")
+    run.finish()
     print("\n  Paste this log back and the fixes get written against these results.")
 
 
@@ -17,49 +17,78 @@ Q3  Does filtering reference_period_desc='YEAR' collapse the state yield series
     to exactly one row per state-year? (The probe showed AUG/SEP/NOV FORECAST
     rows sharing the same year — unfiltered, a forecast can overwrite a final.)
 
-Writes nothing. Prints answers.
+The eleven calls behind the three answers are declared up front (CALLS) and
+go out together through probe_runner (2026-10-19); --replay answers them from
+the recorded responses, --report writes latency, status and row counts.
+
+Writes nothing to the site. Prints answers.
 """
 
+import argparse
 import json
 import os
 import sys
-import urllib.error
 import urllib.parse
-import urllib.request
 from collections import Counter, defaultdict
 
+import probe_runner as pr
+
 NASS = "https://quickstats.nass.usda.gov/api/api_GET/"
-UA = {"User-Agent": "AGSIST-probe/1.0 (+https://agsist.com; sig@farmers1st.com)"}
+UA = pr.UA
+RENT_NONIRR = "RENT, CASH, CROPLAND, NON-IRRIGATED - EXPENSE, MEASURED IN $ / ACRE"
+CORN_YIELD = "CORN, GRAIN - YIELD, MEASURED IN BU / ACRE"
+Q2_YEARS = ("2013", "2014", "2015", "2016", "2017")
+Q3_FILTERS = (("UNFILTERED", {}), ("ref_period=YEAR", {"reference_period_desc": "YEAR"}))
+
+# name -> Quick Stats params; every question's calls, declared as data
+CALLS = {
+    **{f"q1/{agg}": {"commodity_desc": "RENT", "agg_level_desc": agg, "year": "2024"}
+       for agg in ("COUNTY", "STATE")},
+    **{f"q2/{yr}": {"short_desc": RENT_NONIRR, "agg_level_desc": "COUNTY", "year": yr}
+       for yr in Q2_YEARS},
+    **{f"q3/{label}": dict({"short_desc": CORN_YIELD, "agg_level_desc": "STATE", "year": "2023"}, **extra)
+       for label, extra in Q3_FILTERS},
+    "q3/IA final": {"short_desc": CORN_YIELD, "agg_level_desc": "STATE", "year": "2023",
+                    "reference_period_desc": "YEAR", "state_alpha": "IA"},
+    "q3/IA aug": {"short_desc": CORN_YIELD, "agg_level_desc": "STATE", "year": "2023",
+                  "reference_period_desc": "YEAR - AUG FORECAST", "state_alpha": "IA"},
+}
 
 
 def out(*a):
     print(*a, flush=True)
 
 
-def call(key, params, timeout=240):
-    q = {"key": key, "format": "JSON"}
-    q.update(params)
-    url = NASS + "?" + urllib.parse.urlencode(q)
-    try:
-        req = urllib.request.Request(url, headers=UA)
-        with urllib.request.urlopen(req, timeout=timeout) as r:
-            return json.loads(r.read().decode("utf-8", "replace")).get("data", [])
-    except urllib.error.HTTPError as e:
-        body = e.read()[:160].decode("utf-8", "replace").replace("\n", " ")
-        out(f"    HTTP {e.code}: {body}")
+def endpoints(key):
+    for name, params in CALLS.items():
+        q = {"key": key, "format": "JSON"}
+        q.update(params)
+        yield pr.Endpoint(name, NASS + "?" + urllib.parse.urlencode(q), UA, 240)
+
+
+def rows_of(r):
+    """The answer's data rows, or None (and why) when the call failed."""
+    if r.error:
+        if r.status:
+            body = r.body[:160].decode("utf-8", "replace").replace("\n", " ")
+            out(f"    HTTP {r.status}: {body}")
+        else:
+            out(f"    {r.error}")
         return None
-    except Exception as e:
+    try:
+        return json.loads(r.body.decode("utf-8", "replace")).get("data", [])
+    except (ValueError, AttributeError) as e:
         out(f"    {type(e).__name__}: {e}")
         return None
 
 
-def q1_enumerate_rent(key):
+def q1_enumerate_rent(res):
     out("\n" + "=" * 78)
     out("  Q1 — every short_desc NASS publishes under commodity_desc=RENT")
     out("=" * 78)
     for agg in ("COUNTY", "STATE"):
         out(f"\n  agg_level_desc={agg}, year=2024:")
-        rows = call(key, {"commodity_desc": "RENT", "agg_level_desc": agg, "year": "2024"})
+        rows = rows_of(res[f"q1/{agg}"])
         if rows is None:
             out("    (request failed)")
             continue
@@ -74,13 +103,12 @@ def q1_enumerate_rent(key):
             out(f"    {n:>7} rows  {sd!r}{mark}")
 
 
-def q2_2015(key):
+def q2_2015(res):
     out("\n" + "=" * 78)
     out("  Q2 — does county cash rent exist for 2015?")
     out("=" * 78)
-    sd = "RENT, CASH, CROPLAND, NON-IRRIGATED - EXPENSE, MEASURED IN $ / ACRE"
-    for yr in ("2013", "2014", "2015", "2016", "2017"):
-        rows = call(key, {"short_desc": sd, "agg_level_desc": "COUNTY", "year": yr})
+    for yr in Q2_YEARS:
+        rows = rows_of(res[f"q2/{yr}"])
         n = 0 if rows is None else len(rows)
         flag = ""
         if yr == "2015":
@@ -90,13 +118,12 @@ def q2_2015(key):
         out(f"    {yr}: {n:>6} counties{flag}")
 
 
-def q3_forecast_filter(key):
+def q3_forecast_filter(res):
     out("\n" + "=" * 78)
     out("  Q3 — does reference_period_desc='YEAR' give exactly 1 row per state-year?")
     out("=" * 78)
-    sd = "CORN, GRAIN - YIELD, MEASURED IN BU / ACRE"
-    for label, extra in (("UNFILTERED", {}), ("ref_period=YEAR", {"reference_period_desc": "YEAR"})):
-        rows = call(key, dict({"short_desc": sd, "agg_level_desc": "STATE", "year": "2023"}, **extra))
+    for label, _ in Q3_FILTERS:
+        rows = rows_of(res[f"q3/{label}"])
         if rows is None:
             continue
         per = defaultdict(list)
@@ -111,23 +138,27 @@ def q3_forecast_filter(key):
         else:
             out("      clean: exactly one row per state — safe to key by year")
     # what a forecast/final disagreement actually costs
-    fin = call(key, {"short_desc": sd, "agg_level_desc": "STATE", "year": "2023",
-                     "reference_period_desc": "YEAR", "state_alpha": "IA"})
-    aug = call(key, {"short_desc": sd, "agg_level_desc": "STATE", "year": "2023",
-                     "reference_period_desc": "YEAR - AUG FORECAST", "state_alpha": "IA"})
+    fin = rows_of(res["q3/IA final"])
+    aug = rows_of(res["q3/IA aug"])
     if fin and aug:
         out(f"\n    IA 2023 corn: FINAL={fin[0].get('Value')} bu vs AUG FORECAST={aug[0].get('Value')} bu")
         out("      ^ this is the size of the error if the filter is missing")
 
 
 def main():
+    ap = argparse.ArgumentParser()
+    pr.add_args(ap, deadline=600)
+    a = ap.parse_args()
     key = os.environ.get("NASS_API_KEY", "").strip()
-    if not key:
+    if not key and not a.replay:
         sys.exit("NASS_API_KEY missing")
-    out("PROBE v2 — settling open questions. Writes nothing.")
-    q1_enumerate_rent(key)
-    q2_2015(key)
-    q3_forecast_filter(key)
+    out("PROBE v2 — settling open questions. Writes nothing." + (" (replay)" if a.replay else ""))
+    run = pr.Runner.from_args("rent", a)
+    res = run.fetch(endpoints(key))
+    q1_enumerate_rent(res)
+    q2_2015(res)
+    q3_forecast_filter(res)
+    run.finish()
     out("\n" + "=" * 78)
     out("  DONE — paste this log back")
     out("=" * 78)
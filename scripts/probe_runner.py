@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+probe_runner.py — the probes' one fetcher: endpoints as data, fetched
+concurrently under per-host limits and one deadline, every answer recorded
+for offline replay, and a per-endpoint report a machine can read.
+
+WHY THIS FILE EXISTS
+  probe_sources, probe_feeds, probe_viral, probe_epic2 and probe_rent each
+  walked their URLs one at a time with blocking urllib and 90-240 s timeouts,
+  so a run took the SUM of every answer (probe_epic2 alone made ~100 NASS
+  calls with a 0.6 s sleep between them), and what it learnt lived only in
+  the Actions log. Too slow to run before a pipeline change, and nothing to
+  compare the next run against.
+
+HOW IT WORKS
+  A probe declares Endpoint(name, url, ...) tuples and hands a list to
+  Runner.fetch(), which
+    - runs them on a thread pool, never more than per_host at once against
+      one host (NASS throttles; a publisher's WAF notices bursts),
+    - holds the whole run to one deadline: each request's timeout is cut to
+      what is left, and an endpoint not reached in time is reported as
+      "deadline", not fetched,
+    - retries 403/429/5xx after the endpoint's own pauses, inside the deadline,
+    - returns {name: Result} in declaration order.
+  Probes whose next questions depend on the answers (the columns a sample
+  row showed, the links a page listed) call fetch() again; every batch of a
+  run shares its deadline and its report.
+
+  Every live answer is recorded to the fixture store, STORE/<probe>/ (the
+  repo's .probe-fixtures/, gitignored): <name>-<hash>.json holds status,
+  headers, latency and shape, <name>-<hash>.body the bytes. API keys are cut
+  out of URLs before they are hashed, recorded or reported, so nothing secret
+  lands on disk and a replay needs no key. --replay fetches nothing: answers
+  come from the store, so a probe's whole diagnostic re-runs offline against
+  the last recorded responses (the probe workflows upload the store as an
+  artifact for exactly this).
+
+  Shape is read off each body: columns and row count of JSON rows (a list,
+  or NASS's {"data": [...]}), of a get_param_values list, of RSS/Atom items.
+  A live answer whose columns differ from its recording reports the columns
+  added and removed; an endpoint's `expect` columns that are absent are
+  reported live or replayed.
+
+  --report PATH writes one record per endpoint: name, url (key cut), host,
+  status, error, latency_ms, bytes, rows, columns, schema changes, and
+  source (live | fixture).
+
+    import probe_runner as pr
+    pr.add_args(ap)
+    run = pr.Runner.from_args("sources", ap.parse_args())
+    res = run.fetch([pr.Endpoint("basis", url, expect=("date",))])
+    rows = pr.json_body(res["basis"])
+    run.finish()                          # summary line, --report file
+
+    python3 scripts/probe_runner.py --selftest
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+REPO = Path(__file__).resolve().parent.parent
+STORE = REPO / ".probe-fixtures"
+UA = {"User-Agent": "AGSIST-probe/1.0 (+https://agsist.com; sig@farmers1st.com)"}
+JOBS = 16
+PER_HOST = 2
+DEADLINE = 900                     # seconds, the whole run
+RETRY_ON = (403, 429)              # plus every 5xx
+SECRET = re.compile(r"([?&])(?:key|api_key|app_token|token)=[^&#]*&?")
+
+# headers None -> UA; retry: pauses (s) before each re-try of a throttled
+# answer; expect: columns the probe's consumer relies on
+Endpoint = namedtuple("Endpoint", "name url headers timeout method retry expect",
+                      defaults=(None, 60, "GET", (), ()))
+# error None exactly when status is 2xx; body is bytes (gzip undone);
+# changes: {"added", "removed", "missing", "rows_was"}, only what applies
+Result = namedtuple("Result", "name url host status error latency body headers "
+                              "columns rows source changes")
+
+
+def public(url):
+    """The url with API keys cut out: what is hashed, recorded and reported."""
+    return SECRET.sub(r"\1", url).rstrip("?&")
+
+
+def text(r):
+    return r.body.decode("utf-8", "replace") if r.body else ""
+
+
+def json_body(r):
+    """Parsed JSON of a successful answer, else None."""
+    if r.error or not r.body:
+        return None
+    try:
+        return json.loads(r.body)
+    except ValueError:
+        return None
+
+
+def _columns(rows):
+    cols = {}
+    for row in rows[:200]:
+        if isinstance(row, dict):
+            cols.update(dict.fromkeys(row))
+    return list(cols) if cols else None
+
+
+def shape(body):
+    """-> (columns, rows) of a body; (None, None) where there are no rows to count."""
+    head = (body or b"").lstrip(b"\xef\xbb\xbf \t\r\n")[:1]
+    if head in (b"[", b"{"):
+        try:
+            d = json.loads(body)
+        except ValueError:
+            return None, None
+        if isinstance(d, dict):
+            if isinstance(d.get("data"), list):
+                d = d["data"]
+            elif len(d) == 1 and isinstance(next(iter(d.values())), list):
+                k = next(iter(d))                          # get_param_values
+                return [k], len(d[k])
+            else:
+                return list(d), None
+        return (_columns(d), len(d)) if isinstance(d, list) else (None, None)
+    if head == b"<":
+        items = re.findall(r"<(item|entry)\b[^>]*>(.*?)</\1>", body.decode("utf-8", "replace"), re.S)
+        if not items:
+            return None, None
+        tags = re.findall(r"<([A-Za-z][\w:.-]*)", items[0][1])
+        return list(dict.fromkeys(tags)), len(items)
+    return None, None
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("_")[:60]
+
+
+class Runner:
+    """One probe run: its deadline, host limits, fixture store and report."""
+
+    def __init__(self, probe, jobs=JOBS, per_host=PER_HOST, deadline=DEADLINE,
+                 store=STORE, replay=False, report=None):
+        self.probe, self.jobs, self.per_host = probe, jobs, per_host
+        self.deadline, self.replay, self.report = deadline, replay, report
+        self.store = Path(store) / probe if store else None
+        self.t0 = time.monotonic()
+        self.t_end = self.t0 + deadline
+        self.started = datetime.now(timezone.utc)
+        self.results = []
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_args(cls, probe, a):
+        return cls(probe, jobs=a.jobs, per_host=a.per_host, deadline=a.deadline,
+                   store=a.store, replay=a.replay, report=a.report)
+
+    def left(self):
+        return self.t_end - time.monotonic()
+
+    def _slot(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.Semaphore(self.per_host)
+            return self._hosts[host]
+
+    def _path(self, ep, suffix):
+        h = hashlib.sha1(f"{ep.method} {public(ep.url)}".encode()).hexdigest()[:12]
+        return self.store / f"{_slug(ep.name)}-{h}{suffix}"
+
+    def _result(self, ep, status, error, latency, body, headers, source, prev=None):
+        cols, rows = shape(body) if not error else (None, None)
+        changes = {}
+        if prev and cols is not None and prev.get("columns") is not None:
+            added = [c for c in cols if c not in prev["columns"]]
+            removed = [c for c in prev["columns"] if c not in cols]
+            if added:
+                changes["added"] = added
+            if removed:
+                changes["removed"] = removed
+            if removed or added or prev.get("rows") != rows:
+                changes["rows_was"] = prev.get("rows")
+        missing = [c for c in ep.expect if cols is None or c not in cols] if not error else []
+        if missing:
+            changes["missing"] = missing
+        return Result(ep.name, public(ep.url), urlsplit(ep.url).netloc, status, error,
+                      latency, body, headers, cols, rows, source, changes)
+
+    def _load(self, ep):
+        try:
+            meta = json.loads(self._path(ep, ".json").read_text(encoding="utf-8"))
+            return meta, self._path(ep, ".body").read_bytes()
+        except (OSError, ValueError):
+            return None, None
+
+    def _record(self, r, ep):
+        self.store.mkdir(parents=True, exist_ok=True)
+        self._path(ep, ".body").write_bytes(r.body or b"")
+        meta = {"name": r.name, "url": r.url, "method": ep.method, "status": r.status,
+                "error": r.error, "latency_ms": round(r.latency * 1000), "headers": r.headers,
+                "columns": r.columns, "rows": r.rows,
+                "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+        self._path(ep, ".json").write_text(json.dumps(meta, indent=1) + "\n", encoding="utf-8")
+
+    def _get(self, ep, timeout):
+        """-> (status, error, body, headers) of one attempt."""
+        req = urllib.request.Request(ep.url, headers=UA if ep.headers is None else ep.headers,
+                                     method=ep.method)
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as r:
+                status, body, hd = r.status, r.read(), r.headers
+            error = None
+        except urllib.error.HTTPError as e:
+            status, hd, error = e.code, e.headers, f"HTTP {e.code}"
+            try:
+                body = e.read()
+            except Exception:
+                body = b""
+        except Exception as e:
+            return None, f"{type(e).__name__}: {str(e)[:80]}", b"", {}
+        if hd.get("Content-Encoding") == "gzip" and body:
+            try:
+                body = gzip.decompress(body)
+            except OSError:
+                pass
+        keep = {k: hd[k] for k in ("Content-Type", "Content-Length", "Last-Modified") if hd.get(k)}
+        return status, error, body, keep
+
+    def _one(self, ep):
+        if self.replay:
+            meta, body = self._load(ep)
+            if meta is None:
+                return self._result(ep, None, "no fixture", 0.0, b"", {}, "fixture")
+            return self._result(ep, meta["status"], meta["error"], meta["latency_ms"] / 1000,
+                                body, meta.get("headers") or {}, "fixture")
+        slot = self._slot(urlsplit(ep.url).netloc)
+        if self.left() <= 0 or not slot.acquire(timeout=max(self.left(), 0)):
+            return self._result(ep, None, "deadline", 0.0, b"", {}, "live")
+        try:
+            pauses = list(ep.retry)
+            while True:
+                if self.left() <= 0:
+                    return self._result(ep, None, "deadline", 0.0, b"", {}, "live")
+                t = time.monotonic()
+                status, error, body, hd = self._get(ep, min(ep.timeout, self.left()))
+                latency = time.monotonic() - t
+                throttled = status is not None and (status in RETRY_ON or status >= 500)
+                if not (throttled and pauses and pauses[0] < self.left()):
+                    break
+                pause = pauses.pop(0)
+                print(f"    {ep.name}: HTTP {status} — backoff {pause}s", file=sys.stderr)
+                time.sleep(pause)
+        finally:
+            slot.release()
+        prev, _ = self._load(ep) if self.store else (None, None)
+        r = self._result(ep, status, error, latency, body, hd, "live", prev)
+        if self.store:
+            self._record(r, ep)
+        return r
+
+    def fetch(self, endpoints):
+        """Fetch (or replay) every endpoint. -> {name: Result}, in declaration order."""
+        endpoints = list(endpoints)
+        if not endpoints:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.jobs, len(endpoints))) as ex:
+            res = list(ex.map(self._one, endpoints))
+        self.results.extend(res)
+        return {r.name: r for r in res}
+
+    def finish(self):
+        """Print the run's summary and changed schemas; write --report. -> the records."""
+        recs = [{"name": r.name, "url": r.url, "host": r.host, "status": r.status, "error": r.error,
+                 "latency_ms": round(r.latency * 1000), "bytes": len(r.body or b""),
+                 "rows": r.rows, "columns": r.columns, "changes": r.changes or None,
+                 "source": r.source} for r in self.results]
+        bad = sum(1 for r in self.results if r.error and r.error != "deadline")
+        late = sum(1 for r in self.results if r.error == "deadline")
+        changed = [r for r in self.results if r.changes]
+        secs = time.monotonic() - self.t0
+        print(f"\nprobe-runner [{self.probe}]: {len(recs)} endpoints, {len(recs) - bad - late} ok, "
+              f"{bad} failed, {late} past the {self.deadline:.0f}s deadline, "
+              f"{len(changed)} schema changes — {secs:.1f}s "
+              f"({'replayed from ' + str(self.store) if self.replay else 'live'})")
+        for r in changed:
+            print(f"  schema {r.name}: " + "  ".join(f"{k}={v}" for k, v in r.changes.items()))
+        if self.report:
+            Path(self.report).parent.mkdir(parents=True, exist_ok=True)
+            Path(self.report).write_text(json.dumps(
+                {"probe": self.probe, "started": self.started.isoformat(timespec="seconds"),
+                 "seconds": round(secs, 1), "mode": "replay" if self.replay else "live",
+                 "endpoints": recs}, indent=1) + "\n", encoding="utf-8")
+            print(f"  report -> {self.report}")
+        return recs
+
+
+def add_args(ap, deadline=DEADLINE):
+    """The runner's flags, shared by every probe."""
+    ap.add_argument("--replay", action="store_true",
+                    help="fetch nothing: answer from the fixture store")
+    ap.add_argument("--report", metavar="PATH", help="write the per-endpoint JSON report here")
+    ap.add_argument("--store", default=str(STORE), help=f"fixture store (default {STORE.name}/)")
+    ap.add_argument("--jobs", type=int, default=JOBS)
+    ap.add_argument("--per-host", type=int, default=PER_HOST)
+    ap.add_argument("--deadline", type=float, default=deadline, help="seconds for the whole run")
+
+
+# ---------------------------------------------------------------- selftest
+def selftest():
+    import socket
+    import tempfile
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    ok = True
+
+    def chk(cond, msg):
+        nonlocal ok
+        print(("  OK   " if cond else "  FAIL ") + msg)
+        ok = ok and cond
+
+    state = {"v2": False, "live": 0, "peak": 0, "flaky": 0, "hits": 0}
+    guard = threading.Lock()
+    rss = (b'<?xml version="1.0"?><rss><channel><title>t</title>'
+           + b"".join(b"<item><title>h%d</title><link>l</link><pubDate>d</pubDate></item>" % i
+                      for i in range(3)) + b"</channel></rss>")
+
+    class H(BaseHTTPRequestHandler):
+        def log_message(self, *a):
+            pass
+
+        def send(self, code, body, ctype="application/json", enc=None):
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            if enc:
+                self.send_header("Content-Encoding", enc)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_HEAD(self):
+            self.do_GET()
+
+        def do_GET(self):
+            with guard:
+                state["hits"] += 1
+            path = self.path.split("?")[0]
+            if path == "/rows.json":
+                rows = [{"a": i, "c" if state["v2"] else "b": i * 2} for i in range(4)]
+                self.send(200, json.dumps(rows).encode())
+            elif path == "/nass":
+                self.send(200, json.dumps({"data": [{"year": "2024", "Value": "1"}] * 5}).encode())
+            elif path == "/params":
+                self.send(200, json.dumps({"short_desc": ["X", "Y"]}).encode())
+            elif path == "/feed.xml":
+                self.send(200, gzip.compress(rss), "application/rss+xml", "gzip")
+            elif path == "/slow":
+                with guard:
+                    state["live"] += 1
+                    state["peak"] = max(state["peak"], state["live"])
+                time.sleep(float(self.path.split("ms=")[1].split("&")[0]) / 1000)
+                with guard:
+                    state["live"] -= 1
+                self.send(200, b'[{"x": 1}]')
+            elif path == "/flaky":
+                state["flaky"] += 1
+                self.send(429 if state["flaky"] == 1 else 200, b'[{"x": 1}]')
+            else:
+                self.send(404, b"no such thing", "text/plain")
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), H)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{srv.server_address[1]}"
+    print("probe_runner selftest")
+    with tempfile.TemporaryDirectory() as td:
+        eps = [Endpoint("rows", f"{base}/rows.json?key=SECRET123&$limit=3", expect=("a", "b")),
+               Endpoint("nass", f"{base}/nass?key=SECRET123&format=JSON", timeout=5),
+               Endpoint("params", f"{base}/params?param=short_desc&key=SECRET123"),
+               Endpoint("feed", f"{base}/feed.xml"),
+               Endpoint("head", f"{base}/rows.json", method="HEAD"),
+               Endpoint("gone", f"{base}/missing")]
+        run = Runner("t", store=td, report=str(Path(td) / "report.json"))
+        res = run.fetch(eps)
+        chk(list(res) == [e.name for e in eps], "results in declaration order")
+        r = res["rows"]
+        chk(r.status == 200 and r.error is None and r.columns == ["a", "b"] and r.rows == 4,
+            f"JSON rows: columns and count ({r.columns}, {r.rows})")
+        chk(json_body(r)[0] == {"a": 0, "b": 0}, "json_body parses the answer")
+        chk((res["nass"].columns, res["nass"].rows) == (["year", "Value"], 5), "NASS {'data': [...]} rows")
+        chk((res["params"].columns, res["params"].rows) == (["short_desc"], 2), "get_param_values list")
+        f = res["feed"]
+        chk(f.rows == 3 and f.columns == ["title", "link", "pubDate"] and text(f).startswith("<?xml"),
+            f"gzip undone, RSS items counted ({f.columns}, {f.rows})")
+        chk(res["head"].status == 200 and res["head"].body == b""
+            and res["head"].headers.get("Content-Length") == str(len(r.body)), "HEAD keeps Content-Length")
+        g = res["gone"]
+        chk(g.status == 404 and g.error == "HTTP 404" and g.body == b"no such thing",
+            "an HTTP error keeps its status and body")
+        chk("SECRET123" not in r.url and r.url.endswith("/rows.json?$limit=3")
+            and public("u?a=1&key=K&b=2") == "u?a=1&b=2", "keys are cut from urls")
+        stored = b"".join(p.read_bytes() for p in Path(td).rglob("*") if p.is_file())
+        chk(b"SECRET123" not in stored and len(list(Path(td, "t").glob("*.json"))) == len(eps),
+            "every answer recorded, no key on disk")
+        run.finish()
+        rep = json.loads(Path(td, "report.json").read_text())
+        e0 = rep["endpoints"][0]
+        chk(rep["mode"] == "live" and len(rep["endpoints"]) == len(eps)
+            and {"latency_ms", "status", "columns", "rows", "bytes", "host"} <= set(e0)
+            and e0["rows"] == 4, "report: one record per endpoint")
+
+        print("schema diff against the recording")
+        state["v2"] = True
+        r2 = Runner("t", store=td).fetch(eps[:1])["rows"]
+        chk(r2.changes == {"added": ["c"], "removed": ["b"], "rows_was": 4, "missing": ["b"]},
+            f"renamed column reported ({r2.changes})")
+        r3 = Runner("t", store=td).fetch(eps[:1])["rows"]
+        chk(r3.changes == {"missing": ["b"]}, "re-recorded: only the expectation still fails")
+        state["v2"] = False
+        Runner("t", store=td).fetch(eps[:1])
+
+        print("concurrency, host limits, deadline, retry")
+        slow = [Endpoint(f"s{i}", f"{base}/slow?ms=300&i={i}") for i in range(6)]
+        t = time.monotonic()
+        Runner("c", store=None, per_host=6).fetch(slow)
+        fast = time.monotonic() - t
+        chk(fast < 1.0, f"6 x 300 ms answers overlap ({fast:.2f}s)")
+        state["peak"] = 0
+        t = time.monotonic()
+        Runner("c", store=None, per_host=2).fetch(slow)
+        chk(state["peak"] == 2 and time.monotonic() - t >= 0.85,
+            f"per_host=2 holds a host to 2 in flight (peak {state['peak']})")
+        t = time.monotonic()
+        late = Runner("c", store=None, deadline=0.5).fetch(
+            [Endpoint(f"z{i}", f"{base}/slow?ms=1500&i={i}") for i in range(4)])
+        took = time.monotonic() - t
+        chk(took < 1.4 and all(r.error for r in late.values()),
+            f"the deadline ends the run ({took:.2f}s; {[r.error for r in late.values()]})")
+        fl = Runner("c", store=None).fetch([Endpoint("f", f"{base}/flaky", retry=(0.05,))])["f"]
+        chk(fl.status == 200 and state["flaky"] == 2, "a 429 is retried after its pause")
+
+        print("offline replay")
+        srv.shutdown()
+        srv.server_close()
+        hits = state["hits"]
+        rep = Runner("t", store=td, replay=True, report=str(Path(td) / "replay.json"))
+        back = rep.fetch(eps + [Endpoint("never", f"{base}/never-recorded")])
+        chk(state["hits"] == hits, "replay makes no request")
+        chk(all((back[e.name].status, back[e.name].columns, back[e.name].rows, back[e.name].body)
+                == (res[e.name].status, res[e.name].columns, res[e.name].rows, res[e.name].body)
+                for e in eps), "replayed answers match the recording")
+        chk(back["rows"].source == "fixture" and back["rows"].changes == {}, "replayed and unchanged")
+        chk(back["never"].error == "no fixture", "an unrecorded endpoint says so")
+        rep.finish()
+        chk(json.loads(Path(td, "replay.json").read_text())["mode"] == "replay", "replay report")
+        with socket.socket() as s:                    # nothing listens here now
+            s.bind(("127.0.0.1", 0))
+            dead = f"http://127.0.0.1:{s.getsockname()[1]}/x"
+        down = Runner("c", store=None).fetch([Endpoint("down", dead, timeout=2)])["down"]
+        chk(down.status is None and down.error.startswith(("URLError", "ConnectionRefused")),
+            f"a dead host is an error, not a crash ({down.error})")
+
+    print("SELFTEST OK" if ok else "SELFTEST FAILED")
+    return 0 if ok else 1
+
+
+def main():
+    ap = argparse.ArgumentParser(description="run with --selftest; probes import this module")
+    ap.add_argument("--selftest", action="store_true")
+    a = ap.parse_args()
+    if a.selftest:
+        return selftest()
+    print(__doc__)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
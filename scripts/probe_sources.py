@@ -10,28 +10,34 @@ WHY THIS EXISTS
   intend to build on and prints exactly what is there: columns, types, sample
   rows, row counts, date ranges, and the distinct keys we would filter on.
 
-  It writes nothing and commits nothing. It is a telescope, not a pipeline.
+  It writes nothing to the site and commits nothing. It is a telescope, not a
+  pipeline.
 
   It also RE-VALIDATES the short_desc strings that fetch_cash_rent.py already
   depends on. That pipeline has never run against live NASS either; if a
   short_desc is wrong, the same mistake is about to be copied into two more
   pipelines. Better to find out once, here.
 
+  Fetching goes through probe_runner (2026-10-19): the samples and counts of
+  every dataset, then the ranges and distinct keys their columns imply, go out
+  concurrently in two batches, and every answer is recorded so --replay re-runs
+  the whole diagnostic offline. --report writes latency, status, columns and
+  row counts per endpoint.
+
 USAGE
   python scripts/probe_sources.py                 # everything
   python scripts/probe_sources.py --only nass     # nass | agtransport
+  python scripts/probe_sources.py --replay        # last recorded answers, no network
 """
 
 import argparse
-import json
 import os
-import sys
-import urllib.error
 import urllib.parse
-import urllib.request
 from collections import Counter
 
-UA = {"User-Agent": "AGSIST-probe/1.0 (+https://agsist.com; sig@farmers1st.com)"}
+import probe_runner as pr
+
+UA = pr.UA
 
 # ---------------------------------------------------------------- AgTransport
 # Socrata (SODA2). Public read: no key required, app token only raises limits.
@@ -47,6 +53,8 @@ AGT = {
 
 # ---------------------------------------------------------------------- NASS
 NASS = "https://quickstats.nass.usda.gov/api/api_GET/"
+# what every fetcher built on these rows reads
+NASS_COLUMNS = ("year", "state_alpha", "reference_period_desc", "Value")
 
 # Candidate short_desc strings. Several spellings are tried per concept because
 # NASS naming is not guessable and a near-miss returns zero rows rather than an
@@ -90,97 +98,110 @@ def hr(t):
     out("=" * 78)
 
 
-def get(url, timeout=90):
-    req = urllib.request.Request(url, headers=UA)
-    with urllib.request.urlopen(req, timeout=timeout) as r:
-        return r.read().decode("utf-8", "replace")
+def failed(r):
+    """Print why `r` failed and return True, or return False."""
+    if r.status and r.error:
+        out(f"    HTTP {r.status} — {r.body[:180].decode('utf-8', 'replace')}")
+    elif r.error:
+        out(f"    FAILED: {r.error}")
+    return bool(r.error)
+
+
+def agt_url(ds, query):
+    return f"{AGT_HOST}/resource/{ds}.json?{query}"
 
 
-def probe_agtransport():
+def probe_agtransport(run):
     hr("AGTRANSPORT (Socrata / SODA2) — no API key required for public reads")
+    first = run.fetch(ep for name, ds in AGT.items() for ep in (
+        pr.Endpoint(name, agt_url(ds, "$limit=3"), UA, 90),
+        pr.Endpoint(f"{name}/count", agt_url(ds, "$select=count(*)"), UA, 90)))
+
+    # second batch: date range + distinct keys on the likely columns the samples showed
+    cols, follow = {}, []
     for name, ds in AGT.items():
-        out(f"\n--- {name}  [{ds}]  {AGT_HOST}/resource/{ds}.json")
-        try:
-            rows = json.loads(get(f"{AGT_HOST}/resource/{ds}.json?$limit=3"))
-        except urllib.error.HTTPError as e:
-            out(f"    HTTP {e.code} — {e.read()[:180].decode('utf-8','replace')}")
+        rows = pr.json_body(first[name])
+        if not rows:
             continue
-        except Exception as e:
-            out(f"    FAILED: {type(e).__name__}: {e}")
+        cols[name] = list(rows[0].keys())
+        for dc in [c for c in cols[name] if any(w in c.lower() for w in ("date", "week", "period", "year"))][:2]:
+            follow.append(pr.Endpoint(f"{name}/range/{dc}", agt_url(ds, f"$select=min({dc}),max({dc})"), UA, 90))
+        for kc in [c for c in cols[name] if any(w in c.lower() for w in
+                   ("commodity", "origin", "destination", "location", "region", "mode", "measure", "type", "unit"))][:4]:
+            follow.append(pr.Endpoint(f"{name}/distinct/{kc}",
+                                      agt_url(ds, f"$select={kc}&$group={kc}&$limit=40"), UA, 90))
+    second = run.fetch(follow)
+
+    for name, ds in AGT.items():
+        out(f"\n--- {name}  [{ds}]  {AGT_HOST}/resource/{ds}.json")
+        if failed(first[name]):
             continue
+        rows = pr.json_body(first[name])
         if not rows:
             out("    returned 0 rows")
             continue
 
-        cols = list(rows[0].keys())
-        out(f"    COLUMNS ({len(cols)}): {cols}")
+        out(f"    COLUMNS ({len(cols[name])}): {cols[name]}")
         out("    SAMPLE ROW:")
         for k, v in rows[0].items():
             out(f"      {k:<28} = {str(v)[:60]}")
 
-        # row count
-        try:
-            n = json.loads(get(f"{AGT_HOST}/resource/{ds}.json?$select=count(*)"))
+        n = pr.json_body(first[f"{name}/count"])
+        if n:
             out(f"    ROW COUNT: {list(n[0].values())[0]}")
-        except Exception as e:
-            out(f"    row count failed: {e}")
-
-        # date range + distinct keys on likely columns
-        for dc in [c for c in cols if any(w in c.lower() for w in ("date", "week", "period", "year"))][:2]:
-            try:
-                r = json.loads(get(f"{AGT_HOST}/resource/{ds}.json?$select=min({dc}),max({dc})"))
-                out(f"    RANGE {dc}: {r[0]}")
-            except Exception:
-                pass
-        for kc in [c for c in cols if any(w in c.lower() for w in
-                   ("commodity", "origin", "destination", "location", "region", "mode", "measure", "type", "unit"))][:4]:
-            try:
-                r = json.loads(get(f"{AGT_HOST}/resource/{ds}.json?$select={kc}&$group={kc}&$limit=40"))
-                vals = [x.get(kc) for x in r]
-                out(f"    DISTINCT {kc} ({len(vals)}): {vals[:22]}")
-            except Exception:
-                pass
+        else:
+            out(f"    row count failed: {first[f'{name}/count'].error or 'unparseable'}")
+
+        for key, r in second.items():
+            if not key.startswith(f"{name}/") or not pr.json_body(r):
+                continue
+            _, kind, c = key.split("/", 2)
+            if kind == "range":
+                out(f"    RANGE {c}: {pr.json_body(r)[0]}")
+            else:
+                vals = [x.get(c) for x in pr.json_body(r)]
+                out(f"    DISTINCT {c} ({len(vals)}): {vals[:22]}")
 
 
-def nass_call(key, short_desc, agg, refperiod, extra=None):
+def nass_url(key, short_desc, agg, refperiod, extra=None):
     q = {"key": key, "short_desc": short_desc, "agg_level_desc": agg,
          "year__GE": "2000", "format": "JSON"}
     if refperiod:
         q["reference_period_desc"] = refperiod
     q.update(extra or {})
-    return get(NASS + "?" + urllib.parse.urlencode(q), timeout=180)
+    return NASS + "?" + urllib.parse.urlencode(q)
 
 
-def probe_nass():
+def probe_nass(run):
     hr("NASS QUICK STATS — validating every short_desc before anything is built on it")
     key = os.environ.get("NASS_API_KEY", "").strip()
-    if not key:
+    if not key and not run.replay:
         out("  NASS_API_KEY not set — skipping. (Repo secret exists; add it to the workflow env.)")
         return
 
+    res = run.fetch(pr.Endpoint(name, nass_url(key, sd, agg, rp), UA, 180, expect=NASS_COLUMNS)
+                    for name, sd, agg, rp in NASS_PROBES)
     for name, sd, agg, rp in NASS_PROBES:
         label = f"{name:<22} [{agg}]"
-        try:
-            body = nass_call(key, sd, agg, rp)
-        except urllib.error.HTTPError as e:
-            msg = e.read()[:200].decode("utf-8", "replace").replace("\n", " ")
+        r = res[name]
+        if r.status and r.error:
+            msg = r.body[:200].decode("utf-8", "replace").replace("\n", " ")
             # NASS answers "no rows match" with 400 — that means the short_desc is WRONG
-            out(f"  {label} HTTP {e.code}  <-- {'SHORT_DESC NOT FOUND / no rows' if e.code == 400 else msg}")
+            out(f"  {label} HTTP {r.status}  <-- {'SHORT_DESC NOT FOUND / no rows' if r.status == 400 else msg}")
             out(f"      tried: {sd!r}")
             continue
-        except Exception as e:
-            out(f"  {label} FAILED: {type(e).__name__}: {e}")
+        if r.error:
+            out(f"  {label} FAILED: {r.error}")
             continue
 
-        try:
-            data = json.loads(body).get("data", [])
-        except json.JSONDecodeError:
-            out(f"  {label} unparseable: {body[:120]}")
+        body = pr.json_body(r)
+        if body is None:
+            out(f"  {label} unparseable: {pr.text(r)[:120]}")
             continue
+        data = body.get("data", [])
         if not data:
             out(f"  {label} 0 rows  <-- short_desc likely wrong: {sd!r}")
             continue
-
         yrs = sorted({int(r["year"]) for r in data if str(r.get("year", "")).isdigit()})
         st = {r.get("state_alpha") for r in data}
         freq = Counter(r.get("freq_desc") for r in data)
@@ -199,12 +220,15 @@ def probe_nass():
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--only", default="", choices=["", "nass", "agtransport"])
+    pr.add_args(ap, deadline=600)
     a = ap.parse_args()
-    out("PROBE — reading sources, writing nothing.")
+    run = pr.Runner.from_args("sources", a)
+    out("PROBE — reading sources, writing nothing." + (" (replay)" if a.replay else ""))
     if a.only in ("", "agtransport"):
-        probe_agtransport()
+        probe_agtransport(run)
     if a.only in ("", "nass"):
-        probe_nass()
+        probe_nass(run)
+    run.finish()
     hr("DONE — paste this whole log back and the pipelines get built against reality")
 
 
@@ -33,33 +33,69 @@ What it settles, per page:
 
 Every failure prints a verdict line instead of crashing the whole probe —
 a dead source is a finding, not an error.
+
+Fetching goes through probe_runner (2026-10-19): every URL known up front
+(first_batch) goes out together, then the HEADs of the payment-file links the
+FSA page listed, then the smallest of those files, all inside one deadline.
+--replay re-runs the surveys offline from the recorded answers (xlsx bytes
+included); --report writes latency, status and shape per endpoint.
 """
+import argparse
 import io
 import json
 import os
 import re
-import sys
-import urllib.request
-import urllib.error
+import urllib.parse
+
+import probe_runner as pr
 
 UA = {"User-Agent": "AGSIST/1.0 (+https://agsist.com; data probe)"}
 TIMEOUT = 120
 
+AFIDA_INDEX = "https://www.fsa.usda.gov/resources/economic-policy-analysis/afida/annual-reports-underlying-data"
+AFIDA_YEARS = {
+    2024: "https://www.fsa.usda.gov/documents/afida-yr2024-holdings-data",
+    2023: "https://www.fsa.usda.gov/documents/afida-yr2023-holdings-data",
+    2015: "https://www.fsa.usda.gov/sites/default/files/documents/afida_current_holdings_yr2015.xlsx",
+}
+FSA_PAGES = [
+    "https://www.fsa.usda.gov/tools/informational/freedom-information-act-foia/electronic-reading-room/frequently-requested/payment-files",
+]
+AGT_JULY_PROBE = {"v85y-3hep": 27582, "g92w-8cn7": 38410,
+                  "an4w-mnp7": 34658, "deqi-uken": 8225, "8uye-ieij": 1246}
+AGT_NAMES = {"v85y-3hep": "grain_basis", "g92w-8cn7": "grain_prices",
+             "an4w-mnp7": "grain_price_spreads", "deqi-uken": "barge_rates",
+             "8uye-ieij": "transport_cost_idx"}
+COND_QUERY = {"short_desc": "CORN - CONDITION, MEASURED IN PCT EXCELLENT",
+              "agg_level_desc": "STATE", "state_alpha": "IA",
+              "year": "2026", "format": "JSON"}
+
 
-def get(url, timeout=TIMEOUT, binary=False):
-    req = urllib.request.Request(url, headers=UA)
-    with urllib.request.urlopen(req, timeout=timeout) as r:
-        body = r.read()
-    return body if binary else body.decode("utf-8", "replace")
+def ep(name, url, method="GET"):
+    return pr.Endpoint(name, url, UA, 30 if method == "HEAD" else TIMEOUT, method)
 
 
-def head_size(url):
-    req = urllib.request.Request(url, headers=UA, method="HEAD")
-    try:
-        with urllib.request.urlopen(req, timeout=30) as r:
-            return int(r.headers.get("Content-Length") or 0), r.headers.get("Content-Type", "")
-    except Exception as e:
-        return None, str(e)[:60]
+def first_batch(key):
+    """Every endpoint whose URL is known before anything has answered."""
+    yield ep("afida/index", AFIDA_INDEX)
+    for yr, url in AFIDA_YEARS.items():
+        yield ep(f"afida/{yr}/head", url, "HEAD")
+        yield ep(f"afida/{yr}", url)
+    for pu in FSA_PAGES:
+        yield ep(f"fsa/{pu.split('/')[-1]}", pu)
+    for ds in AGT_JULY_PROBE:
+        yield ep(f"agt/{ds}/count", f"https://agtransport.usda.gov/resource/{ds}.json?$select=count(*)")
+        yield ep(f"agt/{ds}/newest", f"https://agtransport.usda.gov/resource/{ds}.json?$select=max(date)")
+    if key is not None:
+        yield ep("conditions/IA", "https://quickstats.nass.usda.gov/api/api_GET/?"
+                 + urllib.parse.urlencode(dict(COND_QUERY, key=key)))
+
+
+def head_size(r):
+    """(Content-Length, Content-Type) of a HEAD answer; (None, why) when it failed."""
+    if r.error:
+        return None, r.error[:60]
+    return int(r.headers.get("Content-Length") or 0), r.headers.get("Content-Type", "")
 
 
 def sect(title):
@@ -102,69 +138,68 @@ def xlsx_survey(blob, label, max_rows=5000):
 
 
 # ---------------------------------------------------------------- 1. AFIDA
-def probe_afida():
+def probe_afida(res):
     sect("1. AFIDA — foreign holdings detailed data (fsa.usda.gov)")
-    candidates = {
-        2024: "https://www.fsa.usda.gov/documents/afida-yr2024-holdings-data",
-        2023: "https://www.fsa.usda.gov/documents/afida-yr2023-holdings-data",
-        2015: "https://www.fsa.usda.gov/sites/default/files/documents/afida_current_holdings_yr2015.xlsx",
-    }
     # also scrape the index page for every year link we can find
-    try:
-        idx = get("https://www.fsa.usda.gov/resources/economic-policy-analysis/afida/annual-reports-underlying-data")
-        links = re.findall(r'href="([^"]*(?:afida[^"]*(?:holdings|data)[^"]*|holdings[^"]*afida[^"]*))"', idx, re.I)
+    r = res["afida/index"]
+    if r.error:
+        print(f"  index page scrape FAILED: {r.error}")
+    else:
+        links = re.findall(r'href="([^"]*(?:afida[^"]*(?:holdings|data)[^"]*|holdings[^"]*afida[^"]*))"',
+                           pr.text(r), re.I)
         print(f"  index page: {len(links)} candidate data links found")
         for l in sorted(set(links))[:20]:
             print("    " + (l if l.startswith("http") else "https://www.fsa.usda.gov" + l))
-    except Exception as e:
-        print(f"  index page scrape FAILED: {type(e).__name__} {str(e)[:80]}")
 
-    for yr, url in candidates.items():
+    for yr in AFIDA_YEARS:
+        size, ctype = head_size(res[f"afida/{yr}/head"])
+        print(f"\n  YR{yr}: HEAD {size if size else '?'}B  type={ctype}")
+        r = res[f"afida/{yr}"]
+        if r.error:
+            print(f"  YR{yr}: FAILED {r.error}")
+            continue
+        print(f"  YR{yr}: downloaded {len(r.body):,}B — surveying")
         try:
-            size, ctype = head_size(url)
-            print(f"\n  YR{yr}: HEAD {size if size else '?'}B  type={ctype}")
-            blob = get(url, binary=True)
-            print(f"  YR{yr}: downloaded {len(blob):,}B — surveying")
-            xlsx_survey(blob, f"afida-{yr}")
+            xlsx_survey(r.body, f"afida-{yr}")
         except Exception as e:
             print(f"  YR{yr}: FAILED {type(e).__name__}: {str(e)[:100]}")
 
 
 # ---------------------------------------------------------- 6. FSA payments
-def probe_fsa_payments():
+def probe_fsa_payments(run, res):
     sect("6. FSA payment files (FOIA reading room)")
-    page_urls = [
-        "https://www.fsa.usda.gov/tools/informational/freedom-information-act-foia/electronic-reading-room/frequently-requested/payment-files",
-    ]
     links = []
-    for pu in page_urls:
-        try:
-            html = get(pu)
-            found = re.findall(r'href="([^"]+)"[^>]*>([^<]{4,80})</a>', html)
-            data_links = [(u, t.strip()) for u, t in found
-                          if re.search(r"payment|name.?address", t, re.I)
-                          and re.search(r"documents/|\.xlsx|\.zip", u, re.I)]
-            print(f"  {pu.split('/')[-1]}: {len(data_links)} payment-file links")
-            for u, t in data_links[:25]:
-                full = u if u.startswith("http") else "https://www.fsa.usda.gov" + u
-                links.append((full, t))
-                print(f"    {t[:60]:<60} {full[:80]}")
-        except Exception as e:
-            print(f"  page scrape FAILED: {type(e).__name__} {str(e)[:80]}")
+    for pu in FSA_PAGES:
+        r = res[f"fsa/{pu.split('/')[-1]}"]
+        if r.error:
+            print(f"  page scrape FAILED: {r.error}")
+            continue
+        found = re.findall(r'href="([^"]+)"[^>]*>([^<]{4,80})</a>', pr.text(r))
+        data_links = [(u, t.strip()) for u, t in found
+                      if re.search(r"payment|name.?address", t, re.I)
+                      and re.search(r"documents/|\.xlsx|\.zip", u, re.I)]
+        print(f"  {pu.split('/')[-1]}: {len(data_links)} payment-file links")
+        for u, t in data_links[:25]:
+            full = u if u.startswith("http") else "https://www.fsa.usda.gov" + u
+            links.append((full, t))
+            print(f"    {t[:60]:<60} {full[:80]}")
 
     # download the SMALLEST discovered file to survey the schema politely
+    heads = run.fetch(ep(f"fsa/head/{i}", full, "HEAD") for i, (full, _) in enumerate(links))
     best = None
-    for full, t in links:
-        size, _ = head_size(full)
+    for i, (full, t) in enumerate(links):
+        size, _ = head_size(heads[f"fsa/head/{i}"])
         if size:
             if best is None or size < best[0]:
                 best = (size, full, t)
     if best:
         size, full, t = best
         print(f"\n  downloading smallest file for schema survey: {t} ({size:,}B)")
+        r = run.fetch([ep("fsa/smallest", full)])["fsa/smallest"]
         try:
-            blob = get(full, binary=True)
-            xlsx_survey(blob, "fsa-payments")
+            if r.error:
+                raise OSError(r.error)
+            xlsx_survey(r.body, "fsa-payments")
         except Exception as e:
             print(f"  download FAILED: {type(e).__name__} {str(e)[:100]}")
     else:
@@ -172,42 +207,32 @@ def probe_fsa_payments():
 
 
 # ------------------------------------------- 4+8. AgTransport re-verification
-def probe_agtransport():
+def probe_agtransport(res):
     sect("4+8. AgTransport (Socrata, no key) — freshness re-check vs 2026-07-16 probe")
-    JULY_PROBE = {"v85y-3hep": 27582, "g92w-8cn7": 38410,
-                  "an4w-mnp7": 34658, "deqi-uken": 8225, "8uye-ieij": 1246}
-    names = {"v85y-3hep": "grain_basis", "g92w-8cn7": "grain_prices",
-             "an4w-mnp7": "grain_price_spreads", "deqi-uken": "barge_rates",
-             "8uye-ieij": "transport_cost_idx"}
-    for ds, prev in JULY_PROBE.items():
+    for ds, prev in AGT_JULY_PROBE.items():
         try:
-            cnt = json.loads(get(f"https://agtransport.usda.gov/resource/{ds}.json?$select=count(*)"))[0]
-            n = int(list(cnt.values())[0])
-            newest = json.loads(get(
-                f"https://agtransport.usda.gov/resource/{ds}.json?$select=max(date)"))[0]
-            nd = list(newest.values())[0]
-            print(f"  {names[ds]:<20} {ds}  rows={n:,} (Δ{n-prev:+,} since 7/16)  newest={str(nd)[:10]}")
+            cnt, newest = res[f"agt/{ds}/count"], res[f"agt/{ds}/newest"]
+            for r in (cnt, newest):
+                if r.error:
+                    raise OSError(r.error)
+            n = int(list(pr.json_body(cnt)[0].values())[0])
+            nd = list(pr.json_body(newest)[0].values())[0]
+            print(f"  {AGT_NAMES[ds]:<20} {ds}  rows={n:,} (Δ{n-prev:+,} since 7/16)  newest={str(nd)[:10]}")
         except Exception as e:
-            print(f"  {names[ds]:<20} {ds}  FAILED {type(e).__name__}: {str(e)[:80]}")
+            print(f"  {AGT_NAMES[ds]:<20} {ds}  FAILED {type(e).__name__}: {str(e)[:80]}")
 
 
 # --------------------------------------------------- 7. Conditions freshness
-def probe_conditions():
+def probe_conditions(res):
     sect("7. NASS weekly conditions — freshness re-check")
-    key = os.environ.get("NASS_API_KEY", "").strip()
-    if not key:
+    if "conditions/IA" not in res:
         print("  NASS_API_KEY not set — skipped (set the secret in probe-viral.yml)")
         return
-    import urllib.parse
-    q = urllib.parse.urlencode({
-        "key": key,
-        "short_desc": "CORN - CONDITION, MEASURED IN PCT EXCELLENT",
-        "agg_level_desc": "STATE", "state_alpha": "IA",
-        "year": "2026", "format": "JSON",
-    })
+    r = res["conditions/IA"]
     try:
-        d = json.loads(get("https://quickstats.nass.usda.gov/api/api_GET/?" + q))
-        rows = d.get("data", [])
+        if r.error:
+            raise OSError(r.error)
+        rows = pr.json_body(r).get("data", [])
         weeks = sorted(r.get("week_ending", "") for r in rows)
         print(f"  IA corn PCT EXCELLENT 2026: {len(rows)} weekly rows, "
               f"first={weeks[0] if weeks else '?'} newest={weeks[-1] if weeks else '?'}")
@@ -219,13 +244,20 @@ def probe_conditions():
 
 
 def main():
-    print("PROBE VIRAL — reads only, writes nothing")
+    ap = argparse.ArgumentParser()
+    pr.add_args(ap, deadline=900)
+    a = ap.parse_args()
+    print("PROBE VIRAL — reads only, writes nothing" + (" (replay)" if a.replay else ""))
     print("Settles data questions for: AFIDA map, FSA payments page, basis page,")
     print("conditions percentile, bushel's journey. Paste this log back.")
-    probe_afida()
-    probe_fsa_payments()
-    probe_agtransport()
-    probe_conditions()
+    key = os.environ.get("NASS_API_KEY", "").strip() or ("" if a.replay else None)
+    run = pr.Runner.from_args("viral", a)
+    res = run.fetch(first_batch(key))
+    probe_afida(res)
+    probe_fsa_payments(run, res)
+    probe_agtransport(res)
+    probe_conditions(res)
+    run.finish()
     print("\nDONE — paste the full log back and the fetchers get written against it.")
 
 
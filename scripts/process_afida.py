@@ -24,18 +24,33 @@ Methodology, validated against the official reports:
     totals but dropped from the county map (counted + reported).
 Missing years (2015, 2021 not published/downloaded) stay missing — the chart
 shows a gap, never a line across it. Same doctrine as cash-rent 2015.
+
+Each year's parse is saved under <RAW>/.parsed/ keyed by a hash of the xlsx,
+so adding a year parses that one file (years that do need parsing run one
+process each) and every other year is a JSON load before the merge. A
+re-downloaded file with different bytes is re-parsed; bump PARSE_VERSION
+whenever read_year's output changes. python-calamine, if installed, reads
+the sheets several times faster than openpyxl and yields the same rows.
 """
+import hashlib
 import json
 import os
 import re
 import sys
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from openpyxl import load_workbook
 
+try:
+    from python_calamine import CalamineWorkbook   # optional Rust xlsx reader
+except ImportError:
+    CalamineWorkbook = None
+
 RAW = sys.argv[1] if len(sys.argv) > 1 else os.environ.get("AFIDA_RAW", "data/afida/raw")
 OUT = sys.argv[2] if len(sys.argv) > 2 else "data/afida"
 
 LAND_COLS = ["Crop", "Pasture", "Forest", "Other Agriculture", "Other Non-Ag"]
+PARSE_VERSION = 1
 
 
 def norm_country(c):
@@ -43,10 +58,21 @@ def norm_country(c):
     return c or "Unknown"
 
 
-def read_year(path):
+def sheet_rows(path):
+    """First sheet as tuples of cell values, streamed. calamine reports an
+    empty cell as "" where openpyxl says None; read_year treats both alike."""
+    if CalamineWorkbook is not None:
+        yield from CalamineWorkbook.from_path(path).get_sheet_by_index(0).iter_rows()
+        return
     wb = load_workbook(path, read_only=True)
-    ws = wb.worksheets[0]
-    rows = ws.iter_rows(values_only=True)
+    try:
+        yield from wb.worksheets[0].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def read_year(path):
+    rows = sheet_rows(path)
     next(rows)  # banner
     next(rows)  # group labels
     hdr = [str(h).strip() if h else "" for h in next(rows)]
@@ -92,12 +118,60 @@ def read_year(path):
     return out
 
 
+def cache_path(path):
+    with open(path, "rb") as fh:
+        digest = hashlib.sha1(fh.read()).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(os.path.dirname(path), ".parsed", f"{stem}.{digest}.v{PARSE_VERSION}.json")
+
+
+def load_cached(path):
+    """read_year(path) as saved by parse_and_cache, or None if the file changed."""
+    try:
+        with open(cache_path(path)) as fh:
+            packed = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return [{"fips": f, "st": st, "co": co, "country": c, "ac": ac, "land": land}
+            for f, st, co, c, ac, land in packed]
+
+
+def parse_and_cache(path):
+    """read_year(path), saved for next time (older parses of the file dropped)."""
+    rows = read_year(path)
+    cp = cache_path(path)
+    os.makedirs(os.path.dirname(cp), exist_ok=True)
+    stem = os.path.basename(cp).split(".", 1)[0] + "."
+    for old in os.listdir(os.path.dirname(cp)):
+        if old.startswith(stem):
+            os.remove(os.path.join(os.path.dirname(cp), old))
+    with open(cp, "w") as fh:
+        json.dump([[r["fips"], r["st"], r["co"], r["country"], r["ac"], r["land"]] for r in rows],
+                  fh, separators=(",", ":"))
+    return rows
+
+
+def read_years(paths):
+    """{path: rows} for every path: cached years loaded, the rest parsed in
+    parallel, one process per file."""
+    out = {p: load_cached(p) for p in paths}
+    todo = [p for p, rows in out.items() if rows is None]
+    print(f"  {len(paths) - len(todo)} years from cache, parsing {len(todo)}")
+    if len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=min(len(todo), os.cpu_count() or 1)) as pool:
+            out.update(zip(todo, pool.map(parse_and_cache, todo)))
+    elif todo:
+        out[todo[0]] = parse_and_cache(todo[0])
+    return out
+
+
 def main():
     files = sorted(f for f in os.listdir(RAW) if re.match(r"afida_\d{4}\.xlsx$", f))
     if not files:
         raise SystemExit(f"no afida_<year>.xlsx files in {RAW}")
     years = [int(re.search(r"\d{4}", f).group()) for f in files]
     print(f"processing {len(files)} years: {years}")
+    parsed = read_years([os.path.join(RAW, f) for f in files])
 
     county = {}          # fips -> {"n","st","y":{year:ac}}
     nat_by_year = {}     # year -> total ac
@@ -106,7 +180,7 @@ def main():
     no_fips = defaultdict(float)
 
     for f, yr in zip(files, years):
-        rows = read_year(os.path.join(RAW, f))
+        rows = parsed[os.path.join(RAW, f)]
         tot = sum(r["ac"] for r in rows)
         nat_by_year[yr] = round(tot)
         print(f"  {yr}: {len(rows):,} holdings, {tot:,.0f} ac")
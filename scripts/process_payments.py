@@ -20,6 +20,9 @@ Outputs:
                                per-state summaries, medians
   data/payments/county.json    {fips: {t(otal), n_payees, pmts, med(ian
                                payee total), top:[[program, $]x3]}}
+                               top: dollars down, equal totals by program
+                               name (since 2026-10-19; before, tie order
+                               was whatever the sort left)
 
 Usage: python scripts/process_payments.py <dir-with-xlsx-files>
        (reads every .xlsx in the dir; dedupes nothing across files — FSA
@@ -42,62 +45,122 @@ BUCKET_LABELS = ["under $1k", "$1k-$5k", "$5k-$25k", "$25k-$100k",
                  "$100k-$500k", "over $500k"]
 
 
+# Read only COLS, each file typed as it is read: the repeated names and
+# program labels as categories (a handful of distinct values over ~1M rows).
+# Workers hand back typed frames and the concat never builds an object
+# column over every file; openpyxl's own per-file cell lists are the peak.
+DTYPES = {"State FSA Name": "category", "County FSA Name": "category",
+          "Formatted Payee Name": "string", "Disbursement Amount": "float64",
+          "Accounting Program Description": "category"}
+CATEGORIES = [c for c, t in DTYPES.items() if t == "category"]
+
+
+def _read_one(fp):
+    import pandas as pd
+    df = pd.read_excel(fp, engine="openpyxl", usecols=lambda c: str(c).strip() in COLS)
+    df.columns = [str(c).strip() for c in df.columns]
+    missing = [c for c in COLS if c not in df.columns]
+    if missing:
+        raise SystemExit(f"FATAL: {os.path.basename(fp)} missing columns {missing} — schema changed, stop and re-validate")
+    df["Disbursement Amount"] = pd.to_numeric(df["Disbursement Amount"], errors="coerce")
+    return df[COLS].astype(DTYPES)
+
+
 def load_frames(path):
+    """Every .xlsx in path, parsed and typed in parallel (openpyxl is pure
+    Python, so one process per file), then concatenated."""
     import pandas as pd
-    frames = []
+    from concurrent.futures import ProcessPoolExecutor
+    from pandas.api.types import union_categoricals
     files = sorted(f for f in os.listdir(path) if f.lower().endswith(".xlsx"))
     if not files:
         raise SystemExit(f"FATAL: no .xlsx files in {path}")
-    for f in files:
-        df = pd.read_excel(os.path.join(path, f), engine="openpyxl")
-        df.columns = [str(c).strip() for c in df.columns]
-        missing = [c for c in COLS if c not in df.columns]
-        if missing:
-            raise SystemExit(f"FATAL: {f} missing columns {missing} — schema changed, stop and re-validate")
-        print(f"  {f}: {len(df):,} rows, states: {sorted(df['State FSA Name'].unique())}")
-        frames.append(df[COLS])
-    return pd.concat(frames, ignore_index=True)
+    with ProcessPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1)) as pool:
+        frames = list(pool.map(_read_one, [os.path.join(path, f) for f in files]))
+    for f, df in zip(files, frames):
+        print(f"  {f}: {len(df):,} rows, states: {sorted(df['State FSA Name'].dropna().unique())}")
+    # concat turns categoricals with different categories into object: merge
+    # those per column instead
+    df = pd.concat([f.drop(columns=CATEGORIES) for f in frames], ignore_index=True)
+    for c in CATEGORIES:
+        df[c] = union_categoricals([f[c] for f in frames], ignore_order=True)
+    return df[COLS]
+
+
+def _codes(values, sort=True):
+    """(int codes, uniques) for a column: every grouping below runs on these
+    integers, so each string column is hashed once, not once per groupby."""
+    import pandas as pd
+    return pd.factorize(values, sort=sort)
 
 
 def shape(df):
+    """National, state and county roll-ups from a handful of grouped
+    aggregations over integer keys (no per-state or per-county Python loop)."""
+    import numpy as np
+    import pandas as pd
     df = df.dropna(subset=["Disbursement Amount", "State FSA Code", "County FSA Code"])
     df = df[df["Disbursement Amount"] > 0]
-    df["fips"] = (df["State FSA Code"].astype(int).astype(str).str.zfill(2)
-                  + df["County FSA Code"].astype(int).astype(str).str.zfill(3))
-    total = float(df["Disbursement Amount"].sum())
+    amt = df["Disbursement Amount"].to_numpy(dtype="float64")
+    total = float(amt.sum())
+
+    # fips from the (state, county) code pairs, formatted once per county
+    sc = df["State FSA Code"].astype(int).to_numpy(dtype="int64")
+    cc = df["County FSA Code"].astype(int).to_numpy(dtype="int64")
+    pair_c, _ = _codes(sc * (int(cc.max()) + 1) + cc)
+    at = np.unique(pair_c, return_index=True)[1]          # a row of each pair
+    pair_fips = np.array([str(s).zfill(2) + str(c).zfill(3) for s, c in zip(sc[at], cc[at])],
+                         dtype=object)
+    fips_c, fips_names = _codes(pair_fips[pair_c])
 
     # payee totals (within state — payee key includes state to avoid
     # cross-state name collisions counting as one person)
-    df["payee_key"] = df["State FSA Code"].astype(str) + "|" + df["Formatted Payee Name"].astype(str)
-    payee_tot = df.groupby("payee_key")["Disbursement Amount"].sum()
+    st_code_c, _ = _codes(df["State FSA Code"].to_numpy(), sort=False)
+    name_c, names = _codes(df["Formatted Payee Name"].astype(str).to_numpy(), sort=False)
+    payee_c, _ = _codes(st_code_c.astype("int64") * len(names) + name_c, sort=False)
+    st_c, st_names = _codes(df["State FSA Name"])
+    prog_c, prog_names = _codes(df["Accounting Program Description"])
+    rows = pd.DataFrame({"st": st_c, "fips": fips_c, "payee": payee_c, "prog": prog_c, "amt": amt})
+
+    payee_tot = rows.groupby("payee")["amt"].sum()
     hist = []
     for lo, hi in BUCKETS:
         sel = payee_tot[(payee_tot >= lo) & (payee_tot < hi)]
         hist.append({"n": int(len(sel)), "dollars": round(float(sel.sum()))})
 
-    programs = (df.groupby("Accounting Program Description")["Disbursement Amount"]
+    programs = (rows[rows["prog"] >= 0].groupby("prog")["amt"]
                 .agg(["sum", "count"]).sort_values("sum", ascending=False))
-    prog_table = [{"p": name, "t": round(float(r["sum"])), "n": int(r["count"])}
-                  for name, r in programs.iterrows()]
-
-    states = {}
-    for st, g in df.groupby("State FSA Name"):
-        pt = g.groupby("payee_key")["Disbursement Amount"].sum()
-        states[st] = {"t": round(float(g["Disbursement Amount"].sum())),
-                      "payees": int(len(pt)), "pmts": int(len(g)),
-                      "med": round(float(pt.median()))}
-
-    counties = {}
-    for fips, g in df.groupby("fips"):
-        pt = g.groupby("payee_key")["Disbursement Amount"].sum()
-        top = (g.groupby("Accounting Program Description")["Disbursement Amount"]
-               .sum().sort_values(ascending=False).head(3))
-        counties[fips] = {"n": str(g["County FSA Name"].iloc[0]),
-                          "st": str(g["State FSA Name"].iloc[0]),
-                          "t": round(float(g["Disbursement Amount"].sum())),
-                          "payees": int(len(pt)), "pmts": int(len(g)),
-                          "med": round(float(pt.median())),
-                          "top": [[p[:40], round(float(v))] for p, v in top.items()]}
+    prog_table = [{"p": prog_names[i], "t": round(float(r["sum"])), "n": int(r["count"])}
+                  for i, r in programs.iterrows()]
+
+    def rollup(key):
+        """t, pmts, payees and median payee total per key code, as one frame."""
+        sub = rows[rows[key] >= 0]                    # a missing name is not a group
+        g = sub.groupby(key)["amt"].agg(t="sum", pmts="size")
+        pt = sub.groupby([key, "payee"])["amt"].sum().groupby(level=0)
+        return g.join(pt.size().rename("payees")).join(pt.quantile(0.5).rename("med"))
+
+    states = {str(st_names[i]): {"t": round(float(r.t)), "payees": int(r.payees),
+                                 "pmts": int(r.pmts), "med": round(float(r.med))}
+              for i, r in rollup("st").iterrows()}
+
+    # top 3 programs per county: one grouped sum over (county, program), one
+    # sort (dollars down, then program name), the first three rows of each
+    # county. The name tie-break is deliberate and new: the old per-county
+    # sort_values().head(3) left equal totals in whatever order the sort
+    # produced, so a tie could list (and at 3rd place, pick) either program.
+    cp = rows[rows["prog"] >= 0].groupby(["fips", "prog"])["amt"].sum().reset_index()
+    cp = cp.sort_values(["fips", "amt", "prog"], ascending=[True, False, True], kind="stable")
+    top = defaultdict(list)
+    for f, p, v in cp.groupby("fips", sort=False).head(3).itertuples(index=False):
+        top[f].append([str(prog_names[p])[:40], round(float(v))])
+    first = np.unique(fips_c, return_index=True)[1]      # first row of each county
+    cname = df["County FSA Name"].to_numpy()[first]
+    sname = df["State FSA Name"].to_numpy()[first]
+    counties = {fips_names[i]: {"n": str(cname[i]), "st": str(sname[i]),
+                                "t": round(float(r.t)), "payees": int(r.payees), "pmts": int(r.pmts),
+                                "med": round(float(r.med)), "top": top[i]}
+                for i, r in rollup("fips").iterrows()}
 
     national = {
         "generated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
@@ -138,6 +201,16 @@ def selftest():
     assert len(national["buckets"]) == 6
     assert counties["54001"]["top"][0][0] in ("TEST PROGRAM", "OTHER PROGRAM")
     assert sum(b["n"] for b in national["buckets"]) == 20
+    # a second county with a three-way tie: dollars down, then name
+    extra = [dict(rows[0], **{"County FSA Code": 3, "County FSA Name": "Berkeley",
+                              "Formatted Payee Name": f"B{i}", "Disbursement Amount": 10.0 * (1 + i // 4),
+                              "Accounting Program Description": "ABCD"[i % 4]}) for i in range(8)]
+    national, counties = shape(pd.DataFrame(rows + extra))
+    assert counties["54003"]["top"] == [["A", 30], ["B", 30], ["C", 30]], counties["54003"]["top"]
+    assert counties["54003"]["med"] == 15 and counties["54003"]["payees"] == 8
+    assert national["states"]["West Virginia"]["pmts"] == 58
+    tops = [v for _, v in counties["54001"]["top"]]
+    assert tops == sorted(tops, reverse=True) and len(tops) == 2
     print("SELFTEST OK — fips join, negative drop, payee rollup, buckets, county top-programs")
 
 
@@ -20,6 +20,8 @@ Safety:
 """
 import json, os, sys, datetime, html, urllib.request, urllib.parse, urllib.error
 
+import sitemap_model
+
 REPO       = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 POLL_PATH  = os.path.join(REPO, "data", "poll.json")
 QUEUE_PATH = os.path.join(REPO, "data", "poll-queue.json")
@@ -287,15 +289,9 @@ def bump_sitemap():
     """Refresh the <lastmod> on the /grower-pulse sitemap entry (the page changes weekly)."""
     if not os.path.exists(SITEMAP_PATH):
         return False
-    import re
-    s = open(SITEMAP_PATH, encoding="utf-8").read()
-    today = datetime.date.today().isoformat()
-    pat = re.compile(r"(<loc>https://agsist\.com/grower-pulse</loc><lastmod>)\d{4}-\d{2}-\d{2}(</lastmod>)")
-    new, n = pat.subn(r"\g<1>" + today + r"\g<2>", s)
-    if n:
-        with open(SITEMAP_PATH, "w", encoding="utf-8") as f:
-            f.write(new)
-    return bool(n)
+    sm = sitemap_model.Sitemap.load(SITEMAP_PATH)
+    sm.bump("https://agsist.com/grower-pulse", datetime.date.today().isoformat())
+    return sm.write(SITEMAP_PATH)
 
 
 def main():
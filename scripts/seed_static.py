@@ -27,11 +27,16 @@ v1.1 — 2026-07-03 (added the weekly-changing pages to DATEMOD_ONLY: urea,
 
 import html as H
 import json
-import re
 import sys
 from datetime import datetime, timezone
+from pathlib import Path
+
+import bake_engine
+import sitemap_model
 
 PRICES = "data/prices.json"
+HAIL_MANIFEST = "data/hail/manifest.json"
+CASHRENT_NATIONAL = "data/cash-rent/national.json"
 SITEMAP = "sitemap.xml"
 
 # page → (crop key, benchmark key, benchmark label, crop word)
@@ -120,7 +125,9 @@ SITEMAP_URLS = [
 ]
 
 
-def load_prices():
+def load_prices(site=None):
+    if site is not None:
+        return site.json(PRICES)
     with open(PRICES, "r") as f:
         d = json.load(f)
     return d
@@ -146,25 +153,19 @@ def cwt_dollars(q):
     return "%.2f" % float(c)
 
 
-def seed_between(text, tag, replacement):
-    """Replace content between <!--SEED:tag--> and <!--/SEED--> (first pair after tag)."""
-    pat = re.compile(r"(<!--SEED:" + re.escape(tag) + r"-->)(.*?)(<!--/SEED-->)", re.S)
-    if not pat.search(text):
-        return text, False
-    new = pat.sub(lambda m: m.group(1) + replacement + m.group(3), text, count=1)
-    return new, new != text
+def seed_between(page, tag, replacement):
+    """Queue the content between <!--SEED:tag--> and <!--/SEED--> on a
+    bake_engine.Page. A page without the marker is left alone."""
+    page.fill(bake_engine.SEED, tag, replacement, expect=None)
 
 
-def stamp_meta_description(text, desc):
-    """Replace the <meta name="description"> content with a freshly-priced one.
+def stamp_meta_description(page, desc):
+    """Queue a freshly-priced <meta name="description"> content.
     The description must contain no double quotes."""
     if '"' in desc:
-        return text, False
-    pat = re.compile(r'(<meta name="description" content=")([^"]*)(")')
-    if not pat.search(text):
-        return text, False
-    new = pat.sub(lambda m: m.group(1) + desc + m.group(3), text, count=1)
-    return new, new != text
+        return
+    page.sub(r'(<meta name="description" content=")([^"]*)(")',
+             lambda m: m.group(1) + desc + m.group(3), "meta description", expect=None, count=1)
 
 
 def _chg(q):
@@ -203,21 +204,25 @@ def px_table(rows, flabel):
     return "".join(out) if n else None
 
 
-def stamp_datemodified(text, today):
-    pat = re.compile(r'("dateModified":\s*")(\d{4}-\d{2}-\d{2})(")')
-    if not pat.search(text):
-        return text, False
-    new = pat.sub(lambda m: m.group(1) + today + m.group(3), text)
-    return new, new != text
+def stamp_datemodified(page, today):
+    page.sub(r'("dateModified":\s*")(\d{4}-\d{2}-\d{2})(")',
+             lambda m: m.group(1) + today + m.group(3), "dateModified", expect=None)
+
 
+def _seeded(page, fn):
+    """Queue fn() on page; True if the page now renders differently than before."""
+    was = page.render()
+    fn()
+    return page.render() != was
 
-def seed_hail(today):
+
+def seed_hail(today, site):
     """Inject live report counts into hail-map.html's SEED:hailstats marker
     from data/hail/manifest.json — crawler-visible freshness on the page
     that competes for "recent hail" queries."""
     try:
-        m = json.load(open("data/hail/manifest.json"))
-        t = open("hail-map.html", encoding="utf-8").read()
+        m = site.json(HAIL_MANIFEST)
+        pg = site.page("hail-map.html")
     except Exception:
         return False
     years = m.get("years") or []
@@ -230,21 +235,18 @@ def seed_hail(today):
     line = (f"{total:,} NWS hail reports on the map ({years[0]}\u2013{years[-1]})"
             + (f" \u00b7 {int(recent):,} in the last {m.get('recent_days',30)} days" if recent else "")
             + (f" \u00b7 data through {gen}" if gen else ""))
-    t2, ch = seed_between(t, "hailstats", line)
-    if ch:
-        open("hail-map.html", "w", encoding="utf-8").write(t2)
-    return ch
+    return _seeded(pg, lambda: seed_between(pg, "hailstats", line))
 
 
-def seed_cashrent(today):
+def seed_cashrent(today, site):
     """Inject national coverage stats into cash-rent.html's SEED:crstats marker
     from data/cash-rent/national.json — a data page where JS-blind crawlers
     previously saw zero numbers (directly against the citation strategy).
     Numbers change once a year (NASS August release) + whenever the cash-rent
     workflow re-runs; idempotent otherwise."""
     try:
-        d = json.load(open("data/cash-rent/national.json"))
-        t = open("cash-rent.html", encoding="utf-8").read()
+        d = site.json(CASHRENT_NATIONAL)
+        pg = site.page("cash-rent.html")
     except Exception:
         return False
     counties = d.get("counties") or {}
@@ -259,40 +261,22 @@ def seed_cashrent(today):
             f"{latest_ry} rent &middot; median county rate ${med:.2f}/acre (non-irrigated where "
             f"available) &middot; rent-to-revenue ratio computed for {d.get('n_pct', 0):,} counties "
             f"({years[0]}&ndash;{years[-1]}) &middot; data refreshed {d.get('generated', today)}")
-    t2, ch = seed_between(t, "crstats", line)
-    if ch:
-        open("cash-rent.html", "w", encoding="utf-8").write(t2)
-    return ch
+    return _seeded(pg, lambda: seed_between(pg, "crstats", line))
 
 
-def bump_sitemap(today):
+def bump_sitemap(today, site):
     try:
-        t = open(SITEMAP, "r", encoding="utf-8").read()
+        pg = site.page(SITEMAP)
     except FileNotFoundError:
         print("  sitemap.xml not found — skipped")
         return False
-    orig = t
-    for url in SITEMAP_URLS:
-        # match the <url> block for this exact loc, replace its lastmod
-        pat = re.compile(
-            r"(<loc>" + re.escape(url) + r"</loc>\s*<lastmod>)([^<]*)(</lastmod>)")
-        t = pat.sub(lambda m: m.group(1) + today + m.group(3), t, count=1)
-    changed = t != orig
-    if changed:
-        open(SITEMAP, "w", encoding="utf-8").write(t)
-    return changed
 
+    return _seeded(pg, lambda: sitemap_model.edit(pg, lambda sm: sm.bump_many(SITEMAP_URLS, today)))
 
-def main():
-    now = datetime.now(timezone.utc)
-    today = now.strftime("%Y-%m-%d")
-    print(f"seed_static.py — {now.strftime('%Y-%m-%d %H:%M UTC')}")
 
-    try:
-        prices = load_prices()
-    except Exception as e:
-        print(f"FATAL: cannot read {PRICES}: {e}")
-        sys.exit(1)
+def seed(site, now, prices):
+    """Queue every seed, description, dateModified and sitemap bump on site."""
+    today = now.strftime("%Y-%m-%d")
     quotes = prices.get("quotes", {})
     fetched = prices.get("fetched", "")
     # human date label from the prices file's own timestamp — never claim fresher
@@ -303,11 +287,9 @@ def main():
     except Exception:
         flabel = today
 
-    any_change = False
-
     for page, (crop_key, bench_key, bench_label, crop) in PAGES.items():
         try:
-            t = open(page, "r", encoding="utf-8").read()
+            pg = site.page(page)
         except FileNotFoundError:
             print(f"  {page}: missing — skipped")
             continue
@@ -318,18 +300,16 @@ def main():
         bq = quotes.get(bench_key)
         f_usd = grain_dollars(fq)
         b_usd = grain_dollars(bq)
-        changed = False
         if f_usd:
             stale = " (last good quote)" if fq.get("stale") else ""
             front_label = ("Nearby " + mon + " " + crop) if mon else ("Front-month " + crop)
-            t, c1 = seed_between(t, "px", "$" + f_usd)
+            seed_between(pg, "px", "$" + f_usd)
             note = (front_label + " last closed near <strong>$" + f_usd +
                     "</strong>" + stale +
                     ((" &middot; " + bench_label + " near $" + b_usd) if b_usd else "") +
                     " &middot; as of " + flabel +
                     " &middot; refreshed every 30 minutes during trading hours &mdash; reload for the latest.")
-            t, c2 = seed_between(t, "note", note)
-            changed = c1 or c2
+            seed_between(pg, "note", note)
 
             # crawler-visible last-close table (marker optional per page)
             rows = [((("Nearby " + mon) if mon else "Front month"), fq),
@@ -339,8 +319,7 @@ def main():
                          ("Minneapolis HRS (MWE, most-active)", quotes.get("mplswheat"))]
             tbl = px_table(rows, flabel)
             if tbl:
-                t, c4 = seed_between(t, "pxtable", tbl)
-                changed = changed or c4
+                seed_between(pg, "pxtable", tbl)
 
             # freshly-priced meta description
             tmpl = DESC.get(page)
@@ -354,14 +333,11 @@ def main():
                     print(f"  {page}: description {dnote}")
                 else:
                     # entity-decode for attribute text: &middot; is fine in content=""
-                    t, c5 = stamp_meta_description(t, desc)
-                    changed = changed or c5
+                    stamp_meta_description(pg, desc)
         else:
             print(f"  {page}: no usable {crop_key} quote — seeds left as-is")
-        t, c3 = stamp_datemodified(t, today)
-        if changed or c3:
-            open(page, "w", encoding="utf-8").write(t)
-            any_change = True
+        stamp_datemodified(pg, today)
+        if pg.changed:
             print(f"  {page}: seeded ${f_usd or '—'}"
                   f"{(' / $' + b_usd) if b_usd else ''}"
                   f"{(' · ' + mon) if mon else ''} · dateModified {today}")
@@ -371,25 +347,21 @@ def main():
     # cattle page: quotes are already $/cwt — no /100
     page = "cattle-futures-prices.html"
     try:
-        t = open(page, "r", encoding="utf-8").read()
+        pg = site.page(page)
         lc = cwt_dollars(quotes.get("cattle"))
         gf = cwt_dollars(quotes.get("feeders"))
-        changed = False
         if lc:
             stale = " (last good quote)" if quotes.get("cattle", {}).get("stale") else ""
-            t, c1 = seed_between(t, "px", "$" + lc)
+            seed_between(pg, "px", "$" + lc)
             note = ("Live cattle last closed near <strong>$" + lc + "</strong>" + stale
                     + ((" &middot; feeders near $" + gf) if gf else "")
                     + " &middot; $/cwt &middot; as of " + flabel
                     + " &middot; refreshed every 30 minutes during trading hours &mdash; reload for the latest.")
-            t, c2 = seed_between(t, "note", note)
-            changed = c1 or c2
+            seed_between(pg, "note", note)
         else:
             print(f"  {page}: no usable cattle quote — seeds left as-is")
-        t, c3 = stamp_datemodified(t, today)
-        if changed or c3:
-            open(page, "w", encoding="utf-8").write(t)
-            any_change = True
+        stamp_datemodified(pg, today)
+        if pg.changed:
             print(f"  {page}: seeded ${lc or '—'}{(' / $' + gf) if gf else ''} · dateModified {today}")
         else:
             print(f"  {page}: no change")
@@ -398,21 +370,18 @@ def main():
 
     for page in DATEMOD_ONLY:
         try:
-            t = open(page, "r", encoding="utf-8").read()
+            pg = site.page(page)
         except FileNotFoundError:
             print(f"  {page}: missing — skipped")
             continue
-        t, c = stamp_datemodified(t, today)
-        if c:
-            open(page, "w", encoding="utf-8").write(t)
-            any_change = True
+        if _seeded(pg, lambda: stamp_datemodified(pg, today)):
             print(f"  {page}: dateModified {today}")
         else:
             print(f"  {page}: no change")
 
     # hail-map: seed crawler-visible stats from the manifest the hail Action maintains
     try:
-        hm = json.load(open("data/hail/manifest.json"))
+        hm = site.json(HAIL_MANIFEST)
         yrs = hm.get("years", [])
         tot = sum(hm.get("counts", {}).values())
         rc = hm.get("recent_count")
@@ -420,32 +389,54 @@ def main():
                 + (f" \u2014 {rc:,} in the last 30 days" if rc else "")
                 + " \u2014 recent reports refresh daily; the full archive rebuilds monthly.") if yrs else None
         if line:
-            t = open("hail-map.html", encoding="utf-8").read()
-            t, ch = seed_between(t, "hailstats", line)
-            t, cd = stamp_datemodified(t, today)
-            if ch or cd:
-                open("hail-map.html", "w", encoding="utf-8").write(t)
-                any_change = True
+            pg = site.page("hail-map.html")
+
+            def _hail():
+                seed_between(pg, "hailstats", line)
+                stamp_datemodified(pg, today)
+            if _seeded(pg, _hail):
                 print("  hail-map.html: stats seeded ·", line[:60])
     except FileNotFoundError:
         pass
     except Exception as e:
         print("  hail-map stats seed skipped:", e)
 
-    if seed_hail(today):
-        any_change = True
+    if seed_hail(today, site):
         print("  hail-map.html: stats line seeded")
-    if seed_cashrent(today):
-        any_change = True
+    if seed_cashrent(today, site):
         print("  cash-rent.html: SEED:crstats seeded")
 
-    if bump_sitemap(today):
-        any_change = True
+    if bump_sitemap(today, site):
         print(f"  sitemap.xml: lastmod → {today} on {len(SITEMAP_URLS)} URLs")
     else:
         print("  sitemap.xml: no change")
 
-    print("CHANGED" if any_change else "NO-CHANGE")
+
+@bake_engine.baker("seed", reads=(PRICES, HAIL_MANIFEST, CASHRENT_NATIONAL),
+                   writes=(*PAGES, "cattle-futures-prices.html", *DATEMOD_ONLY,
+                           "cash-rent.html", SITEMAP))
+def bake_site(site):
+    seed(site, datetime.now(timezone.utc), load_prices(site))
+    return f"{len(PAGES) + 1 + len(DATEMOD_ONLY)} pages + sitemap"
+
+
+def main():
+    now = datetime.now(timezone.utc)
+    print(f"seed_static.py — {now.strftime('%Y-%m-%d %H:%M UTC')}")
+
+    # one Page per file: hail-map.html is seeded from three places below and
+    # still read once and written once
+    site = bake_engine.Site(Path.cwd())
+    try:
+        prices = load_prices(site)
+    except Exception as e:
+        print(f"FATAL: cannot read {PRICES}: {e}")
+        sys.exit(1)
+    seed(site, now, prices)
+    written, _, refused = site.flush()
+    for rel, why in refused:
+        print(f"  {rel}: not written — {why}")
+    print("CHANGED" if written else "NO-CHANGE")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+site_graph.py — every HTML page in the repo, what it links to, which data
+files it fetches, and its head metadata, indexed once and kept between runs.
+
+WHY THIS FILE EXISTS
+  audit_pages rebuilt its duplicate-title and duplicate-description dicts on
+  every run, covered only the top-level pages, and could not answer "does
+  anything link here?" at all. A baker about to rewrite data/cot.json had no
+  way to ask which pages fetch it. Both are questions about the whole site,
+  and answering them by crawling ~530 files each time is the cost this index
+  removes.
+
+WHAT IT HOLDS
+  One node per *.html file (the root pages, daily/, hail/, hail-map/, rent/,
+  embed/ and the components/ fragments):
+
+      links      local hrefs in real markup (local_links: not ones a script
+                 assembles), as written
+      refs       data/*.json files the page references, first-seen order
+      title, desc, canonical
+
+  Fragments under components/ are link SOURCES only: header.html is injected
+  into every page, so its nav counts as an inbound link, but a fragment is
+  never reported as an orphan page.
+
+INCREMENTAL
+  .site-graph.json stores each node with its file's size, mtime and a hash
+  of its bytes. refresh() re-reads only files whose size or mtime moved,
+  re-parses only those whose bytes actually changed, and drops nodes whose
+  file is gone. Inbound edges are derived from the nodes on first query, so
+  nothing about another page has to be re-read when one page changes.
+
+USAGE
+    python3 scripts/site_graph.py                             refresh, summary
+    python3 scripts/site_graph.py --consumers data/cot.json   who fetches it
+    python3 scripts/site_graph.py --inbound cot.html          who links here
+    python3 scripts/site_graph.py --orphans                   pages nothing links to
+    python3 scripts/site_graph.py --dupes                     shared titles/descriptions
+    python3 scripts/site_graph.py --selftest
+
+    import site_graph
+    g = site_graph.SiteGraph.load()          # refreshed from disk and saved
+    g.consumers("data/cot.json")             # -> ["cot.html", ...]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+INDEX = REPO / ".site-graph.json"
+FRAGMENT_DIRS = ("components",)
+VERSION = 1                    # bump when node() changes what it extracts
+
+TITLE_RX = re.compile(r"<title>(.*?)</title>", re.S)
+DESC_RX = re.compile(r'<meta name="description"\s+content="([^"]*)"')
+CANON_RX = re.compile(r'<link rel="canonical"\s+href="([^"]*)"')
+DATA_REF_RX = re.compile(r"['\"](/?data/[a-zA-Z0-9_\-/]+\.json)['\"]")
+_SCRIPT_RX = re.compile(r"<script.*?</script>", re.S)
+_HREF_RX = re.compile(r'href="(/[^"#?\s]*)"')
+
+
+def local_links(html):
+    """Only hrefs in real markup. A template literal like
+
+        '<a href="/daily/'+escHtml(iso)+'">'
+
+    is a link the browser never sees as written, and the first run of
+    audit_pages reported three of them as dead links. Strip scripts first, and
+    refuse anything carrying a quote, plus or brace."""
+    body = _SCRIPT_RX.sub(" ", html)
+    out = set()
+    for m in _HREF_RX.finditer(body):
+        href = m.group(1)
+        if any(c in href for c in "'+{}$`"):
+            continue
+        out.add(href)
+    return out
+
+
+def data_refs(html):
+    """data/*.json references as written, each once, in the order they appear."""
+    return list(dict.fromkeys(m.group(1) for m in DATA_REF_RX.finditer(html)))
+
+
+def node(html):
+    """The graph's view of one page."""
+    t, d, c = TITLE_RX.search(html), DESC_RX.search(html), CANON_RX.search(html)
+    return {"links": sorted(local_links(html)), "refs": data_refs(html),
+            "title": re.sub(r"\s+", " ", t.group(1)).strip() if t else None,
+            "desc": d.group(1).strip() if d else None,
+            "canonical": c.group(1).strip() if c else None}
+
+
+def read_page(path):
+    """(bytes, text) as Path.read_text would decode it: universal newlines."""
+    raw = Path(path).read_bytes()
+    return raw, raw.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+
+
+class SiteGraph:
+    """rel path -> node, plus the queries the auditor and bakers ask of it."""
+
+    def __init__(self, nodes=None, root=REPO):
+        self.root = Path(root)
+        self.nodes = nodes or {}
+        self._inbound = None
+        self.parsed = 0                       # nodes refresh() re-parsed
+
+    @classmethod
+    def load(cls, path=INDEX, root=REPO, refresh=True, save=True):
+        """The saved index, brought up to date with the tree (and re-saved)."""
+        try:
+            saved = json.loads(Path(path).read_text(encoding="utf-8"))
+            nodes = saved["nodes"] if saved.get("version") == VERSION else {}
+        except (OSError, ValueError, KeyError):
+            nodes = {}
+        g = cls(nodes, root)
+        if refresh and g.refresh() and save:
+            g.save(path)
+        return g
+
+    def save(self, path=INDEX):
+        Path(path).write_text(json.dumps({"version": VERSION, "nodes": self.nodes},
+                                         separators=(",", ":"), sort_keys=True),
+                              encoding="utf-8")
+
+    # -- building -----------------------------------------------------------
+    def files(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            rel = os.path.relpath(dirpath, self.root)
+            for f in sorted(filenames):
+                if f.endswith(".html"):
+                    yield f if rel == "." else f"{rel}/{f}"
+
+    def refresh(self):
+        """Re-parse pages whose bytes changed, drop pages that are gone.
+        Returns True if any node changed."""
+        seen, dirty = set(), False
+        for rel in self.files():
+            seen.add(rel)
+            st = (self.root / rel).stat()
+            stat = [st.st_size, st.st_mtime_ns]
+            old = self.nodes.get(rel)
+            if old is not None and old.get("stat") == stat:
+                continue
+            raw, html = read_page(self.root / rel)
+            digest = hashlib.sha1(raw).hexdigest()
+            if old is not None and old.get("hash") == digest:
+                old["stat"] = stat             # touched, not changed
+                dirty = True
+                continue
+            self.nodes[rel] = {**node(html), "hash": digest, "stat": stat}
+            self.parsed += 1
+            dirty = True
+        for rel in set(self.nodes) - seen:
+            del self.nodes[rel]
+            dirty = True
+        if dirty:
+            self._inbound = None
+        return dirty
+
+    # -- queries ------------------------------------------------------------
+    def resolve(self, href):
+        """The page an href lands on, as a rel path, or None (an asset, a data
+        file, or a dead link)."""
+        p = href.lstrip("/")
+        if not p:
+            return "index.html" if "index.html" in self.nodes else None
+        for cand in (p, p + ".html", p + "/index.html"):
+            cand = os.path.normpath(cand)
+            if cand in self.nodes:
+                return cand
+        return None
+
+    def is_fragment(self, rel):
+        return rel.split("/", 1)[0] in FRAGMENT_DIRS
+
+    def outbound(self, rel):
+        """Pages rel links to (its own anchors excluded)."""
+        targets = {self.resolve(h) for h in self.nodes[rel]["links"]}
+        return sorted(t for t in targets if t and t != rel)
+
+    def inbound(self, rel):
+        """Pages and fragments that link to rel."""
+        if self._inbound is None:
+            self._inbound = {}
+            for src in self.nodes:
+                for t in self.outbound(src):
+                    self._inbound.setdefault(t, []).append(src)
+        return self._inbound.get(rel, [])
+
+    def orphans(self, pages=None):
+        """Pages nothing links to. The home page is the root of the site, not
+        an orphan; fragments are not pages."""
+        return [p for p in (self.nodes if pages is None else pages)
+                if p != "index.html" and not self.is_fragment(p) and not self.inbound(p)]
+
+    def consumers(self, data_path):
+        """Pages that reference data_path ("data/cot.json" or "/data/cot.json")."""
+        want = data_path.lstrip("/")
+        return [p for p, n in self.nodes.items() if any(r.lstrip("/") == want for r in n["refs"])]
+
+    def duplicates(self, field, pages=None):
+        """{value: [pages]} for every value of field ("title", "desc",
+        "canonical") that more than one page carries, in page order."""
+        seen = {}
+        for p in (self.nodes if pages is None else pages):
+            v = self.nodes[p].get(field)
+            if v is not None and not self.is_fragment(p):
+                seen.setdefault(v, []).append(p)
+        return {v: ps for v, ps in seen.items() if len(ps) > 1}
+
+
+def _selftest():
+    import tempfile
+    ok = True
+
+    def chk(cond, msg):
+        nonlocal ok
+        print(("  OK   " if cond else "  FAIL ") + msg)
+        if not cond:
+            ok = False
+
+    print("site_graph selftest")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for d in ("hail", "components"):
+            (root / d).mkdir()
+        pages = {
+            "index.html": '<title>Home</title><a href="/cot">c</a><a href="/hail/">h</a>',
+            "cot.html": ('<title>COT</title><meta name="description" content="Funds">'
+                         "<script>fetch('/data/cot.json');h='<a href=\"/lost\">'</script>"
+                         '<a href="/cot#top">self</a>'),
+            "lost.html": '<title>COT</title><meta name="description" content="Funds">',
+            "hail/index.html": "<title>Hail</title><script>fetch('data/hail.json')</script>",
+            "about.html": "<title>About</title>",
+            "components/header.html": '<a href="/about">About</a>',
+        }
+        for rel, html in pages.items():
+            (root / rel).write_text(html)
+        index = root / "graph.json"
+        g = SiteGraph.load(index, root)
+        chk(g.parsed == 6 and sorted(g.nodes) == sorted(pages), "first load parses every page")
+        chk(g.resolve("/cot") == "cot.html" and g.resolve("/hail/") == "hail/index.html"
+            and g.resolve("/") == "index.html" and g.resolve("/img/x.png") is None, "hrefs resolve to pages")
+        chk(g.consumers("data/cot.json") == ["cot.html"] and g.consumers("/data/hail.json") == ["hail/index.html"],
+            "consumers of a data file, with or without the leading slash")
+        chk(g.orphans() == ["lost.html"], f"a script-built link is not an inbound link ({g.orphans()})")
+        chk(g.inbound("about.html") == ["components/header.html"], "the header fragment's nav counts as inbound")
+        chk(g.inbound("cot.html") == ["index.html"], "a page's own anchor is not an inbound link")
+        chk(g.duplicates("title") == {"COT": ["cot.html", "lost.html"]}
+            and g.duplicates("desc", ["cot.html", "about.html"]) == {}, "duplicate clusters, optionally scoped")
+
+        again = SiteGraph.load(index, root)
+        chk(again.parsed == 0 and again.nodes == g.nodes, "an unchanged tree is not re-parsed")
+        (root / "about.html").write_text('<title>About</title><a href="/lost">x</a>')
+        (root / "hail" / "index.html").unlink()
+        again = SiteGraph.load(index, root)
+        chk(again.parsed == 1 and "hail/index.html" not in again.nodes, "one edit re-parses one page; a delete drops it")
+        chk(again.orphans() == [] and again.inbound("lost.html") == ["about.html"],
+            "inbound edges follow the edit")
+
+    print("SELFTEST OK" if ok else "SELFTEST FAILED")
+    return 0 if ok else 1
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Site link graph")
+    ap.add_argument("--consumers", metavar="DATA_JSON")
+    ap.add_argument("--inbound", metavar="PAGE")
+    ap.add_argument("--orphans", action="store_true")
+    ap.add_argument("--dupes", action="store_true")
+    ap.add_argument("--selftest", action="store_true")
+    a = ap.parse_args()
+    if a.selftest:
+        return _selftest()
+    g = SiteGraph.load()
+    if a.consumers:
+        print("\n".join(g.consumers(a.consumers)))
+    elif a.inbound:
+        print("\n".join(g.inbound(a.inbound)))
+    elif a.orphans:
+        print("\n".join(g.orphans()))
+    elif a.dupes:
+        for field in ("title", "desc", "canonical"):
+            for v, ps in g.duplicates(field).items():
+                print(f"{field:<9} {len(ps):>3}  {v[:60]}\n            {', '.join(ps[:6])}{' ...' if len(ps) > 6 else ''}")
+    else:
+        n_links = sum(len(n["links"]) for n in g.nodes.values())
+        print(f"{len(g.nodes)} pages, {n_links} local links, {g.parsed} re-parsed; "
+              f"{len(g.orphans())} orphans, {len(g.duplicates('title'))} shared titles")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+sitemap_model.py — sitemap.xml parsed once, edited in memory, written once.
+
+WHY THIS FILE EXISTS
+  update_sitemap, rotate_poll, seed_static, build_state_rent_pages and the two
+  hail generators each did their own read-regex-write of sitemap.xml.
+  update_sitemap --add re-ran re.sub(r"<url>.*?</url>") over all ~500 entries
+  for EVERY URL it was given, so appending the hail or daily archives was
+  quadratic. Here the file is split once into its bytes: text between
+  entries, <url> entries (indexed by <loc>), and named marker blocks
+  (<!-- HAIL-STATE-PAGES --> ... <!-- /HAIL-STATE-PAGES -->). Every operation
+  is a dict lookup or an append, and serialise() is one join.
+
+BYTE-STABLE
+  Nothing is re-formatted. serialise() of an unedited parse is the input;
+  a bumped entry changes only its <lastmod> text; added entries and replaced
+  blocks use the one-line style the writers have always used.
+
+USAGE
+    import sitemap_model
+    sm = sitemap_model.Sitemap.load("sitemap.xml")
+    sm.bump("https://agsist.com/grower-pulse", today)
+    sm.add("https://agsist.com/daily/2026-10-19", today)          # or bump if present
+    sm.set_block("HAIL-STATE-PAGES", [(loc, today, "monthly", "0.6"), ...])
+    sm.write("sitemap.xml")                                        # only if bytes changed
+
+    # inside a bake_engine Site, queue it on the shared sitemap.xml page
+    sitemap_model.edit(site.page("sitemap.xml"), lambda sm: sm.bump_many(urls, today))
+
+Run `python3 scripts/sitemap_model.py` for the selftest.
+"""
+import re
+import sys
+from pathlib import Path
+
+_TOKEN = re.compile(r"<url>.*?</url>|<!-- (/?)([A-Z][A-Z0-9-]*) -->", re.S)
+_LOC = re.compile(r"<loc>\s*(.*?)\s*</loc>", re.S)
+_LASTMOD = re.compile(r"<lastmod>\s*(.*?)\s*</lastmod>", re.S)
+CLOSE = "</urlset>"
+
+
+def url_entry(loc, lastmod, changefreq, priority):
+    """One <url> in the sitemap's single-line style."""
+    return (f"<url><loc>{loc}</loc><lastmod>{lastmod}</lastmod>"
+            f"<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>")
+
+
+class Entry:
+    """One <url>...</url>, kept as its original bytes."""
+
+    __slots__ = ("text", "loc")
+
+    def __init__(self, text):
+        self.text = text
+        m = _LOC.search(text)
+        self.loc = m.group(1).strip() if m else None
+
+    @property
+    def lastmod(self):
+        m = _LASTMOD.search(self.text)
+        return m.group(1).strip() if m else ""
+
+    def set_lastmod(self, day):
+        """Point <lastmod> at day (inserting one after </loc> if missing). True if changed."""
+        if self.lastmod == day:
+            return False
+        if _LASTMOD.search(self.text):
+            self.text = _LASTMOD.sub(f"<lastmod>{day}</lastmod>", self.text, count=1)
+        else:
+            self.text = self.text.replace("</loc>", f"</loc>\n    <lastmod>{day}</lastmod>", 1)
+        return True
+
+
+class Block:
+    """A <!-- NAME --> ... <!-- /NAME --> run of entries one generator owns."""
+
+    __slots__ = ("name", "parts")
+
+    def __init__(self, name, parts):
+        self.name, self.parts = name, parts
+
+    @property
+    def text(self):
+        return _join(self.parts)
+
+
+def _join(parts):
+    return "".join(p if isinstance(p, str) else p.text for p in parts)
+
+
+class Sitemap:
+    """Ordered loc -> entries map over the file's bytes, plus its named blocks."""
+
+    def __init__(self, text):
+        self.original = text
+        self.parts = []           # str | Entry | Block, in file order
+        self.tail = ""            # "</urlset>" and whatever follows it
+        self._index = {}          # loc -> [Entry]
+        self._blocks = {}         # name -> Block
+        self._parse(text)
+
+    @classmethod
+    def load(cls, path):
+        return cls(Path(path).read_text(encoding="utf-8"))
+
+    def _parse(self, text):
+        out, block, pos = self.parts, None, 0
+        for m in _TOKEN.finditer(text):
+            closing, name = m.group(1), m.group(2)
+            if name is None:
+                out.append(text[pos:m.start()])
+                out.append(self._indexed(Entry(m.group(0))))
+            elif not closing and block is None and text.find(f"<!-- /{name} -->", m.end()) >= 0:
+                out.append(text[pos:m.start()])
+                block = Block(name, [m.group(0)])
+                self._blocks.setdefault(name, block)
+                out = block.parts
+            elif closing and block is not None and name == block.name:
+                out.append(text[pos:m.end()])
+                self.parts.append(block)
+                out, block = self.parts, None
+            else:
+                continue                      # a stray marker stays plain text
+            pos = m.end()
+        rest = text[pos:]
+        cut = rest.find(CLOSE)
+        if cut < 0:
+            self.parts.append(rest)
+        else:
+            self.parts.append(rest[:cut])
+            self.tail = rest[cut:]
+        self.parts = [p for p in self.parts if p != ""]
+
+    def _indexed(self, e):
+        if e.loc is not None:
+            self._index.setdefault(e.loc, []).append(e)
+        return e
+
+    # -- queries ------------------------------------------------------------
+    def __contains__(self, loc):
+        return loc in self._index
+
+    def __len__(self):
+        return sum(len(v) for v in self._index.values())
+
+    def get(self, loc):
+        return self._index.get(loc, [])
+
+    def entries(self):
+        """Every entry in file order, block entries included."""
+        for p in self.parts:
+            if isinstance(p, Entry):
+                yield p
+            elif isinstance(p, Block):
+                yield from (e for e in p.parts if isinstance(e, Entry))
+
+    def block(self, name):
+        return self._blocks.get(name)
+
+    # -- edits --------------------------------------------------------------
+    def bump(self, loc, day):
+        """Set lastmod on every entry for loc. True if any changed."""
+        return any([e.set_lastmod(day) for e in self.get(loc)])
+
+    def bump_many(self, locs, day):
+        """bump() each loc; returns the ones that changed."""
+        return [loc for loc in locs if self.bump(loc, day)]
+
+    def add(self, loc, day, changefreq="never", priority="0.4"):
+        """Append a new entry just before </urlset>, or bump it if already listed.
+        Returns "added", "bumped" or None (already current)."""
+        if loc in self._index:
+            return "bumped" if self.bump(loc, day) else None
+        if not self.tail:
+            raise ValueError("sitemap has no </urlset> to append before")
+        self.parts += ["  ", self._indexed(Entry(url_entry(loc, day, changefreq, priority))), "\n"]
+        return "added"
+
+    def set_block(self, name, rows):
+        """Regenerate block name from (loc, lastmod, changefreq, priority) rows,
+        appending it before </urlset> if the file does not have it yet.
+        True if the block's bytes changed."""
+        parts = [f"<!-- {name} -->"]
+        for row in rows:
+            parts += ["\n  ", Entry(url_entry(*row))]
+        parts += ["\n  ", f"<!-- /{name} -->"]
+        blk = self._blocks.get(name)
+        if blk is None:
+            if not self.tail:
+                raise ValueError("sitemap has no </urlset> to append before")
+            blk = self._blocks[name] = Block(name, [])
+            self.parts += ["  ", blk, "\n"]
+        elif _join(parts) == blk.text:
+            return False
+        for e in blk.parts:
+            if isinstance(e, Entry) and e.loc is not None:
+                self._index[e.loc].remove(e)
+                if not self._index[e.loc]:
+                    del self._index[e.loc]
+        blk.parts = parts
+        for e in parts:
+            if isinstance(e, Entry):
+                self._indexed(e)
+        return True
+
+    # -- output -------------------------------------------------------------
+    def serialise(self):
+        return _join(self.parts) + self.tail
+
+    def changed(self):
+        return self.serialise() != self.original
+
+    def write(self, path):
+        """Write path only if the bytes changed. True if written."""
+        text = self.serialise()
+        if text == self.original:
+            return False
+        Path(path).write_text(text, encoding="utf-8")
+        self.original = text
+        return True
+
+
+def edit(page, fn):
+    """Queue fn(Sitemap) as one text edit on a bake_engine Page.
+    The page re-renders after every queued change; an unchanged input is
+    not parsed again."""
+    memo = [None, None]
+
+    def _edit(text):
+        if memo[0] is not text:
+            sm = Sitemap(text)
+            fn(sm)
+            memo[:] = [text, sm.serialise()]
+        return memo[1]
+    return page.edit(_edit)
+
+
+def _selftest():
+    ok = True
+
+    def chk(cond, msg):
+        nonlocal ok
+        print(("  OK   " if cond else "  FAIL ") + msg)
+        if not cond:
+            ok = False
+
+    print("sitemap_model selftest")
+    src = ('<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="x">\n\n  <!-- Core -->\n'
+           '  <url><loc>https://agsist.com/</loc><lastmod>2026-08-22</lastmod></url>\n'
+           '  <url>\n    <loc>https://agsist.com/odd</loc>\n  </url>\n'
+           '  <!-- HAIL-STATE-PAGES -->\n  <url><loc>https://agsist.com/hail-map/iowa</loc>'
+           '<lastmod>2026-08-01</lastmod></url>\n  <!-- /HAIL-STATE-PAGES -->\n</urlset>\n')
+    sm = Sitemap(src)
+    chk(sm.serialise() == src, "unedited parse serialises byte-for-byte")
+    chk(len(sm) == 3 and "https://agsist.com/hail-map/iowa" in sm, "block entries are indexed too")
+    chk(sm.bump("https://agsist.com/", "2026-10-19") and not sm.bump("https://agsist.com/", "2026-10-19"),
+        "bump changes once, then is a no-op")
+    sm.bump("https://agsist.com/odd", "2026-10-19")
+    chk("<loc>https://agsist.com/odd</loc>\n    <lastmod>2026-10-19</lastmod>" in sm.serialise(),
+        "a missing lastmod is inserted after </loc>")
+    chk(sm.add("https://agsist.com/daily/2026-10-19", "2026-10-19") == "added"
+        and sm.add("https://agsist.com/daily/2026-10-19", "2026-10-19") is None,
+        "add appends once; a repeat is already current")
+    chk(sm.serialise().endswith("<priority>0.4</priority></url>\n</urlset>\n"),
+        "added entry lands just before </urlset>")
+    rows = [("https://agsist.com/hail-map/" + s, "2026-10-19", "monthly", "0.6") for s in ("iowa", "ohio")]
+    chk(sm.set_block("HAIL-STATE-PAGES", rows) and not sm.set_block("HAIL-STATE-PAGES", rows),
+        "set_block rewrites once, then reports no change")
+    chk(sm.get("https://agsist.com/hail-map/iowa")[0].lastmod == "2026-10-19"
+        and "https://agsist.com/hail-map/ohio" in sm, "replaced block is re-indexed")
+    sm.set_block("HAIL-EVENT-PAGES", [("https://agsist.com/hail/", "2026-10-19", "daily", "0.7")])
+    chk(sm.serialise().endswith("  <!-- /HAIL-EVENT-PAGES -->\n</urlset>\n"), "a new block is appended")
+    again = Sitemap(sm.serialise())
+    chk(again.serialise() == sm.serialise() and again.block("HAIL-EVENT-PAGES") is not None,
+        "re-parse of the output is stable")
+
+    try:
+        real = Path(__file__).resolve().parent.parent / "sitemap.xml"
+        text = real.read_text(encoding="utf-8")
+        chk(Sitemap(text).serialise() == text, f"{real.name} round-trips ({len(Sitemap(text))} URLs)")
+    except OSError:
+        pass
+
+    print("SELFTEST OK" if ok else "SELFTEST FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(_selftest())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+test_market_scoring.py — golden-output selftest for the v12 compiled
+keyword scanner in fetch_markets (is_junk / score_relevance / get_category).
+
+The v11 per-keyword loops are frozen below as the reference. Every title
+in the captured sample, every title in data/markets.json, and a sweep that
+drops each tier/blacklist/category keyword into boundary-sensitive
+contexts must produce the identical (junk, score, tier, category) tuple.
+
+Runs offline, no network. Run:  python3 scripts/test_market_scoring.py
+"""
+import json
+import re
+import sys
+import time
+
+sys.path.insert(0, "scripts")
+import fetch_markets as fm  # noqa: E402
+from fetch_markets import _has_word  # noqa: E402
+
+# Captured from Kalshi /markets and Polymarket /events scans (titles +
+# tickers as the fetchers pass them to the scorers).
+SAMPLE = [
+    ("Will WTI Crude Oil (WTI) hit (HIGH) $90 in August?", ""),
+    ("Will WTI Crude Oil (WTI) hit (LOW) $65 in August?", ""),
+    ("Fed decision in September? 25 bps decrease", ""),
+    ("Will the Fed cut rates 3 times in 2026?", ""),
+    ("Russia x Ukraine ceasefire in 2026?", ""),
+    ("Will US tariffs on China exceed 50% by Dec 31?", ""),
+    ("Will the US and India sign a trade deal before October?", ""),
+    ("CPI year-over-year in August above 3.0%?", ""),
+    ("Corn price above $4.50 on Sep 30?", "KXCORN-26SEP30-T450"),
+    ("", "KXSOY-26NOV-T1100"),
+    ("", "KXEGGSAVG-26AUG-T3.50"),
+    ("Average egg price above $3.50 in August?", "KXEGGS-26AUG"),
+    ("Hurricane makes landfall in Louisiana before Oct 1?", "KXHURRICANE-26OCT01"),
+    ("Will inflation exceed 4% in 2026?", ""),
+    ("NFL: Chiefs vs Eagles moneyline", "KXNFLGAME-26SEP07KCPHI"),
+    ("Will Mahomes throw 40 touchdowns?", ""),
+    ("Lakers win total over/under 48.5", ""),
+    ("Will Bitcoin hit $150k in 2026?", ""),
+    ("Will the Fed cut rates and will crude oil hit $100?", "KXMVECROSSCATEGORY-S2026"),
+    ("Black Sea grain deal renewed by December?", ""),
+    ("Will bird flu be declared a pandemic?", ""),
+    ("Will natural gas settle above $3 on Henry Hub?", "KXGAS-26SEP"),
+    ("Soybean exports to China resume before harvest?", ""),
+    ("Will USDA raise the corn yield estimate in the September WASDE?", ""),
+    ("Drought covers >40% of Iowa on Sep 15?", "KXDROUGHT-26SEP15"),
+    ("Will the Mississippi River close to barge traffic at Memphis?", ""),
+    ("Will Powell remain Fed chair through 2026?", ""),
+    ("Rate cut at the December FOMC meeting?", "KXFED-26DEC"),
+    ("Will diesel average above $4/gal in October?", "KXDIESEL-26OCT"),
+    ("Will the farm bill pass the Senate in 2026?", ""),
+    ("Will Luka Doncic be traded?", ""),
+    ("Will Steph Curry retire?", ""),
+    ("Will a railroad strike happen in 2026?", ""),
+    ("Will H-2A wage rates rise next year?", ""),
+    ("Hog futures above $100 on Oct 15?", "KXHOG-26OCT15"),
+    ("Live cattle record high in September?", "KXCATTLE-26SEP"),
+    ("Will Taylor Swift release a new album?", ""),
+    ("Will the S&P 500 close above 6000?", ""),
+    ("Soil moisture below normal across the Corn Belt by August?", ""),
+    ("Will La Nina develop before winter? freeze risk", ""),
+    ("Will the government ban imports of Brazilian beef?", ""),
+    ("Will OPEC+ cut production in November?", ""),
+    ("Will the price of gasoline fall under $3?", ""),
+    ("Fertilizer prices (urea) above $500/ton at NOLA?", ""),
+    ("Will the Panama Canal restrict transits again?", ""),
+    ("Sugar, rice and cotton all up on the year?", ""),
+    ("Will PPI come in hot? rate hikes back on the table", "KXPPI-26SEP"),
+    ("ufc 310: who wins?", ""),
+    ("Will the ethanol blend wall be lifted (E15 year-round)?", "KXETHANOL-26"),
+    ("Grocery store prices: will a dozen eggs top $5?", "KXGROC-26"),
+]
+
+CONTEXTS = ["{}", "will {} rise?", "{}s", "x{}", "{}x", "({})", "{}-{}",
+            "{} and {}", "pre-{} post", "{}/", "1{}", "{}2", "THE {} UP"]
+
+
+# ---------------------------------------------------------------- v11 reference
+
+def ref_is_junk(title, ticker=""):
+    t = title.lower()
+    if ticker:
+        for p in fm.KALSHI_JUNK_RE:
+            if re.search(p, ticker.upper()):
+                return True
+    for p in fm.MEME_BLACKLIST + fm.SPORTS_BLACKLIST:
+        if _has_word(t, p):
+            return True
+    for p in fm.SPORTS_PLAYER_RE:
+        if re.search(p, t):
+            return True
+    return False
+
+
+def ref_score_relevance(text, ticker=""):
+    T1, T2, T3 = fm.TIER1_KEYWORDS, fm.TIER2_KEYWORDS, fm.TIER3_KEYWORDS
+    t = text.lower()
+    score, tier = 0, 0
+    matched_kws = []
+    if ticker:
+        tkr = ticker.upper()
+        for prefix, implied_kw in fm.KALSHI_TICKER_HINTS.items():
+            if tkr.startswith(prefix):
+                if implied_kw in T1:
+                    score, tier = 100, 1
+                    matched_kws.append(implied_kw)
+                elif implied_kw in T2:
+                    score, tier = 70, 2
+                    matched_kws.append(implied_kw)
+                elif implied_kw in T3:
+                    score, tier = 40, 3
+                    matched_kws.append(implied_kw)
+                break
+    if tier < 1:
+        for kw in T1:
+            if _has_word(t, kw):
+                score, tier = 100, 1
+                matched_kws.append(kw)
+                break
+    if score < 100:
+        for kw in T2:
+            if _has_word(t, kw):
+                if tier == 0:
+                    score, tier = 70, 2
+                matched_kws.append(kw)
+                break
+    if score < 70:
+        for kw in T3:
+            if _has_word(t, kw):
+                score, tier = 40, 3
+                matched_kws.append(kw)
+                break
+    if tier == 3:
+        for kw in T1:
+            if _has_word(t, kw):
+                score = min(100, score + 30)
+                matched_kws.append(kw)
+                break
+        else:
+            for kw in T2:
+                if _has_word(t, kw):
+                    score = min(100, score + 15)
+                    matched_kws.append(kw)
+                    break
+    if tier > 0:
+        extra_hits = 0
+        for kw in T1:
+            if kw not in matched_kws and _has_word(t, kw):
+                extra_hits += 1
+                if extra_hits >= 3:
+                    break
+        for kw in T2:
+            if kw not in matched_kws and _has_word(t, kw):
+                extra_hits += 1
+                if extra_hits >= 3:
+                    break
+        score += min(extra_hits * 3, 9)
+    return score, tier
+
+
+def ref_get_category(text):
+    t = text.lower()
+    for cat, kws in fm.AG_CATEGORIES:
+        for kw in kws:
+            if kw in t:
+                return cat
+    return "Other"
+
+
+# ---------------------------------------------------------------- harness
+
+def cases():
+    out = list(SAMPLE)
+    try:
+        with open("data/markets.json") as f:
+            out += [(m["title"], m.get("ticker", "") if m.get("platform") == "Kalshi" else "")
+                    for m in json.load(f).get("markets", [])]
+    except (OSError, ValueError):
+        pass
+    vocab = (fm.TIER1_KEYWORDS + fm.TIER2_KEYWORDS + fm.TIER3_KEYWORDS
+             + fm.MEME_BLACKLIST + fm.SPORTS_BLACKLIST
+             + [kw for _, kws in fm.AG_CATEGORIES for kw in kws])
+    for kw in vocab:
+        for ctx in CONTEXTS:
+            out.append((ctx.replace("{}", kw), ""))
+    # pairwise: a tier-3 word next to every tier-1/2 word exercises the
+    # upgrade and the extra-hit bump paths
+    for a in fm.TIER3_KEYWORDS[::4]:
+        for b in fm.TIER1_KEYWORDS[::3] + fm.TIER2_KEYWORDS[::3]:
+            out.append((f"{a} vs {b} and {fm.TIER1_KEYWORDS[0]} crop", ""))
+    for prefix in fm.KALSHI_TICKER_HINTS:
+        out.append(("", prefix + "-26DEC31"))
+        out.append(("weather forecast", prefix + "X"))
+    return out
+
+
+def main():
+    ok = True
+
+    def chk(cond, msg):
+        nonlocal ok
+        if not cond:
+            print("  FAIL " + msg)
+            ok = False
+
+    print("market scoring golden selftest")
+    sample = cases()
+    mismatches = 0
+    for title, ticker in sample:
+        text = title or ticker
+        want = (ref_is_junk(title, ticker), ref_score_relevance(text, ticker),
+                ref_get_category(text))
+        got = (fm.is_junk(title, ticker), fm.score_relevance(text, ticker),
+               fm.get_category(text))
+        if got != want:
+            mismatches += 1
+            chk(False, f"{title!r} / {ticker!r}: got {got}, want {want}")
+    print(f"  {len(sample)} titles compared, {mismatches} mismatches")
+
+    # shared-scan path used by the Polymarket record builder
+    for title, _ in SAMPLE:
+        hits = fm.match_keywords(title)
+        chk(fm.is_junk(title, hits=hits) == ref_is_junk(title), f"is_junk(hits=) {title!r}")
+        chk(fm.score_relevance(title, hits=hits) == ref_score_relevance(title),
+            f"score_relevance(hits=) {title!r}")
+
+    # overlapping phrases that share a first token are all reported
+    hits = fm.match_keywords("Black Sea grain corridor and the trade war")
+    chk({"black sea", "black sea grain", "grain", "trade war"} <= hits,
+        "overlapping phrases all reported in one scan")
+    chk("nfl" not in fm.match_keywords("inflation"), "nfl does not match inside inflation")
+
+    t0 = time.perf_counter()
+    for title, ticker in sample:
+        ref_is_junk(title, ticker); ref_score_relevance(title or ticker, ticker)
+    t_ref = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for title, ticker in sample:
+        fm.is_junk(title, ticker); fm.score_relevance(title or ticker, ticker)
+    t_new = time.perf_counter() - t0
+    print(f"  v11 loops {t_ref * 1000:.0f} ms  ->  v12 scanner {t_new * 1000:.0f} ms")
+
+    print("SELFTEST OK" if ok else "SELFTEST FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
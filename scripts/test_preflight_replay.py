@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+test_preflight_replay.py — the vectorised replay in preflight_prices must
+fire exactly where run() does, rule by rule, key by key, date by date;
+otherwise a fire-rate report is a report about some other gate.
+
+Builds a few hundred feeds from the 2026-08-08 fixture and today's
+data/prices.json, randomly broken in every way the gate checks for (stale
+prior closes, spliced continuous closes, impossible moves, out-of-band
+prices, stale derived fields, missing curves) at dates either side of the
+contract expiries, and compares replay() with one run(repair=False) per feed.
+Then the three snapshot sources on a temp git repo, a temp dir and a temp
+archive. Needs numpy (replay mode does).
+
+Run: python3 scripts/test_preflight_replay.py      (exit 0 all pass, 1 otherwise)
+"""
+import copy
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+import preflight_prices as pp                          # noqa: E402
+from test_preflight_limits import FEED_2026_08_08      # noqa: E402
+
+PASS = 0
+FAIL = 0
+
+
+def check(name, cond, detail=""):
+    global PASS, FAIL
+    if cond:
+        PASS += 1
+        print(f"  ok    {name}")
+    else:
+        FAIL += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+def broken(base, rnd):
+    """A copy of feed `base` with a few random faults."""
+    d = copy.deepcopy(base)
+    q = d["quotes"]
+    for k in rnd.sample(sorted(q), min(len(q), rnd.randint(0, 6))):
+        v = q[k]
+        if not v or v.get("close") is None:
+            continue
+        fault = rnd.choice(("splice", "prior", "move", "band", "net", "stale", "drop", "no-open"))
+        c = float(v["close"])
+        if fault == "splice":
+            v["close"] = round(c * rnd.choice((0.97, 1.003, 1.02)), 4)
+        elif fault == "prior" and v.get("open") is not None:
+            v["open"] = round(float(v["open"]) * rnd.choice((0.95, 1.001, 1.04)), 4)
+        elif fault == "move" and v.get("open") is not None:
+            lim = pp.limit_for(k) or 1.0
+            v["close"] = round(float(v["open"]) + lim * rnd.choice((-1.5, 1.0, 2.9)), 4)
+        elif fault == "band":
+            v["close"] = c * rnd.choice((0.01, 100))
+        elif fault == "net":
+            v["pctChange"] = (v.get("pctChange") or 0) + rnd.choice((0.05, 0.5))
+            v["netChange"] = (v.get("netChange") or 0) + rnd.choice((0.01, 3.0))
+        elif fault == "stale":
+            v["stale"] = True
+        elif fault == "drop":
+            del q[k]
+        elif fault == "no-open":
+            v.pop("open", None)
+    return d
+
+
+def fired_by_run(snaps):
+    """{(rule, sev): set of (t, name)} from one run() per snapshot."""
+    out = {}
+    for t, (_, when, d) in enumerate(snaps):
+        _, issues, _ = pp.run(copy.deepcopy(d), today=when, repair=False)
+        for sev, code, msg in issues:
+            out.setdefault((code, sev), set()).add((t, msg.split()[0].rstrip(":")))
+    return out
+
+
+def fired_by_replay(fired):
+    out = {}
+    for rule, (fail, warn, names) in fired.items():
+        for sev, m in (("FAIL", fail), ("WARN", warn)):
+            hits = {(int(t), names[j]) for t, j in zip(*m.nonzero())}
+            if hits:
+                out[(rule, sev)] = hits
+    return out
+
+
+def git(cwd, *args, env=None):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True,
+                   env={**os.environ, **(env or {})})
+
+
+def main():
+    rnd = random.Random(49)
+    live = json.loads((HERE.parent / "data" / "prices.json").read_text())
+    bases = [(FEED_2026_08_08, datetime(2026, 8, 8, 7, 5, tzinfo=timezone.utc)),
+             (live, pp._when(live["fetched"]))]
+
+    print("replay == run(), check by check")
+    snaps = []
+    for i in range(240):
+        base, when = bases[i % 2]
+        # either side of the Aug 15 grain expiry and the month-end roll
+        when = when + timedelta(days=rnd.choice((0, 1, 7, 9, 24)))
+        snaps.append((f"s{i}", when, broken(base, rnd)))
+    arrays = pp.load_arrays(snaps)
+    want, got = fired_by_run(snaps), fired_by_replay(pp.replay(arrays))
+    for rule in pp.RULES:
+        for sev in ("FAIL", "WARN"):
+            w, g = want.get((rule, sev), set()), got.get((rule, sev), set())
+            if w or g:
+                check(f"{rule} {sev}: {len(w)} firings", w == g,
+                      f"run only {sorted(w - g)[:4]} replay only {sorted(g - w)[:4]}")
+    check("every rule fired somewhere in the sample",
+          {r for r, _ in want} == set(pp.RULES), str(sorted({r for r, _ in want})))
+    blocked = {t for (r, s), hits in want.items() if s == "FAIL" for t, _ in hits}
+    check("blocked snapshots agree",
+          blocked == {t for t in range(len(snaps)) if not pp.run(copy.deepcopy(snaps[t][2]),
+                                                                  today=snaps[t][1])[0]})
+
+    print("snapshot sources")
+    with tempfile.TemporaryDirectory() as td:
+        repo = Path(td) / "repo"
+        (repo / "data").mkdir(parents=True)
+        git(repo, "init", "-q")
+        git(repo, "config", "user.email", "t@t"); git(repo, "config", "user.name", "t")
+        for day, hour, close in (("2026-08-03", 9, 400.0), ("2026-08-03", 15, 401.0), ("2026-08-04", 9, 402.0)):
+            (repo / "data/prices.json").write_text(json.dumps({"quotes": {"corn": {"close": close, "open": 399.0}}}))
+            stamp = f"{day}T{hour:02d}:00:00+00:00"
+            git(repo, "add", "data/prices.json")
+            git(repo, "commit", "-q", "-m", day, env={"GIT_COMMITTER_DATE": stamp, "GIT_AUTHOR_DATE": stamp})
+        cwd = os.getcwd()
+        os.chdir(repo)
+        try:
+            gs = pp.git_snapshots()
+        finally:
+            os.chdir(cwd)
+        check("git: last commit of each day",
+              [(l, d["quotes"]["corn"]["close"]) for l, _, d in gs] == [("2026-08-03", 401.0), ("2026-08-04", 402.0)],
+              str([(l, d["quotes"]) for l, _, d in gs]))
+
+        folder = Path(td) / "snaps"
+        folder.mkdir()
+        for i, (_, when, d) in enumerate(snaps[:3]):
+            (folder / f"{i:03d}.json").write_text(json.dumps(dict(d, fetched=when.isoformat())))
+        ds = pp.dir_snapshots(str(folder))
+        check("dir: by name, dated by `fetched`",
+              [l for l, _, _ in ds] == ["000", "001", "002"] and ds[1][1] == snaps[1][1])
+
+        arch = Path(td) / "archive"
+        arch.mkdir()
+        for day, lp in (("2026-08-05", {"corn": 4.40, "hogs": 81.675}), ("2026-08-06", {"corn": 4.41, "hogs": 95.5}),
+                        ("2026-08-07", {"corn": 4.42})):
+            (arch / f"{day}.json").write_text(json.dumps({"locked_prices": lp}))
+        (arch / "index.json").write_text("{}")
+        arch_snaps = pp.archive_snapshots(str(arch))
+        q = arch_snaps[1][2]["quotes"]
+        check("archive: grains back in cents, prior close from the day before",
+              abs(q["corn"]["close"] - 441.0) < 1e-9 and abs(q["corn"]["open"] - 440.0) < 1e-9)
+        fired = pp.replay(pp.load_arrays(arch_snaps), ("band", "limit"))
+        fail, _, names = fired["limit"]
+        check("archive: the hog move over the limit fires, once",
+              {(int(t), names[j]) for t, j in zip(*fail.nonzero())} == {(1, "hogs")})
+
+    print()
+    print(f"preflight replay selftest: {PASS} passed, {FAIL} failed")
+    return 1 if FAIL else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
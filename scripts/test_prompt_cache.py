@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+test_prompt_cache.py — request-shape and usage-accounting selftest for the
+two Anthropic callers (generate_daily.call_claude, critique_briefing).
+
+A local http.server stands in for the messages endpoint. It records every
+request and answers from a script (529s, malformed JSON, clean answers with
+cache usage), streaming SSE when the request asks for it and plain JSON when
+it does not, so whichever transport is installed gets exercised. Checks:
+  - the static system prefix is byte-identical whatever the day's context,
+    carries cache_control, and nothing per-day leaks into it
+  - every retry and regeneration sends that same prefix
+  - meta.api_usage records tokens, cache reads and attempts per request
+  - the critic caches CRITIC_SYSTEM and does not feed api_usage back to the model
+
+Runs offline. Run:  python3 scripts/test_prompt_cache.py
+"""
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+os.environ["ANTHROPIC_API_KEY"] = "test-key"
+
+USAGE = {"input_tokens": 812, "cache_creation_input_tokens": 0,
+         "cache_read_input_tokens": 9120, "output_tokens": 1400}
+BRIEFING = {"headline": "Corn holds $4.62", "meta": {"market_mood": "mixed"}}
+CRITIQUE = {"scores": {"rule_9_voice": 8}, "rewrite_needed": False}
+
+
+class Stub(BaseHTTPRequestHandler):
+    script = []          # (status, answer) popped per request
+    seen = []            # request bodies, in order
+
+    def log_message(self, *a):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        Stub.seen.append(body)
+        status, answer = Stub.script.pop(0)
+        if status != 200:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b'{"type":"error","error":{"type":"overloaded_error"}}')
+            return
+        text = answer if isinstance(answer, str) else json.dumps(answer)
+        if body.get("stream"):
+            events = [
+                {"type": "message_start", "message": {"usage": {**USAGE, "output_tokens": 1}}},
+                {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+                {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text[:20]}},
+                {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text[20:]}},
+                {"type": "message_delta", "usage": {"output_tokens": USAGE["output_tokens"]}},
+                {"type": "message_stop"},
+            ]
+            out = "".join(f"event: {e['type']}\ndata: {json.dumps(e)}\n\n" for e in events).encode()
+            ctype = "text/event-stream"
+        else:
+            out = json.dumps({"content": [{"type": "text", "text": text}], "usage": USAGE}).encode()
+            ctype = "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+
+def market(closed=False):
+    return {"is_closed": closed, "note": "", "day_name": "Tuesday", "reason": "open"}
+
+
+def generate(gd, **kw):
+    return gd.call_claude({"price_block": "corn 4.62"}, [], "[GRAINS] nothing", "harvest",
+                          {"text": "Q", "attribution": "A"}, "", ["Basis 101"], market(), **kw)
+
+
+def main():
+    # imported here, not at module level: generate_daily needs Python 3.12
+    # and pytest collects this file under whatever interpreter it runs on
+    import critique_briefing as cb
+    import generate_daily as gd
+    ok = True
+
+    def chk(cond, msg):
+        nonlocal ok
+        print(("  OK   " if cond else "  FAIL ") + msg)
+        if not cond:
+            ok = False
+
+    print("prompt cache selftest (" + ("streaming" if gd.requests else "urllib") + " transport)")
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Stub)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{srv.server_address[1]}/v1/messages"
+    gd.ANTHROPIC_API = cb.ANTHROPIC_API = url
+    gd.API_BACKOFF_SECONDS = cb.BACKOFF_SECONDS = [0, 0, 0]
+
+    a = gd.build_system_prompt(market(), ["Basis 101"], editorial_notes="EDITOR: lead with hogs")
+    b = gd.build_system_prompt(market(True), None, usda_release="WASDE at 11:00 CT")
+    chk(a[0] == b[0] and a[0]["text"] == gd.static_system_prompt(),
+        f"static prefix byte-identical across days ({len(a[0]['text'])} chars)")
+    chk(a[0].get("cache_control") == {"type": "ephemeral"} and "cache_control" not in a[-1],
+        "cache_control on the static block only")
+    chk("EDITOR: lead with hogs" in a[-1]["text"] and "Basis 101" in a[-1]["text"]
+        and "WASDE at 11:00 CT" in b[-1]["text"] and "Basis 101" not in a[0]["text"],
+        "per-day context rides in the tail block")
+    chk(gd.system_blocks("S", "") == [{"type": "text", "text": "S", "cache_control": {"type": "ephemeral"}}],
+        "no empty tail block when there is no context")
+
+    # one 529, then a clean answer: one request entry, two attempts
+    Stub.seen[:], gd.call_claude.usage[:] = [], []
+    Stub.script[:] = [(529, None), (200, BRIEFING)]
+    got = generate(gd)
+    rec = gd.call_claude.usage[-1] if gd.call_claude.usage else {}
+    chk(got == BRIEFING, "briefing parsed through the retry")
+    chk(len(Stub.seen) == 2 and Stub.seen[0]["system"] == Stub.seen[1]["system"],
+        "the retry resends the identical system blocks")
+    chk(rec.get("attempts") == 2 and rec.get("ok") and rec.get("cache_read_input_tokens") == 9120
+        and rec.get("output_tokens") == 1400 and rec.get("input_tokens") == 812,
+        f"usage of the answering attempt recorded ({rec})")
+    chk((rec.get("ttft_ms") is not None) == bool(gd.requests), "ttft measured when streaming")
+
+    # malformed JSON: the parse retry is a second request with the same prefix
+    Stub.seen[:], gd.call_claude.usage[:] = [], []
+    Stub.script[:] = [(200, "{not json at all"), (200, BRIEFING)]
+    got = generate(gd)
+    chk(got == BRIEFING and len(gd.call_claude.usage) == 2
+        and [r["attempts"] for r in gd.call_claude.usage] == [1, 1],
+        "parse-retry regeneration logged as its own request")
+    chk(Stub.seen[0]["system"][0] == Stub.seen[1]["system"][0], "regeneration reuses the cached prefix")
+
+    # every attempt fails: raised, and still accounted for
+    gd.call_claude.usage[:] = []
+    Stub.script[:] = [(500, None)] * 3
+    try:
+        generate(gd)
+        chk(False, "exhausted retries raise")
+    except Exception:
+        rec = gd.call_claude.usage[-1] if gd.call_claude.usage else {}
+        chk(rec.get("ok") is False and rec.get("attempts") == 3, f"failed request logged ({rec})")
+
+    # critic: cached CRITIC_SYSTEM, usage recorded, api_usage kept out of the draft
+    Stub.seen[:], cb.critique_briefing.usage[:] = [], []
+    Stub.script[:] = [(503, None), (200, CRITIQUE)]
+    draft = {**BRIEFING, "meta": {"market_mood": "mixed", "api_usage": {"generate": [rec]}}}
+    got = cb.critique_briefing(draft)
+    sent = Stub.seen[-1]
+    chk(got == CRITIQUE and sent["system"][0]["text"] == cb.CRITIC_SYSTEM
+        and sent["system"][0]["cache_control"] == {"type": "ephemeral"}, "critic caches CRITIC_SYSTEM")
+    chk("api_usage" not in sent["messages"][0]["content"] and "market_mood" in sent["messages"][0]["content"],
+        "api_usage is not sent to the editor")
+    crec = cb.critique_briefing.usage[-1] if cb.critique_briefing.usage else {}
+    chk(crec.get("attempts") == 2 and crec.get("cache_read_input_tokens") == 9120, f"critic usage ({crec})")
+
+    srv.shutdown()
+    print("SELFTEST OK" if ok else "SELFTEST FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+test_scorecard_ledger.py — selftest for build_scorecard's grade ledger: a
+run re-grades only the dates whose briefing, prior briefing or grading rules
+changed, and what it publishes is what a full re-grade would publish.
+
+Runs on a synthetic archive in a temp dir; the real data/ is never touched.
+Run: python3 scripts/test_scorecard_ledger.py       (exit 0 all pass, 1 otherwise)
+"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+import build_scorecard as bs   # noqa: E402
+
+PASS = 0
+FAIL = 0
+
+
+def check(name, cond, detail=""):
+    global PASS, FAIL
+    if cond:
+        PASS += 1
+        print(f"  ok    {name}")
+    else:
+        FAIL += 1
+        print(f"  FAIL  {name}  {detail}")
+
+
+def day(d, close, call, outcome=None):
+    """One archived briefing: corn closed at `close`, today's call `call`
+    (direction, level), grading yesterday's as `outcome`."""
+    b = {"date": d, "locked_prices": {"corn": close},
+         "yesterdays_call": {"summary": "corn call graded", "outcome": outcome} if outcome else {}}
+    if call:
+        b["todays_call"] = {"instrument": "corn", "direction": call[0], "level": call[1]}
+    return b
+
+
+def write(arch, b):
+    (arch / f"{b['date']}.json").write_text(json.dumps(b))
+
+
+def published():
+    out = json.loads(bs.OUT.read_text())
+    out.pop("updated")
+    return out
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        arch = Path(tmp) / "daily-archive"
+        arch.mkdir()
+        days = [day("2026-08-03", 4.40, ("up", 4.50)),
+                day("2026-08-04", 4.55, ("down", 4.50), "played_out"),
+                day("2026-08-05", 4.60, ("up", 4.70), "didnt"),
+                day("2026-08-06", 4.72, ("up", 4.80), "played_out"),
+                day("2026-08-07", 4.75, None, "pending")]
+        for b in days:
+            write(arch, b)
+        bs.ARCHIVE = arch
+        bs.OUT = Path(tmp) / "scorecard.json"
+        ledger_path = bs.OUT.with_name(bs.LEDGER_NAME)
+        rules = bs.rules_version()
+        dates = [b["date"] for b in days]
+
+        def raw():
+            return {d: (arch / f"{d}.json").read_bytes() for d in sorted(p.stem for p in arch.glob("*.json"))}
+
+        print("incremental grading")
+        led, regraded = bs.grade(dates, {}, rules, raw())
+        check("empty ledger grades every date", regraded == dates, str(regraded))
+        again, regraded = bs.grade(dates, led, rules, raw())
+        check("unchanged archive grades nothing", regraded == [] and again == led, str(regraded))
+
+        bs.main()
+        first = published()
+        check("ledger written next to OUT", ledger_path.exists())
+        check("four calls published", first["total"] == 4, str(first["total"]))
+        bs.main()
+        check("a cached run publishes the same scorecard", published() == first)
+
+        # an edited briefing re-grades its own date and the next one, which
+        # grades the call it made
+        days[2] = day("2026-08-05", 4.60, ("down", 4.55), "didnt")
+        write(arch, days[2])
+        led2, regraded = bs.grade(dates, json.loads(ledger_path.read_text())["dates"], rules, raw())
+        check("edit re-grades that date and the next",
+              regraded == ["2026-08-05", "2026-08-06"], str(regraded))
+
+        _, regraded = bs.grade(dates, led2, rules + "x", raw())
+        check("changed rules re-grade everything", regraded == dates, str(regraded))
+        check("a ledger under other rules is not reused",
+              bs.load_ledger(ledger_path, rules + "x") == {})
+
+        print("--full against the incremental build")
+        bs.main()
+        incremental = published()
+        check("--full finds no difference", bs.main(full=True) == 0)
+        check("--full publishes what the ledger did", published() == incremental)
+
+        # a ledger entry that disagrees with a fresh grade is reported
+        led = json.loads(ledger_path.read_text())
+        led["dates"]["2026-08-04"]["rec"]["outcome"] = "didnt"
+        ledger_path.write_text(json.dumps(led))
+        check("--full flags a stale ledger entry", bs.main(full=True) == 1)
+        check("--full writes the full result", published() == incremental)
+
+        (arch / "2026-08-03.json").unlink()
+        bs.main()
+        led = json.loads(ledger_path.read_text())["dates"]
+        check("dates gone from the archive leave the ledger", "2026-08-03" not in led, str(sorted(led)))
+        ledger_path.write_text("{not json")
+        bs.main()
+        check("an unreadable ledger is rebuilt", len(json.loads(ledger_path.read_text())["dates"]) == 4)
+
+    print()
+    print(f"scorecard-ledger selftest: {PASS} passed, {FAIL} failed")
+    return 1 if FAIL else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
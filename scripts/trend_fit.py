@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+trend_fit.py — batched, masked ordinary least squares: the one straight-line
+fitter behind the conditions-vs-yield fits, the Yield Nowcast and the county
+cash-rent trend yields.
+
+WHY THIS FILE EXISTS
+  Three scripts each carried a pure-Python OLS (fetch_cond_yield.lin_r2 and
+  detrend, build_yield_nowcast.linfit, fetch_cash_rent.fit_trend) and called
+  it once per state, per week, per county, building lists for every pair.
+  fetch_cond_yield alone ran it ~2 x 19 x 50 times a crop. Same arithmetic,
+  three copies, all of it interpreted.
+
+HOW IT WORKS
+  fit(x, y) regresses y on x along the LAST axis, for every leading index at
+  once. Missing observations are NaN in x or y (or False in mask) and simply
+  drop out of their own row's sums, so a state x year x week panel with holes
+  is one call. Two-pass centred sums, like the loops it replaced, so results
+  agree with them to float rounding.
+
+  -> Fit(intercept, slope, r2, n, sxx), arrays of the leading shape:
+       slope = 0 where x has no spread (sxx == 0), as every caller did
+       r2    = 0 where x or y has no spread
+       n     = observations in the row; callers apply their own MIN_N
+
+      import trend_fit
+      f = trend_fit.fit(years, panel)          # panel: states x years, NaN gaps
+      f.slope[f.n >= 15]
+
+  linfit(xs, ys) is the scalar (intercept, slope) for callers fitting one line.
+
+    python3 scripts/trend_fit.py --selftest
+"""
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+Fit = namedtuple("Fit", "intercept slope r2 n sxx")
+
+
+def fit(x, y, mask=None):
+    """OLS of y on x along the last axis. See module docstring."""
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    m = ~(np.isnan(x) | np.isnan(y))
+    if mask is not None:
+        m &= np.asarray(mask, dtype=bool)
+    n = m.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mx = np.where(m, x, 0.0).sum(axis=-1) / n
+        my = np.where(m, y, 0.0).sum(axis=-1) / n
+    dx = np.where(m, x - mx[..., None], 0.0)
+    dy = np.where(m, y - my[..., None], 0.0)
+    sxx = (dx * dx).sum(axis=-1)
+    sxy = (dx * dy).sum(axis=-1)
+    syy = (dy * dy).sum(axis=-1)
+    slope = np.divide(sxy, sxx, out=np.zeros_like(sxx), where=sxx != 0)
+    r2 = np.divide(sxy * sxy, sxx * syy, out=np.zeros_like(sxx), where=(sxx != 0) & (syy != 0))
+    return Fit(my - slope * mx, slope, r2, n, sxx)
+
+
+def linfit(xs, ys):
+    """(intercept, slope) of one line; slope 0 when xs has no spread."""
+    f = fit(xs, ys)
+    return float(f.intercept), float(f.slope)
+
+
+# ---------------------------------------------------------------- selftest
+def _loop(xs, ys):
+    """The per-series loop the callers used, as the reference."""
+    n = len(xs)
+    mx, my = sum(xs) / n, sum(ys) / n
+    sxx = sum((x - mx) ** 2 for x in xs)
+    sxy = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    syy = sum((y - my) ** 2 for y in ys)
+    b = sxy / sxx if sxx else 0.0
+    r2 = (sxy * sxy) / (sxx * syy) if sxx and syy else 0.0
+    return my - b * mx, b, r2, n
+
+
+def selftest():
+    import random
+    rnd = random.Random(11)
+    ok = True
+
+    def chk(cond, msg):
+        nonlocal ok
+        print(("  OK   " if cond else "  FAIL ") + msg)
+        ok = ok and cond
+
+    print("trend_fit selftest")
+    a, b = linfit([2011, 2012, 2013], [150.0, 152.0, 154.0])
+    chk(abs(b - 2) < 1e-9 and abs(a + b * 2014 - 156) < 1e-9, "exact on a perfect line")
+    chk(linfit([2020] * 4, [1.0, 2.0, 3.0, 4.0])[1] == 0.0, "no x spread: slope 0")
+
+    # a ragged 3-d panel against the loop, row by row
+    years = np.arange(2000, 2026, dtype=float)
+    y = np.array([[[150 + 2 * (yr - 2000) + rnd.gauss(0, 8) if rnd.random() > 0.25 else np.nan
+                    for yr in years] for _ in range(4)] for _ in range(6)])
+    y[0, 0, :] = np.nan                                  # empty row
+    y[0, 1, :] = np.nan
+    y[0, 1, 3] = 170.0                                   # one point
+    y[1, 2, :] = np.where(np.isnan(y[1, 2, :]), np.nan, 160.0)   # no y spread
+    f = fit(years, y)
+    worst = 0.0
+    same_n = True
+    for i in range(y.shape[0]):
+        for j in range(y.shape[1]):
+            keep = ~np.isnan(y[i, j])
+            if keep.sum() < 2:
+                same_n &= int(f.n[i, j]) == int(keep.sum())
+                continue
+            ia, ib, ir2, nn = _loop(list(years[keep]), list(y[i, j][keep]))
+            same_n &= int(f.n[i, j]) == nn
+            worst = max(worst, abs(f.intercept[i, j] - ia), abs(f.slope[i, j] - ib), abs(f.r2[i, j] - ir2))
+    chk(same_n and worst < 1e-9, f"batched fit matches the per-row loop (max diff {worst:.1e})")
+    chk(f.r2[1, 2] == 0.0 and f.slope[1, 2] == 0.0, "no y spread: r2 0, slope 0")
+    chk(f.n[0, 0] == 0 and np.isnan(f.intercept[0, 0]), "empty row: n 0, no intercept")
+
+    # explicit mask and NaN x drop observations the same way
+    yy = y[2, 0]
+    m = ~np.isnan(yy) & (years < 2020)
+    xs = np.where(years < 2020, years, np.nan)
+    g1, g2 = fit(years, yy, mask=m), fit(xs, yy)
+    chk(int(g1.n) == int(g2.n) and abs(g1.slope - g2.slope) < 1e-12, "mask and NaN x agree")
+
+    print("SELFTEST OK" if ok else "SELFTEST FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    if "--selftest" in sys.argv:
+        sys.exit(selftest())
+    print(__doc__)
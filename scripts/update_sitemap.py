@@ -14,16 +14,18 @@ Two modes:
 
 Never invents URLs. Only rewrites the date text inside existing <lastmod> tags (or
 inserts one right after <loc> if a URL somehow lacks it), leaving all other bytes —
-indentation, attribute order, the XML declaration — untouched.
+indentation, attribute order, the XML declaration — untouched. The file is parsed
+once into a sitemap_model.Sitemap, so --add with thousands of URLs stays linear.
 
 Optional: --out PATH writes the list of bumped URLs (one per line) for an IndexNow ping.
 Stdlib only.
 """
 import argparse
 import datetime
-import re
 from pathlib import Path
 
+import sitemap_model
+
 HOST = "https://agsist.com"
 SITEMAP = "sitemap.xml"
 
@@ -67,6 +69,31 @@ def file_to_url(fpath):
     return f"{HOST}/{slug}"
 
 
+def add_urls(sm, urls, today, bumped, changefreq=None, priority=None):
+    """--add mode: ensure URLs exist in the Sitemap sm. Existing URL -> bump
+    lastmod to today. Missing URL -> append a single-line <url> just before
+    </urlset>, matching the file's existing one-line entry style. Never
+    duplicates. Bumped/added URLs are appended to bumped; returns sm."""
+    # Defaults are tuned for daily ARCHIVE pages: published once, never
+    # revised, low priority. A tool page is neither, so allow an override
+    # rather than silently filing /cash-rent as "never changes, 0.4".
+    _freq = changefreq or "never"
+    _pri = priority or "0.4"
+    for url in urls:
+        # AUDIT 2026-08-11: preserve an intentional trailing slash — rstrip
+        # turned the /rent/ hub (whose page canonical IS /rent/) into /rent,
+        # a canonical mismatch on every state page's breadcrumb parent.
+        url = url.strip()
+        if not url:
+            continue
+        done = sm.add(url, today, _freq, _pri)
+        if done:
+            bumped.append(url)
+        if done == "added":
+            print(f"[sitemap] added {url}")
+    return sm
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--daily", action="store_true")
@@ -105,61 +132,20 @@ def main():
         # push mode
         return loc in changed_urls
 
-    def process(m):
-        block = m.group(0)
-        loc_m = re.search(r"<loc>\s*(.*?)\s*</loc>", block, re.S)
-        if not loc_m:
-            return block
-        loc = loc_m.group(1).strip()
-        lm_m = re.search(r"<lastmod>\s*(.*?)\s*</lastmod>", block, re.S)
-        cur = lm_m.group(1).strip() if lm_m else ""
-        if cur == today or not should_bump(loc, cur):
-            return block
-        bumped.append(loc)
-        if lm_m:
-            return re.sub(r"<lastmod>\s*.*?\s*</lastmod>",
-                          f"<lastmod>{today}</lastmod>", block, count=1, flags=re.S)
-        # no lastmod present: insert one right after </loc>, matching indated style
-        return re.sub(r"</loc>", f"</loc>\n    <lastmod>{today}</lastmod>",
-                      block, count=1)
-
-    new = re.sub(r"<url>.*?</url>", process, content, flags=re.S)
-
-    # --add mode: ensure URLs exist. Existing URL -> bump lastmod to today.
-    # Missing URL -> insert a new single-line <url> block just before </urlset>,
-    # matching the file's existing one-line entry style. Never duplicates.
-    for url in args.add:
-        # AUDIT 2026-08-11: preserve an intentional trailing slash — rstrip
-        # turned the /rent/ hub (whose page canonical IS /rent/) into /rent,
-        # a canonical mismatch on every state page's breadcrumb parent.
-        url = url.strip()
-        if not url:
+    sm = sitemap_model.Sitemap(content)
+    for entry in sm.entries():
+        if entry.loc is None:
             continue
-        if f"<loc>{url}</loc>" in new:
-            def bump_existing(m, _url=url):
-                block = m.group(0)
-                if f"<loc>{_url}</loc>" not in block:
-                    return block
-                if f"<lastmod>{today}</lastmod>" in block:
-                    return block
-                bumped.append(_url)
-                return re.sub(r"<lastmod>\s*.*?\s*</lastmod>",
-                              f"<lastmod>{today}</lastmod>", block, count=1, flags=re.S)
-            new = re.sub(r"<url>.*?</url>", bump_existing, new, flags=re.S)
-        else:
-            # Defaults are tuned for daily ARCHIVE pages: published once, never
-            # revised, low priority. A tool page is neither, so allow an override
-            # rather than silently filing /cash-rent as "never changes, 0.4".
-            _freq = args.changefreq or "never"
-            _pri = args.priority or "0.4"
-            entry = (f"  <url><loc>{url}</loc><lastmod>{today}</lastmod>"
-                     f"<changefreq>{_freq}</changefreq><priority>{_pri}</priority></url>\n")
-            new = new.replace("</urlset>", entry + "</urlset>", 1)
-            bumped.append(url)
-            print(f"[sitemap] added {url}")
+        cur = entry.lastmod
+        if cur == today or not should_bump(entry.loc, cur):
+            continue
+        entry.set_lastmod(today)
+        bumped.append(entry.loc)
+
+    add_urls(sm, args.add, today, bumped, args.changefreq, args.priority)
 
     if bumped:
-        Path(SITEMAP).write_text(new, encoding="utf-8")
+        sm.write(SITEMAP)
         print(f"[sitemap] bumped {len(bumped)} lastmod -> {today}:")
         for u in bumped:
             print(f"  {u}")